@@ -19,11 +19,20 @@ except ImportError:
     raise
 
 
+def call_changes(args):
+    """Function used when the "changes" subcommand is called"""
+    from physbiblio.database import pBDB
+
+    if args.deleteUpTo is not None and pBDB.changes.deleteUpTo(args.deleteUpTo):
+        pBDB.commit()
+    pBDB.changes.printSince(since=args.since)
+
+
 def call_clean(args):
     """Function used when the "clean" subcommand is called"""
     from physbiblio.database import pBDB
 
-    pBDB.bibs.cleanBibtexs(startFrom=args.startFrom)
+    pBDB.bibs.cleanBibtexs(startFrom=args.startFrom, after=args.after)
     pBDB.commit()
 
 
@@ -38,7 +47,14 @@ def call_export(args):
     """Function used when the "export" subcommand is called"""
     from physbiblio.export import pBExport
 
-    pBExport.exportAll(args.filename)
+    return pBExport.exportAll(args.filename, since=args.since)
+
+
+def call_maintain(args):
+    """Function used when the "maintain" subcommand is called"""
+    from physbiblio.database import pBDB
+
+    pBDB.maintain(full=args.full)
 
 
 def call_tests(args):
@@ -89,7 +105,9 @@ def call_update(args):
     """Function used when the "update" subcommand is called"""
     from physbiblio.database import pBDB
 
-    pBDB.bibs.searchOAIUpdates(startFrom=args.startFrom, force=args.force)
+    pBDB.bibs.searchOAIUpdates(
+        startFrom=args.startFrom, force=args.force, resume=args.resume, after=args.after
+    )
     pBDB.commit()
 
 
@@ -153,6 +171,22 @@ def call_gui(args=None):
         pBLogger.info(apstr.closeMainW)
 
 
+def runCommand(args):
+    """Run the function corresponding to the chosen sub-command.
+    If requested, collect statistics on the database queries
+    and print them at the end
+    """
+    if not getattr(args, "queryStats", False):
+        return args.func(args)
+    from physbiblio.database import pBDB
+
+    pBDB.setQueryProfiling(True)
+    try:
+        args.func(args)
+    finally:
+        pBLogger.info(pBDB.profiler.report())
+
+
 class NewProfileAction(argparse.Action):
     """Used to trigger a reload of the settings
     if a profile is specified as an argument
@@ -179,6 +213,11 @@ def setParser():
         choices=pbConfig.profiles.keys(),
         help=apstr.profileHelp,
     )
+    parser.add_argument(
+        "--queryStats",
+        action="store_true",
+        help=apstr.queryStatsHelp,
+    )
     parser.add_argument(
         "-v",
         "--version",
@@ -187,6 +226,15 @@ def setParser():
     )
     subparsers = parser.add_subparsers(help=apstr.subHelp, dest="cmd")
 
+    parser_changes = subparsers.add_parser("changes", help=apstr.changesHelp)
+    parser_changes.add_argument(
+        "-s", "--since", type=int, default=0, help=apstr.changesSinceHelp
+    )
+    parser_changes.add_argument(
+        "-d", "--deleteUpTo", type=int, help=apstr.changesDeleteHelp
+    )
+    parser_changes.set_defaults(func=call_changes)
+
     parser_clean = subparsers.add_parser("clean", help=apstr.cleanHelp)
     parser_clean.add_argument(
         "-s",
@@ -195,6 +243,7 @@ def setParser():
         help=apstr.cleanStartHelp,
         default=0,
     )
+    parser_clean.add_argument("-a", "--after", help=apstr.afterHelp)
     parser_clean.set_defaults(func=call_clean)
 
     parser_cli = subparsers.add_parser("cli", help=apstr.cliHelp)
@@ -220,8 +269,17 @@ def setParser():
 
     parser_export = subparsers.add_parser("export", help=apstr.exportHelp)
     parser_export.add_argument("filename", help=apstr.exportFilenameHelp)
+    parser_export.add_argument(
+        "-s", "--since", type=int, default=None, help=apstr.exportSinceHelp
+    )
     parser_export.set_defaults(func=call_export)
 
+    parser_maintain = subparsers.add_parser("maintain", help=apstr.maintainHelp)
+    parser_maintain.add_argument(
+        "-f", "--full", action="store_true", help=apstr.maintainFullHelp
+    )
+    parser_maintain.set_defaults(func=call_maintain)
+
     parser_test = subparsers.add_parser("test", help=apstr.testHelp)
     parser_test.add_argument(
         "-d",
@@ -314,6 +372,10 @@ def setParser():
     parser_update.add_argument(
         "-f", "--force", action="store_true", help=apstr.updateForceHelp
     )
+    parser_update.add_argument(
+        "-r", "--resume", action="store_true", help=apstr.updateResumeHelp
+    )
+    parser_update.add_argument("-a", "--after", help=apstr.afterHelp)
     parser_update.set_defaults(func=call_update)
 
     parser_weekly = subparsers.add_parser("weekly", help=apstr.weeklyHelp)
@@ -136,6 +136,118 @@ configuration_params.add(
         special="float",
     )
 )
+configuration_params.add(
+    ConfigParameter(
+        "httpPoolSize",
+        10,
+        description=cstr.Desc.httpPoolSize,
+        special="int",
+    )
+)
+configuration_params.add(
+    ConfigParameter(
+        "httpMaxPerHost",
+        4,
+        description=cstr.Desc.httpMaxPerHost,
+        special="int",
+    )
+)
+configuration_params.add(
+    ConfigParameter(
+        "httpRetries",
+        2,
+        description=cstr.Desc.httpRetries,
+        special="int",
+    )
+)
+configuration_params.add(
+    ConfigParameter(
+        "httpBackoff",
+        0.3,
+        description=cstr.Desc.httpBackoff,
+        special="float",
+    )
+)
+configuration_params.add(
+    ConfigParameter(
+        "httpConnectTimeout",
+        5.0,
+        description=cstr.Desc.httpConnectTimeout,
+        special="float",
+    )
+)
+configuration_params.add(
+    ConfigParameter(
+        "loadAndInsertWorkers",
+        4,
+        description=cstr.Desc.loadAndInsertWorkers,
+        special="int",
+    )
+)
+configuration_params.add(
+    ConfigParameter(
+        "oaiUpdateWorkers",
+        4,
+        description=cstr.Desc.oaiUpdateWorkers,
+        special="int",
+    )
+)
+configuration_params.add(
+    ConfigParameter(
+        "oaiUpdateBatchSize",
+        50,
+        description=cstr.Desc.oaiUpdateBatchSize,
+        special="int",
+    )
+)
+configuration_params.add(
+    ConfigParameter(
+        "oaiRequestDelay",
+        0.35,
+        description=cstr.Desc.oaiRequestDelay,
+        special="float",
+    )
+)
+configuration_params.add(
+    ConfigParameter(
+        "busyTimeout",
+        5000,
+        description=cstr.Desc.busyTimeout,
+        special="int",
+    )
+)
+configuration_params.add(
+    ConfigParameter(
+        "cacheSize",
+        16000,
+        description=cstr.Desc.cacheSize,
+        special="int",
+    )
+)
+configuration_params.add(
+    ConfigParameter(
+        "mmapSize",
+        64,
+        description=cstr.Desc.mmapSize,
+        special="int",
+    )
+)
+configuration_params.add(
+    ConfigParameter(
+        "profileQueries",
+        False,
+        description=cstr.Desc.profileQueries,
+        special="boolean",
+    )
+)
+configuration_params.add(
+    ConfigParameter(
+        "slowQueryTime",
+        500,
+        description=cstr.Desc.slowQueryTime,
+        special="int",
+    )
+)
 configuration_params.add(
     ConfigParameter(
         "askBeforeExit", False, description=cstr.Desc.confirmExit, special="boolean"
@@ -149,6 +261,14 @@ configuration_params.add(
         special="int",
     )
 )
+configuration_params.add(
+    ConfigParameter(
+        "bibListPageSize",
+        100,
+        description=cstr.Desc.bibListPageSize,
+        special="int",
+    )
+)
 configuration_params.add(
     ConfigParameter(
         "defaultUpdateFrom",
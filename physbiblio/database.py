@@ -4,20 +4,31 @@ This file is part of the physbiblio package.
 """
 import ast
 import datetime
+import hashlib
+import json
 import os
 import re
+import threading
 import traceback
+import unicodedata
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from sqlite3 import DatabaseError, InterfaceError, OperationalError, ProgrammingError
 
 import bibtexparser
 import dictdiffer
 import six
+from pylatexenc.latex2text import LatexNodes2Text
 from pyparsing import ParseException
 
 try:
     from physbiblio.bibtexWriter import pbWriter
     from physbiblio.config import ConfigurationDB, pbConfig
-    from physbiblio.databaseCore import PhysBiblioDBCore, PhysBiblioDBSub
+    from physbiblio.databaseCore import (
+        PhysBiblioDBCore,
+        PhysBiblioDBSub,
+        ProfiledCursor,
+    )
     from physbiblio.errors import pBLogger
     from physbiblio.parseAccents import parse_accents_str
     from physbiblio.strings.main import DatabaseStrings as dstr
@@ -33,6 +44,46 @@ class PhysBiblioDB(PhysBiblioDBCore):
     and loadSubClasses implementations.
     """
 
+    useWAL = True
+    # the tables whose rows are counted in the `tableStats` table
+    statsTables = [
+        "entries",
+        "categories",
+        "experiments",
+        "entryCats",
+        "expCats",
+        "entryExps",
+    ]
+
+    @property
+    def busyTimeout(self):
+        """The busy timeout for the connections, from the configuration"""
+        return pbConfig.params["busyTimeout"]
+
+    @property
+    def cacheSize(self):
+        """The size (in KiB) of the page cache, from the configuration"""
+        return pbConfig.params["cacheSize"]
+
+    @property
+    def mmapSize(self):
+        """The size (in MiB) of the memory-mapped I/O,
+        from the configuration
+        """
+        return pbConfig.params["mmapSize"]
+
+    @property
+    def profileQueries(self):
+        """Collect statistics on the statements, from the configuration"""
+        return pbConfig.params["profileQueries"]
+
+    @property
+    def slowQueryTime(self):
+        """The threshold for the log of slow statements,
+        from the configuration
+        """
+        return pbConfig.params["slowQueryTime"]
+
     def reOpenDB(self, newDB=None):
         """Close the currently open database and
         open a new one (the same if newDB is None).
@@ -51,6 +102,7 @@ class PhysBiblioDB(PhysBiblioDBCore):
         self.catBib = None
         self.catExp = None
         self.config = None
+        self.changes = None
         if newDB is not None:
             self.closeDB()
             del self.conn
@@ -64,6 +116,7 @@ class PhysBiblioDB(PhysBiblioDBCore):
             self.checkDatabaseUpdates()
             self.lastFetched = None
             self.catsHier = None
+            self.catsGraph = None
         else:
             self.closeDB()
             self.openDB()
@@ -73,6 +126,7 @@ class PhysBiblioDB(PhysBiblioDBCore):
             self.checkDatabaseUpdates()
             self.lastFetched = None
             self.catsHier = None
+            self.catsGraph = None
         return True
 
     def loadSubClasses(self):
@@ -91,6 +145,7 @@ class PhysBiblioDB(PhysBiblioDBCore):
             "catExp",
             "utils",
             "config",
+            "changes",
         ]:
             try:
                 delattr(self, q)
@@ -104,6 +159,7 @@ class PhysBiblioDB(PhysBiblioDBCore):
         self.catBib = CatsEntries(self)
         self.catExp = CatsExps(self)
         self.config = ConfigurationDB(self)
+        self.changes = ChangeJournal(self)
         return True
 
     def checkDatabaseUpdates(self):
@@ -113,7 +169,334 @@ class PhysBiblioDB(PhysBiblioDBCore):
         """
         PhysBiblioDBCore.checkDatabaseUpdates(self)
         self.convertSearchFormat()
+        self.checkDisplayFields()
         self.checkCaseInsensitiveBibkey()
+        self.createEntryAliases()
+        self.checkForeignKeys()
+        self.createIndexes()
+        self.convertBibdictFormat()
+        self.createFullTextIndex()
+        self.createChangeJournal()
+        self.createTableStats()
+
+    def maintain(self, full=False, pbMax=None, pbVal=None):
+        """Maintain the database file (see `PhysBiblioDBCore.maintain`).
+        The full VACUUM may change the rowid of the entries,
+        so that the full-text index must be rebuilt after it.
+        The rows of the tables are also counted again
+        for the `tableStats` table
+
+        Parameters:
+            full, pbMax, pbVal: see `PhysBiblioDBCore.maintain`
+
+        Output:
+            the output of `PhysBiblioDBCore.maintain`
+        """
+        result = PhysBiblioDBCore.maintain(self, full=full, pbMax=pbMax, pbVal=pbVal)
+        if result is not None and result["fullVacuum"] and self.hasFullText:
+            pBLogger.info(dstr.maintainFullText)
+            self.createFullTextIndex(rebuild=True)
+        if result is not None:
+            self.createTableStats(rebuild=True)
+        return result
+
+    def createFullTextIndex(self, rebuild=False):
+        """Create the FTS5 table used for the full-text searches
+        on the entries (see physbiblio.tablesDef.fullTextFields)
+        and the triggers that keep it in sync with the `entries` table.
+        If the triggers are missing (e.g. after the `entries` table
+        has been recreated), the index content is rebuilt.
+        If FTS5 is not available in the sqlite library,
+        the "match" searches fall back to "like"
+
+        Parameters:
+            rebuild (boolean, default False): if True,
+                rebuild the index content even if
+                the table and the triggers exist
+
+        Output:
+            True if the index is available, False otherwise
+        """
+        table = self.fullTextTable
+        names = [f[0] for f in self.fullTextFields]
+        triggers = ["%s_ai" % table, "%s_ad" % table, "%s_au" % table]
+        self.cursExec(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table,)
+        )
+        existingTable = len(self.curs.fetchall()) > 0
+        self.cursExec(
+            "SELECT name FROM sqlite_master WHERE type='trigger' "
+            + "AND tbl_name='entries'"
+        )
+        existingTriggers = [name[0] for name in self.curs]
+        if (
+            existingTable
+            and all(t in existingTriggers for t in triggers)
+            and not rebuild
+        ):
+            self.hasFullText = True
+            return True
+
+        def values(row):
+            """Return the SQL expressions for the content of the index"""
+            return ", ".join([f[1].format(row) for f in self.fullTextFields])
+
+        insertQ = "INSERT INTO %s (rowid, %s) " % (table, ", ".join(names))
+        commands = []
+        if not existingTable:
+            commands.append(
+                "CREATE VIRTUAL TABLE %s USING fts5(%s, "
+                % (
+                    table,
+                    ", ".join(["%s %s" % (f[0], f[2]) for f in self.fullTextFields]),
+                )
+                + "tokenize='unicode61 remove_diacritics 2');"
+            )
+        commands += ["DROP TRIGGER IF EXISTS %s;" % t for t in triggers]
+        commands += [
+            "CREATE TRIGGER %s AFTER INSERT ON entries BEGIN " % triggers[0]
+            + insertQ
+            + "VALUES (new.rowid, %s); END;" % values("new"),
+            "CREATE TRIGGER %s AFTER DELETE ON entries BEGIN " % triggers[1]
+            + "DELETE FROM %s WHERE rowid = old.rowid; END;" % table,
+            "CREATE TRIGGER %s AFTER UPDATE OF %s ON entries BEGIN "
+            % (triggers[2], ", ".join(self.fullTextUpdateCols))
+            + "DELETE FROM %s WHERE rowid = old.rowid; " % table
+            + insertQ
+            + "VALUES (new.rowid, %s); END;" % values("new"),
+            "DELETE FROM %s;" % table,
+            insertQ + "SELECT rowid, %s FROM entries;" % values("entries"),
+        ]
+        pBLogger.info(dstr.createFullText)
+        for command in commands:
+            pBLogger.debug(command)
+            if not self.connExec(command):
+                pBLogger.warning(dstr.noFullText)
+                self.undo(verbose=False)
+                self.hasFullText = False
+                return False
+        self.commit(verbose=False)
+        self.hasFullText = True
+        return True
+
+    def createEntryAliases(self, rebuild=False):
+        """Create the `entryAliases` table, which maps
+        each previous bibtex key (see the `old_keys` field,
+        where the keys are separated by commas or spaces)
+        to the current key of the entry,
+        and the triggers that keep it in sync with the `entries` table.
+        If the triggers are missing, the table content is rebuilt
+        from the `old_keys` of all the entries
+
+        Parameters:
+            rebuild (boolean, default False): if True,
+                rebuild the table content even if
+                the table and the triggers exist
+
+        Output:
+            True if successful, False otherwise
+        """
+        triggers = ["entryAliases_ai", "entryAliases_ad", "entryAliases_au"]
+        self.cursExec("SELECT name FROM sqlite_master WHERE type='table'")
+        existingTable = "entryAliases" in [name[0] for name in self.curs]
+        self.cursExec(
+            "SELECT name FROM sqlite_master WHERE type='trigger' "
+            + "AND tbl_name='entries'"
+        )
+        existingTriggers = [name[0] for name in self.curs]
+        if (
+            existingTable
+            and all(t in existingTriggers for t in triggers)
+            and not rebuild
+        ):
+            return True
+
+        def aliases(row):
+            """Return the query that extracts the aliases
+            from the `old_keys` of the given row
+            """
+            keys = (
+                "'[\"' || replace(replace(replace(replace(%s.old_keys, " % row
+                + "'\\', ''), '\"', ''), ' ', ','), ',', '\",\"') || '\"]'"
+            )
+            return (
+                "SELECT trim(value), %s.bibkey FROM " % row
+                + ("entries, " if row == "entries" else "")
+                + "json_each(case when json_valid(%s) then %s else '[]' end) "
+                % (keys, keys)
+                + "WHERE trim(value) != '' "
+                + "AND trim(value) != %s.bibkey COLLATE NOCASE" % row
+            )
+
+        insertQ = "INSERT OR REPLACE INTO entryAliases (alias, bibkey) "
+        pBLogger.info(dstr.createAliases)
+        if not existingTable:
+            self.createTable("entryAliases", self.tableFields["entryAliases"])
+        commands = ["DROP TRIGGER IF EXISTS %s;" % t for t in triggers]
+        commands += [
+            "CREATE TRIGGER %s AFTER INSERT ON entries BEGIN " % triggers[0]
+            + insertQ
+            + aliases("new")
+            + "; END;",
+            "CREATE TRIGGER %s AFTER DELETE ON entries BEGIN " % triggers[1]
+            + "DELETE FROM entryAliases WHERE bibkey = old.bibkey; END;",
+            "CREATE TRIGGER %s AFTER UPDATE OF bibkey, old_keys ON entries BEGIN "
+            % triggers[2]
+            + "DELETE FROM entryAliases WHERE bibkey = old.bibkey; "
+            + insertQ
+            + aliases("new")
+            + "; END;",
+            "DELETE FROM entryAliases;",
+            insertQ + aliases("entries") + ";",
+        ]
+        for command in commands:
+            pBLogger.debug(command)
+            if not self.connExec(command):
+                pBLogger.warning(dstr.noAliases)
+                self.undo(verbose=False)
+                return False
+        self.commit(verbose=False)
+        return True
+
+    def createChangeJournal(self, rebuild=False):
+        """Create the `entryChanges` table, which records
+        the insertions, updates and deletions of the entries
+        and of their links to categories and experiments,
+        with an increasing sequence number,
+        and the triggers that fill it.
+        The changes which occur when the triggers are missing
+        cannot be recovered: the journal only contains the changes
+        which occurred after its creation
+
+        Parameters:
+            rebuild (boolean, default False): if True,
+                recreate the triggers even if they exist
+
+        Output:
+            True if successful, False otherwise
+        """
+        tables = [["entries", None], ["entryCats", "idCat"], ["entryExps", "idExp"]]
+        triggers = {
+            t: ["entryChanges_%s_%s" % (t, a) for a in ["ai", "ad", "au"]]
+            for t, link in tables
+        }
+        self.cursExec("SELECT name FROM sqlite_master WHERE type='table'")
+        existingTable = "entryChanges" in [name[0] for name in self.curs]
+        self.cursExec("SELECT name FROM sqlite_master WHERE type='trigger'")
+        existingTriggers = [name[0] for name in self.curs]
+        if (
+            existingTable
+            and all(t in existingTriggers for v in triggers.values() for t in v)
+            and not rebuild
+        ):
+            return True
+
+        def record(table, action, row, link, when=""):
+            """Return the query that records a change of the given row"""
+            return (
+                "INSERT INTO entryChanges (tableName, action, bibkey, idLink) "
+                + "SELECT '%s', '%s', %s.bibkey, %s%s; "
+                % (table, action, row, "%s.%s" % (row, link) if link else "NULL", when)
+            )
+
+        pBLogger.info(dstr.createChanges)
+        if not existingTable:
+            self.createTable("entryChanges", self.tableFields["entryChanges"])
+        commands = [
+            "DROP TRIGGER IF EXISTS %s;" % t for v in triggers.values() for t in v
+        ]
+        for table, link in tables:
+            ai, ad, au = triggers[table]
+            if link is None:
+                # a new bibtex key is recorded as the deletion of the old one
+                update = record(
+                    table,
+                    "delete",
+                    "old",
+                    link,
+                    when=" WHERE old.bibkey != new.bibkey COLLATE BINARY",
+                ) + record(table, "update", "new", link)
+            else:
+                update = record(table, "delete", "old", link) + record(
+                    table, "insert", "new", link
+                )
+            commands += [
+                "CREATE TRIGGER %s AFTER INSERT ON %s BEGIN " % (ai, table)
+                + record(table, "insert", "new", link)
+                + "END;",
+                "CREATE TRIGGER %s AFTER DELETE ON %s BEGIN " % (ad, table)
+                + record(table, "delete", "old", link)
+                + "END;",
+                "CREATE TRIGGER %s AFTER UPDATE ON %s BEGIN " % (au, table)
+                + update
+                + "END;",
+            ]
+        for command in commands:
+            pBLogger.debug(command)
+            if not self.connExec(command):
+                pBLogger.warning(dstr.noChanges)
+                self.undo(verbose=False)
+                return False
+        self.commit(verbose=False)
+        return True
+
+    def createTableStats(self, rebuild=False):
+        """Create the `tableStats` table, which stores
+        the number of rows of the tables in `self.statsTables`,
+        and the triggers that keep it up to date,
+        so that `dbStats` does not need to count the rows.
+        The rows are counted again when some trigger is missing
+        (e.g. after a table has been recreated)
+
+        Parameters:
+            rebuild (boolean, default False): if True,
+                recreate the triggers and count the rows
+                even if the triggers exist
+
+        Output:
+            True if successful, False otherwise
+        """
+        triggers = {
+            t: ["tableStats_%s_%s" % (t, a) for a in ["ai", "ad"]]
+            for t in self.statsTables
+        }
+        self.cursExec("SELECT name FROM sqlite_master WHERE type='table'")
+        existingTable = "tableStats" in [name[0] for name in self.curs]
+        self.cursExec("SELECT name FROM sqlite_master WHERE type='trigger'")
+        existingTriggers = [name[0] for name in self.curs]
+        if (
+            existingTable
+            and all(t in existingTriggers for v in triggers.values() for t in v)
+            and not rebuild
+        ):
+            return True
+
+        pBLogger.info(dstr.createStats)
+        if not existingTable:
+            self.createTable("tableStats", self.tableFields["tableStats"])
+        commands = [
+            "DROP TRIGGER IF EXISTS %s;" % t for v in triggers.values() for t in v
+        ] + ["DELETE FROM tableStats;"]
+        for table in self.statsTables:
+            ai, ad = triggers[table]
+            commands += [
+                "INSERT INTO tableStats (tableName, numRows) "
+                + "SELECT '%s', COUNT(*) FROM %s;" % (table, table),
+                "CREATE TRIGGER %s AFTER INSERT ON %s BEGIN " % (ai, table)
+                + "UPDATE tableStats SET numRows = numRows + 1 "
+                + "WHERE tableName = '%s'; END;" % table,
+                "CREATE TRIGGER %s AFTER DELETE ON %s BEGIN " % (ad, table)
+                + "UPDATE tableStats SET numRows = numRows - 1 "
+                + "WHERE tableName = '%s'; END;" % table,
+            ]
+        for command in commands:
+            pBLogger.debug(command)
+            if not self.connExec(command):
+                pBLogger.warning(dstr.noStats)
+                self.undo(verbose=False)
+                return False
+        self.commit(verbose=False)
+        return True
 
     def checkCaseInsensitiveBibkey(self):
         """Check if the 'bibkey' field in the 'entries' table
@@ -158,6 +541,142 @@ class PhysBiblioDB(PhysBiblioDBCore):
                 + " Nothing to do here."
             )
 
+    def checkForeignKeys(self):
+        """Check if the tables which link entries, categories
+        and experiments have the foreign keys
+        defined in physbiblio.tablesDef.tableForeignKeys.
+        If not, delete the links to missing elements
+        and recreate the tables with the foreign keys,
+        so that the links are renamed or deleted
+        together with the linked elements
+
+        Output:
+            True if successful, False otherwise
+        """
+        missing = []
+        for table in self.tableForeignKeys.keys():
+            self.cursExec("PRAGMA foreign_key_list(%s);" % table)
+            if len(self.curs.fetchall()) < len(self.tableForeignKeys[table]):
+                missing.append(table)
+        if len(missing) == 0:
+            pBLogger.debug("Foreign keys already present. Nothing to do here.")
+            return True
+        self.commit(verbose=False)
+        # the checks must be disabled when the tables are dropped
+        self.cursExec("PRAGMA foreign_keys = OFF;")
+        if not self.connExec("BEGIN TRANSACTION;"):
+            pBLogger.error(dstr.errorForeignKeys)
+            self.cursExec("PRAGMA foreign_keys = ON;")
+            return False
+        self.utils.cleanSpareEntries()
+        for table in missing:
+            pBLogger.info(dstr.addForeignKeys % table)
+            cols = ", ".join(self.tableCols[table])
+            self.createTable(
+                "tmp_%s" % table,
+                self.tableFields[table],
+                foreignKeys=self.tableForeignKeys[table],
+            )
+            for command in [
+                "INSERT INTO tmp_%s (%s) SELECT %s FROM %s;"
+                % (table, cols, cols, table),
+                "DROP TABLE %s;" % table,
+                "ALTER TABLE tmp_%s RENAME TO %s;" % (table, table),
+            ]:
+                if not self.connExec(command):
+                    pBLogger.error(dstr.errorForeignKeys)
+                    self.undo(verbose=False)
+                    self.cursExec("PRAGMA foreign_keys = ON;")
+                    return False
+        self.commit(verbose=False)
+        self.cursExec("PRAGMA foreign_keys = ON;")
+        self.createIndexes(
+            {k: v for k, v in self.tableIndexes.items() if v[0] in missing}
+        )
+        return True
+
+    def checkDisplayFields(self):
+        """Add the columns with the plain text fields of the entries
+        (see `Entries.displayCols`) if they are missing,
+        and compute them for the entries where they are not set
+        """
+        self.cursExec("PRAGMA table_info(entries);")
+        entriesCols = [name[1] for name in self.curs]
+        for col in Entries.displayCols:
+            if col not in entriesCols:
+                if self.connExec("ALTER TABLE entries ADD COLUMN %s text;" % col):
+                    pBLogger.info(dstr.newColumn % col)
+                else:
+                    pBLogger.error(dstr.errorDisplayFields)
+                    self.undo()
+                    return
+        self.cursExec(
+            "SELECT bibkey, bibtex, bibdict, year FROM entries WHERE "
+            + " OR ".join(["%s IS NULL" % c for c in Entries.displayCols])
+        )
+        rows = self.curs.fetchall()
+        if len(rows) == 0:
+            pBLogger.debug("Plain text fields already present. Nothing to do here.")
+            self.commit(verbose=False)
+            return
+        pBLogger.info(dstr.computeDisplayFields % len(rows))
+        bibs = Entries(self)
+        newData = [bibs.addDisplayFields(dict(r)) for r in rows]
+        if self.connExecMany(
+            "update entries set "
+            + ", ".join(["%s=:%s" % (c, c) for c in Entries.displayCols])
+            + " where bibkey=:bibkey\n",
+            newData,
+        ):
+            self.commit()
+        else:
+            pBLogger.error(dstr.errorDisplayFields)
+            self.undo()
+
+    def convertBibdictFormat(self):
+        """Convert the content of the 'bibdict' column
+        from the old string representation of python dictionaries
+        to JSON, and fill the missing ones parsing the bibtex.
+        Entries already in the new format are not considered.
+        """
+        self.cursExec(
+            "SELECT bibkey, bibtex, bibdict FROM entries "
+            + "WHERE bibdict IS NULL OR bibdict LIKE ?",
+            ("{'%",),
+        )
+        rows = self.curs.fetchall()
+        if len(rows) == 0:
+            pBLogger.debug("'bibdict' already in JSON format. Nothing to do here.")
+            return
+        pBLogger.info(dstr.convertBibdict % len(rows))
+        newData = []
+        for r in rows:
+            if r["bibdict"] is None:
+                try:
+                    bibdict = (
+                        bibtexparser.bparser.BibTexParser(common_strings=True)
+                        .parse(r["bibtex"])
+                        .entries[0]
+                    )
+                except (IndexError, ParseException):
+                    bibdict = {}
+            else:
+                try:
+                    bibdict = ast.literal_eval(r["bibdict"].strip())
+                except (ValueError, SyntaxError):
+                    pBLogger.warning(dstr.Bibs.errorReadBibdict % r["bibdict"])
+                    continue
+            newData.append(
+                {"bibkey": r["bibkey"], "bibdict": self.bibs.dumpBibdict(bibdict)}
+            )
+        if self.connExecMany(
+            "update entries set bibdict=:bibdict where bibkey=:bibkey\n", newData
+        ):
+            self.commit()
+        else:
+            pBLogger.error(dstr.errorConvertBibdict)
+            self.undo()
+
     def convertSearchFormat(self):
         """Read the old saved searches/replaces and convert them
         to the new format for future use"""
@@ -344,6 +863,7 @@ class Categories(PhysBiblioDBSub):
             pBLogger.info(dstr.Cats.alreadyPresent)
             return False
         else:
+            self.mainDB.catsGraph = None
             return self.connExec(
                 "INSERT into categories (name, description, parentCat, "
                 + "comments, ord) values (:name, :description, :parentCat, "
@@ -362,13 +882,8 @@ class Categories(PhysBiblioDBSub):
             the output of self.connExec
         """
         data["idCat"] = idCat
-        query = (
-            "replace into categories ("
-            + ", ".join(data.keys())
-            + ") values (:"
-            + ", :".join(data.keys())
-            + ")\n"
-        )
+        query = self.replaceQuery("categories", list(data.keys()))
+        self.mainDB.catsGraph = None
         return self.connExec(query, data)
 
     def updateField(self, idCat, field, value):
@@ -391,6 +906,7 @@ class Categories(PhysBiblioDBSub):
             and value is not None
         ):
             query = "update categories set " + field + "=:field where idCat=:idCat\n"
+            self.mainDB.catsGraph = None
             return self.connExec(query, {"field": value, "idCat": idCat})
         else:
             return False
@@ -423,11 +939,12 @@ class Categories(PhysBiblioDBSub):
                 return False
             pBLogger.info(dstr.Cats.useCat % idCat)
             pBLogger.info(dstr.Cats.lookChild)
-            for row in self.getChild(idCat):
-                self.delete(row["idCat"])
-            self.cursExec("delete from categories where idCat=?\n", (idCat,))
-            self.cursExec("delete from expCats where idCat=?\n", (idCat,))
-            self.cursExec("delete from entryCats where idCat=?\n", (idCat,))
+            tree = self.treeQuery([idCat])
+            self.mainDB.catsGraph = None
+            # the connections are deleted by the foreign keys
+            self.cursExec(
+                "delete from categories where idCat in (%s)\n" % tree, (idCat,)
+            )
             return True
 
     def getAll(self):
@@ -504,31 +1021,67 @@ class Categories(PhysBiblioDBSub):
         )
         return self.curs.fetchall()
 
+    def treeQuery(self, parents):
+        """Build a recursive query that selects the `idCat`
+        of the given categories and all their subcategories
+
+        Parameters:
+            parents: the list of `idCat`s of the parent categories.
+                Only the length is used,
+                the values must be passed as query parameters
+
+        Output:
+            the query string
+        """
+        return (
+            "with recursive tree(idCat) as ("
+            + "select idCat from categories where idCat in (%s) "
+            % ", ".join(["?"] * len(parents))
+            + "union select categories.idCat from categories "
+            + "join tree on categories.parentCat=tree.idCat) "
+            + "select idCat from tree"
+        )
+
     def getAllCatsInTree(self, parent):
         """Get a list of all the subcategories that are in the tree
         starting with the given one
 
         Parameters:
-            parent: the `idCat` of the parent category
+            parent: the `idCat` of the parent category (or a list)
 
         Output:
             the list of `idCat`s of the categories
         """
         try:
-            [a for a in parent]
+            parent = [a for a in parent]
         except TypeError:
             parent = [parent]
-        result = []
-        for c in parent:
-            if len(self.getByID(c)) == 0:
-                continue
-            r = self.getChild(c)
-            result += [c] + [a["idCat"] for a in r]
-        unique = set(result)
-        result = [a for a in unique]
-        for a in unique - set(parent):
-            result += self.getAllCatsInTree(a)
-        return list(set(result))
+        if len(parent) == 0:
+            return []
+        self.cursExec(self.treeQuery(parent) + " order by idCat\n", parent)
+        return [r["idCat"] for r in self.curs.fetchall()]
+
+    def getAncestors(self, child):
+        """Get the list of the categories that contain the given one,
+        from the direct parent up to the main category
+
+        Parameters:
+            child: the id of the child category
+
+        Output:
+            the list of `idCat`s of the parent categories
+        """
+        self.cursExec(
+            "with recursive parents(idCat, depth) as ("
+            + "select parentCat, 1 from categories where idCat=? and idCat!=0 "
+            + "union select categories.parentCat, parents.depth+1 "
+            + "from categories join parents on categories.idCat=parents.idCat "
+            + "where categories.idCat!=0 "
+            + "and parents.depth<(select Count(*) from categories)) "
+            + "select idCat from parents order by depth\n",
+            (child,),
+        )
+        return [r["idCat"] for r in self.curs.fetchall()]
 
     def getParent(self, child):
         """Get the category that is the parent of the given one
@@ -569,7 +1122,14 @@ class Categories(PhysBiblioDBSub):
         if self.catsHier is not None and not replace:
             return self.catsHier
         if cats is None:
-            cats = self.getAll()
+            children = {
+                i: c["children"] for i, c in self.getGraph().items() if c["children"]
+            }
+        else:
+            children = {}
+            for a in cats:
+                if a["idCat"] != 0:
+                    children.setdefault(a["parentCat"], []).append(a["idCat"])
 
         def addSubCats(idC):
             """The subfunction that recursively builds
@@ -579,8 +1139,8 @@ class Categories(PhysBiblioDBSub):
                 idC: the id of the parent category
             """
             tmp = {}
-            for c in [a for a in cats if a["parentCat"] == idC and a["idCat"] != 0]:
-                tmp[c["idCat"]] = addSubCats(c["idCat"])
+            for c in children.get(idC, []):
+                tmp[c] = addSubCats(c)
             return tmp
 
         catsHier = {}
@@ -588,6 +1148,45 @@ class Categories(PhysBiblioDBSub):
         self.catsHier = catsHier
         return catsHier
 
+    def getGraph(self, replace=False):
+        """Load all the categories with a single query and
+        build an in-memory graph with their names, parents,
+        children and the number of connected entries and experiments.
+        The graph is cached and computed again only
+        after the categories or their connections change
+
+        Parameters:
+            replace (boolean, default False): if True,
+                rebuild the graph even if a cached one exists
+
+        Output:
+            a dictionary with the idCat as keys and, as values,
+                dictionaries with the category fields, plus
+                "children" (the list of the ids of the subcategories,
+                in alphabetical order), "entries" and "exps"
+        """
+        if self.mainDB.catsGraph is not None and not replace:
+            return self.mainDB.catsGraph
+        self.cursExec(
+            "select categories.*, "
+            + "(select Count(*) from entryCats "
+            + "where entryCats.idCat=categories.idCat) as entries, "
+            + "(select Count(*) from expCats "
+            + "where expCats.idCat=categories.idCat) as exps "
+            + "from categories\n"
+        )
+        graph = {}
+        for r in self.curs.fetchall():
+            graph[r["idCat"]] = dict(r)
+            graph[r["idCat"]]["children"] = []
+        for idCat, cat in sorted(
+            graph.items(), key=lambda x: (x[1]["name"].lower(), x[0])
+        ):
+            if idCat != 0 and cat["parentCat"] in graph:
+                graph[cat["parentCat"]]["children"].append(idCat)
+        self.mainDB.catsGraph = graph
+        return graph
+
     def printHier(
         self, startFrom=0, sp=5 * " ", withDesc=False, depth=10, replace=False
     ):
@@ -605,11 +1204,10 @@ class Categories(PhysBiblioDBSub):
                 if True, rebuild the structure again,
                 if False return the previously calculated one
         """
-        cats = self.getAll()
         if depth < 2:
             pBLogger.warning(dstr.Cats.invalidDepth)
             depth = 10
-        catsHier = self.getHier(cats, startFrom=startFrom, replace=replace)
+        catsHier = self.getHier(startFrom=startFrom, replace=replace)
 
         def printSubGroup(tree, indent="", startDepth=0):
             """The subfunction that recursively builds
@@ -656,15 +1254,33 @@ class Categories(PhysBiblioDBSub):
             the list of `sqlite3.Row` objects
                 with all the matching categories
         """
-        self.cursExec(
+        rows = self.selectIn(
             "select * from categories "
             + "join entryCats on categories.idCat=entryCats.idCat "
-            + "where "
-            + " or ".join(["entryCats.bibkey=?" for k in keys])
-            + "\n",
+            + "where entryCats.bibkey in (%s)\n",
             keys,
         )
-        return self.curs.fetchall()
+        return sorted(rows, key=lambda r: r["idEnC"])
+
+    def getDictByEntries(self, keys):
+        """Find all the categories associated to a list of entries,
+        grouped by bibtex key
+
+        Parameters:
+            keys: the list of bibtex keys of the entries
+
+        Output:
+            a dictionary with the bibtex keys as keys
+                and the lists of `sqlite3.Row` objects
+                with the matching categories as values
+        """
+        return self.selectInGrouped(
+            "select * from categories "
+            + "join entryCats on categories.idCat=entryCats.idCat "
+            + "where entryCats.bibkey in (%s) order by entryCats.idEnC\n",
+            keys,
+            "bibkey",
+        )
 
     def getByExp(self, idExp):
         """Find all the categories associated to a given experiment
@@ -708,6 +1324,23 @@ class CatsEntries(PhysBiblioDBSub):
         )
         return self.curs.fetchall()[0][0]
 
+    def countByCatTree(self, idCat):
+        """Obtain the number of entries which are associated
+        with a given category or with one of its subcategories
+
+        Parameters:
+            idCat: the id of the category
+
+        Output:
+            the number of matching entries
+        """
+        self.cursExec(
+            "SELECT Count(DISTINCT bibkey) FROM entryCats WHERE idCat in (%s)"
+            % self.mainDB.cats.treeQuery([idCat]),
+            (idCat,),
+        )
+        return self.curs.fetchall()[0][0]
+
     def getOne(self, idCat, key):
         """Find connections between a category and an entry
 
@@ -745,15 +1378,18 @@ class CatsEntries(PhysBiblioDBSub):
             False if the connection is already present,
                 the output of self.connExec otherwise
         """
-        if isinstance(idCat, list):
-            for q in idCat:
-                self.insert(q, key)
-        elif isinstance(key, list):
-            for q in key:
-                self.insert(idCat, q)
+        if isinstance(idCat, list) or isinstance(key, list):
+            self.insertMany(
+                [
+                    (c, k)
+                    for c in (idCat if isinstance(idCat, list) else [idCat])
+                    for k in (key if isinstance(key, list) else [key])
+                ]
+            )
         else:
             if len(self.getOne(idCat, key)) == 0:
                 pBLogger.debug(dstr.BibsCats.insert % (idCat, key))
+                self.mainDB.catsGraph = None
                 return self.connExec(
                     "INSERT into entryCats (bibkey, idCat) "
                     + "values (:bibkey, :idCat)",
@@ -763,6 +1399,83 @@ class CatsEntries(PhysBiblioDBSub):
                 pBLogger.info(dstr.BibsCats.alreadyPresent % (idCat, key))
                 return False
 
+    def insertMany(self, pairs):
+        """Create many new connections between categories
+        and bibtex entries, using a single `executemany`
+        in a transaction. Already existing connections are ignored
+
+        Parameters:
+            pairs: an iterable of (idCat, bibkey) pairs
+
+        Output:
+            a list with one element for each pair:
+                True if the connection has been created,
+                False if it was already present
+                (also earlier in the same list),
+                None if it could not be created
+                (e.g. if the entry or the linked object does not exist)
+        """
+        pairs = list(pairs)
+        if len(pairs) == 0:
+            return []
+        query = "select idCat, bibkey from entryCats where bibkey in (%s)"
+        keys = set(k for c, k in pairs)
+        existing = set(
+            (str(r["idCat"]), r["bibkey"].lower()) for r in self.selectIn(query, keys)
+        )
+        # the foreign keys make the whole transaction fail
+        # if a single pair refers to a missing entry or category
+        validKeys = set(
+            r["bibkey"].lower()
+            for r in self.selectIn(
+                "select bibkey from entries where bibkey in (%s)", keys
+            )
+        )
+        validCats = set(
+            str(r["idCat"])
+            for r in self.selectIn(
+                "select idCat from categories where idCat in (%s)",
+                set(c for c, k in pairs),
+            )
+        )
+        invalid = set(
+            (str(c), k.lower())
+            for c, k in pairs
+            if str(c) not in validCats or k.lower() not in validKeys
+        )
+        new = []
+        newSet = set()
+        for c, k in pairs:
+            p = (str(c), k.lower())
+            if p not in invalid and p not in existing and p not in newSet:
+                new.append({"bibkey": k, "idCat": c})
+                newSet.add(p)
+        pBLogger.debug(dstr.BibsCats.insertMany % len(new))
+        self.mainDB.catsGraph = None
+        if len(new) > 0 and self.connExecMany(
+            "INSERT OR IGNORE into entryCats (bibkey, idCat) "
+            + "values (:bibkey, :idCat)",
+            new,
+            atomic=True,
+        ):
+            now = set(
+                (str(r["idCat"]), r["bibkey"].lower())
+                for r in self.selectIn(query, keys)
+            )
+        else:
+            now = set()
+        outcomes = []
+        for c, k in pairs:
+            p = (str(c), k.lower())
+            if p in invalid:
+                outcomes.append(None)
+            elif p in newSet:
+                outcomes.append(True if p in now else None)
+                newSet.discard(p)
+            else:
+                outcomes.append(False)
+        return outcomes
+
     def delete(self, idCat, key):
         """Delete a connection between a category and a bibtex entry
 
@@ -780,6 +1493,7 @@ class CatsEntries(PhysBiblioDBSub):
             for q in key:
                 self.delete(idCat, q)
         else:
+            self.mainDB.catsGraph = None
             return self.connExec(
                 "delete from entryCats where bibkey=:bibkey and idCat=:idCat",
                 {"bibkey": key, "idCat": idCat},
@@ -918,6 +1632,7 @@ class CatsExps(PhysBiblioDBSub):
         else:
             if len(self.getOne(idCat, idExp)) == 0:
                 pBLogger.debug(dstr.CatsExps.insert % (idCat, idExp))
+                self.mainDB.catsGraph = None
                 return self.connExec(
                     "INSERT into expCats (idExp, idCat) values (:idExp, :idCat)",
                     {"idExp": idExp, "idCat": idCat},
@@ -943,6 +1658,7 @@ class CatsExps(PhysBiblioDBSub):
             for q in idExp:
                 self.delete(idCat, q)
         else:
+            self.mainDB.catsGraph = None
             return self.connExec(
                 "delete from expCats where idExp=:idExp and idCat=:idCat",
                 {"idExp": idExp, "idCat": idCat},
@@ -983,6 +1699,116 @@ class CatsExps(PhysBiblioDBSub):
                 pBLogger.warning(dstr.errorReadInput % string)
 
 
+class ChangeJournal(PhysBiblioDBSub):
+    """Functions to read the journal of the changes in the entries
+    and in their links (see `PhysBiblioDB.createChangeJournal`),
+    which allows to update the exported files and the copies
+    of the database without processing all the entries
+    """
+
+    def count(self):
+        """Obtain the number of changes in the journal"""
+        self.cursExec("SELECT Count(*) FROM entryChanges")
+        return self.curs.fetchall()[0][0]
+
+    def lastSeq(self):
+        """Get the sequence number of the last change,
+        to be used in the next call of `self.getSince`
+
+        Output:
+            the sequence number (0 if no changes were recorded)
+        """
+        if self.cursExec("SELECT seq FROM sqlite_sequence WHERE name = 'entryChanges'"):
+            rows = self.curs.fetchall()
+            if len(rows) > 0:
+                return rows[0][0]
+        return 0
+
+    def getSince(self, since=0):
+        """Get the changes recorded after the given sequence number
+
+        Parameters:
+            since (int, default 0): the sequence number
+                of the last known change
+
+        Output:
+            the list of changes, ordered by sequence number
+        """
+        self.cursExec("SELECT * FROM entryChanges WHERE seq > ? ORDER BY seq", (since,))
+        return self.curs.fetchall()
+
+    def getChangedBibkeys(self, since=0):
+        """Get the bibtex keys of the entries which have been
+        inserted, modified or deleted after the given sequence number,
+        including the changes in their categories and experiments.
+        Renamed entries appear with the old key among the deleted ones
+        and with the new key among the changed ones
+
+        Parameters:
+            since (int, default 0): the sequence number
+                of the last known change
+
+        Output:
+            a tuple with the list of keys of the existing entries
+            and the list of keys of the deleted ones
+        """
+        self.cursExec(
+            "SELECT DISTINCT bibkey FROM entryChanges WHERE seq > ?", (since,)
+        )
+        touched = [r["bibkey"] for r in self.curs.fetchall()]
+        existing = sorted(
+            [
+                r["bibkey"]
+                for r in self.selectIn(
+                    "SELECT bibkey FROM entries WHERE bibkey in (%s)", touched
+                )
+            ]
+        )
+        lower = set([k.lower() for k in existing])
+        return existing, sorted([k for k in touched if k.lower() not in lower])
+
+    def printSince(self, since=0):
+        """Print the changes recorded after the given sequence number
+        and the sequence number of the last change
+
+        Parameters:
+            since (int, default 0): the sequence number
+                of the last known change
+        """
+        for r in self.getSince(since):
+            pBLogger.info(
+                dstr.Changes.line
+                % (
+                    r["seq"],
+                    r["time"],
+                    r["action"],
+                    (
+                        r["bibkey"]
+                        if r["idLink"] is None
+                        else "%s, %s" % (r["bibkey"], r["idLink"])
+                    ),
+                    r["tableName"],
+                )
+            )
+        pBLogger.info(dstr.Changes.last % self.lastSeq())
+
+    def deleteUpTo(self, seq):
+        """Delete the old changes from the journal
+        (available from the command line through `changes --deleteUpTo`),
+        when they are not needed any more to update
+        the exported files and the copies of the database.
+        The sequence numbers of the next changes are not affected
+
+        Parameters:
+            seq (int): the sequence number of the last change
+                that must be deleted
+
+        Output:
+            the output of `self.connExec`
+        """
+        return self.connExec("DELETE FROM entryChanges WHERE seq <= ?", (seq,))
+
+
 class EntryExps(PhysBiblioDBSub):
     """Functions for connecting entries and experiments"""
 
@@ -1043,12 +1869,14 @@ class EntryExps(PhysBiblioDBSub):
             False if the connection is already present,
                 the output of self.connExec otherwise
         """
-        if isinstance(key, list):
-            for q in key:
-                self.insert(q, idExp)
-        elif isinstance(idExp, list):
-            for q in idExp:
-                self.insert(key, q)
+        if isinstance(key, list) or isinstance(idExp, list):
+            self.insertMany(
+                [
+                    (k, e)
+                    for k in (key if isinstance(key, list) else [key])
+                    for e in (idExp if isinstance(idExp, list) else [idExp])
+                ]
+            )
         else:
             if len(self.getOne(key, idExp)) == 0:
                 pBLogger.debug(dstr.BibsExps.insert % (key, idExp))
@@ -1064,15 +1892,102 @@ class EntryExps(PhysBiblioDBSub):
                 pBLogger.info(dstr.BibsExps.alreadyPresent % (key, idExp))
                 return False
 
-    def delete(self, key, idExp):
-        """Delete a connection between a bibtex entry and an experiment
+    def insertMany(self, pairs):
+        """Create many new connections between bibtex entries
+        and experiments, using a single `executemany`
+        in a transaction. Already existing connections are ignored.
+        The new connections are also extended to the categories
+        of the experiments (see `CatsEntries.insertMany`)
 
         Parameters:
-            key: the bibtex key (or a list)
-            idExp: the experiment id (or a list)
+            pairs: an iterable of (bibkey, idExp) pairs
 
         Output:
-            the output of self.connExec
+            a list with one element for each pair:
+                True if the connection has been created,
+                False if it was already present
+                (also earlier in the same list),
+                None if it could not be created
+                (e.g. if the entry or the linked object does not exist)
+        """
+        pairs = list(pairs)
+        if len(pairs) == 0:
+            return []
+        query = "select bibkey, idExp from entryExps where bibkey in (%s)"
+        keys = set(k for k, e in pairs)
+        existing = set(
+            (r["bibkey"].lower(), str(r["idExp"])) for r in self.selectIn(query, keys)
+        )
+        # the foreign keys make the whole transaction fail
+        # if a single pair refers to a missing entry or experiment
+        validKeys = set(
+            r["bibkey"].lower()
+            for r in self.selectIn(
+                "select bibkey from entries where bibkey in (%s)", keys
+            )
+        )
+        validExps = set(
+            str(r["idExp"])
+            for r in self.selectIn(
+                "select idExp from experiments where idExp in (%s)",
+                set(e for k, e in pairs),
+            )
+        )
+        invalid = set(
+            (k.lower(), str(e))
+            for k, e in pairs
+            if str(e) not in validExps or k.lower() not in validKeys
+        )
+        new = []
+        newSet = set()
+        for k, e in pairs:
+            p = (k.lower(), str(e))
+            if p not in invalid and p not in existing and p not in newSet:
+                new.append({"idExp": e, "bibkey": k})
+                newSet.add(p)
+        pBLogger.debug(dstr.BibsExps.insertMany % len(new))
+        if len(new) > 0 and self.connExecMany(
+            "INSERT OR IGNORE into entryExps (idExp, bibkey) "
+            + "values (:idExp, :bibkey)",
+            new,
+            atomic=True,
+        ):
+            now = set(
+                (r["bibkey"].lower(), str(r["idExp"]))
+                for r in self.selectIn(query, keys)
+            )
+        else:
+            now = set()
+        outcomes = []
+        expCats = {}
+        catPairs = []
+        for k, e in pairs:
+            p = (k.lower(), str(e))
+            if p in invalid:
+                outcomes.append(None)
+            elif p in newSet:
+                outcomes.append(True if p in now else None)
+                newSet.discard(p)
+                if outcomes[-1]:
+                    if p[1] not in expCats:
+                        expCats[p[1]] = [
+                            c["idCat"] for c in self.mainDB.cats.getByExp(e)
+                        ]
+                    catPairs += [(c, k) for c in expCats[p[1]]]
+            else:
+                outcomes.append(False)
+        self.mainDB.catBib.insertMany(catPairs)
+        return outcomes
+
+    def delete(self, key, idExp):
+        """Delete a connection between a bibtex entry and an experiment
+
+        Parameters:
+            key: the bibtex key (or a list)
+            idExp: the experiment id (or a list)
+
+        Output:
+            the output of self.connExec
         """
         if isinstance(key, list):
             for q in key:
@@ -1169,13 +2084,7 @@ class Experiments(PhysBiblioDBSub):
             the output of self.connExec
         """
         data["idExp"] = idExp
-        query = (
-            "replace into experiments ("
-            + ", ".join(data.keys())
-            + ") values (:"
-            + ", :".join(data.keys())
-            + ")\n"
-        )
+        query = self.replaceQuery("experiments", list(data.keys()))
         return self.connExec(query, data)
 
     def updateField(self, idExp, field, value):
@@ -1213,9 +2122,9 @@ class Experiments(PhysBiblioDBSub):
                 self.delete(e)
         else:
             pBLogger.info(dstr.Exps.useExp % idExp)
+            self.mainDB.catsGraph = None
+            # the connections are deleted by the foreign keys
             self.cursExec("delete from experiments where idExp=?", (idExp,))
-            self.cursExec("delete from expCats where idExp=?", (idExp,))
-            self.cursExec("delete from entryExps where idExp=?", (idExp,))
 
     def getAll(self, orderBy="name", order="ASC"):
         """Get all the experiments
@@ -1487,15 +2396,33 @@ class Experiments(PhysBiblioDBSub):
             the list of `sqlite3.Row` objects
                 with all the matching experiments
         """
-        self.cursExec(
+        rows = self.selectIn(
             "select * from experiments "
             + "join entryExps on experiments.idExp=entryExps.idExp "
-            + "where "
-            + " or ".join(["entryExps.bibkey=?" for k in keys])
-            + "\n",
+            + "where entryExps.bibkey in (%s)\n",
             keys,
         )
-        return self.curs.fetchall()
+        return sorted(rows, key=lambda r: r["idEnEx"])
+
+    def getDictByEntries(self, keys):
+        """Find all the experiments associated to a list of entries,
+        grouped by bibtex key
+
+        Parameters:
+            keys: the list of bibtex keys of the entries
+
+        Output:
+            a dictionary with the bibtex keys as keys
+                and the lists of `sqlite3.Row` objects
+                with the matching experiments as values
+        """
+        return self.selectInGrouped(
+            "select * from experiments "
+            + "join entryExps on experiments.idExp=entryExps.idExp "
+            + "where entryExps.bibkey in (%s) order by entryExps.idEnEx\n",
+            keys,
+            "bibkey",
+        )
 
 
 class Entries(PhysBiblioDBSub):
@@ -1515,6 +2442,7 @@ class Entries(PhysBiblioDBSub):
             dstr.Bibs.Search.opTExact: "=",
             dstr.Bibs.Search.opTNotCont: "not like",
             dstr.Bibs.Search.opTDifferent: "!=",
+            dstr.Bibs.Search.opTMatches: "match",
         },
         "catexp": {
             dstr.Bibs.Search.opCEAll: "",
@@ -1559,6 +2487,45 @@ class Entries(PhysBiblioDBSub):
             "volume",
         ],
     }
+    pageFilterFields = [
+        "bibkey",
+        "bibtex",
+        "arxiv",
+        "doi",
+        "inspire",
+        "year",
+        "firstdate",
+        "comments",
+        "marks",
+    ]
+    pageSortColumns = {
+        "author": "firstAuthor",
+        "title": "titleText",
+        "published": "publishedText",
+    }
+    pageSortBibdictFields = {
+        "author": "author",
+        "title": "title",
+        "journal": "journal",
+        "published": "journal",
+        "volume": "volume",
+        "number": "number",
+        "pages": "pages",
+    }
+    oaiCheckpointName = "oaiUpdatesCheckpoint"
+    # number of entries loaded at once by iterQueryPages
+    iterPageSize = 500
+    # plain text fields computed from the bibtex when saving the entries
+    displayCols = [
+        "titleText",
+        "authorText",
+        "firstAuthor",
+        "publishedText",
+        "fingerprint",
+    ]
+    # upper bound for the prefix searches on indexed text columns:
+    # all the strings that start with "p" lie in [p, p + prefixEnd)
+    prefixEnd = "\U0010ffff"
 
     def __init__(self, parent):
         """Call parent __init__ and create an empty lastFetched & c."""
@@ -1573,10 +2540,28 @@ class Entries(PhysBiblioDBSub):
         self.runningCleanBibtexs = False
         self.runningOAIUpdates = False
         self.newKey = None
-        try:
-            self.fetchCurs = self.conn.cursor()
-        except AttributeError:
-            self.fetchCurs = None
+        self.fetchCursors = {}
+        self.lastPageToken = None
+
+    @property
+    def fetchCurs(self):
+        """The cursor used when fetching with `doFetch=False`,
+        created for the connection of the current thread
+        """
+        ident = threading.get_ident()
+        conn, curs = self.fetchCursors.get(ident, (None, None))
+        if (
+            conn is not self.conn
+            or curs is None
+            or (self.mainDB.profiler.enabled and not isinstance(curs, ProfiledCursor))
+        ):
+            conn = self.conn
+            try:
+                curs = self.mainDB.newCursor(conn)
+            except AttributeError:
+                curs = None
+            self.fetchCursors[ident] = (conn, curs)
+        return curs
 
     def fetchCursor(self):
         """Return the cursor"""
@@ -1589,18 +2574,24 @@ class Entries(PhysBiblioDBSub):
 
     def delete(self, key):
         """Delete an entry and all its connections
+        (which are deleted by the foreign keys).
+        A list of keys is deleted with one statement
+        for each chunk of `self.selectInChunkSize` keys
 
         Parameters:
             key: the bibtex key (or a list)
         """
-        if isinstance(key, list):
-            for k in key:
-                self.delete(k)
-        else:
-            pBLogger.info(dstr.Bibs.delete % key)
-            self.cursExec("delete from entries where bibkey=?", (key,))
-            self.cursExec("delete from entryCats where bibkey=?", (key,))
-            self.cursExec("delete from entryExps where bibkey=?", (key,))
+        keys = key if isinstance(key, list) else [key]
+        for k in keys:
+            pBLogger.info(dstr.Bibs.delete % k)
+        self.mainDB.catsGraph = None
+        for i in range(0, len(keys), self.selectInChunkSize):
+            chunk = keys[i : i + self.selectInChunkSize]
+            self.cursExec(
+                "delete from entries where bibkey in (%s)"
+                % ", ".join(["?"] * len(chunk)),
+                chunk,
+            )
 
     def completeFetched(self, fetched_in):
         """Use the database content to add additional fields
@@ -1626,7 +2617,7 @@ class Entries(PhysBiblioDBSub):
                     and el["bibdict"].strip() != ""
                     and el["bibdict"].strip() != "{}"
                 ):
-                    tmp["bibtexDict"] = ast.literal_eval(el["bibdict"].strip())
+                    tmp["bibtexDict"] = self.loadBibdict(el["bibdict"])
                     tmp["bibdict"] = dict(tmp["bibtexDict"])
                 elif isinstance(el["bibdict"], dict):
                     tmp["bibtexDict"] = tmp["bibdict"]
@@ -1647,7 +2638,9 @@ class Entries(PhysBiblioDBSub):
                     )
                     tmp["bibtexDict"] = {}
                     tmp["bibdict"] = {}
-                self.updateField(el["bibkey"], "bibdict", "%s" % tmp["bibtexDict"])
+                self.updateField(
+                    el["bibkey"], "bibdict", self.dumpBibdict(tmp["bibtexDict"])
+                )
             try:
                 tmp["year"] = tmp["bibtexDict"]["year"]
             except KeyError:
@@ -1658,19 +2651,24 @@ class Entries(PhysBiblioDBSub):
                     tmp[fi] = tmp["bibtexDict"][fi]
                 except KeyError:
                     tmp[fi] = ""
-            try:
-                tmp["published"] = " ".join(
-                    [tmp["journal"], tmp["volume"], "(%s)" % tmp["year"], tmp["pages"]]
-                )
-                if tmp["published"] == "  () ":
+            if tmp.get("publishedText") is not None:
+                tmp["published"] = tmp["publishedText"]
+            else:
+                try:
+                    tmp["published"] = " ".join(
+                        [
+                            tmp["journal"],
+                            tmp["volume"],
+                            "(%s)" % tmp["year"],
+                            tmp["pages"],
+                        ]
+                    )
+                    if tmp["published"] == "  () ":
+                        tmp["published"] = ""
+                except KeyError:
                     tmp["published"] = ""
-            except KeyError:
-                tmp["published"] = ""
             try:
-                author = tmp["bibtexDict"]["author"]
-                if author.count(" and ") > pbConfig.params["maxAuthorNames"] - 1:
-                    author = author[: author.index(" and ")] + " et al."
-                tmp["author"] = author
+                tmp["author"] = shortAuthors(tmp["bibtexDict"]["author"])
             except KeyError:
                 tmp["author"] = ""
             if tmp["bibkey"] not in fetched_keys:
@@ -1678,6 +2676,121 @@ class Entries(PhysBiblioDBSub):
                 fetched_out.append(tmp)
         return fetched_out
 
+    def addDisplayFields(self, data):
+        """Add to the data of an entry the plain text fields
+        (see `self.displayCols` and `displayFields`) which are missing,
+        computing them from the "bibdict" or "bibtex" fields
+
+        Parameters:
+            data: the dictionary with the fields of the entry
+
+        Output:
+            the same dictionary, completed
+        """
+        if all(c in data.keys() for c in self.displayCols):
+            return data
+        bibdict = data.get("bibdict")
+        if isinstance(bibdict, six.string_types) and bibdict.strip() != "":
+            try:
+                bibdict = self.loadBibdict(bibdict)
+            except (ValueError, SyntaxError):
+                bibdict = None
+        if not isinstance(bibdict, dict):
+            try:
+                bibdict = (
+                    bibtexparser.bparser.BibTexParser(common_strings=True)
+                    .parse(data.get("bibtex") or "")
+                    .entries[0]
+                )
+            except (IndexError, ParseException):
+                bibdict = {}
+        for k, v in displayFields(bibdict, data.get("year")).items():
+            data.setdefault(k, v)
+        return data
+
+    def getDisplayFields(self, key, bibdict=None, year=None):
+        """Compute the plain text fields of an entry
+        (see `self.displayCols` and `displayFields`)
+
+        Parameters:
+            key: the bibtex key of the entry
+            bibdict: the dictionary with the bibtex fields,
+                or its serialized form as saved in the "bibdict" column.
+                If None, use the one currently stored in the database
+            year (default None): the year to use if it is not
+                in the bibtex. If None, use the one currently stored
+                in the database
+
+        Output:
+            a dictionary with the plain text fields
+        """
+        if bibdict is None:
+            self.cursExec("select bibdict from entries where bibkey=?", (key,))
+            rows = self.curs.fetchall()
+            bibdict = rows[0]["bibdict"] if len(rows) > 0 else {}
+        if isinstance(bibdict, six.string_types):
+            try:
+                bibdict = self.loadBibdict(bibdict)
+            except (ValueError, SyntaxError):
+                bibdict = {}
+        if not isinstance(bibdict, dict):
+            bibdict = {}
+        if year is None and "year" not in bibdict.keys():
+            self.cursExec("select year from entries where bibkey=?", (key,))
+            rows = self.curs.fetchall()
+            year = rows[0]["year"] if len(rows) > 0 else None
+        return displayFields(bibdict, year)
+
+    def updateDisplayFields(self, key, bibdict=None):
+        """Compute and save the plain text fields of an entry
+        (see `self.displayCols` and `displayFields`)
+
+        Parameters:
+            key: the bibtex key of the entry
+            bibdict: the dictionary with the bibtex fields,
+                or its serialized form as saved in the "bibdict" column.
+                If None, use the one currently stored in the database
+
+        Output:
+            the output of self.connExec
+        """
+        data = self.getDisplayFields(key, bibdict)
+        data["bibkey"] = key
+        return self.connExec(
+            "update entries set "
+            + ", ".join(["%s=:%s" % (c, c) for c in self.displayCols])
+            + " where bibkey=:bibkey\n",
+            data,
+        )
+
+    def dumpBibdict(self, bibdict):
+        """Serialize the dictionary obtained from bibtexparser
+        in the compact JSON string saved in the 'bibdict' column
+
+        Parameters:
+            bibdict: the dictionary with the bibtex fields
+
+        Output:
+            a string
+        """
+        return json.dumps(bibdict, ensure_ascii=False, separators=(",", ":"))
+
+    def loadBibdict(self, string):
+        """Read the content of the 'bibdict' column.
+        Strings saved with the old format (the string representation
+        of a python dictionary) are still accepted
+
+        Parameters:
+            string: the content of the 'bibdict' column
+
+        Output:
+            a dictionary
+        """
+        try:
+            return json.loads(string)
+        except ValueError:
+            return ast.literal_eval(string.strip())
+
     def fetchFromLast(self, doFetch=True):
         """Fetch entries using the last saved query
 
@@ -1707,154 +2820,628 @@ class Entries(PhysBiblioDBSub):
             self.lastFetched = self.completeFetched(fetched_in)
         return self
 
-    def fetchFromDict(
+    def preparePageQuery(
+        self, query, vals=(), filterText="", orderBy=None, orderType="ASC"
+    ):
+        """Wrap an existing query into a new one that
+        filters and sorts its results directly in SQL
+
+        Parameters:
+            query: the original query string
+            vals: the tuple of values for the original query
+            filterText: if not empty, keep only the entries
+                where at least one of the fields in
+                `self.pageFilterFields` contains the text
+            orderBy: the name of the field according
+                to which the results are ordered.
+                It can be a column of the entries table,
+                one of the keys of `self.pageSortColumns`
+                (which use the stored plain text fields)
+                or one of the keys of `self.pageSortBibdictFields`,
+                which are extracted from the stored bibtex dictionary.
+                If None or not valid, keep the order of the original query
+            orderType: "ASC" (default) or "DESC"
+
+        Output:
+            the query string and the tuple of values
+        """
+        newQuery = "select * from (%s) " % query.strip().rstrip(";")
+        newVals = tuple(vals)
+        if filterText:
+            newQuery += "where %s " % " or ".join(
+                ["%s like ?" % f for f in self.pageFilterFields]
+            )
+            newVals += ("%%%s%%" % filterText,) * len(self.pageFilterFields)
+        if orderType.strip() != "ASC" and orderType.strip() != "DESC":
+            pBLogger.warning(dstr.Bibs.invalidOrdering % orderType)
+            orderType = "ASC"
+        sortExpr = self.pageSortExpression(orderBy)
+        if sortExpr is not None:
+            newQuery += "order by %s collate nocase %s" % (sortExpr, orderType)
+        return newQuery, newVals
+
+    def pageSortExpression(self, orderBy):
+        """Get the SQL expression used to sort the results
+        of `self.preparePageQuery` and `self.getQueryPageAfter`
+
+        Parameters:
+            orderBy: the name of the field (see `self.preparePageQuery`)
+
+        Output:
+            a string, or None if the results cannot be sorted
+            according to the given field
+        """
+        if orderBy in self.pageSortColumns.keys():
+            return self.pageSortColumns[orderBy]
+        if orderBy in self.tableCols["entries"]:
+            return orderBy
+        if orderBy in self.pageSortBibdictFields.keys():
+            return (
+                "case when json_valid(bibdict) "
+                + "then json_extract(bibdict, '$.%s') end"
+                % self.pageSortBibdictFields[orderBy]
+            )
+        return None
+
+    def makePageToken(self, value, bibkey):
+        """Build the token that identifies the position
+        of an entry in a list of results sorted by some field
+        (see `self.getQueryPageAfter`)
+
+        Parameters:
+            value: the value of the sorting field for the entry
+            bibkey: the bibtex key of the entry
+
+        Output:
+            a string, which should be considered opaque
+        """
+        return json.dumps([value, bibkey], ensure_ascii=False, separators=(",", ":"))
+
+    def readPageToken(self, token):
+        """Read the content of a token created by `self.makePageToken`
+
+        Parameters:
+            token: the token string
+
+        Output:
+            a tuple (value, bibkey), or None if the token is not valid
+        """
+        try:
+            value, bibkey = json.loads(token)
+        except (TypeError, ValueError):
+            return None
+        if not isinstance(bibkey, six.string_types):
+            return None
+        return value, bibkey
+
+    def countQueryPage(
+        self, query, vals=(), filterText="", orderBy=None, orderType="ASC", after=None
+    ):
+        """Count the number of results of a query,
+        optionally filtered as in `self.preparePageQuery`
+        and only considering the ones after a given position
+        (see `self.preparePageQueryAfter`)
+
+        Parameters:
+            query: the original query string
+            vals: the tuple of values for the original query
+            filterText: the filter text (see `self.preparePageQuery`)
+            orderBy, orderType, after: see `self.getQueryPageAfter`
+
+        Output:
+            the number of rows (0 if the query fails)
+        """
+        if after is None:
+            newQuery, newVals = self.preparePageQuery(query, vals, filterText=filterText)
+        else:
+            newQuery, newVals = self.preparePageQueryAfter(
+                query,
+                vals,
+                filterText=filterText,
+                orderBy=orderBy,
+                orderType=orderType,
+                after=after,
+            )
+            if newQuery is None:
+                return 0
+        if not self.cursExec("select count(*) from (%s)" % newQuery, newVals):
+            return 0
+        return self.curs.fetchall()[0][0]
+
+    def getQueryPage(
         self,
-        queryFields=[],
-        defaultConnection="and",
-        orderBy="firstdate",
+        query,
+        vals=(),
+        filterText="",
+        orderBy=None,
         orderType="ASC",
         limitTo=None,
         limitOffset=None,
-        saveQuery=True,
-        doFetch=True,
     ):
-        """Fetch entries using a number of criterions
+        """Obtain a page of the results of a query,
+        filtered and sorted in SQL (see `self.preparePageQuery`).
+        Only the rows in the page are processed by `self.completeFetched`,
+        and `self.lastQuery`, `self.lastFetched` are not changed.
 
         Parameters:
-            queryFields: a list of dictionaries containing
-                the type, criterion and content
-                for each search requirement.
-                Each dictionary must have the following keys:
-                    "type": either "Text", "Categories", "Experiments",
-                        "Marks" or "Type"
-                    "field": the sub-field to match.
-                        Ignored for some types.
-                    "logical": the logical operator connecting
-                        to the previous requirements
-                    "operator": depending on the type, different values
-                        are allowed (e.g., "exact match" or "contains")
-                    "content": the string match, or
-                        the index of category/experiment,
-                        or the list of types/marks
-            defaultConnection: "and" (default) or "or",
-                the default logical operator for multiple field matches
-            orderBy: the name of the field according to which
-                the results must be ordered
+            query: the original query string
+            vals: the tuple of values for the original query
+            filterText: the filter text
+            orderBy: the name of the field used for sorting
             orderType: "ASC" (default) or "DESC"
             limitTo (int or None): maximum number of results.
                 If None, do not limit
             limitOffset (int or None): where to start in the ordered list.
                 If None, use 0
-            saveQuery (boolean, default True):
-                if True, save the query for future reuse
-            doFetch (boolean, default True):
-                use self.curs.fetchall and store all the rows in a list.
-                Set to False to directly use the iterator on self.curs.
 
         Output:
-            self
+            the list of fetched entries
         """
+        newQuery, newVals = self.preparePageQuery(
+            query,
+            vals,
+            filterText=filterText,
+            orderBy=orderBy,
+            orderType=orderType,
+        )
+        if limitTo is not None:
+            newQuery += " LIMIT %s" % int(limitTo)
+            if limitOffset is not None:
+                newQuery += " OFFSET %s" % int(limitOffset)
+        if not self.cursExec(newQuery, newVals):
+            return []
+        return self.completeFetched(self.curs.fetchall())
 
-        def getQueryStr(txt, operator):
-            """Return a match string, with trailing % if needed
-
-            Parameters:
-                txt: the text to match
-                operator: the operator to use
-
-            Output:
-                a string
-            """
-            return "%%%s%%" % txt if "like" in operator else txt
-
-        def catExpStrings(idxs, operator, tabName, fieldName):
-            """Returns the string and the data needed
-            to perform a search using categories and/or experiments
+    def preparePageQueryAfter(
+        self, query, vals=(), filterText="", orderBy=None, orderType="ASC", after=None
+    ):
+        """Prepare the query used by `self.getQueryPageAfter`:
+        the results of the original query (filtered as in
+        `self.preparePageQuery`) get a "pageSortValue" column
+        and only the ones following the position described
+        by the `after` token are selected.
+        The ordering is not added
 
-            Parameters:
-                idxs: the list of indices
-                operator: the operator to use
-                tabName: the name of the table to consider
-                fieldName: the name of the primary key in the considered table
+        Parameters:
+            query: the original query string
+            vals: the tuple of values for the original query
+            filterText, orderBy, after: see `self.getQueryPageAfter`
+            orderType: "ASC" (default) or "DESC"
 
-            Output:
-                joinStr, whereStr, valsTmp:
-                    the string containing the `join` structure,
-                    the one containing the `where` conditions
-                    and a tuple with the values of the fields
-            """
-            joinStr = ""
-            whereStr = ""
-            valsTmp = tuple()
-            if isinstance(idxs, list):
-                idxs = [str(i) for i in idxs]
-            else:
-                idxs = [str(idxs)]
-            if operator == dstr.Bibs.Search.opCSub and fieldName == "idCat":
-                idxs = self.mainDB.cats.getAllCatsInTree(idxs)
-                operator = dstr.Bibs.Search.opCEOne
-            if len(idxs) > 1:
-                if operator == dstr.Bibs.Search.opCEOne:
-                    joinStr += " left join %s on entries.bibkey=%s.bibkey" % (
-                        tabName,
-                        tabName,
-                    )
-                    whereStr += "(%s)" % "or".join(
-                        [" %s.%s = ? " % (tabName, fieldName) for q in idxs]
-                    )
-                    valsTmp = tuple(idxs)
-                elif operator == dstr.Bibs.Search.opCEAll:
-                    joinStr += " ".join(
-                        [
-                            " left join %s %s%d on entries.bibkey=%s%d.bibkey"
-                            % (tabName, tabName, iC, tabName, iC)
-                            for iC, q in enumerate(idxs)
-                        ]
-                    )
-                    whereStr += (
-                        "("
-                        + " and ".join(
-                            [
-                                "%s%d.%s = ?" % (tabName, iC, fieldName)
-                                for iC, q in enumerate(idxs)
-                            ]
-                        )
-                        + ")"
-                    )
-                    valsTmp = tuple(idxs)
-                # elif operator == "none of the following":
-                # joinStr += " ".join(
-                # [" left join %s %s%d on entries.bibkey=%s%d.bibkey"%(
-                # tabName, tabName, iC, tabName, iC) for iC, q in \
-                # enumerate(idxs)])
-                # whereStr += "(" + " and ".join(
-                # ["%s%d.%s != ?"%(tabName, iC, fieldName) for iC, q in \
-                # enumerate(idxs)]) + ")"
-                # valsTmp = tuple(idxs)
-                else:
-                    pBLogger.warning(dstr.Bibs.Search.invalidOperator % operator)
-            elif len(idxs) == 1:
-                joinStr += " left join %s on entries.bibkey=%s.bibkey" % (
-                    tabName,
-                    tabName,
+        Output:
+            a tuple with the new query and the new tuple of values,
+            or (None, None) if the token is not valid
+        """
+        sortExpr = self.pageSortExpression(orderBy)
+        if sortExpr is None:
+            sortExpr = "bibkey"
+        newQuery, newVals = self.preparePageQuery(query, vals, filterText=filterText)
+        newQuery = "select *, %s as pageSortValue from (%s) " % (sortExpr, newQuery)
+        if after is not None:
+            position = self.readPageToken(after)
+            if position is None:
+                pBLogger.warning(dstr.Bibs.invalidPageToken % after)
+                return None, None
+            value, bibkey = position
+            comp = ">" if orderType == "ASC" else "<"
+            if value is None:
+                newQuery += "where (%s) is null and bibkey %s ? collate nocase" % (
+                    sortExpr,
+                    comp,
                 )
-                whereStr += "%s.%s = ? " % (tabName, fieldName)
-                valsTmp = tuple(idxs)
+                newVals += (bibkey,)
+                if orderType == "ASC":
+                    newQuery += " or (%s) is not null" % sortExpr
             else:
-                pBLogger.warning(dstr.Bibs.Search.invalidIds % idxs)
-            return joinStr, whereStr, valsTmp
+                newQuery += (
+                    "where (%s) %s ? collate nocase " % (sortExpr, comp)
+                    + "or ((%s) = ? collate nocase " % sortExpr
+                    + "and bibkey %s ? collate nocase)" % comp
+                )
+                newVals += (value, value, bibkey)
+                if orderType == "DESC":
+                    newQuery += " or (%s) is null" % sortExpr
+        return newQuery, newVals
 
-        first = True
-        vals = ()
-        query = "select * from entries "
-        joinQ = ""
-        whereQ = ""
-        prependTab = (
-            "entries."
+    def getQueryPageAfter(
+        self,
+        query,
+        vals=(),
+        filterText="",
+        orderBy=None,
+        orderType="ASC",
+        limitTo=None,
+        after=None,
+        limitOffset=None,
+        entryTokens=False,
+    ):
+        """Obtain a page of the results of a query using keyset pagination:
+        the results are sorted by the given field and then by bibtex key,
+        and the page starts immediately after the position described by
+        the `after` token, without scanning the previous rows.
+        Only the rows in the page are processed by `self.completeFetched`,
+        and `self.lastQuery`, `self.lastFetched` are not changed.
+
+        Parameters:
+            query: the original query string
+            vals: the tuple of values for the original query
+            filterText: the filter text (see `self.preparePageQuery`)
+            orderBy: the name of the field used for sorting
+                (see `self.preparePageQuery`).
+                If None or not valid, sort only by bibtex key
+            orderType: "ASC" (default) or "DESC"
+            limitTo (int or None): maximum number of results.
+                If None, do not limit
+            after (default None): the token returned by a previous call
+                with the same query and sorting. If None, start from the
+                first result
+            limitOffset (int or None): the number of results to skip
+                after the starting point (useful to locate the first page
+                when starting from a given index)
+            entryTokens (boolean, default False): if True, store
+                in the field "pageToken" of each entry the token
+                which describes its position
+
+        Output:
+            a tuple containing the list of fetched entries
+            and the token to be used to obtain the next page
+            (None if the page is empty)
+        """
+        if orderType.strip() != "ASC" and orderType.strip() != "DESC":
+            pBLogger.warning(dstr.Bibs.invalidOrdering % orderType)
+            orderType = "ASC"
+        orderType = orderType.strip()
+        newQuery, newVals = self.preparePageQueryAfter(
+            query,
+            vals,
+            filterText=filterText,
+            orderBy=orderBy,
+            orderType=orderType,
+            after=after,
+        )
+        if newQuery is None:
+            return [], None
+        newQuery += " order by pageSortValue collate nocase %s, " % orderType
+        newQuery += "bibkey collate nocase %s" % orderType
+        if limitTo is not None:
+            newQuery += " LIMIT %s" % int(limitTo)
+            if limitOffset is not None:
+                newQuery += " OFFSET %s" % int(limitOffset)
+        elif limitOffset is not None:
+            newQuery += " LIMIT -1 OFFSET %s" % int(limitOffset)
+        if not self.cursExec(newQuery, newVals):
+            return [], None
+        rows = self.curs.fetchall()
+        if len(rows) == 0:
+            return [], None
+        token = self.makePageToken(rows[-1]["pageSortValue"], rows[-1]["bibkey"])
+        entries = self.completeFetched(rows)
+        for e in entries:
+            value = e.pop("pageSortValue", None)
+            if entryTokens:
+                e["pageToken"] = self.makePageToken(value, e["bibkey"])
+        return entries, token
+
+    def iterQueryPages(
+        self,
+        query,
+        vals=(),
+        orderBy=None,
+        orderType="ASC",
+        startFrom=0,
+        after=None,
+        pageSize=None,
+    ):
+        """Iterate over all the results of a query,
+        loading them in pages with `self.getQueryPageAfter`.
+        The token of the last yielded entry is stored
+        in `self.lastPageToken`, so that an interrupted iteration
+        can be resumed later from the following entry
+
+        Parameters:
+            query: the original query string
+            vals: the tuple of values for the original query
+            orderBy, orderType: see `self.getQueryPageAfter`
+            startFrom (default 0): the index of the first result
+                to be considered (ignored if `after` is given)
+            after (default None): the token from which
+                the iteration is resumed
+            pageSize (default None): the number of entries in each page.
+                If None, use `self.iterPageSize`
+
+        Output:
+            a generator of entries
+        """
+        if pageSize is None:
+            pageSize = self.iterPageSize
+        offset = startFrom if after is None and startFrom > 0 else None
+        self.lastPageToken = after
+        token = after
+        while True:
+            entries, token = self.getQueryPageAfter(
+                query,
+                vals,
+                orderBy=orderBy,
+                orderType=orderType,
+                limitTo=pageSize,
+                after=token,
+                limitOffset=offset,
+                entryTokens=True,
+            )
+            if len(entries) == 0:
+                return
+            offset = None
+            for e in entries:
+                self.lastPageToken = e.pop("pageToken", token)
+                yield e
+            if len(entries) < pageSize:
+                return
+
+    def iterAllEntries(self, startFrom=0, after=None):
+        """Prepare the iteration over all the entries sorted by firstdate,
+        used by the functions which process the whole database.
+        The position of each entry is stored in `self.lastPageToken`
+        (see `self.iterQueryPages`)
+
+        Parameters:
+            startFrom (default 0): the index of the first entry
+                (ignored if `after` is given)
+            after (default None): the token of the last entry
+                processed by a previous run, from which to resume
+
+        Output:
+            a tuple with the number of entries to be processed
+            and the generator of entries.
+            A TypeError is raised if `startFrom` or `after` are not valid
+        """
+        query = "select * from entries"
+        if after is not None:
+            if self.readPageToken(after) is None:
+                pBLogger.warning(dstr.Bibs.invalidPageToken % after)
+                raise TypeError
+            pBLogger.info(dstr.Bibs.resumeAfter % self.readPageToken(after)[1])
+            tot = self.countQueryPage(query, orderBy="firstdate", after=after)
+        else:
+            tot = self.count() - startFrom
+        return tot, self.iterQueryPages(
+            query, orderBy="firstdate", startFrom=startFrom, after=after
+        )
+
+    def logResumeToken(self, token):
+        """Print the position of the last processed entry
+        when a function processing the whole database is stopped,
+        so that it can be resumed later with the `after` parameter
+
+        Parameters:
+            token: the token of the last processed entry (or None)
+        """
+        if token is not None:
+            pBLogger.info(dstr.Bibs.resumeToken % (self.readPageToken(token)[1], token))
+
+    def getQueryKeys(self, query, vals=(), filterText=""):
+        """Obtain the bibtex keys of all the results of a query,
+        optionally filtered as in `self.preparePageQuery`,
+        without processing the full entries
+
+        Parameters:
+            query: the original query string
+            vals: the tuple of values for the original query
+            filterText: the filter text
+
+        Output:
+            the list of bibtex keys
+        """
+        newQuery, newVals = self.preparePageQuery(
+            query, vals, filterText=filterText
+        )
+        if not self.cursExec("select bibkey from (%s)" % newQuery, newVals):
+            return []
+        return [r["bibkey"] for r in self.curs.fetchall()]
+
+    def fullTextQuery(self, text, field=None):
+        """Convert a search string into a FTS5 query.
+        Words and quoted phrases are all required,
+        a trailing "*" performs a prefix match and
+        the uppercase operators "AND", "OR", "NOT" are kept
+
+        Parameters:
+            text: the search string
+            field (default None): if one of the indexed columns
+                (see physbiblio.tablesDef.fullTextFields),
+                restrict the match to it
+
+        Output:
+            a string
+        """
+        parts = []
+        for token in re.findall(r'"[^"]*"?|[^\s"]+', text):
+            if token in ["AND", "OR", "NOT"]:
+                if len(parts) > 0 and parts[-1] not in ["AND", "OR", "NOT"]:
+                    parts.append(token)
+                continue
+            prefix = token.endswith("*")
+            word = token.strip('"*').replace('"', "")
+            if word.strip() != "":
+                parts.append('"%s"%s' % (word, "*" if prefix else ""))
+        while len(parts) > 0 and parts[-1] in ["AND", "OR", "NOT"]:
+            parts.pop()
+        query = " ".join(parts) if len(parts) > 0 else '""'
+        if field in self.fullTextColumns():
+            query = "%s : (%s)" % (field, query)
+        return query
+
+    def fullTextColumns(self):
+        """Return the list of the columns indexed in the full-text table"""
+        return [f[0] for f in self.mainDB.fullTextFields if "unindexed" not in f[2]]
+
+    def prepareMatch(self, field, text, prependTab=""):
+        """Build the condition for a "match" search.
+        If the full-text index is available and the field
+        is indexed (or None, to use all the indexed columns),
+        the FTS5 table is used, otherwise a "like" comparison
+        is performed
+
+        Parameters:
+            field: the name of the column (or None)
+            text: the search string (see `self.fullTextQuery`)
+            prependTab (default ""): the string to prepend
+                to the column name, when using "like"
+
+        Output:
+            the condition string and the tuple of values
+        """
+        if self.mainDB.hasFullText and (
+            field is None or field in self.fullTextColumns()
+        ):
+            return (
+                "entries.rowid in (select rowid from %s where %s match ?)"
+                % (self.mainDB.fullTextTable, self.mainDB.fullTextTable),
+                (self.fullTextQuery(text, field),),
+            )
+        if field is None or field in self.fullTextColumns():
+            field = field if field in self.tableCols["entries"] else "bibtex"
+        return "%s%s like ?" % (prependTab, field), ("%%%s%%" % text,)
+
+    def fetchFromDict(
+        self,
+        queryFields=[],
+        defaultConnection="and",
+        orderBy="firstdate",
+        orderType="ASC",
+        limitTo=None,
+        limitOffset=None,
+        saveQuery=True,
+        doFetch=True,
+    ):
+        """Fetch entries using a number of criterions
+
+        Parameters:
+            queryFields: a list of dictionaries containing
+                the type, criterion and content
+                for each search requirement.
+                Each dictionary must have the following keys:
+                    "type": either "Text", "Categories", "Experiments",
+                        "Marks" or "Type"
+                    "field": the sub-field to match.
+                        Ignored for some types.
+                    "logical": the logical operator connecting
+                        to the previous requirements
+                    "operator": depending on the type, different values
+                        are allowed (e.g., "exact match" or "contains")
+                    "content": the string match, or
+                        the index of category/experiment,
+                        or the list of types/marks
+            defaultConnection: "and" (default) or "or",
+                the default logical operator for multiple field matches
+            orderBy: the name of the field according to which
+                the results must be ordered.
+                Use "rank" to order according to the relevance
+                in the full-text ("match") searches
+            orderType: "ASC" (default) or "DESC"
+            limitTo (int or None): maximum number of results.
+                If None, do not limit
+            limitOffset (int or None): where to start in the ordered list.
+                If None, use 0
+            saveQuery (boolean, default True):
+                if True, save the query for future reuse
+            doFetch (boolean, default True):
+                use self.curs.fetchall and store all the rows in a list.
+                Set to False to directly use the iterator on self.curs.
+
+        Output:
+            self
+        """
+
+        def getQueryStr(txt, operator):
+            """Return a match string, with trailing % if needed
+
+            Parameters:
+                txt: the text to match
+                operator: the operator to use
+
+            Output:
+                a string
+            """
+            return "%%%s%%" % txt if "like" in operator else txt
+
+        def catExpStrings(idxs, operator, tabName, fieldName):
+            """Returns the string and the data needed
+            to perform a search using categories and/or experiments.
+            The conditions are written as subqueries on the
+            connection tables, so that each entry is returned only once
+
+            Parameters:
+                idxs: the list of indices
+                operator: the operator to use
+                tabName: the name of the table to consider
+                fieldName: the name of the primary key in the considered table
+
+            Output:
+                whereStr, valsTmp:
+                    the string containing the `where` conditions
+                    and a tuple with the values of the fields
+            """
+            whereStr = ""
+            valsTmp = tuple()
+            if isinstance(idxs, list):
+                idxs = [str(i) for i in idxs]
+            else:
+                idxs = [str(idxs)]
+            if (
+                operator == dstr.Bibs.Search.opCSub
+                and fieldName == "idCat"
+                and len(idxs) > 0
+            ):
+                whereStr += (
+                    "entries.bibkey in (select bibkey from entryCats "
+                    + "where idCat in (%s))" % self.mainDB.cats.treeQuery(idxs)
+                )
+                valsTmp = tuple(idxs)
+            elif len(idxs) > 1:
+                if operator == dstr.Bibs.Search.opCEOne:
+                    whereStr += (
+                        "entries.bibkey in (select bibkey from %s " % tabName
+                        + "where %s in (%s))"
+                        % (fieldName, ", ".join(["?"] * len(idxs)))
+                    )
+                    valsTmp = tuple(idxs)
+                elif operator == dstr.Bibs.Search.opCEAll:
+                    whereStr += (
+                        "("
+                        + " and ".join(
+                            [
+                                "exists (select 1 from %s " % tabName
+                                + "where %s.bibkey = entries.bibkey " % tabName
+                                + "and %s.%s = ?)" % (tabName, fieldName)
+                                for q in idxs
+                            ]
+                        )
+                        + ")"
+                    )
+                    valsTmp = tuple(idxs)
+                else:
+                    pBLogger.warning(dstr.Bibs.Search.invalidOperator % operator)
+            elif len(idxs) == 1:
+                whereStr += (
+                    "entries.bibkey in (select bibkey from %s " % tabName
+                    + "where %s = ?) " % fieldName
+                )
+                valsTmp = tuple(idxs)
+            else:
+                pBLogger.warning(dstr.Bibs.Search.invalidIds % idxs)
+            return whereStr, valsTmp
+
+        first = True
+        vals = ()
+        query = "select * from entries "
+        joinQ = ""
+        whereQ = ""
+        prependTab = (
+            "entries."
             if any([e["type"] in ["Categories", "Experiments"] for e in queryFields])
             else ""
         )
-        jC, wC, vC, jE, wE, vE = ["", "", tuple(), "", "", tuple()]
+        matchTexts = []
 
         for di in queryFields:
             if di["logical"] is None or di["logical"].lower() not in ["and", "or"]:
@@ -1894,7 +3481,17 @@ class Entries(PhysBiblioDBSub):
                 ]:
                     pBLogger.warning(dstr.Bibs.Search.invalidOperator % di["operator"])
                     continue
-                if di["field"] in self.tableCols["entries"]:
+                if di["operator"] == "match" and (
+                    di["field"] in self.tableCols["entries"]
+                    or di["field"] in self.fullTextColumns()
+                ):
+                    matchQ, matchV = self.prepareMatch(
+                        di["field"], di["content"], prependTab=prependTab
+                    )
+                    whereQ += "%s %s " % (di["logical"], matchQ)
+                    vals += matchV
+                    matchTexts.append((di["field"], di["content"]))
+                elif di["field"] in self.tableCols["entries"]:
                     whereQ += "%s %s%s %s ? " % (
                         di["logical"],
                         prependTab,
@@ -1906,17 +3503,15 @@ class Entries(PhysBiblioDBSub):
                     pBLogger.warning(dstr.Bibs.Search.invalidField % di["field"])
                     continue
             elif di["type"] == "Categories":
-                jC, wC, vC = catExpStrings(
+                wC, vC = catExpStrings(
                     di["content"], di["operator"], "entryCats", "idCat"
                 )
-                joinQ += jC if "join entryCats" not in joinQ else ""
                 whereQ += "%s %s " % (di["logical"], wC)
                 vals += vC
             elif di["type"] == "Experiments":
-                jE, wE, vE = catExpStrings(
+                wE, vE = catExpStrings(
                     di["content"], di["operator"], "entryExps", "idExp"
                 )
-                joinQ += jE if "join entryExps" not in joinQ else ""
                 whereQ += "%s %s " % (di["logical"], wE)
                 vals += vE
             elif di["type"] == "Marks":
@@ -1941,15 +3536,32 @@ class Entries(PhysBiblioDBSub):
                 )
                 vals += ("1",)
 
+        if orderBy == "rank":
+            if len(matchTexts) > 0 and self.mainDB.hasFullText:
+                joinQ = (
+                    " left join (select rowid as ftsRowid, rank from %s "
+                    % self.mainDB.fullTextTable
+                    + "where %s match ?) ftsRank " % self.mainDB.fullTextTable
+                    + "on ftsRank.ftsRowid=entries.rowid"
+                    + joinQ
+                )
+                vals = (
+                    " OR ".join(
+                        ["(%s)" % self.fullTextQuery(t, f) for f, t in matchTexts]
+                    ),
+                ) + vals
+                orderBy = "ftsRank.rank"
+            else:
+                orderBy = "firstdate"
         query += joinQ if joinQ != "" else ""
         query += (" where %s" % whereQ) if whereQ != "" else ""
-        query += " order by %s%s" % (prependTab, orderBy)
+        query += " order by %s%s" % (prependTab if "." not in orderBy else "", orderBy)
         query += (" %s" % orderType) if orderBy else ""
         if limitTo is not None:
             query += " LIMIT %s" % (str(limitTo))
         if limitOffset is not None:
             if limitTo is None:
-                query += " LIMIT 100000"
+                query += " LIMIT -1"
             query += " OFFSET %s" % (str(limitOffset))
         if saveQuery and doFetch:
             self.lastQuery = query
@@ -1992,7 +3604,8 @@ class Entries(PhysBiblioDBSub):
                 it must contain the structure "field": "value"
             connection: "and"/"or", default "and"
             operator: "=" for exact match (default),
-                "like" for containing match
+                "like" for containing match,
+                "match" for a full-text search (see `self.prepareMatch`)
             orderBy: the name of the field according
                 to which the results are ordered
             orderType: "ASC" (default) or "DESC"
@@ -2009,12 +3622,65 @@ class Entries(PhysBiblioDBSub):
         Output:
             self
         """
+        query, vals = self.prepareFetchAll(
+            params=params,
+            connection=connection,
+            operator=operator,
+            orderBy=orderBy,
+            orderType=orderType,
+            limitTo=limitTo,
+            limitOffset=limitOffset,
+            saveQuery=saveQuery and doFetch,
+        )
+        if doFetch:
+            cursor = self.curs
+        else:
+            cursor = self.fetchCurs
+        try:
+            if len(vals) > 0:
+                cursor.execute(query, vals)
+            else:
+                cursor.execute(query)
+        except OperationalError as err:
+            if str(err) == "database is locked":
+                if not self.sendDBIsLocked():
+                    pBLogger.exception(dstr.opErDbOpen)
+            else:
+                pBLogger.exception(dstr.errorConnection % (err, query))
+        except (ProgrammingError, DatabaseError, InterfaceError) as err:
+            pBLogger.exception(dstr.Bibs.errorQueryFailed % (query, vals))
+        if doFetch:
+            fetched_in = self.curs.fetchall()
+            self.lastFetched = self.completeFetched(fetched_in)
+        return self
+
+    def prepareFetchAll(
+        self,
+        params=None,
+        connection="and",
+        operator="=",
+        orderBy="firstdate",
+        orderType="ASC",
+        limitTo=None,
+        limitOffset=None,
+        saveQuery=False,
+    ):
+        """Build the query used by `self.fetchAll`, without executing it.
+
+        Parameters:
+            see `self.fetchAll`
+            saveQuery (boolean, default False):
+                if True, save the query for future reuse
+
+        Output:
+            the query string and the tuple of values
+        """
         query = "select * from entries "
         vals = ()
         if connection.strip() != "and" and connection.strip() != "or":
             pBLogger.warning(dstr.Bibs.invalidLogicalOp % connection)
             connection = "and"
-        if operator.strip() != "=" and operator.strip() != "like":
+        if operator.strip() not in ["=", "like", "match"]:
             pBLogger.warning(dstr.Bibs.invalidComparisonOp % operator)
             operator = "="
         if orderType.strip() != "ASC" and orderType.strip() != "DESC":
@@ -2030,6 +3696,11 @@ class Entries(PhysBiblioDBSub):
                             first = False
                         else:
                             query += " %s " % connection
+                        if operator.strip() == "match":
+                            matchQ, matchV = self.prepareMatch(k, v1)
+                            query += " %s " % matchQ
+                            vals += matchV
+                            continue
                         query += k + " %s " % operator + " ? "
                         if operator.strip() == "like" and "%" not in v1:
                             v1 = "%%%s%%" % v1
@@ -2039,6 +3710,11 @@ class Entries(PhysBiblioDBSub):
                         first = False
                     else:
                         query += " %s " % connection
+                    if operator.strip() == "match":
+                        matchQ, matchV = self.prepareMatch(k, v)
+                        query += " %s " % matchQ
+                        vals += matchV
+                        continue
                     query += k + " %s " % operator + "? "
                     if operator.strip() == "like" and "%" not in v:
                         v = "%%%s%%" % v
@@ -2048,30 +3724,10 @@ class Entries(PhysBiblioDBSub):
             query += " LIMIT %s" % (str(limitTo))
             if limitOffset is not None:
                 query += " OFFSET %s" % (str(limitOffset))
-        if saveQuery and doFetch:
+        if saveQuery:
             self.lastQuery = query
             self.lastVals = vals
-        if doFetch:
-            cursor = self.curs
-        else:
-            cursor = self.fetchCurs
-        try:
-            if len(vals) > 0:
-                cursor.execute(query, vals)
-            else:
-                cursor.execute(query)
-        except OperationalError as err:
-            if str(err) == "database is locked":
-                if not self.sendDBIsLocked():
-                    pBLogger.exception(dstr.opErDbOpen)
-            else:
-                pBLogger.exception(dstr.errorConnection % (err, query))
-        except (ProgrammingError, DatabaseError, InterfaceError) as err:
-            pBLogger.exception(dstr.Bibs.errorQueryFailed % (query, vals))
-        if doFetch:
-            fetched_in = self.curs.fetchall()
-            self.lastFetched = self.completeFetched(fetched_in)
-        return self
+        return query, vals
 
     def getAll(
         self,
@@ -2108,19 +3764,33 @@ class Entries(PhysBiblioDBSub):
         and returns the dictionary of fetched entries
 
         Parameters:
-            bibkey: the bibtex key to match (or a list)
+            bibkey: the bibtex key to match (or a list).
+                Lists longer than `self.selectInChunkSize`
+                are processed in chunks and the query is not saved
             saveQuery (boolean, default True):
                 whether to save the query or not
 
         Output:
             self
         """
-        if isinstance(bibkey, list):
-            return self.fetchAll(
-                params={"bibkey": bibkey}, connection="or", saveQuery=saveQuery
-            )
-        else:
+        if not isinstance(bibkey, list):
             return self.fetchAll(params={"bibkey": bibkey}, saveQuery=saveQuery)
+        if len(bibkey) > self.selectInChunkSize:
+            rows = self.selectIn("select * from entries where bibkey in (%s)\n", bibkey)
+            self.lastFetched = self.completeFetched(
+                sorted(rows, key=lambda r: r["firstdate"] or "")
+            )
+            return self
+        query = "select * from entries where bibkey in (%s) order by firstdate ASC" % (
+            ", ".join(["?" for k in bibkey])
+        )
+        vals = tuple(bibkey)
+        if saveQuery:
+            self.lastQuery = query
+            self.lastVals = vals
+        self.cursExec(query, vals)
+        self.lastFetched = self.completeFetched(self.curs.fetchall())
+        return self
 
     def getByBibkey(self, bibkey, saveQuery=True):
         """Use self.fetchByBibkey and returns
@@ -2133,36 +3803,45 @@ class Entries(PhysBiblioDBSub):
         """
         return self.fetchByBibkey(bibkey, saveQuery=saveQuery).lastFetched
 
-    def fetchByKey(self, key, saveQuery=True):
-        """Use self.fetchAll with a match
-        on the bibtex key in the bibkey, bibtex or old_keys fields
+    def fetchByKey(self, key, saveQuery=True, prefix=False):
+        """Fetch the entries that match the given bibtex key,
+        either as their current key or as one of their previous keys
+        (see the `entryAliases` table),
         and returns the dictionary of fetched entries
 
         Parameters:
             key: the bibtex key to match (or a list)
             saveQuery (boolean, default True):
                 whether to save the query or not
+            prefix (boolean, default False): if True,
+                match all the keys that start with the given string(s)
 
         Output:
             self
         """
-        if isinstance(key, list):
-            strings = ["%%%s%%" % q for q in key]
-            return self.fetchAll(
-                params={"bibkey": strings, "old_keys": strings},
-                connection="or ",
-                operator=" like ",
-                saveQuery=saveQuery,
-            )
+        keys = key if isinstance(key, list) else [key]
+        if prefix:
+            match = " or ".join(["({0} >= ? and {0} < ?)" for k in keys])
+            vals = tuple(v for k in keys for v in (k, k + self.prefixEnd))
         else:
-            return self.fetchAll(
-                params={"bibkey": "%%%s%%" % key, "old_keys": "%%%s%%" % key},
-                connection="or ",
-                operator=" like ",
-                saveQuery=saveQuery,
-            )
+            match = "{0} in (%s)" % ", ".join(["?" for k in keys])
+            vals = tuple(keys)
+        query = (
+            "select * from entries where "
+            + match.format("bibkey")
+            + " or bibkey in (select bibkey from entryAliases where "
+            + match.format("alias")
+            + ") order by firstdate ASC"
+        )
+        vals = vals + vals
+        if saveQuery:
+            self.lastQuery = query
+            self.lastVals = vals
+        self.cursExec(query, vals)
+        self.lastFetched = self.completeFetched(self.curs.fetchall())
+        return self
 
-    def getByKey(self, key, saveQuery=True):
+    def getByKey(self, key, saveQuery=True, prefix=False):
         """Use self.fetchByKey and returns
         the dictionary of fetched entries
 
@@ -2171,7 +3850,47 @@ class Entries(PhysBiblioDBSub):
         Output:
             a dictionary
         """
-        return self.fetchByKey(key, saveQuery=saveQuery).lastFetched
+        return self.fetchByKey(key, saveQuery=saveQuery, prefix=prefix).lastFetched
+
+    def getAliases(self, key):
+        """Get the previous bibtex keys of an entry,
+        from the `entryAliases` table
+
+        Parameters:
+            key: the current bibtex key of the entry
+
+        Output:
+            the sorted list of the aliases
+        """
+        self.cursExec(
+            "select alias from entryAliases where bibkey=? order by alias", (key,)
+        )
+        return [r["alias"] for r in self.curs.fetchall()]
+
+    def resolveAlias(self, alias, prefix=False):
+        """Find the current bibtex keys corresponding to
+        a previous one, using the index on the `entryAliases` table
+
+        Parameters:
+            alias: the previous bibtex key
+            prefix (boolean, default False): if True,
+                match all the aliases that start with the given string
+
+        Output:
+            a dictionary with the matching aliases as keys
+                and the current bibtex keys as values
+        """
+        if prefix:
+            self.cursExec(
+                "select alias, bibkey from entryAliases "
+                + "where alias >= ? and alias < ?",
+                (alias, alias + self.prefixEnd),
+            )
+        else:
+            self.cursExec(
+                "select alias, bibkey from entryAliases where alias = ?", (alias,)
+            )
+        return {r["alias"]: r["bibkey"] for r in self.curs.fetchall()}
 
     def fetchByBibtex(self, string, saveQuery=True):
         """Use self.fetchAll with a match on the bibtex content
@@ -2232,8 +3951,8 @@ class Entries(PhysBiblioDBSub):
             return False
         if field == "bibdict" and isinstance(value, six.string_types):
             try:
-                return ast.literal_eval(value)
-            except SyntaxError:
+                return self.loadBibdict(value)
+            except (ValueError, SyntaxError):
                 pBLogger.error(dstr.Bibs.errorReadBibdict % value)
                 return value
         else:
@@ -2303,6 +4022,7 @@ class Entries(PhysBiblioDBSub):
         Output:
             the output of self.connExec
         """
+        self.addDisplayFields(data)
         return self.connExec(
             "INSERT into entries ("
             + ", ".join(self.tableCols["entries"])
@@ -2312,6 +4032,61 @@ class Entries(PhysBiblioDBSub):
             data,
         )
 
+    def insertMany(self, data):
+        """Insert many entries, using a single `executemany`
+        in a transaction. The entries whose bibtex key
+        is already present in the database are ignored
+
+        Parameters:
+            data: an iterable of dictionaries with the data fields
+                to be inserted (see `self.prepareInsert`)
+
+        Output:
+            a list with one element for each entry:
+                True if it has been inserted,
+                False if the bibtex key was already present
+                (also earlier in the same list, the comparison
+                is case insensitive),
+                None if it could not be inserted
+        """
+        data = [self.addDisplayFields(d) for d in data]
+        if len(data) == 0:
+            return []
+        query = "select bibkey from entries where bibkey in (%s)"
+        keys = [d["bibkey"] for d in data]
+        existing = set(r["bibkey"].lower() for r in self.selectIn(query, set(keys)))
+        new = []
+        newKeys = set()
+        for d in data:
+            k = d["bibkey"].lower()
+            if k not in existing and k not in newKeys:
+                new.append(d)
+                newKeys.add(k)
+        pBLogger.debug(dstr.Bibs.insertMany % len(new))
+        if len(new) > 0 and self.connExecMany(
+            "INSERT OR IGNORE into entries ("
+            + ", ".join(self.tableCols["entries"])
+            + ") values (:"
+            + ", :".join(self.tableCols["entries"])
+            + ")\n",
+            new,
+            atomic=True,
+        ):
+            now = set(
+                r["bibkey"].lower()
+                for r in self.selectIn(query, [d["bibkey"] for d in new])
+            )
+        else:
+            now = set()
+        outcomes = []
+        for k in [k.lower() for k in keys]:
+            if k in newKeys:
+                outcomes.append(True if k in now else None)
+                newKeys.discard(k)
+            else:
+                outcomes.append(False)
+        return outcomes
+
     def insertFromBibtex(self, bibtex):
         """A function that wraps self.insert(self.prepareInsert(bibtex))
 
@@ -2335,14 +4110,9 @@ class Entries(PhysBiblioDBSub):
             the output of self.connExec
         """
         data["bibkey"] = oldkey
-        return self.connExec(
-            "replace into entries ("
-            + ", ".join(data.keys())
-            + ") values (:"
-            + ", :".join(data.keys())
-            + ")\n",
-            data,
-        )
+        if "bibtex" in data.keys() or "bibdict" in data.keys():
+            self.addDisplayFields(data)
+        return self.connExec(self.replaceQuery("entries", list(data.keys())), data)
 
     def prepareInsert(
         self,
@@ -2508,7 +4278,7 @@ class Entries(PhysBiblioDBSub):
                 exc_info=True,
             )
             tmpBibDict = {}
-        data["bibdict"] = "%s" % tmpBibDict
+        data["bibdict"] = self.dumpBibdict(tmpBibDict)
         # if some fields are empty, use bibtex info
         if arxiv == "":
             if "arxiv" in tmpBibDict.keys() and tmpBibDict["arxiv"] != "":
@@ -2518,6 +4288,7 @@ class Entries(PhysBiblioDBSub):
         for f in ["year", "doi", "isbn"]:
             if f in tmpBibDict.keys() and tmpBibDict[f] != "":
                 data[f] = tmpBibDict[f]
+        data.update(displayFields(tmpBibDict, data["year"]))
         return data
 
     def prepareUpdateByKey(self, key_old, key_new):
@@ -2659,6 +4430,32 @@ class Entries(PhysBiblioDBSub):
                         pBLogger.warning(dstr.Bibs.errorUIIDArxiv)
             return False
 
+    def parseBibdict(self, bibtex):
+        """Parse a bibtex string and obtain the dictionary
+        of its fields, to be saved in the "bibdict" column
+
+        Parameters:
+            bibtex: the bibtex string
+
+        Output:
+            the dictionary of the first entry in the bibtex
+            (empty if the bibtex cannot be parsed)
+        """
+        try:
+            return (
+                bibtexparser.bparser.BibTexParser(common_strings=True)
+                .parse(bibtex)
+                .entries[0]
+            )
+        except IndexError:
+            return {}
+        except ParseException:
+            pBLogger.warning(
+                dstr.Bibs.errorParseBibtex % bibtex,
+                exc_info=True,
+            )
+            return {}
+
     def updateField(self, key, field, value, verbose=1):
         """Update a single field of an entry
 
@@ -2674,21 +4471,12 @@ class Entries(PhysBiblioDBSub):
         if verbose > 0:
             pBLogger.info(dstr.Bibs.updateField % (field, key))
         if field == "bibtex" and value != "" and value is not None:
-            try:
-                tmpBibDict = (
-                    bibtexparser.bparser.BibTexParser(common_strings=True)
-                    .parse(value)
-                    .entries[0]
-                )
-            except IndexError:
-                tmpBibDict = {}
-            except ParseException:
-                pBLogger.warning(
-                    dstr.Bibs.errorParseBibtex % value,
-                    exc_info=True,
-                )
-                tmpBibDict = {}
-            self.updateField(key, "bibdict", "%s" % tmpBibDict, verbose=verbose)
+            self.updateField(
+                key,
+                "bibdict",
+                self.dumpBibdict(self.parseBibdict(value)),
+                verbose=verbose,
+            )
         if (
             field in self.tableCols["entries"]
             and field != "bibkey"
@@ -2697,14 +4485,72 @@ class Entries(PhysBiblioDBSub):
             query = "update entries set " + field + "=:field where bibkey=:bibkey\n"
             if verbose > 1:
                 pBLogger.info("%s" % ((query, field, value)))
-            return self.connExec(query, {"field": value, "bibkey": key})
+            result = self.connExec(query, {"field": value, "bibkey": key})
+            if result and field == "bibdict":
+                self.updateDisplayFields(key, value)
+            elif result and field == "year":
+                self.updateDisplayFields(key)
+            return result
         else:
             if verbose > 1:
                 pBLogger.warning(dstr.Bibs.errorField % (key, field, value))
             return False
 
+    def updateFields(self, key, fields, verbose=1):
+        """Update several fields of an entry with a single query.
+        If the bibtex changes, it is parsed only once
+        to obtain the new "bibdict" and the plain text fields
+        (see `self.displayCols`)
+
+        Parameters:
+            key: the bibtex key
+            fields: a dictionary with the field names as keys
+                and the new values as values
+            verbose (int): increase output level
+
+        Output:
+            the output of self.connExec,
+            or False if there are no valid fields
+        """
+        data = {}
+        for field, value in fields.items():
+            if (
+                field in self.tableCols["entries"]
+                and field != "bibkey"
+                and field not in self.displayCols
+                and value is not None
+            ):
+                data[field] = value
+            elif verbose > 1:
+                pBLogger.warning(dstr.Bibs.errorField % (key, field, value))
+        if len(data) == 0:
+            return False
+        if verbose > 0:
+            pBLogger.info(dstr.Bibs.updateField % ("', '".join(data.keys()), key))
+        bibdict = None
+        if "bibdict" in data:
+            bibdict = data["bibdict"]
+            if isinstance(bibdict, dict):
+                data["bibdict"] = self.dumpBibdict(bibdict)
+        elif data.get("bibtex", "") != "":
+            bibdict = self.parseBibdict(data["bibtex"])
+            data["bibdict"] = self.dumpBibdict(bibdict)
+        if bibdict is not None or "year" in data:
+            data.update(self.getDisplayFields(key, bibdict, data.get("year")))
+        query = (
+            "update entries set "
+            + ", ".join(["%s=:%s" % (f, f) for f in data.keys()])
+            + " where bibkey=:bibkey\n"
+        )
+        if verbose > 1:
+            pBLogger.info("%s" % ((query, data)))
+        data["bibkey"] = key
+        return self.connExec(query, data)
+
     def updateBibkey(self, oldKey, newKey):
-        """Update the bibtex key of an entry
+        """Update the bibtex key of an entry.
+        The connections with categories and experiments
+        are updated by the foreign keys
 
         Parameters:
             oldKey: the old bibtex key
@@ -2731,12 +4577,7 @@ class Entries(PhysBiblioDBSub):
                     pBPDF.renameFolder(oldKey, newKey)
                 except Exception:
                     pBLogger.exception(dstr.errorRename)
-                query = "update entryCats set bibkey=:new where bibkey=:old\n"
-                if self.connExec(query, {"new": newKey, "old": oldKey}):
-                    query = "update entryExps set bibkey=:new where bibkey=:old\n"
-                    return self.connExec(query, {"new": newKey, "old": oldKey})
-                else:
-                    return False
+                return True
             else:
                 return False
         except:
@@ -2763,6 +4604,7 @@ class Entries(PhysBiblioDBSub):
         entries = physBiblioWeb.webSearch["inspireoai"].retrieveOAIUpdates(date1, date2)
         changed = []
         for e in entries:
+            newFields = {}
             try:
                 key = e["bibkey"]
                 pBLogger.info(key)
@@ -2785,11 +4627,12 @@ class Entries(PhysBiblioDBSub):
                                 pBLogger.info(dstr.Bibs.oaiNew % e[o])
                             else:
                                 pBLogger.info(dstr.Bibs.oaiInfoS % (d, old[0][d], e[o]))
-                            self.updateField(key, d, e[o], verbose=0)
-                            if len(changed) == 0 or changed[-1] != key:
-                                changed.append(key)
+                            newFields[d] = e[o]
             except:
                 pBLogger.exception(dstr.Bibs.errorOAIEntryDet % (e["id"], e))
+            if len(newFields) > 0:
+                self.updateFields(key, newFields, verbose=0)
+                changed.append(key)
         pBLogger.info(dstr.Bibs.oaiChanged % (len(changed), changed))
         pBLogger.info(dstr.Bibs.oaiDone)
 
@@ -2801,6 +4644,7 @@ class Entries(PhysBiblioDBSub):
         readConferenceTitle=False,
         reloadAll=False,
         originalKey=None,
+        oaiData=None,
     ):
         """Use inspire OAI to retrieve the info for a single entry
 
@@ -2814,6 +4658,9 @@ class Entries(PhysBiblioDBSub):
                 without trying to simply update the existing one
             originalKey (optional): the previous key of the entry
                 (useful when reloadAll is True)
+            oaiData (optional): the output of
+                `physBiblioWeb.webSearch["inspireoai"].retrieveOAIData`,
+                if it has already been obtained
 
         Output:
             True if successful, or False if there were errors
@@ -2832,7 +4679,9 @@ class Entries(PhysBiblioDBSub):
             if not inspireID.isdigit():
                 pBLogger.error(dstr.Bibs.iidWrongVal % inspireID)
                 return False
-        if not reloadAll:
+        if oaiData is not None:
+            result = oaiData
+        elif not reloadAll:
             result = physBiblioWeb.webSearch["inspireoai"].retrieveOAIData(
                 inspireID,
                 bibtex=bibtex,
@@ -2868,24 +4717,22 @@ class Entries(PhysBiblioDBSub):
             if verbose > 1:
                 pBLogger.info("%s, %s" % (key, old))
             if len(old) > 0:
+                newFields = {}
                 for [o, d] in physBiblioWeb.webSearch["inspireoai"].correspondences:
                     try:
                         if verbose > 0:
                             pBLogger.info("%s = %s (%s)" % (d, result[o], old[0][d]))
                         if result[o] != old[0][d]:
                             if o == "bibtex" and result[o] is not None:
-                                self.updateField(
-                                    key,
-                                    d,
-                                    self.rmBibtexComments(
-                                        self.rmBibtexACapo(result[o].strip())
-                                    ),
-                                    verbose=0,
+                                newFields[d] = self.rmBibtexComments(
+                                    self.rmBibtexACapo(result[o].strip())
                                 )
                             else:
-                                self.updateField(key, d, result[o], verbose=0)
+                                newFields[d] = result[o]
                     except KeyError:
                         pBLogger.exception(dstr.Bibs.iidKeyError % (o, d))
+                if len(newFields) > 0:
+                    self.updateFields(key, newFields, verbose=0)
             if verbose > 0:
                 pBLogger.info(dstr.Bibs.iidSaved % inspireID)
         except KeyError:
@@ -3060,6 +4907,7 @@ class Entries(PhysBiblioDBSub):
                     before = entry[fiOld]
                 bef = []
                 aft = []
+                newFields = {}
                 for fiNew, new in zip(fiNews, news):
                     if (
                         not fiNew in entry["bibtexDict"].keys()
@@ -3081,18 +4929,18 @@ class Entries(PhysBiblioDBSub):
                         entry["bibtex"] = self.rmBibtexComments(
                             self.rmBibtexACapo(pbWriter.write(db).strip())
                         )
-                        self.updateField(
-                            entry["bibkey"], "bibtex", entry["bibtex"], verbose=0
-                        )
+                        newFields["bibtex"] = entry["bibtex"]
                     if fiNew in entry.keys():
                         bef.append(entry[fiNew])
                         after = singleReplace(before, new, previous=entry[fiNew])
                         aft.append(after)
-                        self.updateField(entry["bibkey"], fiNew, after, verbose=0)
+                        newFields[fiNew] = after
             except KeyError:
                 pBLogger.exception(dstr.Bibs.replaceError)
                 failed.append(entry["bibkey"])
             else:
+                if len(newFields) > 0:
+                    self.updateFields(entry["bibkey"], newFields, verbose=0)
                 success.append(entry["bibkey"])
                 if any(b != a for a, b in zip(aft, bef)):
                     changed.append(entry["bibkey"])
@@ -3231,7 +5079,7 @@ class Entries(PhysBiblioDBSub):
             bibtex = self.rmBibtexComments(
                 self.rmBibtexACapo(pbWriter.write(db).strip())
             )
-            self.updateField(bibkey, "bibtex", bibtex)
+            self.updateFields(bibkey, {"bibtex": bibtex})
             return True
         except Exception:
             pBLogger.exception(dstr.Bibs.gffaFailed)
@@ -3422,6 +5270,10 @@ class Entries(PhysBiblioDBSub):
         elif entry is not None and isinstance(entry, list):
             failed = []
             entry = returnListIfSub(entry, [])
+            if pbConfig.params["loadAndInsertWorkers"] > 1 and method != "bibtex":
+                return self.loadAndInsertBatch(
+                    entry, method=method, pbMax=pbMax, pbVal=pbVal
+                )
             self.runningLoadAndInsert = True
             tot = len(entry)
             pBLogger.info(dstr.Bibs.laiProcessTot % tot)
@@ -3441,7 +5293,7 @@ class Entries(PhysBiblioDBSub):
                         dstr.Bibs.laiProcessProgr
                         % (ie + 1, tot, 100.0 * (ie + 1) / tot, e)
                     )
-                    if not self.loadAndInsert(e, childProcess=True):
+                    if not self.loadAndInsert(e, method=method, childProcess=True):
                         failed.append(e)
             if len(self.lastInserted) > 0:
                 pBLogger.info(dstr.Bibs.laiImported % ", ".join(self.lastInserted))
@@ -3452,6 +5304,205 @@ class Entries(PhysBiblioDBSub):
             pBLogger.error(dstr.Bibs.laiInvalidArgs)
             return False
 
+    def loadAndInsertBatch(self, entries, method="inspire", pbMax=None, pbVal=None):
+        """Batch mode of `self.loadAndInsert` for a list of entries.
+        The web contents (bibtex, abstract, INSPIRE-HEP ID and OAI data)
+        are downloaded concurrently by a pool of `loadAndInsertWorkers`
+        threads, while the database is only used by the calling thread,
+        which inserts the entries in the original order,
+        without committing, as soon as their data are available.
+        The requests to each web service are limited
+        by `WebInterf.waitRateLimit`.
+
+        Parameters:
+            entries: the list of strings to be searched
+            method: "inspire" (default) or any other supported method
+                from the webimport subpackage
+            pbMax (callable, optional): a function to set the maximum
+                of a progress bar in the GUI, if possible
+            pbVal (callable, optional): a function to set the value
+                of a progress bar in the GUI, if possible
+
+        Output:
+            False if the method is not valid, True otherwise
+        """
+        if method not in physBiblioWeb.webSearch.keys():
+            pBLogger.error(dstr.Bibs.laiInvalidMethod % method)
+            return False
+        entries = [str(e) if isinstance(e, float) else e for e in entries]
+        self.runningLoadAndInsert = True
+        tot = len(entries)
+        workers = max(1, min(tot, pbConfig.params["loadAndInsertWorkers"]))
+        pBLogger.info(dstr.Bibs.laiProcessTot % tot)
+        pBLogger.info(dstr.Bibs.laiWorkers % workers)
+        try:
+            pbMax(tot)
+        except TypeError:
+            pass
+        progress = [0]
+        failed = []
+
+        def advance():
+            """Update the progress bar when an entry has been processed"""
+            progress[0] += 1
+            try:
+                pbVal(progress[0])
+            except TypeError:
+                pass
+
+        def getExisting(key, arxiv, doi):
+            """Return the existing entries matching the bibtex key,
+            the arxiv or the doi (database access, main thread only)
+            """
+            existing = self.getByBibkey(key, saveQuery=False)
+            for f, v in (("arxiv", arxiv), ("doi", doi)):
+                if isinstance(v, six.string_types) and v.strip() != "":
+                    existing += self.fetchAll(
+                        params={f: v}, saveQuery=False
+                    ).lastFetched
+            return existing
+
+        def fetchBibtex(string):
+            """Download the bibtex (worker thread, no database access)"""
+            if not self.runningLoadAndInsert:
+                return None
+            return physBiblioWeb.webSearch[method].retrieveUrlAll(string)
+
+        def fetchDetails(string, data):
+            """Download abstract, INSPIRE-HEP ID and OAI data
+            (worker thread, no database access)
+            """
+            details = {"abstract": None, "inspireID": False, "oaiData": None}
+            if not self.runningLoadAndInsert:
+                return details
+            if pbConfig.params["fetchAbstract"] and data["arxiv"] != "":
+                arxivBibtex, arxivDict = physBiblioWeb.webSearch[
+                    "arxiv"
+                ].retrieveUrlAll(data["arxiv"], searchType="id", fullDict=True)
+                details["abstract"] = arxivDict["abstract"]
+            if method == "inspire":
+                inspire = physBiblioWeb.webSearch["inspire"]
+                eid = inspire.retrieveInspireID(string)
+                for f, kwargs in (
+                    ("doi", {"isDoi": True}),
+                    ("arxiv", {"isArxiv": True}),
+                ):
+                    if (
+                        eid == ""
+                        and isinstance(data[f], six.string_types)
+                        and data[f].strip() != ""
+                    ):
+                        eid = inspire.retrieveInspireID(data[f], number=0, **kwargs)
+                if eid != "":
+                    details["inspireID"] = eid
+                    details["oaiData"] = physBiblioWeb.webSearch[
+                        "inspireoai"
+                    ].retrieveOAIData(eid)
+            return details
+
+        def writeEntry(string, e, data, details):
+            """Insert the entry and its additional information
+            (main thread only)
+            """
+            key = data["bibkey"]
+            if details["abstract"] is not None:
+                data["abstract"] = details["abstract"]
+            if not self.insert(data):
+                pBLogger.error(dstr.Bibs.laiFailed % string)
+                return False
+            try:
+                self.mainDB.catBib.insert(pbConfig.params["defaultCategories"], key)
+                if method == "inspire":
+                    if details["inspireID"]:
+                        self.connExec(
+                            "update entries set inspire=:inspire "
+                            + "where bibkey=:bibkey\n",
+                            {"inspire": details["inspireID"], "bibkey": key},
+                        )
+                    self.updateInfoFromOAI(
+                        details["inspireID"], oaiData=details["oaiData"]
+                    )
+                elif method == "isbn":
+                    self.setBook(key)
+                if "inproceeding" in data["bibtex"].lower():
+                    self.setProceeding(key)
+                if "phdthesis" in data["bibtex"].lower():
+                    self.setPhdThesis(key)
+            except Exception:
+                pBLogger.warning(dstr.failedComplete % string)
+                return False
+            pBLogger.info(dstr.Bibs.laiInserted)
+            self.lastInserted.append(key)
+            return True
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            toFetch = []
+            for string in entries:
+                if getExisting(string, string, string):
+                    pBLogger.info(dstr.Bibs.alreadyExisting % string)
+                    advance()
+                else:
+                    toFetch.append((string, pool.submit(fetchBibtex, string)))
+            seenKeys = set()
+            toWrite = []
+            for string, future in toFetch:
+                if not self.runningLoadAndInsert:
+                    break
+                try:
+                    e = future.result()
+                except Exception:
+                    pBLogger.exception(dstr.Bibs.laiFailed % string)
+                    failed.append(string)
+                    advance()
+                    continue
+                if e is None:
+                    continue
+                if e.count("@") > 1:
+                    pBLogger.warning(dstr.Bibs.laiMismatch % e)
+                    failed.append(string)
+                    advance()
+                    continue
+                data = self.prepareInsert(e)
+                key = data["bibkey"]
+                if key.strip() == "":
+                    pBLogger.error(dstr.Bibs.laiEmptyKey % string)
+                    failed.append(string)
+                    advance()
+                    continue
+                if key in seenKeys or getExisting(key, data["arxiv"], data["doi"]):
+                    pBLogger.info(dstr.Bibs.alreadyExisting % key)
+                    advance()
+                    continue
+                seenKeys.add(key)
+                pBLogger.info(dstr.Bibs.laiNewKey % key)
+                toWrite.append(
+                    (string, e, data, pool.submit(fetchDetails, string, data))
+                )
+            for string, e, data, future in toWrite:
+                if not self.runningLoadAndInsert:
+                    break
+                pBLogger.info(
+                    dstr.Bibs.laiProcessProgr
+                    % (progress[0] + 1, tot, 100.0 * (progress[0] + 1) / tot, string)
+                )
+                try:
+                    details = future.result()
+                except Exception:
+                    pBLogger.exception(dstr.Bibs.laiFailed % string)
+                    details = None
+                if details is None or not writeEntry(string, e, data, details):
+                    failed.append(string)
+                advance()
+            for string, future in toFetch:
+                future.cancel()
+            for string, e, data, future in toWrite:
+                future.cancel()
+        if len(self.lastInserted) > 0:
+            pBLogger.info(dstr.Bibs.laiImported % ", ".join(self.lastInserted))
+        if len(failed) > 0:
+            pBLogger.warning(dstr.Bibs.laiErrors % (", ".join(failed)))
+        return True
+
     def loadAndInsertWithCats(
         self,
         entry,
@@ -3507,13 +5558,47 @@ class Entries(PhysBiblioDBSub):
             entries = []
         return entries
 
-    def parseAllBibtexs(self, fullBibText, errors=[], verbose=False, messageEvery=100):
-        """Parse the text containing several bibtex entries and return
-        the list of parsed entries from `bibtexparser`.
+    def readBibtexFile(self, filename, chunkSize=65536, progress=None):
+        """Generator that reads a text file in chunks
+        and yields its lines one at a time,
+        so that the whole content is never kept in memory
+
+        Parameters:
+            filename: the name of the file
+            chunkSize (default 65536): the number of characters
+                read at each step
+            progress (callable, optional): a function which is called
+                with the number of bytes read so far, after each chunk
+
+        Output:
+            yields the lines of the file, including the newline character
+        """
+        with open(filename) as r:
+            rest = ""
+            while True:
+                chunk = r.read(chunkSize)
+                if not chunk:
+                    break
+                lines = (rest + chunk).split("\n")
+                rest = lines.pop()
+                try:
+                    progress(r.buffer.tell())
+                except TypeError:
+                    pass
+                for line in lines:
+                    yield line + "\n"
+            if rest != "":
+                yield rest
+
+    def iterBibtexs(self, lines, errors=[], verbose=False, messageEvery=100):
+        """Generator that splits a sequence of lines in bibtex entries
+        and yields the entries parsed by `bibtexparser`
+        one at a time, as soon as they are complete.
         It should deal well with a number of errors
 
         Parameter:
-            fullBibText: the text to be processed
+            lines: an iterable over the lines of text to be processed
+                (for example a list or `self.readBibtexFile`)
             errors (default []): a list that contains the errors.
                 It should add to the existing list if passed
             verbose (default False): if True, print some more messages
@@ -3521,29 +5606,60 @@ class Entries(PhysBiblioDBSub):
                 showing the reading progress every N found entries
 
         Output:
-            a list of parsed entries
+            yields the parsed entries
         """
-        bibText = ""
-        elements = []
+        bibText = []
         found = 0
         pBLogger.info(dstr.Bibs.pabStart)
-        for il, line in enumerate(fullBibText):
+        for il, line in enumerate(lines):
             if line.startswith("@") and il > 0:
-                elements += self.parseSingleBibtex(
-                    bibText, errors=errors, verbose=verbose
-                )
+                for e in self.parseSingleBibtex(
+                    "".join(bibText), errors=errors, verbose=verbose
+                ):
+                    yield e
                 found += 1
                 if found % messageEvery == 0:
                     pBLogger.info(dstr.Bibs.pabRead % found)
-                bibText = line
+                bibText = [line]
             else:
-                bibText += line
-        elements += self.parseSingleBibtex(bibText, errors=errors, verbose=verbose)
+                bibText.append(line)
+        for e in self.parseSingleBibtex(
+            "".join(bibText), errors=errors, verbose=verbose
+        ):
+            yield e
+
+    def parseAllBibtexs(self, fullBibText, errors=[], verbose=False, messageEvery=100):
+        """Parse the text containing several bibtex entries and return
+        the list of parsed entries from `bibtexparser`
+        (see `self.iterBibtexs`)
+
+        Parameter:
+            fullBibText: the text to be processed, as a list of lines
+            errors (default []): a list that contains the errors.
+                It should add to the existing list if passed
+            verbose (default False): if True, print some more messages
+            messageEvery (default 100): print a message
+                showing the reading progress every N found entries
+
+        Output:
+            a list of parsed entries
+        """
+        elements = list(
+            self.iterBibtexs(
+                fullBibText, errors=errors, verbose=verbose, messageEvery=messageEvery
+            )
+        )
         pBLogger.info(dstr.Bibs.pabFound % len(elements))
         return elements
 
-    def importFromBib(self, filename, completeInfo=True, pbMax=None, pbVal=None):
-        """Read a .bib file and add the contained entries in the database
+    def importFromBib(
+        self, filename, completeInfo=True, pbMax=None, pbVal=None, batchSize=100
+    ):
+        """Read a .bib file and add the contained entries in the database.
+        The file is read in chunks and the entries are inserted
+        in groups of `batchSize` (see `self.insertMany`)
+        as soon as they have been parsed, so that the memory usage
+        does not depend on the size of the file
 
         Parameters:
             filename: the name of the .bib file
@@ -3551,8 +5667,12 @@ class Entries(PhysBiblioDBSub):
                 and other fields to look for more information online
             pbMax (callable, optional): a function to set the maximum
                 of a progress bar in the GUI, if possible
+                (it receives the size of the file in bytes)
             pbVal (callable, optional): a function to set the value
                 of a progress bar in the GUI, if possible
+                (it receives the number of bytes read so far)
+            batchSize (default 100): the number of parsed entries
+                which are inserted together
         """
 
         def printExisting(entry):
@@ -3564,75 +5684,106 @@ class Entries(PhysBiblioDBSub):
             """
             pBLogger.info(dstr.Bibs.ifbExist % entry)
 
+        def progress(offset):
+            """Store the number of bytes read so far
+            and update the progress bar
+
+            Parameters:
+                offset: the number of bytes read
+            """
+            current[0] = offset
+            try:
+                pbVal(offset)
+            except TypeError:
+                pass
+
+        def insertBuffer():
+            """Insert the parsed entries collected in the buffer
+            with `self.insertMany` and complete their information
+            """
+            outcomes = self.insertMany(buffer)
+            self.mainDB.catBib.insert(
+                pbConfig.params["defaultCategories"],
+                [d["bibkey"] for d, o in zip(buffer, outcomes) if o],
+            )
+            for data, outcome in zip(buffer, outcomes):
+                key = data["bibkey"]
+                if outcome is False:
+                    printExisting(key)
+                    exist.append(key)
+                    continue
+                if outcome is None:
+                    pBLogger.warning(dstr.Bibs.ifbFailed % key)
+                    errors.append(key)
+                    continue
+                pBLogger.info(dstr.Bibs.ifbNewKey % key)
+                try:
+                    if completeInfo:
+                        if pbConfig.params["fetchAbstract"] and data["arxiv"] != "":
+                            arxivBibtex, arxivDict = physBiblioWeb.webSearch[
+                                "arxiv"
+                            ].retrieveUrlAll(
+                                data["arxiv"], searchType="id", fullDict=True
+                            )
+                            self.updateField(
+                                key, "abstract", arxivDict["abstract"], verbose=0
+                            )
+                        eid = self.updateInspireID(key)
+                        self.updateInfoFromOAI(eid)
+                    pBLogger.info(dstr.Bibs.ifbInserted)
+                    self.lastInserted.append(key)
+                except Exception:
+                    pBLogger.exception(dstr.failedComplete % key)
+                    errors.append(key)
+            del buffer[:]
+
         self.lastInserted = []
         exist = []
         errors = []
+        current = [0]
+        buffer = []
 
         pBLogger.info(dstr.Bibs.ifbFromFile % filename)
-        with open(filename) as r:
-            fullBibText = r.readlines()
-        elements = self.parseAllBibtexs(fullBibText, errors=errors, verbose=True)
+        tot = os.path.getsize(filename)
         db = bibtexparser.bibdatabase.BibDatabase()
         self.importFromBibFlag = True
-        tot = len(elements)
         pBLogger.info(dstr.Bibs.ifbProcessTot % tot)
         try:
             pbMax(tot)
         except TypeError:
             pass
-        for ie, e in enumerate(elements):
-            try:
-                pbVal(ie + 1)
-            except TypeError:
-                pass
-            if self.importFromBibFlag and e != []:
-                db.entries = [e]
-                bibtex = self.rmBibtexComments(
-                    self.rmBibtexACapo(pbWriter.write(db).strip())
-                )
-                data = self.prepareInsert(bibtex)
-                key = data["bibkey"]
-                pBLogger.info(
-                    dstr.Bibs.ifbProcessProgr
-                    % (ie + 1, tot, 100.0 * (ie + 1.0) / tot, key)
-                )
-                existing = self.getByBibkey(key, saveQuery=False)
-                if existing:
-                    printExisting(key)
-                    exist.append(key)
-                elif key.strip() == "":
-                    pBLogger.warning(dstr.Bibs.ifbEmptyKey)
-                    errors.append(key)
-                else:
-                    if (
-                        completeInfo
-                        and pbConfig.params["fetchAbstract"]
-                        and data["arxiv"] != ""
-                    ):
-                        arxivBibtex, arxivDict = physBiblioWeb.webSearch[
-                            "arxiv"
-                        ].retrieveUrlAll(data["arxiv"], searchType="id", fullDict=True)
-                        data["abstract"] = arxivDict["abstract"]
-                    pBLogger.info(dstr.Bibs.ifbNewKey % key)
-                    if not self.insert(data):
-                        pBLogger.warning(dstr.Bibs.ifbFailed % key)
-                        errors.append(key)
-                    else:
-                        self.mainDB.catBib.insert(
-                            pbConfig.params["defaultCategories"], key
-                        )
-                        try:
-                            if completeInfo:
-                                eid = self.updateInspireID(key)
-                                self.updateInfoFromOAI(eid)
-                            pBLogger.info(dstr.Bibs.ifbInserted)
-                            self.lastInserted.append(key)
-                        except Exception:
-                            pBLogger.exception(dstr.failedComplete % key)
-                            errors.append(key)
+        processed = 0
+        for ie, e in enumerate(
+            self.iterBibtexs(
+                self.readBibtexFile(filename, progress=progress),
+                errors=errors,
+                verbose=True,
+            )
+        ):
+            if not self.importFromBibFlag:
+                break
+            processed += 1
+            db.entries = [e]
+            bibtex = self.rmBibtexComments(
+                self.rmBibtexACapo(pbWriter.write(db).strip())
+            )
+            data = self.prepareInsert(bibtex)
+            key = data["bibkey"]
+            pBLogger.info(
+                dstr.Bibs.ifbProcessProgr
+                % (ie + 1, 100.0 * current[0] / tot if tot > 0 else 100.0, key)
+            )
+            if key.strip() == "":
+                pBLogger.warning(dstr.Bibs.ifbEmptyKey)
+                errors.append(key)
+                continue
+            buffer.append(data)
+            if len(buffer) >= batchSize:
+                insertBuffer()
+        insertBuffer()
         pBLogger.info(
             dstr.Bibs.ifbCompleteSummary
-            % (len(elements), len(exist), len(self.lastInserted), len(errors))
+            % (processed, len(exist), len(self.lastInserted), len(errors))
         )
 
     def setBook(self, key, value=1):
@@ -3912,18 +6063,24 @@ class Entries(PhysBiblioDBSub):
         """
         return self.fetchByExp(idExp, orderBy=orderBy, orderType=orderType).lastFetched
 
-    def cleanBibtexs(self, startFrom=0, entries=None, pbMax=None, pbVal=None):
+    def cleanBibtexs(
+        self, startFrom=0, entries=None, pbMax=None, pbVal=None, after=None
+    ):
         """Clean (remove comments, unwanted fields, newlines, accents)
-        and reformat the bibtexs
+        and reformat the bibtexs.
+        If the process is stopped while considering all the entries,
+        the position from which it can be resumed is printed
 
         Parameters:
             startFrom (default 0): the index where to start from
             entries: the list of entries to be considered.
-                If None, the output of self.getAll
+                If None, all the entries, loaded with self.iterAllEntries
             pbMax (callable, optional): a function to set the maximum
                 of a progress bar in the GUI, if possible
             pbVal (callable, optional): a function to set the value
                 of a progress bar in the GUI, if possible
+            after (default None): the token of the last entry
+                processed by a previous run (see `self.iterAllEntries`)
 
         Output:
             num, err, changed:
@@ -3933,11 +6090,7 @@ class Entries(PhysBiblioDBSub):
         """
         if entries is None:
             try:
-                tot = self.count() - startFrom
-                self.fetchAll(
-                    saveQuery=False, limitTo=tot, limitOffset=startFrom, doFetch=False
-                )
-                iterator = self.fetchCursor()
+                tot, iterator = self.iterAllEntries(startFrom=startFrom, after=after)
             except TypeError:
                 pBLogger.exception(dstr.Bibs.cbInvalidStart)
                 return 0, 0, []
@@ -3947,6 +6100,7 @@ class Entries(PhysBiblioDBSub):
         num = 0
         err = 0
         changed = []
+        lastToken = None
         self.runningCleanBibtexs = True
         pBLogger.info(dstr.Bibs.cbProcessTot % tot)
         try:
@@ -3965,19 +6119,20 @@ class Entries(PhysBiblioDBSub):
                     dstr.Bibs.cbProcessProgr
                     % (ix + 1, tot, 100.0 * (ix + 1) / tot, e["bibkey"])
                 )
+                newFields = {}
                 for field in [
                     "marks",
                     "old_keys",
                 ]:  # convert None to "" for given fields
                     if e[field] is None:
-                        self.updateField(e["bibkey"], field, "")
+                        newFields[field] = ""
                 if e["marks"] is not None and "'" in e["marks"]:
                     marks = e["marks"].replace("'", "").split(",")
                     newmarks = []
                     for m in marks:
                         if m not in newmarks:
                             newmarks.append(m)
-                    self.updateField(e["bibkey"], "marks", ",".join(newmarks))
+                    newFields["marks"] = ",".join(newmarks)
                 try:
                     element = (
                         bibtexparser.bparser.BibTexParser(common_strings=True)
@@ -3991,41 +6146,52 @@ class Entries(PhysBiblioDBSub):
                             parse_accents_str(pbWriter.write(db).strip())
                         )
                     )
-                    if e["bibtex"] != newbibtex and self.updateField(
-                        e["bibkey"], "bibtex", newbibtex
-                    ):
-                        pBLogger.info(dstr.Bibs.elementChanged)
-                        changed.append(e["bibkey"])
+                    if e["bibtex"] != newbibtex:
+                        newFields["bibtex"] = newbibtex
                 except (IndexError, ValueError, ParseException):
                     pBLogger.warning(dstr.Bibs.cbError % e["bibkey"], exc_info=True)
                     err += 1
+                if (
+                    len(newFields) > 0
+                    and self.updateFields(e["bibkey"], newFields)
+                    and "bibtex" in newFields
+                ):
+                    pBLogger.info(dstr.Bibs.elementChanged)
+                    changed.append(e["bibkey"])
+                lastToken = self.lastPageToken
+            else:
+                break
+        if entries is None and not self.runningCleanBibtexs:
+            self.logResumeToken(lastToken)
         pBLogger.info(dstr.Bibs.cbResEntr % num)
         pBLogger.info(dstr.Bibs.cbResErr % err)
         pBLogger.info(dstr.Bibs.cbResChan % len(changed))
         return num, err, changed
 
-    def findCorruptedBibtexs(self, startFrom=0, entries=None, pbMax=None, pbVal=None):
-        """Find bibtexs that cannot be read properly
+    def findCorruptedBibtexs(
+        self, startFrom=0, entries=None, pbMax=None, pbVal=None, after=None
+    ):
+        """Find bibtexs that cannot be read properly.
+        If the process is stopped while considering all the entries,
+        the position from which it can be resumed is printed
 
         Parameters:
             startFrom (default 0): the index where to start from
             entries: the list of entries to be considered.
-                If None, the output of self.getAll
+                If None, all the entries, loaded with self.iterAllEntries
             pbMax (callable, optional): a function to set the maximum
                 of a progress bar in the GUI, if possible
             pbVal (callable, optional): a function to set the value
                 of a progress bar in the GUI, if possible
+            after (default None): the token of the last entry
+                processed by a previous run (see `self.iterAllEntries`)
 
         Output:
             bibtexs: the list of problematic entries
         """
         if entries is None:
             try:
-                tot = self.count() - startFrom
-                self.fetchAll(
-                    saveQuery=False, limitTo=tot, limitOffset=startFrom, doFetch=False
-                )
-                iterator = self.fetchCursor()
+                tot, iterator = self.iterAllEntries(startFrom=startFrom, after=after)
             except TypeError:
                 pBLogger.exception(dstr.Bibs.fcbInvalidStart)
                 return 0, 0, []
@@ -4033,6 +6199,7 @@ class Entries(PhysBiblioDBSub):
             iterator = entries
             tot = len(entries)
         bibtexs = []
+        lastToken = None
         self.runningFindBadBibtexs = True
         pBLogger.info(dstr.Bibs.fcbProcessTot % tot)
         try:
@@ -4060,9 +6227,196 @@ class Entries(PhysBiblioDBSub):
                 except Exception:
                     bibtexs.append(e["bibkey"])
                     pBLogger.warning(dstr.Bibs.fcbNotReadable % e["bibkey"])
+                lastToken = self.lastPageToken
+            else:
+                break
+        if entries is None and not self.runningFindBadBibtexs:
+            self.logResumeToken(lastToken)
         pBLogger.info(dstr.Bibs.fcbBadEntries % (len(bibtexs), bibtexs))
         return bibtexs
 
+    def duplicateKeys(self, entry):
+        """Compute the normalized identifiers of an entry
+        which are compared to find the duplicated entries:
+        the DOI (lowercase), the arXiv number (without version),
+        the INSPIRE ID and the fingerprint
+        of title, first author and year (see `fingerprint`)
+
+        Parameters:
+            entry: a dictionary (or `sqlite3.Row`) with the fields
+                "doi", "arxiv", "inspire" and "fingerprint"
+
+        Output:
+            a list of tuples (name of the identifier, value)
+        """
+        doi = re.sub(
+            r"^(https?://(dx\.)?doi\.org/|doi:)", "", (entry["doi"] or "").lower()
+        ).strip()
+        arxiv = re.sub(r"^arxiv:", "", (entry["arxiv"] or "").lower()).strip()
+        arxiv = re.sub(r"v[0-9]+$", "", arxiv)
+        keys = []
+        for name, value in [
+            ["doi", doi],
+            ["arxiv", arxiv],
+            ["inspire", ("%s" % (entry["inspire"] or "")).strip()],
+            ["fingerprint", entry["fingerprint"] or ""],
+        ]:
+            if value != "":
+                keys.append((name, value))
+        return keys
+
+    def findDuplicates(self, pbMax=None, pbVal=None):
+        """Find the groups of entries which may be duplicated,
+        because they have the same normalized DOI, arXiv number,
+        INSPIRE ID or fingerprint (see `self.duplicateKeys`).
+        The entries are read once and grouped using dictionaries,
+        so that the time grows linearly with the number of entries.
+        Entries connected through different identifiers
+        are in the same group
+
+        Parameters:
+            pbMax (callable, optional): a function to set the maximum
+                of a progress bar in the GUI, if possible
+            pbVal (callable, optional): a function to set the value
+                of a progress bar in the GUI, if possible
+
+        Output:
+            a list of dictionaries, one for each group, with
+            the sorted list of bibtex keys ("bibkeys")
+            and the names of the identifiers that matched ("matches")
+        """
+        tot = self.count()
+        pBLogger.info(dstr.Bibs.dupProcessTot % tot)
+        try:
+            pbMax(tot)
+        except TypeError:
+            pass
+        candidates = {}
+        self.cursExec("select bibkey, doi, arxiv, inspire, fingerprint from entries")
+        for ix, e in enumerate(self.curs.fetchall()):
+            try:
+                pbVal(ix + 1)
+            except TypeError:
+                pass
+            for k in self.duplicateKeys(e):
+                candidates.setdefault(k, []).append(e["bibkey"])
+        candidates = {k: v for k, v in candidates.items() if len(v) > 1}
+        roots = {}
+
+        def root(key):
+            """Find the key which represents the group of the given one"""
+            while roots.setdefault(key, key) != key:
+                roots[key] = roots[roots[key]]
+                key = roots[key]
+            return key
+
+        for keys in candidates.values():
+            for k in keys[1:]:
+                roots[root(k)] = root(keys[0])
+        groups = {}
+        for (name, value), keys in candidates.items():
+            group = groups.setdefault(
+                root(keys[0]), {"bibkeys": set(), "matches": set()}
+            )
+            group["bibkeys"].update(keys)
+            group["matches"].add(name)
+        groups = sorted(
+            [
+                {"bibkeys": sorted(g["bibkeys"]), "matches": sorted(g["matches"])}
+                for g in groups.values()
+            ],
+            key=lambda g: g["bibkeys"],
+        )
+        pBLogger.info(dstr.Bibs.dupFound % len(groups))
+        return groups
+
+    def isOAIUpdatable(self, e, force=False):
+        """Check if an entry should be updated using inspireOAI:
+        it must have an INSPIRE-HEP ID, it must not be a book,
+        lecture, PhD thesis or (unless force) a proceeding,
+        it must not be marked as noUpdate and (unless force)
+        it must miss the DOI or the journal information
+
+        Parameters:
+            e: the dictionary of the entry, as given by `completeFetched`
+            force (boolean, default False): consider also proceedings
+                and entries which already have journal information
+
+        Output:
+            a boolean
+        """
+        return (
+            (e["proceeding"] == 0 or force)
+            and e["book"] == 0
+            and e["lecture"] == 0
+            and e["phd_thesis"] == 0
+            and e["noUpdate"] == 0
+            and e["inspire"] is not None
+            and e["inspire"] != ""
+            and (force or (e["doi"] is None or "journal" not in e["bibtexDict"].keys()))
+        )
+
+    def applyOAIUpdate(self, e, force=False, reloadAll=False, oaiData=None):
+        """Use `self.updateInfoFromOAI` to update one entry
+        and compare the new content with the previous one.
+        If the bibtex key changes, `e["bibkey"]` is updated
+
+        Parameters:
+            e: the dictionary of the entry, as given by `completeFetched`
+            force, reloadAll: see `self.searchOAIUpdates`
+            oaiData (optional): the output of
+                `physBiblioWeb.webSearch["inspireoai"].retrieveOAIData`,
+                if it has already been obtained
+
+        Output:
+            None if some error occurred,
+            True if the entry changed, False otherwise
+        """
+        kwargs = {} if oaiData is None else {"oaiData": oaiData}
+        if not self.updateInfoFromOAI(
+            e["inspire"],
+            bibtex=e["bibtex"],
+            verbose=0,
+            readConferenceTitle=(e["proceeding"] == 1 and force),
+            reloadAll=reloadAll,
+            originalKey=e["bibkey"],
+            **kwargs
+        ):
+            return None
+        try:
+            new = self.getByKey(e["bibkey"], saveQuery=False)[0]
+        except IndexError:
+            try:
+                e["bibkey"] = self.newKey
+                del self.newKey
+                new = self.getByKey(e["bibkey"], saveQuery=False)[0]
+            except (AttributeError, IndexError):
+                pBLogger.exception(dstr.Bibs.souError % e["bibkey"])
+                return None
+        if e != new:
+            pBLogger.info(dstr.Bibs.elementChanged)
+            for diff in list(dictdiffer.diff(e, new)):
+                pBLogger.info(diff)
+            return True
+        return False
+
+    def getOAICheckpoint(self):
+        """Get the position of the last entry processed
+        by an interrupted `self.searchOAIUpdatesBatch`,
+        saved in the settings table of the database
+
+        Output:
+            the token (see `self.makePageToken`) or None,
+            if no valid checkpoint is available
+        """
+        try:
+            token = self.mainDB.config.getByName(self.oaiCheckpointName)[0]["value"]
+        except (IndexError, TypeError):
+            return None
+        if self.readPageToken(token) is None:
+            return None
+        return token
+
     def searchOAIUpdates(
         self,
         startFrom=0,
@@ -4071,14 +6425,18 @@ class Entries(PhysBiblioDBSub):
         reloadAll=False,
         pbMax=None,
         pbVal=None,
+        resume=False,
+        after=None,
     ):
-        """Select unpublished papers and look for updates using inspireOAI
+        """Select unpublished papers and look for updates using inspireOAI.
+        If the `oaiUpdateWorkers` setting is larger than 1
+        or `resume` is True, use `self.searchOAIUpdatesBatch`
 
         Parameters:
             startFrom (default 0): the index in the list of entries
                 where to start updating from
             entries: the list of entries to be considered or None
-                (if None, use self.getAll)
+                (if None, use self.iterQueryPages)
             force (boolean, default False): force the update also
                 of entries which already have journal information
             reloadAll (boolean, default False): reload the entire content,
@@ -4087,6 +6445,11 @@ class Entries(PhysBiblioDBSub):
                 of a progress bar in the GUI, if possible
             pbVal (callable, optional): a function to set the value
                 of a progress bar in the GUI, if possible
+            resume (boolean, default False): restart from the checkpoint
+                saved by a previous interrupted run
+                (see `self.searchOAIUpdatesBatch`)
+            after (default None): the token of the last entry
+                processed by a previous run (see `self.iterAllEntries`)
 
         Output:
             num, err, changed:
@@ -4094,13 +6457,20 @@ class Entries(PhysBiblioDBSub):
                 the list of errors and
                 of changed entries
         """
+        if resume or pbConfig.params["oaiUpdateWorkers"] > 1:
+            return self.searchOAIUpdatesBatch(
+                startFrom=startFrom,
+                entries=entries,
+                force=force,
+                reloadAll=reloadAll,
+                pbMax=pbMax,
+                pbVal=pbVal,
+                resume=resume,
+                after=after,
+            )
         if entries is None:
             try:
-                tot = self.count() - startFrom
-                self.fetchAll(
-                    saveQuery=False, limitTo=tot, limitOffset=startFrom, doFetch=False
-                )
-                iterator = self.fetchCursor()
+                tot, iterator = self.iterAllEntries(startFrom=startFrom, after=after)
             except TypeError:
                 pBLogger.exception(dstr.Bibs.souInvalidStart)
                 return 0, [], []
@@ -4110,6 +6480,7 @@ class Entries(PhysBiblioDBSub):
         num = 0
         err = []
         changed = []
+        lastToken = None
         self.runningOAIUpdates = True
         pBLogger.info(dstr.Bibs.souProcessTot % tot)
         try:
@@ -4121,54 +6492,211 @@ class Entries(PhysBiblioDBSub):
                 pbVal(ix + 1)
             except TypeError:
                 pass
+            if not self.runningOAIUpdates:
+                break
             if not "bibtexDict" in e.keys():
                 e = self.completeFetched([e])[0]
-            if (
-                self.runningOAIUpdates
-                and (e["proceeding"] == 0 or force)
-                and e["book"] == 0
-                and e["lecture"] == 0
-                and e["phd_thesis"] == 0
-                and e["noUpdate"] == 0
-                and e["inspire"] is not None
-                and e["inspire"] != ""
-                and (
-                    force
-                    or (e["doi"] is None or "journal" not in e["bibtexDict"].keys())
-                )
-            ):
+            if self.isOAIUpdatable(e, force=force):
                 num += 1
                 pBLogger.info(
                     dstr.Bibs.souProcessProgr
                     % (ix + 1, tot, 100.0 * (ix + 1) / tot, e["bibkey"])
                 )
-                if not self.updateInfoFromOAI(
-                    e["inspire"],
-                    bibtex=e["bibtex"],
-                    verbose=0,
-                    readConferenceTitle=(e["proceeding"] == 1 and force),
-                    reloadAll=reloadAll,
-                    originalKey=e["bibkey"],
-                ):
+                outcome = self.applyOAIUpdate(e, force=force, reloadAll=reloadAll)
+                if outcome is None:
                     err.append(e["bibkey"])
-                else:
-                    try:
-                        new = self.getByKey(e["bibkey"], saveQuery=False)[0]
-                    except IndexError:
-                        try:
-                            e["bibkey"] = self.newKey
-                            del self.newKey
-                            new = self.getByKey(e["bibkey"], saveQuery=False)[0]
-                        except (AttributeError, IndexError):
-                            pBLogger.exception(dstr.Bibs.souError % e["bibkey"])
-                            err.append(e["bibkey"])
-                            continue
-                    if e != new:
-                        pBLogger.info(dstr.Bibs.elementChanged)
-                        for diff in list(dictdiffer.diff(e, new)):
-                            pBLogger.info(diff)
-                        changed.append(e["bibkey"])
+                elif outcome:
+                    changed.append(e["bibkey"])
                 pBLogger.info("")
+            lastToken = self.lastPageToken
+        if entries is None and not self.runningOAIUpdates:
+            self.logResumeToken(lastToken)
+        self.printOAIUpdatesResults(num, err, changed)
+        return num, err, changed
+
+    def searchOAIUpdatesBatch(
+        self,
+        startFrom=0,
+        entries=None,
+        force=False,
+        reloadAll=False,
+        pbMax=None,
+        pbVal=None,
+        resume=False,
+        after=None,
+    ):
+        """Concurrent version of `self.searchOAIUpdates`.
+        The OAI records are downloaded by a pool of `oaiUpdateWorkers`
+        threads (the requests are spaced by the `oaiRequestDelay` setting),
+        while the calling thread applies the updates in the original order.
+        When processing the whole database, the entries are loaded
+        in pages sorted by firstdate (as in `self.searchOAIUpdates`),
+        the changes are committed every `oaiUpdateBatchSize` entries
+        and the position of the last applied entry is saved
+        as a checkpoint in the settings table at each commit,
+        so that an interrupted run can be resumed later.
+        The checkpoint is removed when the update completes.
+        When a list of entries is given, nothing is committed
+        and the transaction is left to the caller
+
+        Parameters:
+            startFrom (default 0): the index in the list of entries
+                where to start updating from (ignored if resuming
+                from a checkpoint)
+            entries: the list of entries to be considered or None
+                (if None, use self.iterQueryPages)
+            force, reloadAll, pbMax, pbVal: see `self.searchOAIUpdates`
+            resume (boolean, default False): if True and
+                `entries` is None, only process the entries
+                following the saved checkpoint
+            after (default None): the token of the last entry
+                processed by a previous run (see `self.iterAllEntries`),
+                used if `resume` is False or no checkpoint is available
+
+        Output:
+            num, err, changed:
+                the number of processed entries,
+                the list of errors and
+                of changed entries
+        """
+        useCheckpoint = entries is None
+        if entries is None:
+            checkpoint = self.getOAICheckpoint() if resume else None
+            if checkpoint is not None:
+                pBLogger.info(dstr.Bibs.souCheckpoint)
+                after = checkpoint
+            try:
+                tot, iterator = self.iterAllEntries(startFrom=startFrom, after=after)
+            except TypeError:
+                pBLogger.exception(dstr.Bibs.souInvalidStart)
+                return 0, [], []
+        else:
+            iterator = entries
+            tot = len(entries)
+        workers = max(1, min(tot, pbConfig.params["oaiUpdateWorkers"]))
+        batchSize = max(1, pbConfig.params["oaiUpdateBatchSize"])
+        num = 0
+        err = []
+        changed = []
+        self.runningOAIUpdates = True
+        pBLogger.info(dstr.Bibs.souProcessTot % tot)
+        pBLogger.info(dstr.Bibs.souWorkers % workers)
+        try:
+            pbMax(tot)
+        except TypeError:
+            pass
+        oaiWeb = physBiblioWeb.webSearch["inspireoai"]
+
+        def fetchRecord(e):
+            """Download the OAI record (worker thread, no database access)"""
+            if not self.runningOAIUpdates:
+                return None
+            kwargs = {
+                "verbose": 0,
+                "readConferenceTitle": (e["proceeding"] == 1 and force),
+            }
+            if not reloadAll:
+                kwargs["bibtex"] = e["bibtex"]
+            return oaiWeb.retrieveOAIData(e["inspire"], **kwargs)
+
+        def saveBatch(lastToken):
+            """Save the checkpoint and commit the changes
+            (only when processing the whole database)
+            """
+            if not useCheckpoint:
+                return
+            if lastToken is not None:
+                self.mainDB.config.insert(self.oaiCheckpointName, lastToken)
+                pBLogger.info(dstr.Bibs.souCommitted % self.readPageToken(lastToken)[1])
+            self.mainDB.commit(verbose=False)
+
+        pending = deque()
+        lastToken = None
+        applied = 0
+
+        def applyNext():
+            """Wait for the first pending download and apply the update
+            (main thread only).
+            Return the position token of the entry
+            """
+            ix, e, future, token = pending.popleft()
+            originalKey = e["bibkey"]
+            try:
+                pbVal(ix + 1)
+            except TypeError:
+                pass
+            pBLogger.info(
+                dstr.Bibs.souProcessProgr
+                % (ix + 1, tot, 100.0 * (ix + 1) / tot, originalKey)
+            )
+            try:
+                result = future.result()
+            except Exception:
+                pBLogger.exception(dstr.Bibs.souError % originalKey)
+                result = False
+            outcome = self.applyOAIUpdate(
+                e, force=force, reloadAll=reloadAll, oaiData=result
+            )
+            if outcome is None:
+                err.append(e["bibkey"])
+            elif outcome:
+                changed.append(e["bibkey"])
+            pBLogger.info("")
+            return token
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for ix, e in enumerate(iterator):
+                if not self.runningOAIUpdates:
+                    break
+                if not "bibtexDict" in e.keys():
+                    e = self.completeFetched([e])[0]
+                if not self.isOAIUpdatable(e, force=force):
+                    continue
+                num += 1
+                pending.append(
+                    (
+                        ix,
+                        e,
+                        pool.submit(fetchRecord, e),
+                        self.lastPageToken if useCheckpoint else None,
+                    )
+                )
+                while len(pending) > 2 * workers and self.runningOAIUpdates:
+                    lastToken = applyNext()
+                    applied += 1
+                    if applied % batchSize == 0:
+                        saveBatch(lastToken)
+            while len(pending) > 0 and self.runningOAIUpdates:
+                lastToken = applyNext()
+                applied += 1
+                if applied % batchSize == 0:
+                    saveBatch(lastToken)
+            num -= len(pending)
+            for ix, e, future, token in pending:
+                future.cancel()
+        if self.runningOAIUpdates:
+            try:
+                pbVal(tot)
+            except TypeError:
+                pass
+            if useCheckpoint:
+                self.mainDB.config.delete(self.oaiCheckpointName)
+                self.mainDB.commit(verbose=False)
+        else:
+            saveBatch(lastToken)
+            if useCheckpoint:
+                self.logResumeToken(lastToken)
+        self.printOAIUpdatesResults(num, err, changed)
+        return num, err, changed
+
+    def printOAIUpdatesResults(self, num, err, changed):
+        """Print the final report of `self.searchOAIUpdates`
+
+        Parameters:
+            num: the number of processed entries
+            err: the list of entries that gave errors
+            changed: the list of changed entries
+        """
         pBLogger.info(dstr.Bibs.souResProc % num)
         pBLogger.info(dstr.Bibs.souResErr % len(err))
         if len(err) > 0:
@@ -4176,7 +6704,6 @@ class Entries(PhysBiblioDBSub):
         pBLogger.info(dstr.Bibs.souResChan % len(changed))
         if len(changed) > 0:
             pBLogger.info(changed)
-        return num, err, changed
 
 
 class Utilities(PhysBiblioDBSub):
@@ -4185,48 +6712,32 @@ class Utilities(PhysBiblioDBSub):
     def cleanSpareEntries(self):
         """Find and delete connections
         (bibtex-category, bibtex-experiment, category-experiment)
-        where one of the parts is missing
+        where one of the parts is missing.
+        The foreign keys prevent the creation of such connections,
+        which may only come from databases created
+        by previous versions of the software
         """
-
-        def deletePresent(ix1, ix2, join, func):
-            """Delete the connections if one of the two extremities
-            are missing in the respective tables.
-
-            Parameters:
-                ix1, ix2: the lists of ids/bibkeys
-                    where to look for the indexes
-                join: the list of pairs of connected elements
-                func: the function that must be used
-                    to delete the connections
-            """
-            for e in join:
-                if e[0] not in ix1 or e[1] not in ix2:
-                    pBLogger.info(dstr.cleaning % (e[0], e[1]))
-                    func(e[0], e[1])
-
-        self.mainDB.bibs.fetchAll(saveQuery=False, doFetch=False)
-        bibkeys = [e["bibkey"] for e in self.mainDB.bibs.fetchCursor()]
-        idCats = [e["idCat"] for e in self.mainDB.cats.getAll()]
-        idExps = [e["idExp"] for e in self.mainDB.exps.getAll()]
-
-        deletePresent(
-            bibkeys,
-            idExps,
-            [[e["bibkey"], e["idExp"]] for e in self.mainDB.bibExp.getAll()],
-            self.mainDB.bibExp.delete,
-        )
-        deletePresent(
-            idCats,
-            bibkeys,
-            [[e["idCat"], e["bibkey"]] for e in self.mainDB.catBib.getAll()],
-            self.mainDB.catBib.delete,
-        )
-        deletePresent(
-            idCats,
-            idExps,
-            [[e["idCat"], e["idExp"]] for e in self.mainDB.catExp.getAll()],
-            self.mainDB.catExp.delete,
-        )
+        for table, cols in [
+            ["entryExps", ["bibkey", "idExp"]],
+            ["entryCats", ["idCat", "bibkey"]],
+            ["expCats", ["idCat", "idExp"]],
+        ]:
+            # the referenced column goes first, to use its collation
+            missing = " OR ".join(
+                [
+                    "NOT EXISTS (SELECT 1 FROM {1} WHERE {1}.{2} = {0}.{3})".format(
+                        table, fk[1], fk[2], fk[0]
+                    )
+                    for fk in self.mainDB.tableForeignKeys[table]
+                ]
+            )
+            self.cursExec(
+                "SELECT %s FROM %s WHERE %s" % (", ".join(cols), table, missing)
+            )
+            for e in self.curs.fetchall():
+                pBLogger.info(dstr.cleaning % (e[0], e[1]))
+            self.connExec("DELETE FROM %s WHERE %s" % (table, missing))
+        self.mainDB.catsGraph = None
 
     def cleanAllBibtexs(self, verbose=0):
         """Remove newlines, non-standard characters
@@ -4258,8 +6769,8 @@ def catString(idCat, db, withDesc=False):
         the output string
     """
     try:
-        cat = db.cats.getByID(idCat)[0]
-    except IndexError:
+        cat = db.cats.getGraph()[int(idCat)]
+    except (KeyError, ValueError):
         pBLogger.warning(dstr.catNotInDb % idCat)
         return ""
     if withDesc:
@@ -4277,30 +6788,133 @@ def cats_alphabetical(listId, db):
     Output:
         the list of ids, ordered according to the category names.
     """
+    graph = db.cats.getGraph()
     listIn = []
     for i in listId:
         try:
-            listIn.append(db.cats.getByID(i)[0])
-        except IndexError:
+            listIn.append(graph[int(i)])
+        except (KeyError, ValueError):
             pBLogger.warning(dstr.catNotInDb % i)
-    decorated = [(x["name"].lower(), x) for x in listIn]
-    return [x[1]["idCat"] for x in sorted(decorated)]
+    decorated = [(x["name"].lower(), x["idCat"]) for x in listIn]
+    return [x[1] for x in sorted(decorated)]
+
+
+def shortAuthors(author):
+    """Replace the list of authors with "First Author et al."
+    when there are more than `maxAuthorNames` names
+
+    Parameters:
+        author: the string with the authors separated by " and "
+
+    Output:
+        the (eventually) shortened string
+    """
+    if author.count(" and ") > pbConfig.params["maxAuthorNames"] - 1:
+        author = author[: author.index(" and ")] + " et al."
+    return author
+
+
+# converter used by `displayFields`, created only once
+# because it is used every time an entry is written
+latexToText = LatexNodes2Text(keep_inline_math=False, keep_comments=False)
+
+
+def displayFields(bibdict, year=None):
+    """Compute the plain text fields which are stored in the entries table
+    and used to show and sort the entries without parsing the bibtex
+    (see `Entries.displayCols`)
+
+    Parameters:
+        bibdict: the dictionary with the bibtex fields
+        year (default None): the year to use if it is not in the bibtex
+
+    Output:
+        a dictionary with the fields "titleText", "authorText",
+            "firstAuthor", "publishedText" and "fingerprint"
+            (see `fingerprint`)
+    """
+    out = {}
+    for f in ["title", "author"]:
+        out[f + "Text"] = latexToText.latex_to_text(bibdict.get(f, "")).strip()
+    first = out["authorText"].split(" and ")[0].strip()
+    if "," not in first and " " in first:
+        first = ", ".join(first.rsplit(" ", 1)[::-1])
+    out["firstAuthor"] = first
+    if "year" in bibdict:
+        year = bibdict["year"]
+    out["publishedText"] = " ".join(
+        [
+            bibdict.get("journal", ""),
+            bibdict.get("volume", ""),
+            "(%s)" % (year if year is not None else ""),
+            bibdict.get("pages", ""),
+        ]
+    )
+    if out["publishedText"] == "  () ":
+        out["publishedText"] = ""
+    out["fingerprint"] = fingerprint(out["titleText"], first, year)
+    return out
+
+
+def fingerprint(title, firstAuthor, year):
+    """Compute the hash of the normalized title, surname
+    of the first author and year of an entry,
+    which is used to find the duplicated entries
+    (see `Entries.findDuplicates`).
+    Case, accents, spaces and punctuation are ignored
+
+    Parameters:
+        title: the title (as plain text)
+        firstAuthor: the first author, as "Surname, Name"
+        year: the year (may be None)
+
+    Output:
+        the hash (a string with 16 hexadecimal digits),
+        or an empty string if the title is empty
+    """
+
+    def normalize(text):
+        """Remove accents, spaces and punctuation, and use lowercase"""
+        text = unicodedata.normalize("NFKD", "%s" % text)
+        text = "".join([c for c in text if not unicodedata.combining(c)])
+        return re.sub(r"[\W_]+", "", text.lower())
+
+    title = normalize(title)
+    if title == "":
+        return ""
+    return hashlib.sha1(
+        "|".join(
+            [
+                title,
+                normalize(firstAuthor.split(",")[0]),
+                normalize(year if year is not None else ""),
+            ]
+        ).encode("utf-8")
+    ).hexdigest()[:16]
 
 
 def dbStats(db):
     """Get statistics on the number of entries
-    in the various database tables
+    in the various database tables.
+    The numbers are read from the `tableStats` table
+    (see `PhysBiblioDB.createTableStats`), if available
 
     Parameters:
         db: the database (instance of PhysBiblioDB)
     """
+    numRows = {}
+    if db.cursExec("SELECT tableName, numRows FROM tableStats"):
+        numRows = {r["tableName"]: r["numRows"] for r in db.curs.fetchall()}
     db.stats = {}
-    db.stats["bibs"] = db.bibs.count()
-    db.stats["cats"] = db.cats.count()
-    db.stats["exps"] = db.exps.count()
-    db.stats["catBib"] = db.catBib.count()
-    db.stats["catExp"] = db.catExp.count()
-    db.stats["bibExp"] = db.bibExp.count()
+    for key, table, sub in [
+        ["bibs", "entries", db.bibs],
+        ["cats", "categories", db.cats],
+        ["exps", "experiments", db.exps],
+        ["catBib", "entryCats", db.catBib],
+        ["catExp", "expCats", db.catExp],
+        ["bibExp", "entryExps", db.bibExp],
+    ]:
+        db.stats[key] = numRows[table] if table in numRows else sub.count()
 
 
 pBDB = PhysBiblioDB(pbConfig.currentDatabase, pBLogger)
@@ -3,9 +3,12 @@
 This file is part of the physbiblio package.
 """
 import ast
+import collections
 import os
 import sqlite3
 import sys
+import threading
+import time
 import traceback
 from sqlite3 import (
     DatabaseError,
@@ -26,11 +29,360 @@ except ImportError:
 encoding_default = "iso-8859-15"
 
 
+class QueryProfiler:
+    """Collect statistics on the SQL statements executed
+    on the database: number of calls, wall time and
+    returned (or modified) rows, grouped by call site.
+    The statements slower than `self.slowQueryTime`
+    are logged together with their query plan.
+    """
+
+    # number of slow statements that are kept in memory
+    maxSlowQueries = 50
+
+    def __init__(self, logger, slowQueryTime=500):
+        """Initialize the (disabled) profiler
+
+        Parameters:
+            logger: the logger used for messages
+            slowQueryTime (default 500): the time (in milliseconds)
+                above which a statement is considered slow.
+                Use 0 to disable the log of slow statements
+        """
+        self.enabled = False
+        self.logger = logger
+        self.slowQueryTime = slowQueryTime
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Delete all the collected statistics"""
+        with self.lock:
+            self.sites = {}
+            self.slowQueries = collections.deque(maxlen=self.maxSlowQueries)
+
+    # the modules whose functions are never reported as call sites
+    databaseFiles = (__file__, os.path.join(os.path.dirname(__file__), "database.py"))
+
+    def callSite(self):
+        """Find the first function in the call stack
+        which is not defined in the database modules
+        (`databaseCore` and `database`)
+
+        Output:
+            a string with the function name, file and line,
+            followed by the name of the outermost function
+            of the database modules that was called
+        """
+        frame = sys._getframe(1)
+        dbFunction = "?"
+        while frame is not None and frame.f_code.co_filename in self.databaseFiles:
+            dbFunction = frame.f_code.co_name
+            frame = frame.f_back
+        if frame is None:
+            return dbFunction
+        return "%s (%s:%d) -> %s" % (
+            frame.f_code.co_name,
+            os.path.basename(frame.f_code.co_filename),
+            frame.f_lineno,
+            dbFunction,
+        )
+
+    def explain(self, conn, query, data=None):
+        """Get the query plan of a statement
+
+        Parameters:
+            conn: the connection where the statement was executed
+            query: the SQL statement
+            data: the values of the parameters in the query
+
+        Output:
+            a list of strings, empty if the query plan
+            cannot be obtained
+        """
+        try:
+            rows = conn.execute("EXPLAIN QUERY PLAN " + query, data or ()).fetchall()
+        except Exception:
+            return []
+        return [r[3] for r in rows]
+
+    def record(self, conn, query, data, elapsed, rows, site):
+        """Save the statistics on an executed statement
+        and log it if it is slow
+
+        Parameters:
+            conn: the connection where the statement was executed
+            query: the SQL statement
+            data: the values of the parameters in the query
+            elapsed: the wall time (in seconds)
+            rows: the number of returned or modified rows
+            site: the call site, see `self.callSite`
+        """
+        slow = 0 < self.slowQueryTime <= elapsed * 1000.0
+        with self.lock:
+            stats = self.sites.setdefault(
+                site, {"calls": 0, "time": 0.0, "rows": 0, "maxTime": 0.0, "slow": 0}
+            )
+            stats["calls"] += 1
+            stats["time"] += elapsed
+            stats["rows"] += rows
+            stats["maxTime"] = max(stats["maxTime"], elapsed)
+            if slow:
+                stats["slow"] += 1
+        if not slow:
+            return
+        plan = self.explain(conn, query, data)
+        with self.lock:
+            self.slowQueries.append(
+                {
+                    "query": query,
+                    "data": data,
+                    "time": elapsed,
+                    "rows": rows,
+                    "site": site,
+                    "plan": plan,
+                }
+            )
+        self.logger.warning(
+            dbcstr.slowQuery
+            % (elapsed * 1000.0, rows, site, query, data, "\n".join(plan))
+        )
+
+    def run(self, conn, method, query, data=None, many=False):
+        """Execute a statement with one method of the connection
+        (`execute` or `executemany`), recording its statistics
+        if the profiler is enabled
+
+        Parameters:
+            conn: the connection
+            method: the method to be used
+            query: the SQL statement
+            data (default None): the values of the parameters
+            many (default False): True if `method` is `executemany`
+                and `data` is a sequence of parameters.
+                Only the first element is saved in the statistics
+                and used to obtain the query plan
+
+        Output:
+            the output of `method`
+        """
+        args = (query,) if data is None else (query, data)
+        if not self.enabled:
+            return method(*args)
+        recordData = data
+        if many:
+            data = list(data)
+            args = (query, data)
+            recordData = data[0] if len(data) > 0 else None
+        site = self.callSite()
+        start = time.perf_counter()
+        cursor = method(*args)
+        self.record(
+            conn,
+            query,
+            recordData,
+            time.perf_counter() - start,
+            max(cursor.rowcount, 0),
+            site,
+        )
+        return cursor
+
+    def summary(self):
+        """Summarize the collected statistics
+
+        Output:
+            a dictionary with the total number of statements,
+            the total time (in seconds), the total number of rows,
+            the number of slow statements,
+            the statistics for each call site (list sorted by
+            decreasing total time) and the last slow statements
+        """
+        with self.lock:
+            sites = [dict(site=k, **v) for k, v in self.sites.items()]
+            slowQueries = list(self.slowQueries)
+        return {
+            "enabled": self.enabled,
+            "statements": sum(s["calls"] for s in sites),
+            "time": sum(s["time"] for s in sites),
+            "rows": sum(s["rows"] for s in sites),
+            "slow": sum(s["slow"] for s in sites),
+            "sites": sorted(sites, key=lambda s: s["time"], reverse=True),
+            "slowQueries": slowQueries,
+        }
+
+    def report(self, maxSites=10):
+        """Describe the collected statistics in a text
+
+        Parameters:
+            maxSites (default 10): the number of call sites
+                to be shown (the slowest ones)
+
+        Output:
+            a string
+        """
+        summary = self.summary()
+        if not summary["enabled"] and summary["statements"] == 0:
+            return dbcstr.profilerDisabled
+        lines = [
+            dbcstr.profilerSummary
+            % (
+                summary["statements"],
+                summary["time"] * 1000.0,
+                summary["rows"],
+                summary["slow"],
+            )
+        ]
+        for s in summary["sites"][:maxSites]:
+            lines.append(
+                dbcstr.profilerSite
+                % (s["time"] * 1000.0, s["calls"], s["rows"], s["site"])
+            )
+        return "\n".join(lines)
+
+
+class ProfiledCursor(sqlite3.Cursor):
+    """Cursor which records the statistics on the executed
+    statements in a `QueryProfiler`.
+    The time and number of rows of a statement include
+    the fetching of the results: the statement is recorded
+    when all the rows have been fetched,
+    or when the cursor executes a new statement
+    """
+
+    def __init__(self, conn, profiler=None):
+        """Create the cursor
+
+        Parameters:
+            conn: the `sqlite3.Connection`
+            profiler: the `QueryProfiler` instance
+        """
+        super(ProfiledCursor, self).__init__(conn)
+        self.profiler = profiler
+        self.pending = None
+
+    def execute(self, query, data=()):
+        """Execute a statement, measuring the wall time
+        if the profiler is enabled
+
+        Parameters: see `sqlite3.Cursor.execute`
+
+        Output:
+            the cursor
+        """
+        self.finishStatement()
+        if self.profiler is None or not self.profiler.enabled:
+            return super(ProfiledCursor, self).execute(query, data)
+        site = self.profiler.callSite()
+        start = time.perf_counter()
+        super(ProfiledCursor, self).execute(query, data)
+        self.pending = [query, data, site, time.perf_counter() - start, 0]
+        if self.description is None:
+            self.pending[4] = max(self.rowcount, 0)
+            self.finishStatement()
+        return self
+
+    def measureFetch(self, method, *args):
+        """Call a fetching method, adding its time
+        to the current statement
+
+        Parameters:
+            method: the method to be called
+            *args: its arguments
+
+        Output:
+            the output of `method`
+        """
+        start = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            if self.pending is not None:
+                self.pending[3] += time.perf_counter() - start
+
+    def addRows(self, number, finished=False):
+        """Count the fetched rows of the current statement
+
+        Parameters:
+            number: the number of new fetched rows
+            finished (default False): if True,
+                all the rows have been fetched
+        """
+        if self.pending is None:
+            return
+        self.pending[4] += number
+        if finished:
+            self.finishStatement()
+
+    def finishStatement(self):
+        """Send the statistics of the current statement
+        to the profiler
+        """
+        if self.pending is None:
+            return
+        query, data, site, elapsed, rows = self.pending
+        self.pending = None
+        self.profiler.record(self.connection, query, data, elapsed, rows, site)
+
+    def fetchall(self):
+        """Same as `sqlite3.Cursor.fetchall`"""
+        rows = self.measureFetch(super(ProfiledCursor, self).fetchall)
+        self.addRows(len(rows), True)
+        return rows
+
+    def fetchmany(self, *args):
+        """Same as `sqlite3.Cursor.fetchmany`"""
+        rows = self.measureFetch(super(ProfiledCursor, self).fetchmany, *args)
+        self.addRows(len(rows), len(rows) == 0)
+        return rows
+
+    def fetchone(self):
+        """Same as `sqlite3.Cursor.fetchone`"""
+        row = self.measureFetch(super(ProfiledCursor, self).fetchone)
+        self.addRows(0 if row is None else 1, row is None)
+        return row
+
+    def __next__(self):
+        """Same as `sqlite3.Cursor.__next__`"""
+        try:
+            row = self.measureFetch(super(ProfiledCursor, self).__next__)
+        except StopIteration:
+            self.addRows(0, True)
+            raise
+        self.addRows(1)
+        return row
+
+    def close(self):
+        """Record the current statement and close the cursor"""
+        self.finishStatement()
+        super(ProfiledCursor, self).close()
+
+
 class PhysBiblioDBCore:
     """Contains most of the basic functions on the database.
     Will be subclassed to do everything else.
+
+    All the threads share the same connection (`self.conn`),
+    so that all the changes can be committed or undone together,
+    while the cursor (`self.curs`) depends on the thread:
+    the one that opened the database uses the main one,
+    while each other thread receives its own cursor
+    (see `self.threadCursor`).
     """
 
+    # time (in milliseconds) to wait for a lock held by other connections
+    busyTimeout = 5000
+    # size (in KiB) of the page cache of each connection
+    cacheSize = 2000
+    # size (in MiB) of the memory-mapped part of the file (0 to disable)
+    mmapSize = 0
+    # use Write-Ahead Logging, so that the readers and the writer
+    # in different processes (e.g. the GUI and the CLI) do not block
+    useWAL = False
+    # collect statistics on the executed statements (see QueryProfiler)
+    profileQueries = False
+    # time (in milliseconds) above which a statement is logged as slow
+    slowQueryTime = 500
+
     def __init__(self, dbname, logger, noOpen=False, info=True):
         """Initialize database class (column names, descriptions)
         and opens the database.
@@ -43,6 +395,11 @@ class PhysBiblioDBCore:
         """
         # structure of the tables
         self.tableFields = physbiblio.tablesDef.tableFields
+        self.tableIndexes = physbiblio.tablesDef.tableIndexes
+        self.tableForeignKeys = physbiblio.tablesDef.tableForeignKeys
+        self.fullTextTable = physbiblio.tablesDef.fullTextTable
+        self.fullTextFields = physbiblio.tablesDef.fullTextFields
+        self.fullTextUpdateCols = physbiblio.tablesDef.fullTextUpdateCols
         self.descriptions = physbiblio.tablesDef.fieldsDescriptions
         # names of the columns
         self.tableCols = {}
@@ -50,11 +407,17 @@ class PhysBiblioDBCore:
             self.tableCols[q] = [a[0] for a in self.tableFields[q]]
 
         self.dbChanged = False
+        self.hasFullText = False
         self.conn = None
-        self.curs = None
+        self.ownerThread = None
+        self.threadCurs = {}
+        self.threadCursLock = threading.Lock()
+        self.mainCurs = None
         self.onIsLocked = None
         self.dbname = dbname
         self.logger = logger
+        self.profiler = QueryProfiler(logger, slowQueryTime=self.slowQueryTime)
+        self.profiler.enabled = bool(self.profileQueries)
         db_is_new = not os.path.exists(self.dbname)
 
         if not noOpen:
@@ -66,6 +429,7 @@ class PhysBiblioDBCore:
 
         self.lastFetched = None
         self.catsHier = None
+        self.catsGraph = None
 
         self.loadSubClasses()
 
@@ -83,12 +447,125 @@ class PhysBiblioDBCore:
             self.logger.info(dbcstr.openDb % self.dbname)
         else:
             self.logger.debug(dbcstr.openDb % self.dbname)
+        self.ownerThread = threading.get_ident()
         self.conn = sqlite3.connect(self.dbname, check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row
-        self.curs = self.conn.cursor()
+        self.setupConnection(self.conn)
+        if self.useWAL:
+            self.conn.execute("PRAGMA journal_mode = WAL")
+        self.curs = self.newCursor(self.conn)
         self.loadSubClasses()
         return True
 
+    def newCursor(self, conn):
+        """Create a new cursor for the given connection,
+        which sends statistics to `self.profiler` if it is enabled
+
+        Parameters:
+            conn: the `sqlite3.Connection` object
+
+        Output:
+            the cursor
+        """
+        if self.profiler.enabled:
+            return conn.cursor(lambda c: ProfiledCursor(c, self.profiler))
+        return conn.cursor()
+
+    def setQueryProfiling(self, enabled=True, slowQueryTime=None):
+        """Enable or disable the collection of statistics
+        on the executed statements, recreating the cursors
+
+        Parameters:
+            enabled (boolean, default True): enable or disable
+                the profiler
+            slowQueryTime (default None): if not None,
+                the new threshold (in milliseconds) for the log
+                of slow statements
+        """
+        self.profiler.enabled = enabled
+        if slowQueryTime is not None:
+            self.profiler.slowQueryTime = slowQueryTime
+        if self.conn is not None:
+            self.mainCurs = self.newCursor(self.conn)
+        with self.threadCursLock:
+            for ident in self.threadCurs.keys():
+                self.threadCurs[ident] = self.newCursor(self.conn)
+
+    def setupConnection(self, conn):
+        """Configure a new connection to the database
+
+        Parameters:
+            conn: the `sqlite3.Connection` object
+        """
+        conn.row_factory = sqlite3.Row
+        # needed to fire the delete triggers when "replace" is used
+        conn.execute("PRAGMA recursive_triggers = ON")
+        conn.execute("PRAGMA busy_timeout = %d" % int(self.busyTimeout))
+        conn.execute("PRAGMA cache_size = -%d" % int(self.cacheSize))
+        conn.execute("PRAGMA mmap_size = %d" % (int(self.mmapSize) * 1024**2))
+        # needed to rename/delete the links together with the entries
+        conn.execute("PRAGMA foreign_keys = ON")
+
+    def isOwnerThread(self):
+        """Tell if the current thread is the one
+        which opened the database (or if it has not been opened yet)
+
+        Output:
+            a boolean
+        """
+        return self.ownerThread is None or threading.get_ident() == self.ownerThread
+
+    def threadCursor(self):
+        """Return the cursor for the current thread,
+        which is not the one that opened the database.
+        A new cursor on the shared connection is created the first time
+
+        Output:
+            the cursor
+        """
+        ident = threading.get_ident()
+        with self.threadCursLock:
+            if ident not in self.threadCurs:
+                self.logger.debug(dbcstr.threadNewCursor % ident)
+                self.threadCurs[ident] = self.newCursor(self.conn)
+            return self.threadCurs[ident]
+
+    def closeThreadCursors(self):
+        """Close the cursors created for the other threads.
+        To be called when the threads have finished using the database.
+        The pending changes are not committed
+
+        Output:
+            the number of closed cursors
+        """
+        with self.threadCursLock:
+            cursors = list(self.threadCurs.values())
+            self.threadCurs = {}
+        for curs in cursors:
+            try:
+                curs.close()
+            except ProgrammingError:
+                pass
+        return len(cursors)
+
+    @property
+    def curs(self):
+        """The cursor to be used in the current thread"""
+        if self.isOwnerThread():
+            return self.mainCurs
+        return self.threadCursor()
+
+    @curs.setter
+    def curs(self, value):
+        if self.isOwnerThread():
+            self.mainCurs = value
+        else:
+            with self.threadCursLock:
+                self.threadCurs[threading.get_ident()] = value
+
+    @curs.deleter
+    def curs(self):
+        self.mainCurs = None
+
     def reOpenDB(self):
         """Not defined at this stage. Present in subclass PhysBiblioDB"""
         pass
@@ -103,6 +580,11 @@ class PhysBiblioDBCore:
             self.logger.info(dbcstr.closeDb)
         else:
             self.logger.debug(dbcstr.closeDb)
+        self.closeThreadCursors()
+        try:
+            self.curs.close()
+        except (AttributeError, ProgrammingError):
+            pass
         self.conn.close()
         return True
 
@@ -171,6 +653,7 @@ class PhysBiblioDBCore:
             return False
         else:
             self.dbChanged = False
+            self.catsGraph = None
             if verbose:
                 self.logger.info(dbcstr.rollbackDb)
             return True
@@ -187,10 +670,58 @@ class PhysBiblioDBCore:
             True if successfull, False if an exception occurred
         """
         try:
-            if data:
-                self.conn.execute(query, data)
+            self.profiler.run(
+                self.conn, self.conn.execute, query, data if data else None
+            )
+        except OperationalError as err:
+            if str(err) == "database is locked":
+                if not self.sendDBIsLocked():
+                    self.logger.error(dbcstr.opErDbOpen % query)
             else:
-                self.conn.execute(query)
+                self.logger.exception(dbcstr.errorConnection % (err, query))
+            return False
+        except IntegrityError as err:
+            self.logger.exception(dbcstr.errorInsUpd % (err, query))
+            return False
+        except (ProgrammingError, DatabaseError, InterfaceError) as err:
+            self.logger.exception(dbcstr.errorConnection % (err, query))
+            return False
+        else:
+            self.dbChanged = True
+            return True
+
+    def connExecMany(self, query, data, atomic=False):
+        """Execute connection, repeating the query
+        for each element of the given sequence of parameters.
+
+        Parameters:
+            query (string): the query to be executed
+            data (iterable): a sequence of dictionaries or lists,
+                each one containing the values of the parameters in the query
+            atomic (boolean, default False): if True, run the query
+                inside a savepoint, so that either all the rows
+                or none of them are processed.
+                The changes are not committed
+
+        Output:
+            True if successfull, False if an exception occurred
+        """
+        try:
+            if atomic:
+                if not self.conn.in_transaction:
+                    self.conn.execute("BEGIN")
+                self.conn.execute("SAVEPOINT connExecMany")
+            try:
+                self.profiler.run(
+                    self.conn, self.conn.executemany, query, data, many=True
+                )
+            except Exception:
+                if atomic:
+                    self.conn.execute("ROLLBACK TO connExecMany")
+                    self.conn.execute("RELEASE connExecMany")
+                raise
+            if atomic:
+                self.conn.execute("RELEASE connExecMany")
         except OperationalError as err:
             if str(err) == "database is locked":
                 if not self.sendDBIsLocked():
@@ -264,13 +795,19 @@ class PhysBiblioDBCore:
         tables = [name[0] for name in self.curs]
         return not all(t in tables for t in wantedTables)
 
-    def createTable(self, q, fields, critical=False):
+    def createTable(self, q, fields, critical=False, foreignKeys=None):
         """Create the table 'q'
 
         Parameters:
             q: the table name
             fieldsDict: the list containing the column information
                 for the table
+            critical (default False): exit if the creation fails
+            foreignKeys (default None): a list of
+                [column, referenced table, referenced column]
+                (see physbiblio.tablesDef.tableForeignKeys).
+                The rows are updated or deleted
+                together with the referenced ones
         """
         command = "CREATE TABLE %s (\n" % q
         first = True
@@ -280,6 +817,12 @@ class PhysBiblioDBCore:
             else:
                 command += ",\n"
             command += " ".join(el)
+        if foreignKeys is not None:
+            for col, table, ref in foreignKeys:
+                command += (
+                    ",\nFOREIGN KEY (%s) REFERENCES %s (%s) " % (col, table, ref)
+                    + "ON UPDATE CASCADE ON DELETE CASCADE"
+                )
         command += ");"
         self.logger.info(command + "\n")
         if not self.connExec(command):
@@ -305,7 +848,7 @@ class PhysBiblioDBCore:
         for q in fieldsDict.keys():
             if q in existingTables:
                 continue
-            self.createTable(q, fieldsDict[q])
+            self.createTable(q, fieldsDict[q], foreignKeys=self.tableForeignKeys.get(q))
         self.cursExec("select * from categories where idCat = 0 or idCat = 1\n")
         cats = self.curs.fetchall()
         if len(cats) < 2:
@@ -321,6 +864,56 @@ class PhysBiblioDBCore:
             if not self.connExec(command):
                 self.logger.error(dbcstr.errorInsMainCats)
         self.commit()
+        self.createIndexes(
+            {k: v for k, v in self.tableIndexes.items() if v[0] in fieldsDict}
+        )
+
+    def createIndexes(self, indexesDict=None):
+        """Create the indexes on the tables of the database,
+        if they are missing.
+        Before creating a unique index, the duplicated rows
+        (the ones with higher rowid) are removed from the table.
+
+        Parameters:
+            indexesDict (default None):
+                the structure of the indexes (see physbiblio.tablesDef)
+
+        Output:
+            True if successfull, False if some index could not be created
+        """
+        if indexesDict is None:
+            indexesDict = self.tableIndexes
+        self.cursExec("SELECT name FROM sqlite_master WHERE type='index';")
+        existingIndexes = [name[0] for name in self.curs]
+        changed = False
+        for name, (table, cols, unique) in indexesDict.items():
+            if name in existingIndexes:
+                continue
+            columns = ", ".join(cols)
+            if unique:
+                self.logger.info(dbcstr.removeDuplicates % (table, columns))
+                if not self.connExec(
+                    "DELETE FROM %s WHERE rowid NOT IN " % table
+                    + "(SELECT min(rowid) FROM %s GROUP BY %s);" % (table, columns)
+                ):
+                    self.logger.error(dbcstr.errorCreateIndex % name)
+                    self.undo()
+                    return False
+            command = "CREATE %sINDEX IF NOT EXISTS %s ON %s (%s);" % (
+                "UNIQUE " if unique else "",
+                name,
+                table,
+                columns,
+            )
+            self.logger.info(command + "\n")
+            if not self.connExec(command):
+                self.logger.error(dbcstr.errorCreateIndex % name)
+                self.undo()
+                return False
+            changed = True
+        if changed:
+            self.commit()
+        return True
 
     def checkDatabaseUpdates(self):
         """Run when new columns are added to the database with respect
@@ -337,6 +930,89 @@ class PhysBiblioDBCore:
                 self.logger.error(dbcstr.errorAlterEntries)
                 self.undo()
 
+    def fileSize(self):
+        """Compute the size of the database content
+
+        Output:
+            the size in bytes (number of pages times the page size)
+        """
+        self.cursExec("PRAGMA page_count")
+        pages = self.curs.fetchall()[0][0]
+        self.cursExec("PRAGMA page_size")
+        return pages * self.curs.fetchall()[0][0]
+
+    def maintain(self, full=False, pbMax=None, pbVal=None):
+        """Maintain the database file: check its integrity,
+        update the statistics used by the query planner (ANALYZE)
+        and release the unused pages (VACUUM).
+        The incremental VACUUM only releases the free pages,
+        but it requires a full VACUUM the first time,
+        to enable the incremental mode of the database.
+        The uncommitted changes are committed before starting
+
+        Parameters:
+            full (default False): rebuild the whole database file
+                instead of running the incremental VACUUM
+            pbMax (callable, optional): a function to set the maximum
+                of a progress bar in the GUI, if possible
+            pbVal (callable, optional): a function to set the value
+                of a progress bar in the GUI, if possible
+
+        Output:
+            a dictionary with the output of the integrity check
+            ("integrity", ["ok"] if no problems were found),
+            the size in bytes before and after ("sizeBefore", "sizeAfter")
+            and if the file was fully rebuilt ("fullVacuum"),
+            or None if some step failed
+        """
+        self.cursExec("PRAGMA auto_vacuum")
+        full = full or self.curs.fetchall()[0][0] != 2
+        steps = [
+            [dbcstr.maintainIntegrity, ["PRAGMA integrity_check"]],
+            [dbcstr.maintainAnalyze, ["ANALYZE"]],
+            (
+                [dbcstr.maintainVacuum, ["PRAGMA auto_vacuum = INCREMENTAL", "VACUUM"]]
+                if full
+                else [dbcstr.maintainIncrVacuum, ["PRAGMA incremental_vacuum"]]
+            ),
+        ]
+        try:
+            pbMax(len(steps))
+        except TypeError:
+            pass
+        self.commit(verbose=False)
+        result = {"fullVacuum": full, "sizeBefore": self.fileSize()}
+        for ix, (name, commands) in enumerate(steps):
+            self.logger.info(dbcstr.maintainStep % (ix + 1, len(steps), name))
+            try:
+                pbVal(ix)
+            except TypeError:
+                pass
+            for command in commands:
+                if not self.cursExec(command):
+                    self.logger.error(dbcstr.maintainFailed)
+                    self.undo(verbose=False)
+                    return None
+                # "incremental_vacuum" releases one page for each fetched row
+                rows = self.curs.fetchall()
+            if ix == 0:
+                result["integrity"] = [r[0] for r in rows]
+                if result["integrity"] != ["ok"]:
+                    self.logger.warning(
+                        dbcstr.maintainIntegrityErr % "\n".join(result["integrity"])
+                    )
+            self.commit(verbose=False)
+        try:
+            pbVal(len(steps))
+        except TypeError:
+            pass
+        result["sizeAfter"] = self.fileSize()
+        self.logger.info(
+            dbcstr.maintainSize
+            % (result["sizeBefore"] / 1024.0**2, result["sizeAfter"] / 1024.0**2)
+        )
+        return result
+
 
 class PhysBiblioDBSub:
     """Uses PhysBiblioDB instance 'self.mainDB = parent'
@@ -345,6 +1021,8 @@ class PhysBiblioDBSub:
     starting from this one.
     """
 
+    selectInChunkSize = 500
+
     def __init__(self, parent):
         """Initialize DB class, connecting to
         the main PhysBiblioDB instance (parent).
@@ -354,13 +1032,43 @@ class PhysBiblioDBSub:
         self.tableFields = self.mainDB.tableFields
         self.tableCols = self.mainDB.tableCols
 
-        self.conn = self.mainDB.conn
-        self.curs = self.mainDB.curs
+        self.connOverride = None
+        self.cursOverride = None
         self.dbname = self.mainDB.dbname
 
         self.lastFetched = None
         self.catsHier = None
 
+    @property
+    def conn(self):
+        """The connection of the main PhysBiblioDB for the current thread"""
+        if self.connOverride is not None:
+            return self.connOverride
+        return self.mainDB.conn
+
+    @conn.setter
+    def conn(self, value):
+        self.connOverride = None if value is self.mainDB.conn else value
+
+    @conn.deleter
+    def conn(self):
+        self.connOverride = None
+
+    @property
+    def curs(self):
+        """The cursor of the main PhysBiblioDB for the current thread"""
+        if self.cursOverride is not None:
+            return self.cursOverride
+        return self.mainDB.curs
+
+    @curs.setter
+    def curs(self, value):
+        self.cursOverride = None if value is self.mainDB.curs else value
+
+    @curs.deleter
+    def curs(self):
+        self.cursOverride = None
+
     def sendDBIsLocked(self):
         """Call corresponding PhysBiblioDBCore function"""
         return self.mainDB.sendDBIsLocked()
@@ -397,6 +1105,12 @@ class PhysBiblioDBSub:
         """Execute connection (see PhysBiblioDB.connExec)"""
         return self.mainDB.connExec(query, data=data)
 
+    def connExecMany(self, query, data, atomic=False):
+        """Execute connection on many parameters
+        (see PhysBiblioDB.connExecMany)
+        """
+        return self.mainDB.connExecMany(query, data, atomic=atomic)
+
     def cursExec(self, query, data=None):
         """Execute cursor (see PhysBiblioDB.cursExec)"""
         return self.mainDB.cursExec(query, data=data)
@@ -404,3 +1118,83 @@ class PhysBiblioDBSub:
     def cursor(self):
         """Return the cursor"""
         return self.mainDB.cursor()
+
+    def selectIn(self, query, values, chunkSize=None):
+        """Execute a select query containing a condition like
+        `field in (%s)` for a long list of values.
+        The values are split in chunks, so that the number of variables
+        in each query remains below the limits of SQLite
+
+        Parameters:
+            query (string): the query to be executed. It must contain
+                a single "%s", which will be replaced by the placeholders
+            values (iterable): the values to be used in the condition
+            chunkSize (default None): the maximum number of values
+                in each query. If None, use `self.selectInChunkSize`
+
+        Output:
+            the list of all the fetched rows
+        """
+        if chunkSize is None:
+            chunkSize = self.selectInChunkSize
+        values = list(values)
+        rows = []
+        for i in range(0, len(values), chunkSize):
+            chunk = values[i : i + chunkSize]
+            if self.cursExec(query % ", ".join(["?"] * len(chunk)), chunk):
+                rows += self.curs.fetchall()
+        return rows
+
+    def selectInGrouped(self, query, values, field, chunkSize=None):
+        """Use `self.selectIn` and group the fetched rows
+        according to the content of one of their fields
+
+        Parameters:
+            query, values, chunkSize: see `self.selectIn`
+            field: the name of the column used to group the rows
+
+        Output:
+            a dictionary with the lists of rows, where the keys are
+            the requested values. All the requested values
+            are in the dictionary, possibly with an empty list.
+            The strings are compared case-insensitively,
+            as the bibtex keys in the database
+        """
+        values = list(values)
+        grouped = {v: [] for v in values}
+        sameKeys = {}
+        for v in grouped:
+            sameKeys.setdefault(v.lower() if isinstance(v, str) else v, []).append(v)
+        for r in self.selectIn(query, values, chunkSize=chunkSize):
+            v = r[field]
+            for k in sameKeys.get(v.lower() if isinstance(v, str) else v, [v]):
+                grouped.setdefault(k, []).append(r)
+        return grouped
+
+    def replaceQuery(self, table, fields):
+        """Build the query that inserts a row in a table
+        or replaces all the fields of the existing one
+        with the same primary key (the first column of the table).
+        Differently from "replace into", the existing row
+        is updated instead of being deleted and inserted again,
+        so that the rows which reference it with a foreign key
+        are not deleted
+
+        Parameters:
+            table: the name of the table
+            fields: the list of the fields which have a value
+                in the query data (the other ones get their default)
+
+        Output:
+            the query string
+        """
+        key = self.tableCols[table][0]
+        return (
+            "insert into %s (%s) values (:%s)\n"
+            % (table, ", ".join(fields), ", :".join(fields))
+            + "on conflict(%s) do update set " % key
+            + ", ".join(
+                ["%s=excluded.%s" % (c, c) for c in self.tableCols[table] if c != key]
+            )
+            + "\n"
+        )
@@ -98,14 +98,94 @@ class PBExport:
         else:
             pBLogger.info(exstr.noLastSel)
 
-    def exportAll(self, fileName):
+    def exportAll(self, fileName, since=None):
         """Export all the entries in the database into a .bib file.
 
         Parameters:
             fileName: the name of the output bibtex file
+            since (int, default None): if not None and the file exists,
+                only update the entries changed after the given
+                sequence number of the journal (see `self.exportChanges`)
+
+        Output:
+            the sequence number of the last change included
+            in the file (to be used as `since` in the next export),
+            or None if errors occurred
         """
+        if since is not None and os.path.isfile(fileName):
+            return self.exportChanges(fileName, since)
+        lastSeq = pBDB.changes.lastSeq()
         pBDB.bibs.fetchAll(saveQuery=False, doFetch=False)
-        self.exportRows(fileName, pBDB.bibs.fetchCursor())
+        if not self.exportRows(fileName, pBDB.bibs.fetchCursor()):
+            return None
+        pBLogger.info(exstr.lastSeqExported % lastSeq)
+        return lastSeq
+
+    def exportChanges(self, fileName, since):
+        """Update a .bib file created by `self.exportAll`
+        using the journal of the changes in the database
+        (see `physbiblio.database.ChangeJournal`):
+        the entries changed after the given sequence number
+        are replaced or added, the deleted ones are removed
+        and the other ones are not read from the database.
+
+        Parameters:
+            fileName: the name of the bibtex file
+            since (int): the sequence number of the last change
+                included in the file (see `ChangeJournal.lastSeq`)
+
+        Output:
+            the sequence number of the last change included
+            in the updated file (to be used as `since` in the next export),
+            or None if errors occurred
+        """
+        lastSeq = pBDB.changes.lastSeq()
+        changed, deleted = pBDB.changes.getChangedBibkeys(since)
+        if changed == [] and deleted == []:
+            pBLogger.info(exstr.noChanges)
+            pBLogger.info(exstr.lastSeqExported % lastSeq)
+            return lastSeq
+        self.backupCopy(fileName)
+        bibfile = ""
+        try:
+            with open(fileName) as r:
+                bibfile += r.read()
+        except IOError:
+            pBLogger.exception(exstr.cannotWrite)
+            return None
+        try:
+            biblist = bibtexparser.bparser.BibTexParser(common_strings=True).parse(
+                bibfile
+            )
+        except IndexError:
+            pBLogger.exception(exstr.errorLoading)
+            return None
+        new = {}
+        if changed != []:
+            for e in pBDB.bibs.getByBibkey(changed, saveQuery=False):
+                new[e["bibkey"].lower()] = e["bibtexDict"]
+        deleted = [k.lower() for k in deleted]
+        db = bibtexparser.bibdatabase.BibDatabase()
+        db.entries = []
+        for b in biblist.entries:
+            key = b["ID"].lower()
+            if key in new:
+                db.entries.append(new.pop(key))
+            elif key not in deleted:
+                db.entries.append(b)
+        db.entries += list(new.values())
+        txt = pbWriter.write(db).strip()
+        try:
+            with codecs.open(fileName, "w", "utf-8") as outfile:
+                outfile.write(txt)
+        except Exception:
+            pBLogger.exception(exstr.errorExport)
+            self.restoreBackupCopy(fileName)
+            return None
+        pBLogger.info(exstr.changesExported % (len(changed), len(deleted)))
+        pBLogger.info(exstr.lastSeqExported % lastSeq)
+        self.rmBackupCopy(fileName)
+        return lastSeq
 
     def exportSelected(self, fileName, rows):
         """An alias for exportRows"""
@@ -117,8 +197,12 @@ class PBExport:
         Parameters:
             fileName: the name of the output bibtex file
             rows: the list of entries to be exported
+
+        Output:
+            False if errors occurred, True otherwise
         """
         self.backupCopy(fileName)
+        success = True
         if rows != []:
             try:
                 with codecs.open(fileName, "w", "utf-8") as bibfile:
@@ -127,9 +211,11 @@ class PBExport:
             except Exception:
                 pBLogger.exception(exstr.errorExport, traceback)
                 self.restoreBackupCopy(fileName)
+                success = False
         else:
             pBLogger.info(exstr.noElement)
         self.rmBackupCopy(fileName)
+        return success
 
     def exportForTexFile(
         self,
@@ -296,10 +382,10 @@ class PBExport:
                 pBLogger.exception(exstr.cannotWrite)
                 return False
 
-        # read previous content of output file, if any
+        # check that the output file exists and can be read
         try:
-            with open(outFileName, "r") as f:
-                existingBibText = f.readlines()
+            with open(outFileName, "r"):
+                existingBib = True
         except IOError:
             pBLogger.error(exstr.cannotRead % outFileName)
             try:
@@ -307,15 +393,18 @@ class PBExport:
             except IOError:
                 pBLogger.exception(exstr.cannotCreate % outFileName)
                 return False
-            existingBibText = ""
+            existingBib = False
 
         # this is time consuming if there are many entries.
         # Do not load it every time for multiple texs!
+        # The file is parsed while it is read, see `Entries.iterBibtexs`
         if newOperation:
             self.allCitations = set([])
-            if existingBibText != "":
-                self.existingBibsList = pBDB.bibs.parseAllBibtexs(
-                    existingBibText, verbose=False
+            if existingBib:
+                self.existingBibsList = list(
+                    pBDB.bibs.iterBibtexs(
+                        pBDB.bibs.readBibtexFile(outFileName), verbose=False
+                    )
                 )
             else:
                 self.existingBibsList = []
@@ -526,7 +615,7 @@ class PBExport:
             len(self.allCitations),
         )
 
-    def updateExportedBib(self, fileName, overwrite=False):
+    def updateExportedBib(self, fileName, overwrite=False, since=None):
         """Reads a bibtex file and updates the entries that it contains,
         for example if the entry has been published.
 
@@ -535,6 +624,9 @@ class PBExport:
             overwrite (boolean, default False): if True,
                 the previous version of the file is replaced
                 and no backup copy is created
+            since (int, default None): if not None, only update
+                the entries changed after the given sequence number
+                of the journal (see `physbiblio.database.ChangeJournal`)
 
         Output:
             True if successful, False if errors occurred
@@ -556,8 +648,13 @@ class PBExport:
             return False
         db = bibtexparser.bibdatabase.BibDatabase()
         db.entries = []
+        if since is not None:
+            changed = [k.lower() for k in pBDB.changes.getChangedBibkeys(since)[0]]
         for b in biblist.entries:
             key = b["ID"]
+            if since is not None and key.lower() not in changed:
+                db.entries.append(b)
+                continue
             element = pBDB.bibs.getByBibkey(key, saveQuery=False)
             if len(element) > 0:
                 db.entries.append(element[0]["bibtexDict"])
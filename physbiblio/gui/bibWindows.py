@@ -15,7 +15,7 @@ import six
 from matplotlib.backends.backend_agg import FigureCanvasAgg
 from pylatexenc.latex2text import LatexNodes2Text
 from pyparsing import ParseException
-from PySide2.QtCore import QEvent, Qt, QUrl
+from PySide2.QtCore import QEvent, QModelIndex, QSortFilterProxyModel, Qt, QUrl
 from PySide2.QtGui import QCursor, QFont, QIcon, QImage, QTextDocument
 from PySide2.QtWidgets import (
     QAction,
@@ -43,7 +43,7 @@ os.environ["QT_API"] = "pyside2"
 try:
     import physbiblio.gui.resourcesPyside2
     from physbiblio.config import pbConfig
-    from physbiblio.database import pBDB
+    from physbiblio.database import pBDB, shortAuthors
     from physbiblio.errors import pBLogger
     from physbiblio.gui.basicDialogs import (
         askDirName,
@@ -238,7 +238,7 @@ def editBibtex(parentObject, editKey=None):
                     exc_info=True,
                 )
                 tmpBibDict = {}
-            data["bibdict"] = "%s" % tmpBibDict
+            data["bibdict"] = pBDB.bibs.dumpBibdict(tmpBibDict)
             # if some fields are empty, use bibtex info:
             if data["arxiv"] == "":
                 if "arxiv" in tmpBibDict.keys() and tmpBibDict["arxiv"] != "":
@@ -511,6 +511,8 @@ class BibTableModel(PBTableModel):
         askBibs=False,
         previous=[],
         mainWin=None,
+        query=None,
+        defaultSort=(None, "ASC"),
         *args
     ):
         """Constructor of the model, defines some properties
@@ -518,7 +520,8 @@ class BibTableModel(PBTableModel):
 
         Parameters:
             parent: the parent widget
-            bib_list: the list of bibtex entries in the model
+            bib_list: the list of bibtex entries in the model.
+                If None and `query` is given, the model works in lazy mode
             header: the names of the columns to be used
             stdCols (default []): the list of standard columns
                 (the ones that are also fields in the database table)
@@ -529,11 +532,36 @@ class BibTableModel(PBTableModel):
                 enable the checkboxes for selection
             previous (default []): the list of initially selected items
             mainWin: None (default) or a MainWindow instance
+            query (default None): a tuple with a query string
+                and its values (see `Entries.getQueryPage`).
+                In lazy mode, the entries are loaded from the database
+                in pages of `bibListPageSize` rows when needed,
+                and sorting and filtering are performed in SQL
+            defaultSort (default (None, "ASC")): the field and direction
+                used in lazy mode when the entries are not sorted
+                according to one of the columns.
+                It should match the ordering of the query:
+                if the field is valid, the pages are loaded with
+                keyset pagination (see `Entries.getQueryPageAfter`),
+                otherwise with offsets in the original query order
         """
         self.mainWin = mainWin
         self.latexToText = LatexNodes2Text(keep_inline_math=False, keep_comments=False)
         self.typeClass = "Bibs"
-        self.dataList = bib_list
+        self.renderCache = {}
+        self.lazy = bib_list is None and query is not None
+        self.query, self.queryVals = query if self.lazy else (None, ())
+        self.filterText = ""
+        self.sortField = None
+        self.sortType = "ASC"
+        self.defaultSort = defaultSort
+        self.pageToken = None
+        self.totalRows = 0
+        if self.lazy:
+            self.dataList = []
+            self.totalRows = pBDB.bibs.countQueryPage(self.query, self.queryVals)
+        else:
+            self.dataList = bib_list
         PBTableModel.__init__(
             self, parent, header + ["bibtex"], askBibs, previous, *args
         )
@@ -542,6 +570,132 @@ class BibTableModel(PBTableModel):
         self.lenStdCols = len(stdCols)
         self.prepareSelected()
 
+    def prepareSelected(self):
+        """Fill the dictionary `self.selectedElements`
+        according to previous selection.
+        In lazy mode, use the keys of all the entries matched by the query,
+        not only the ones which have already been loaded
+        """
+        if not self.lazy:
+            return PBTableModel.prepareSelected(self)
+        self.layoutAboutToBeChanged.emit()
+        self.selectedElements = {}
+        for key in pBDB.bibs.getQueryKeys(self.query, self.queryVals):
+            self.selectedElements[key] = key in self.previous
+        self.layoutChanged.emit()
+
+    def canFetchMore(self, parent=QModelIndex()):
+        """Tell if there are rows that have not been loaded yet
+
+        Parameter:
+            parent: the parent `QModelIndex` (unused)
+
+        Output:
+            True if the model is in lazy mode and not all the rows
+            have been loaded, False otherwise
+        """
+        return self.lazy and len(self.dataList) < self.totalRows
+
+    def fetchMore(self, parent=QModelIndex()):
+        """Load the next page of entries from the database
+
+        Parameter:
+            parent: the parent `QModelIndex` (unused)
+        """
+        if not self.canFetchMore(parent):
+            return
+        start = len(self.dataList)
+        pageSize = pbConfig.params["bibListPageSize"]
+        if pageSize <= 0:
+            pageSize = self.totalRows - start
+        orderBy, orderType = self.currentSort()
+        if pBDB.bibs.pageSortExpression(orderBy) is not None:
+            newRows, token = pBDB.bibs.getQueryPageAfter(
+                self.query,
+                self.queryVals,
+                filterText=self.filterText,
+                orderBy=orderBy,
+                orderType=orderType,
+                limitTo=min(pageSize, self.totalRows - start),
+                after=self.pageToken,
+            )
+        else:
+            newRows = pBDB.bibs.getQueryPage(
+                self.query,
+                self.queryVals,
+                filterText=self.filterText,
+                orderBy=orderBy,
+                orderType=orderType,
+                limitTo=min(pageSize, self.totalRows - start),
+                limitOffset=start,
+            )
+            token = None
+        if len(newRows) == 0:
+            self.totalRows = start
+            return
+        self.pageToken = token
+        self.beginInsertRows(QModelIndex(), start, start + len(newRows) - 1)
+        self.dataList += newRows
+        for bib in newRows:
+            self.selectedElements.setdefault(bib["bibkey"], False)
+        self.endInsertRows()
+
+    def reloadPages(self):
+        """Discard the loaded rows and count again the entries
+        matched by the query, using the current filter.
+        The view will then require the first page using `fetchMore`
+        """
+        self.beginResetModel()
+        self.dataList = []
+        self.pageToken = None
+        self.totalRows = pBDB.bibs.countQueryPage(
+            self.query, self.queryVals, filterText=self.filterText
+        )
+        self.endResetModel()
+
+    def currentSort(self):
+        """Get the field and direction used to sort the entries in lazy mode:
+        the ones of the sorted column, if it can be sorted in SQL,
+        or `self.defaultSort`
+
+        Output:
+            a tuple (field, orderType)
+        """
+        if pBDB.bibs.pageSortExpression(self.sortField) is not None:
+            return self.sortField, self.sortType
+        return self.defaultSort
+
+    def setFilterText(self, text):
+        """In lazy mode, filter the entries in the SQL query
+        and reload the table content
+
+        Parameter:
+            text: the string to be matched
+        """
+        if not self.lazy or text == self.filterText:
+            return
+        self.filterText = text
+        self.reloadPages()
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """In lazy mode, sort the entries in the SQL query
+        and reload the table content.
+        Columns which cannot be sorted in SQL keep the query order
+
+        Parameters:
+            column: the index of the column used for sorting
+            order: `Qt.AscendingOrder` or `Qt.DescendingOrder`
+        """
+        if not self.lazy:
+            return
+        field = self.header[column] if 0 <= column < len(self.header) else None
+        sortType = "DESC" if order == Qt.DescendingOrder else "ASC"
+        if field == self.sortField and sortType == self.sortType:
+            return
+        self.sortField = field
+        self.sortType = sortType
+        self.reloadPages()
+
     def getIdentifier(self, element):
         """Get the bibkey that uniquely identifies an element
 
@@ -635,6 +789,58 @@ class BibTableModel(PBTableModel):
         else:
             return False, ""
 
+    def renderCell(self, rowData, colName):
+        """Compute the content of a cell,
+        which is then stored in `self.renderCache`
+
+        Parameters:
+            rowData: the database record of the entry
+            colName: the name of the column
+
+        Output:
+            a tuple, containing:
+                True or False, if the content is an image or not,
+                the cell content
+        """
+        hasImg = False
+        if colName == "marks":
+            try:
+                hasImg, value = self.addMarksCell(rowData["marks"])
+            except KeyError:
+                pBLogger.debug(bwstr.missMarks % rowData.keys())
+                hasImg, value = self.addMarksCell("")
+        elif colName == "Type":
+            value = self.addTypeCell(rowData)
+        elif colName == "PDF":
+            hasImg, value = self.addPDFCell(rowData["bibkey"])
+        else:
+            try:
+                value = rowData[colName]
+                if colName in ["title", "author"]:
+                    stored = rowData.get(colName + "Text")
+                    if stored is None:
+                        value = self.latexToText.latex_to_text(value)
+                    elif colName == "author":
+                        value = shortAuthors(stored)
+                    else:
+                        value = stored
+            except KeyError:
+                value = ""
+        return hasImg, value
+
+    def invalidateCache(self, bibkey=None):
+        """Remove the cached content of the cells of an entry,
+        so that it is computed again when needed
+
+        Parameter:
+            bibkey (default None): the key of the entry.
+                If None, empty the whole cache
+        """
+        if bibkey is None:
+            self.renderCache = {}
+        else:
+            self.renderCache.pop(bibkey, None)
+
     def data(self, index, role):
         """Return the cell data for the given index and role
 
@@ -661,23 +867,24 @@ class BibTableModel(PBTableModel):
         except IndexError:
             pBGUILogger.exception(bwstr.btmdInvalid % "column")
             return None
-        if colName == "marks":
-            try:
-                hasImg, value = self.addMarksCell(rowData["marks"])
-            except KeyError:
-                pBLogger.debug(bwstr.missMarks % rowData.keys())
-                hasImg, value = self.addMarksCell("")
-        elif colName == "Type":
-            value = self.addTypeCell(rowData)
-        elif colName == "PDF":
-            hasImg, value = self.addPDFCell(rowData["bibkey"])
-        else:
+        if role not in (
+            Qt.CheckStateRole,
+            Qt.EditRole,
+            Qt.DecorationRole,
+            Qt.DisplayRole,
+        ):
+            return None
+        try:
+            hasImg, value = self.renderCache[rowData["bibkey"]][colName]
+        except KeyError:
+            hasImg, value = self.renderCell(rowData, colName)
             try:
-                value = rowData[colName]
-                if colName in ["title", "author"]:
-                    value = self.latexToText.latex_to_text(value)
+                self.renderCache.setdefault(rowData["bibkey"], {})[colName] = (
+                    hasImg,
+                    value,
+                )
             except KeyError:
-                value = ""
+                pass
 
         if role == Qt.CheckStateRole and self.ask and column == 0:
             if self.selectedElements[rowData["bibkey"]] == True:
@@ -711,11 +918,74 @@ class BibTableModel(PBTableModel):
                 self.selectedElements[self.dataList[index.row()]["bibkey"]] = True
             else:
                 self.selectedElements[self.dataList[index.row()]["bibkey"]] = False
+        self.invalidateCache(self.dataList[index.row()]["bibkey"])
 
         self.dataChanged.emit(index, index)
         return True
 
 
+class BibSortFilterProxyModel(QSortFilterProxyModel):
+    """Extension of `QSortFilterProxyModel` which, when the source
+    `BibTableModel` works in lazy mode, lets the source model
+    sort and filter the entries in the SQL query
+    """
+
+    def __init__(self, parent=None):
+        """Call `QSortFilterProxyModel.__init__` and
+        initialize the sort properties used in lazy mode
+
+        Parameter:
+            parent: the parent widget
+        """
+        QSortFilterProxyModel.__init__(self, parent)
+        self.lazySortColumn = -1
+        self.lazySortOrder = Qt.AscendingOrder
+
+    def isLazy(self):
+        """Tell if the source model works in lazy mode"""
+        try:
+            return self.sourceModel().lazy
+        except AttributeError:
+            return False
+
+    def setFilterRegExp(self, string):
+        """Set the filter string, or pass it to the lazy source model
+
+        Parameter:
+            string: the filter string to be matched
+        """
+        if self.isLazy():
+            self.sourceModel().setFilterText(str(string))
+        else:
+            QSortFilterProxyModel.setFilterRegExp(self, string)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """Sort the rows, or let the lazy source model do it
+
+        Parameters:
+            column: the index of the column used for sorting
+            order: `Qt.AscendingOrder` or `Qt.DescendingOrder`
+        """
+        if self.isLazy():
+            self.lazySortColumn = column
+            self.lazySortOrder = order
+            self.sourceModel().sort(column, order)
+        else:
+            QSortFilterProxyModel.sort(self, column, order)
+
+    def sortColumn(self):
+        """Return the index of the column currently used for sorting"""
+        if self.isLazy():
+            return self.lazySortColumn
+        return QSortFilterProxyModel.sortColumn(self)
+
+    def sortOrder(self):
+        """Return the current sort order"""
+        if self.isLazy():
+            return self.lazySortOrder
+        return QSortFilterProxyModel.sortOrder(self)
+
+
 class CommonBibActions:
     """Class that contains actions and menu functions
     in use inside of other bibWindows classes
@@ -1268,6 +1538,15 @@ class CommonBibActions:
             else:
                 outcome = pBPDF.copyNewFile(bibkey, newPdf, ftype)
             if outcome:
+                try:
+                    self.parent().currentTabWidget().tableModel.invalidateCache(
+                        bibkey
+                    )
+                except AttributeError:
+                    pBLogger.debug(
+                        bwstr.noAttribute % ("parent", "currentTabWidget"),
+                        exc_info=True,
+                    )
                 infoMessage(bwstr.Acts.pdfAddS)
             else:
                 pBGUILogger.error(bwstr.Acts.pdfAddF)
@@ -1506,6 +1785,10 @@ class CommonBibActions:
         """Open a `MergeBibtexs` window to configure the merging,
         then perform the requested changes, merge the entries and
         delete the previous ones
+
+        Output:
+            the bibtex key of the merged entry,
+            or None if the entries have not been merged
         """
         mergewin = MergeBibtexs(self.bibs[0], self.bibs[1], self.parent())
         mergewin.exec_()
@@ -1545,9 +1828,18 @@ class CommonBibActions:
             data = pBDB.bibs.prepareInsert(**data)
             if data["bibkey"].strip() != "" and data["bibtex"].strip() != "":
                 correct = False
+                oldkeys = [self.bibs[0]["bibkey"], self.bibs[1]["bibkey"]]
+                # the links are removed together with the old entries,
+                # store them before deleting
+                links = {}
+                for oldkey in oldkeys:
+                    links[oldkey] = (
+                        [e["idCat"] for e in pBDB.cats.getByEntry(oldkey)],
+                        [e["idExp"] for e in pBDB.exps.getByEntry(oldkey)],
+                    )
                 pBDB.commit()
                 try:
-                    for key in [self.bibs[0]["bibkey"], self.bibs[1]["bibkey"]]:
+                    for key in oldkeys:
                         pBDB.bibs.delete(key)
                 except:
                     pBGUILogger.exception(bwstr.Acts.cantDelOld)
@@ -1566,14 +1858,14 @@ class CommonBibActions:
                         except:
                             pBLogger.warning(bwstr.Acts.reloadFail)
                 if correct:
-                    for oldkey in [self.bibs[0]["bibkey"], self.bibs[1]["bibkey"]]:
-                        for e in pBDB.cats.getByEntry(oldkey):
-                            pBDB.catBib.insert(e["idCat"], data["bibkey"])
-                            pBDB.catBib.delete(e["idCat"], oldkey)
-                        for e in pBDB.exps.getByEntry(oldkey):
-                            pBDB.bibExp.insert(data["bibkey"], e["idExp"])
-                            pBDB.bibExp.delete(oldkey, e["idExp"])
+                    for oldkey in oldkeys:
+                        idCats, idExps = links[oldkey]
+                        for idCat in idCats:
+                            pBDB.catBib.insert(idCat, data["bibkey"])
+                        for idExp in idExps:
+                            pBDB.bibExp.insert(data["bibkey"], idExp)
                         pBPDF.mergePDFFolders(oldkey, data["bibkey"])
+                    return data["bibkey"]
             else:
                 pBGUILogger.error(bwstr.Acts.emptyKeyBib)
         else:
@@ -1641,6 +1933,8 @@ class CommonBibActions:
 class BibtexListWindow(QFrame, ObjListWindow):
     """Class that constructs the main bibtex table"""
 
+    proxyModelClass = BibSortFilterProxyModel
+
     def __init__(self, parent=None, bibs=None, askBibs=False, previous=[]):
         """Define some properties and create the table
 
@@ -1846,8 +2140,11 @@ class BibtexListWindow(QFrame, ObjListWindow):
     def restoreSort(self):
         """Re-establish current sort status for the table:
         first use the default (ascending on column 0),
-        then apply last settings
+        then apply last settings.
+        Nothing to do in lazy mode, where sorting is performed in SQL
         """
+        if self.tableModel.lazy:
+            return
         ccol = self.proxyModel.sortColumn()
         cord = self.proxyModel.sortOrder()
         self.proxyModel.sort(self.columns.index("bibkey"), Qt.AscendingOrder)
@@ -1897,13 +2194,21 @@ class BibtexListWindow(QFrame, ObjListWindow):
         """Create the table model, the toolbar for the selection,
         the filter input box, set some properties.
         Retrieve the list of bibtex entries from the database
-        if not already given.
+        if not already given: if `bibListPageSize` is positive,
+        the entries are loaded lazily by the table model.
         """
+        lazyQuery = None
         if self.bibs is None:
-            self.bibs = pBDB.bibs.getAll(
-                orderType="DESC", limitTo=pbConfig.params["defaultLimitBibtexs"]
-            )
-        rowcnt = len(self.bibs)
+            if pbConfig.params["bibListPageSize"] > 0:
+                lazyQuery = pBDB.bibs.prepareFetchAll(
+                    orderType="DESC",
+                    limitTo=pbConfig.params["defaultLimitBibtexs"],
+                    saveQuery=True,
+                )
+            else:
+                self.bibs = pBDB.bibs.getAll(
+                    orderType="DESC", limitTo=pbConfig.params["defaultLimitBibtexs"]
+                )
 
         commentStr = bwstr.LW.lastQuery % (pBDB.bibs.lastQuery)
         if len(pBDB.bibs.lastVals) > 0:
@@ -1939,6 +2244,8 @@ class BibtexListWindow(QFrame, ObjListWindow):
             askBibs=self.askBibs,
             mainWin=self.mainWin,
             previous=self.previous,
+            query=lazyQuery,
+            defaultSort=("firstdate", "DESC"),
         )
 
         self.changeEnableActions()
@@ -2122,15 +2429,10 @@ class BibtexListWindow(QFrame, ObjListWindow):
 
         Parameter:
             bibs (default None): the list of bibtex entries to use.
-                if None, use `getAll` on the database
+                if None, `self.createTable` uses the default query
         """
         QApplication.setOverrideCursor(Qt.WaitCursor)
-        if bibs is not None:
-            self.bibs = bibs
-        else:
-            self.bibs = pBDB.bibs.getAll(
-                orderType="DESC", limitTo=pbConfig.params["defaultLimitBibtexs"]
-            )
+        self.bibs = bibs
         self.cleanLayout()
         self.createTable()
         QApplication.restoreOverrideCursor()
@@ -2235,6 +2537,7 @@ class EditBibtexDialog(EditObjectWindow):
             or k == "bibtex"
             or k == "comments"
             or k in self.checkboxes
+            or k in pBDB.bibs.displayCols
         ):
             return i
         i += 1
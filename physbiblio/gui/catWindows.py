@@ -19,7 +19,7 @@ from PySide2.QtWidgets import (
 try:
     import physbiblio.gui.resourcesPyside2
     from physbiblio.config import pbConfig
-    from physbiblio.database import cats_alphabetical, pBDB
+    from physbiblio.database import pBDB
     from physbiblio.errors import pBLogger
     from physbiblio.gui.basicDialogs import askYesNo
     from physbiblio.gui.commonClasses import (
@@ -519,7 +519,7 @@ class CatsTreeWindow(PBDialog):
         catsNamedTree = self._populateTree(catsTree[0], 0)
 
         self.root_model = CatsModel(
-            pBDB.cats.getAll(),
+            list(pBDB.cats.getGraph().values()),
             [catsNamedTree],
             self,
             self.previous,
@@ -566,9 +566,10 @@ class CatsTreeWindow(PBDialog):
                 of the currently considered one
             idCat: the id of the current category
         """
-        name = pBDB.cats.getByID(idCat)[0]["name"]
+        graph = pBDB.cats.getGraph()
+        name = graph[idCat]["name"]
         children_list = []
-        for child in cats_alphabetical(children, pBDB):
+        for child in [c for c in graph[idCat]["children"] if c in children]:
             child_item = self._populateTree(children[child], child)
             children_list.append(child_item)
         return NamedElement(idCat, name, children_list)
@@ -601,8 +602,8 @@ class CatsTreeWindow(PBDialog):
         except AttributeError:
             pass
         try:
-            catData = pBDB.cats.getByID(idCat)[0]
-        except IndexError:
+            catData = pBDB.cats.getGraph()[int(idCat)]
+        except (KeyError, ValueError):
             pBGUILogger.exception(cwstr.failedFind)
             return
         self.timer = QTimer(self)
@@ -611,8 +612,9 @@ class CatsTreeWindow(PBDialog):
             lambda: QToolTip.showText(
                 QCursor.pos(),
                 cwstr.catId.format(idC=idCat, cat=catData["name"])
-                + cwstr.entriesCorrespondent.format(en=pBDB.catBib.countByCat(idCat))
-                + cwstr.expsAssociated.format(ex=pBDB.catExp.countByCat(idCat)),
+                + cwstr.entriesCorrespondent.format(en=catData["entries"])
+                + cwstr.entriesInTree.format(en=pBDB.catBib.countByCatTree(idCat))
+                + cwstr.expsAssociated.format(ex=catData["exps"]),
                 self.tree.viewport(),
                 self.tree.visualRect(index),
                 3000,
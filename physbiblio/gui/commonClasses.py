@@ -180,6 +180,8 @@ class PBTrueFalseCombo(PBComboBox):
 class ObjListWindow(PBDialog):
     """Create a window managing a list (of bibtexs or of experiments)"""
 
+    proxyModelClass = QSortFilterProxyModel
+
     def __init__(self, parent=None, gridLayout=False):
         """Init using parent class and create common definitions
 
@@ -257,7 +259,7 @@ class ObjListWindow(PBDialog):
             sortOrder: the order for sorting
                 (`Qt.AscendingOrder` or `Qt.DescendingOrder`)
         """
-        self.proxyModel = QSortFilterProxyModel(self)
+        self.proxyModel = self.proxyModelClass(self)
         self.proxyModel.setSourceModel(self.tableModel)
         self.proxyModel.setFilterCaseSensitivity(Qt.CaseInsensitive)
         self.proxyModel.setSortCaseSensitivity(Qt.CaseInsensitive)
@@ -455,6 +457,8 @@ class PBTableModel(QAbstractTableModel):
     used for experiments and bibtex entries
     """
 
+    pixmapCache = {}
+
     def __init__(self, parent, header, ask=False, previous=[], *args):
         """Constructor, based on `QAbstractTableModel.__init__`
 
@@ -529,7 +533,9 @@ class PBTableModel(QAbstractTableModel):
         self.layoutChanged.emit()
 
     def addImage(self, imagePath, height):
-        """Create a cell containing an image
+        """Create a cell containing an image.
+        The scaled images are stored in the class attribute
+        `pixmapCache`, shared by all the models
 
         Parameters:
             imagePath: the path of the image
@@ -538,7 +544,10 @@ class PBTableModel(QAbstractTableModel):
         Output:
             a QPixmap
         """
-        return QPixmap(imagePath).scaledToHeight(height)
+        key = (imagePath, height)
+        if key not in self.pixmapCache:
+            self.pixmapCache[key] = QPixmap(imagePath).scaledToHeight(height)
+        return self.pixmapCache[key]
 
     def addImages(self, imagePaths, outHeight, height=48):
         """Create a cell containing multiple images, using a `QPainter`
@@ -551,8 +560,11 @@ class PBTableModel(QAbstractTableModel):
                 to be used when painting
 
         Output:
-            a `QPixmap`
+            a `QPixmap` (stored in `pixmapCache`, see `self.addImage`)
         """
+        key = (tuple(imagePaths), outHeight, height)
+        if key in self.pixmapCache:
+            return self.pixmapCache[key]
         width = len(imagePaths) * height
         pm = QPixmap(width, height)
         pm.fill(Qt.transparent)
@@ -560,7 +572,8 @@ class PBTableModel(QAbstractTableModel):
         for i, img in enumerate(imagePaths):
             self.painter.drawPixmap(i * height, 0, QPixmap(img))
         self.painter.end()
-        return pm.scaledToHeight(outHeight)
+        self.pixmapCache[key] = pm.scaledToHeight(outHeight)
+        return self.pixmapCache[key]
 
     def rowCount(self, parent=None):
         """Count the rows of the given model based on the header
@@ -52,6 +52,7 @@ try:
         AbstractFormulas,
         BibtexInfo,
         BibtexListWindow,
+        CommonBibActions,
         FieldsFromArxiv,
         SearchBibsWindow,
         editBibtex,
@@ -85,10 +86,13 @@ try:
         Thread_exportTexBib,
         Thread_fieldsArxiv,
         Thread_findBadBibtexs,
+        Thread_findDuplicates,
         Thread_importDailyArxiv,
         Thread_importFromBib,
         Thread_loadAndInsert,
+        Thread_maintainDB,
         Thread_paperStats,
+        Thread_pdfFolderSummary,
         Thread_replace,
         Thread_updateAllBibtexs,
         Thread_updateInspireInfo,
@@ -154,6 +158,7 @@ class MainWindow(QMainWindow):
         self.selectedExps = []
         self.badBibtexs = []
         self.importArXivResults = []
+        self.pdfSummaryThread = None
         self.tabWidget = QTabWidget(self)
         self.tabWidget.setTabBarAutoHide(True)
         self.tabWidget.setTabsClosable(True)
@@ -180,6 +185,7 @@ class MainWindow(QMainWindow):
         self.checkUpdated.finished.connect(self.checkUpdated.deleteLater)
         self.checkUpdated.result.connect(self.printNewVersion)
         self.checkUpdated.start()
+        self.refreshPDFSummary()
 
     def closeEvent(self, event):
         """Intercept close events. If uncommitted changes exist,
@@ -452,6 +458,13 @@ class MainWindow(QMainWindow):
             triggered=self.findBadBibtexs,
         )
 
+        self.findDuplicatesAct = QAction(
+            mwstr.Act.dupT,
+            self,
+            statusTip=mwstr.Act.dupD,
+            triggered=self.findDuplicates,
+        )
+
         self.infoFromArxivAct = QAction(
             mwstr.Act.arxIT,
             self,
@@ -556,6 +569,13 @@ class MainWindow(QMainWindow):
             triggered=self.cleanSparePDF,
         )
 
+        self.maintainDBAct = QAction(
+            mwstr.Act.maintT,
+            self,
+            statusTip=mwstr.Act.maintD,
+            triggered=self.maintainDB,
+        )
+
     def createMenusAndToolBar(self):
         """Set the content of the menus and of the toolbar."""
         self.menuBar().clear()
@@ -584,6 +604,7 @@ class MainWindow(QMainWindow):
         self.bibMenu.addAction(self.cleanAllBibtexsAct)
         self.bibMenu.addAction(self.cleanAllBibtexsAskAct)
         self.bibMenu.addAction(self.findBadBibtexsAct)
+        self.bibMenu.addAction(self.findDuplicatesAct)
         self.bibMenu.addSeparator()
         self.bibMenu.addAction(self.infoFromArxivAct)
         self.bibMenu.addAction(self.updateAllBibtexsAct)
@@ -608,6 +629,7 @@ class MainWindow(QMainWindow):
         self.toolMenu.addSeparator()
         self.toolMenu.addAction(self.cleanSpareAct)
         self.toolMenu.addAction(self.cleanSparePDFAct)
+        self.toolMenu.addAction(self.maintainDBAct)
         self.toolMenu.addSeparator()
         self.toolMenu.addAction(self.authorStatsAct)
 
@@ -998,33 +1020,60 @@ class MainWindow(QMainWindow):
         mbox.setIconPixmap(QPixmap(":/images/icon.png"))
         mbox.exec_()
 
+    def refreshPDFSummary(self):
+        """Scan the PDF folder in a thread, to update the number of files
+        and the size shown in the statistics (see `self.showDBStats`),
+        unless a previous scan is still running
+        """
+        if self.pdfSummaryThread is not None and self.pdfSummaryThread.isRunning():
+            return
+        self.pdfSummaryThread = Thread_pdfFolderSummary(self)
+        self.pdfSummaryThread.start()
+
     def showDBStats(self):
         """Function to show a dialog with the statistics
-        of the database content and on the number of stored PDF files
+        of the database content and on the number of stored PDF files.
+        The PDF folder is not scanned here: the last summary is shown
+        and a new scan starts in the background
         """
         dbStats(pBDB)
-        onlyfiles = pBPDF.numberOfFiles(pBPDF.pdfDir)
+        summary = pBPDF.getFolderSummary()
+        if summary is None:
+            onlyfiles = mwstr.dbStatsPDFUnknown
+            pdfSize = mwstr.dbStatsPDFUnknown
+        else:
+            onlyfiles = summary["files"]
+            pdfSize = pBPDF.getSizeWUnits(summary["size"])
+        text = mwstr.dbStatsText.format(
+            bib=pBDB.stats["bibs"],
+            cat=pBDB.stats["cats"],
+            exp=pBDB.stats["exps"],
+            catbib=pBDB.stats["catBib"],
+            catexp=pBDB.stats["catExp"],
+            bibexp=pBDB.stats["bibExp"],
+            nf=onlyfiles,
+            pdfs=pdfSize,
+        )
+        if summary is not None:
+            text += mwstr.dbStatsPDFTime % summary["time"].strftime("%Y-%m-%d %H:%M")
+        if pBDB.profiler.enabled:
+            text += mwstr.dbStatsQueries % pBDB.profiler.report()
         mbox = QMessageBox(
             QMessageBox.Information,
             mwstr.dbStatsTitle,
-            mwstr.dbStatsText.format(
-                bib=pBDB.stats["bibs"],
-                cat=pBDB.stats["cats"],
-                exp=pBDB.stats["exps"],
-                catbib=pBDB.stats["catBib"],
-                catexp=pBDB.stats["catExp"],
-                bibexp=pBDB.stats["bibExp"],
-                nf=onlyfiles,
-                pdfs=pBPDF.getSizeWUnits(pBPDF.dirSize(pBPDF.pdfDir)),
-            ),
+            text,
             parent=self,
         )
         mbox.setIconPixmap(QPixmap(":/images/icon.png"))
-        mbox.show()
+        self.refreshPDFSummary()
+        mbox.exec_()
 
     def _runInThread(self, Thread_func, title, *args, **kwargs):
         """Function which simplifies the creation of the objects which
-        are needed to run a function in a thread
+        are needed to run a function in a thread.
+        The changes performed by the thread are not committed:
+        they can be saved or undone by the user
+        as the ones performed in the main thread
 
         Parameters:
             Thread_func: the thread class name
@@ -1080,6 +1129,14 @@ class MainWindow(QMainWindow):
         app.exec_()
         pBLogger.info(mwstr.closing)
         pBErrorManager.rmTempHandler()
+        try:
+            threadFinished = thr.isFinished()
+        except RuntimeError:
+            threadFinished = True
+        if threadFinished:
+            pBDB.closeThreadCursors()
+        if pBDB.checkUncommitted():
+            self.mainWindowTitle(mwstr.winTitleModified)
         if outMessage:
             self.statusBarMessage(outMessage)
         else:
@@ -1098,6 +1155,17 @@ class MainWindow(QMainWindow):
         if askYesNo(mwstr.cleanPDFAsk):
             self._runInThread(Thread_cleanSparePDF, mwstr.cleanPDFT)
 
+    def maintainDB(self):
+        """Ask and run a thread to check the integrity of the database,
+        update the statistics of the query planner
+        and reclaim the unused space
+        """
+        if pBDB.checkUncommitted() and not askYesNo(mwstr.maintainUncommitted):
+            return
+        self._runInThread(
+            Thread_maintainDB, mwstr.maintainT, askYesNo(mwstr.maintainFullAsk)
+        )
+
     def createStatusBar(self):
         """Function to create Status Bar"""
         self.mainStatusBar.showMessage(mwstr.ready, 0)
@@ -1524,12 +1592,20 @@ class MainWindow(QMainWindow):
 
     def updateAllBibtexsAsk(self):
         """Same as updateAllBibtexs, but ask the values of
-        `startFrom` and `force` before the execution
+        `startFrom` and `force` before the execution.
+        If a previous update was interrupted, ask if it must be resumed
         """
         force = askYesNo(
             mwstr.forceUpdText,
             mwstr.forceUpdTitle,
         )
+        checkpoint = pBDB.bibs.getOAICheckpoint()
+        if checkpoint is not None and askYesNo(
+            mwstr.updResumeText % pBDB.bibs.readPageToken(checkpoint)[1],
+            mwstr.updResumeTitle,
+        ):
+            self.updateAllBibtexs(0, force=force, resume=True)
+            return
         text, out = askGenericText(
             mwstr.updINumText,
             mwstr.updINumTitle,
@@ -1552,6 +1628,7 @@ class MainWindow(QMainWindow):
         useEntries=None,
         force=False,
         reloadAll=False,
+        resume=False,
     ):
         """Use INSPIRE to obtain updated information of a list of papers
         and update their bibtex with the new data.
@@ -1567,6 +1644,8 @@ class MainWindow(QMainWindow):
             reloadAll (default False): if True, completely reload
                 the bibtex instead of updating it
                 (may solve some format problems)
+            resume (default False): if True, resume the update
+                from the checkpoint saved by a previous interrupted run
         """
         self.statusBarMessage(mwstr.updateStartFrom % startFrom)
         self._runInThread(
@@ -1576,6 +1655,7 @@ class MainWindow(QMainWindow):
             useEntries=useEntries,
             force=force,
             reloadAll=reloadAll,
+            resume=resume,
             minProgress=0.0,
             stopFlag=True,
         )
@@ -1724,12 +1804,13 @@ class MainWindow(QMainWindow):
         Parameter:
             entriesList: the list of entries to be used
         """
+        previous = pBDB.cats.getDictByEntries(entriesList)
         for entry in entriesList:
             selectCats = CatsTreeWindow(
                 parent=self,
                 askCats=True,
                 askForBib=entry,
-                previous=[a[0] for a in pBDB.cats.getByEntry(entry)],
+                previous=[a[0] for a in previous[entry]],
             )
             selectCats.exec_()
             if selectCats.result in ["Ok", "Exps"]:
@@ -1822,6 +1903,7 @@ class MainWindow(QMainWindow):
                         newFound[ch] = found[ch]
                 found = newFound
                 inserted = []
+                records = []
                 for key in sorted(found):
                     el = found[key]
                     db.entries = [el["bibpars"]]
@@ -1832,7 +1914,10 @@ class MainWindow(QMainWindow):
                         continue
                     if method == "adsnasa":
                         data["ads"] = key
-                    if not pBDB.bibs.insert(data):
+                    records.append((key, data))
+                outcomes = pBDB.bibs.insertMany([data for key, data in records])
+                for (key, data), outcome in zip(records, outcomes):
+                    if not outcome:
                         pBGUILogger.warning(mwstr.elementFailed % key)
                         continue
                     try:
@@ -1929,6 +2014,51 @@ class MainWindow(QMainWindow):
         else:
             infoMessage(mwstr.cheBibNoInv)
 
+    def findDuplicates(self):
+        """Use a thread to scan the database for entries which share
+        the same identifiers or title, first author and year.
+        If the user wants, the entries of each group are then
+        merged one pair at a time in a `MergeBibtexs` dialog:
+        the result of each merge is compared with the next entry
+        of the group, until all the entries have been considered
+        """
+        self.duplicates = []
+        self._runInThread(Thread_findDuplicates, mwstr.dupT, minProgress=0.0)
+        if not self.duplicates:
+            infoMessage(mwstr.dupNone)
+            return
+        allKeys = [k for g in self.duplicates for k in g["bibkeys"]]
+        self.reloadMainContent(pBDB.bibs.getByBibkey(allKeys, saveQuery=False))
+        if not askYesNo(mwstr.dupFound % len(self.duplicates)):
+            return
+        for group in self.duplicates:
+            survivor = group["bibkeys"][0]
+            for other in group["bibkeys"][1:]:
+                entries = pBDB.bibs.getByBibkey([survivor, other], saveQuery=False)
+                if len(entries) < 2:
+                    # one of the two entries is missing, keep the other one
+                    if len(entries) == 1:
+                        survivor = entries[0]["bibkey"]
+                    continue
+                ids = [dict(pBDB.bibs.duplicateKeys(e)) for e in entries]
+                shared = [n for n, v in ids[0].items() if ids[1].get(n) == v]
+                if shared:
+                    question = mwstr.dupMergeAsk % (
+                        entries[0]["bibkey"],
+                        entries[1]["bibkey"],
+                        ", ".join(shared),
+                    )
+                else:
+                    question = mwstr.dupMergeAskGroup % (
+                        entries[0]["bibkey"],
+                        entries[1]["bibkey"],
+                        ", ".join(group["matches"]),
+                    )
+                if askYesNo(question):
+                    merged = CommonBibActions(entries, self).onMerge()
+                    if merged is not None:
+                        survivor = merged
+
     def infoFromArxiv(self, useEntries=None):
         """Use arXiv to obtain more information
         on a specific selection of entries
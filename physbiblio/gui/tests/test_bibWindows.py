@@ -383,8 +383,9 @@ class TestFunctions(GUIwMainWTestCase):
             "pages": "",
             "published": "  (2015) ",
             "author": "",
-            "bibdict": "%s"
-            % {"arxiv": "1507.08204", "ENTRYTYPE": "article", "ID": "Gariazzo:2015rra"},
+            "bibdict": pBDB.bibs.dumpBibdict(
+                {"arxiv": "1507.08204", "ENTRYTYPE": "article", "ID": "Gariazzo:2015rra"}
+            ),
         }
         p = PBDialog()
         ebd = EditBibtexDialog(self.mainW, bib=None)
@@ -1632,6 +1633,175 @@ class TestBibTableModel(GUITestCase):
         self.assertEqual(tm.getIdentifier(biblist[0]), "a")
         self.assertEqual(tm.getIdentifier(biblist[1]), "b")
 
+    def test_lazyMode(self):
+        """test the methods used in lazy mode"""
+        p = QWidget()
+        header = ["bibkey", "title", "Type"]
+        tm = BibTableModel(p, [{"bibkey": "a"}], header, query=("q", ()))
+        self.assertFalse(tm.lazy)
+        self.assertFalse(tm.canFetchMore())
+        with patch(
+            "physbiblio.database.Entries.getQueryPage", autospec=True
+        ) as _gp, patch(
+            "physbiblio.database.Entries.countQueryPage", autospec=True
+        ) as _cp:
+            tm.fetchMore()
+            tm.setFilterText("abc")
+            tm.sort(0, Qt.DescendingOrder)
+            self.assertEqual(_gp.call_count, 0)
+            self.assertEqual(_cp.call_count, 0)
+        self.assertEqual(tm.filterText, "")
+        self.assertEqual(tm.sortField, None)
+
+        with patch(
+            "physbiblio.database.Entries.countQueryPage",
+            return_value=3,
+            autospec=True,
+        ) as _cp, patch(
+            "physbiblio.database.Entries.getQueryKeys",
+            return_value=["a", "b", "c"],
+            autospec=True,
+        ) as _gk:
+            tm = BibTableModel(
+                p, None, header, previous=["b", "d"], query=("q", (1,))
+            )
+            _cp.assert_called_once_with(pBDB.bibs, "q", (1,))
+            _gk.assert_called_once_with(pBDB.bibs, "q", (1,))
+        self.assertTrue(tm.lazy)
+        self.assertEqual(tm.dataList, [])
+        self.assertEqual(tm.totalRows, 3)
+        self.assertEqual(tm.selectedElements, {"a": False, "b": True, "c": False})
+        self.assertTrue(tm.canFetchMore())
+        self.assertEqual(tm.rowCount(), 0)
+        with patch(
+            "physbiblio.database.Entries.getQueryPage",
+            side_effect=[[{"bibkey": "a"}, {"bibkey": "b"}], [{"bibkey": "c"}]],
+            autospec=True,
+        ) as _gp, patch.dict(pbConfig.params, {"bibListPageSize": 2}, clear=False):
+            tm.fetchMore()
+            _gp.assert_called_once_with(
+                pBDB.bibs,
+                "q",
+                (1,),
+                filterText="",
+                orderBy=None,
+                orderType="ASC",
+                limitTo=2,
+                limitOffset=0,
+            )
+            self.assertEqual(tm.rowCount(), 2)
+            self.assertTrue(tm.canFetchMore())
+            tm.fetchMore()
+            _gp.assert_called_with(
+                pBDB.bibs,
+                "q",
+                (1,),
+                filterText="",
+                orderBy=None,
+                orderType="ASC",
+                limitTo=1,
+                limitOffset=2,
+            )
+            self.assertEqual(tm.rowCount(), 3)
+            self.assertFalse(tm.canFetchMore())
+            tm.fetchMore()
+            self.assertEqual(_gp.call_count, 2)
+
+        with patch(
+            "physbiblio.gui.bibWindows.BibTableModel.reloadPages", autospec=True
+        ) as _rp:
+            tm.setFilterText("abc")
+            _rp.assert_called_once_with(tm)
+            tm.setFilterText("abc")
+            _rp.assert_called_once_with(tm)
+            self.assertEqual(tm.filterText, "abc")
+            _rp.reset_mock()
+            tm.sort(1, Qt.DescendingOrder)
+            _rp.assert_called_once_with(tm)
+            self.assertEqual(tm.sortField, "title")
+            self.assertEqual(tm.sortType, "DESC")
+            tm.sort(1, Qt.DescendingOrder)
+            _rp.assert_called_once_with(tm)
+            tm.sort(-1, Qt.AscendingOrder)
+            self.assertEqual(tm.sortField, None)
+            self.assertEqual(tm.sortType, "ASC")
+        with patch(
+            "physbiblio.database.Entries.countQueryPage",
+            return_value=1,
+            autospec=True,
+        ) as _cp:
+            tm.reloadPages()
+            _cp.assert_called_once_with(pBDB.bibs, "q", (1,), filterText="abc")
+        self.assertEqual(tm.dataList, [])
+        self.assertEqual(tm.totalRows, 1)
+        self.assertEqual(tm.pageToken, None)
+
+        # keyset pagination
+        with patch(
+            "physbiblio.database.Entries.countQueryPage",
+            return_value=3,
+            autospec=True,
+        ) as _cp, patch(
+            "physbiblio.database.Entries.getQueryKeys",
+            return_value=["a", "b", "c"],
+            autospec=True,
+        ) as _gk:
+            tm = BibTableModel(
+                p, None, header, query=("q", (1,)), defaultSort=("firstdate", "DESC")
+            )
+        self.assertEqual(tm.defaultSort, ("firstdate", "DESC"))
+        self.assertEqual(tm.currentSort(), ("firstdate", "DESC"))
+        tm.sortField = "Type"
+        self.assertEqual(tm.currentSort(), ("firstdate", "DESC"))
+        tm.sortField = "title"
+        self.assertEqual(tm.currentSort(), ("title", "ASC"))
+        tm.sortField = None
+        with patch(
+            "physbiblio.database.Entries.getQueryPageAfter",
+            side_effect=[
+                ([{"bibkey": "a"}, {"bibkey": "b"}], "t1"),
+                ([{"bibkey": "c"}], "t2"),
+            ],
+            autospec=True,
+        ) as _ga, patch(
+            "physbiblio.database.Entries.getQueryPage", autospec=True
+        ) as _gp, patch.dict(
+            pbConfig.params, {"bibListPageSize": 2}, clear=False
+        ):
+            tm.fetchMore()
+            _ga.assert_called_once_with(
+                pBDB.bibs,
+                "q",
+                (1,),
+                filterText="",
+                orderBy="firstdate",
+                orderType="DESC",
+                limitTo=2,
+                after=None,
+            )
+            self.assertEqual(tm.pageToken, "t1")
+            tm.fetchMore()
+            _ga.assert_called_with(
+                pBDB.bibs,
+                "q",
+                (1,),
+                filterText="",
+                orderBy="firstdate",
+                orderType="DESC",
+                limitTo=1,
+                after="t1",
+            )
+            self.assertEqual(tm.pageToken, "t2")
+            self.assertEqual(tm.rowCount(), 3)
+            self.assertEqual(_gp.call_count, 0)
+        with patch(
+            "physbiblio.database.Entries.countQueryPage",
+            return_value=3,
+            autospec=True,
+        ) as _cp:
+            tm.reloadPages()
+        self.assertEqual(tm.pageToken, None)
+
     def test_addTypeCell(self):
         """test addTypeCell"""
         p = QWidget()
@@ -1815,6 +1985,31 @@ class TestBibTableModel(GUITestCase):
         self.assertEqual(tm.data(tm.index(1, 3), Qt.DisplayRole), "Gar")
         self.assertEqual(tm.data(tm.index(1, 3), Qt.CheckStateRole), None)
         self.assertEqual(tm.data(tm.index(1, 4), Qt.DisplayRole), "")
+        tmStored = BibTableModel(
+            m,
+            [
+                {
+                    "bibkey": "c",
+                    "title": r"my title {\mu}",
+                    "author": "Gar and Stef and Ago",
+                    "titleText": "stored title",
+                    "authorText": "Gar and Stef and Ago",
+                    "marks": "",
+                }
+            ],
+            header,
+            header,
+        )
+        with patch.dict(pbConfig.params, {"maxAuthorNames": 2}, clear=False), patch(
+            "pylatexenc.latex2text.LatexNodes2Text.latex_to_text", autospec=True
+        ) as _ltt:
+            self.assertEqual(
+                tmStored.data(tmStored.index(0, 2), Qt.DisplayRole), "stored title"
+            )
+            self.assertEqual(
+                tmStored.data(tmStored.index(0, 3), Qt.DisplayRole), "Gar et al."
+            )
+            self.assertEqual(_ltt.call_count, 0)
 
         # check marks
         with patch(
@@ -1831,6 +2026,9 @@ class TestBibTableModel(GUITestCase):
         ) as _m:
             self.assertEqual(tm.data(tm.index(1, 1), Qt.DisplayRole), "")
             _m.assert_called_once_with(tm, "new,imp")
+            self.assertEqual(tm.data(tm.index(1, 1), Qt.DisplayRole), "")
+            _m.assert_called_once_with(tm, "new,imp")
+        tm.invalidateCache()
         self.assertEqual(tm.data(tm.index(0, 1), Qt.DisplayRole), "")
         self.assertEqual(tm.data(tm.index(0, 1), Qt.DecorationRole), None)
         self.assertEqual(tm.data(tm.index(1, 1), Qt.DisplayRole), None)
@@ -1851,6 +2049,7 @@ class TestBibTableModel(GUITestCase):
         ) as _m:
             self.assertEqual(tm.data(tm.index(1, 5), Qt.DisplayRole), "type B")
             _m.assert_called_once_with(tm, biblist[1])
+        tm.invalidateCache()
         self.assertEqual(tm.data(tm.index(0, 5), Qt.DisplayRole), "")
         self.assertEqual(tm.data(tm.index(0, 5), Qt.DecorationRole), None)
         self.assertEqual(tm.data(tm.index(1, 5), Qt.DisplayRole), "Book")
@@ -1871,6 +2070,7 @@ class TestBibTableModel(GUITestCase):
         ) as _m:
             self.assertEqual(tm.data(tm.index(1, 6), Qt.DisplayRole), "no PDF")
             _m.assert_called_once_with(tm, "b")
+        tm.invalidateCache()
         with patch(
             "physbiblio.pdf.LocalPDF.getExisting",
             side_effect=[[], [], ["b"], ["b"]],
@@ -1883,6 +2083,14 @@ class TestBibTableModel(GUITestCase):
             self.assertEqual(tm.data(tm.index(1, 6), Qt.DisplayRole), None)
             _ge.assert_called_once_with(pBPDF, "b")
             self.assertIsInstance(tm.data(tm.index(1, 6), Qt.DecorationRole), QPixmap)
+            self.assertEqual(_ge.call_count, 1)
+            tm.invalidateCache("b")
+            self.assertEqual(tm.data(tm.index(0, 6), Qt.DisplayRole), "no PDF")
+            self.assertIsInstance(tm.data(tm.index(1, 6), Qt.DecorationRole), QPixmap)
+            self.assertEqual(_ge.call_count, 2)
+        self.assertEqual(sorted(tm.renderCache.keys()), ["a", "b"])
+        self.assertEqual(tm.renderCache["a"]["PDF"], (False, "no PDF"))
+        self.assertEqual(tm.data(tm.index(0, 6), Qt.ToolTipRole), None)
 
         tm = BibTableModel(
             m, biblist, header + addCols, header, addCols, previous=[], askBibs=False
@@ -1929,6 +2137,10 @@ class TestBibTableModel(GUITestCase):
         self.assertEqual(tm.selectedElements, {"a": False, "b": False})
         self.assertEqual(self.newEmit, ix)
 
+        tm.renderCache = {"a": {"A": (False, "a")}, "b": {"A": (False, "b")}}
+        self.assertEqual(tm.setData(ix, Qt.Checked, Qt.CheckStateRole), True)
+        self.assertEqual(tm.renderCache, {"b": {"A": (False, "b")}})
+
         tm = BibTableModel(p, biblist, header)
         ix = tm.index(1, 0)
         self.assertEqual(tm.setData(ix, "abc", Qt.EditRole), True)
@@ -1937,6 +2149,48 @@ class TestBibTableModel(GUITestCase):
         self.assertEqual(tm.selectedElements, {"a": False, "b": False})
 
 
+@unittest.skipIf(skipTestsSettings.gui, "GUI tests")
+class TestBibSortFilterProxyModel(GUITestCase):
+    """test the `BibSortFilterProxyModel` methods"""
+
+    def test_methods(self):
+        """test sort and filter in normal and lazy mode"""
+        p = QWidget()
+        pm = BibSortFilterProxyModel(p)
+        self.assertIsInstance(pm, QSortFilterProxyModel)
+        self.assertEqual(pm.lazySortColumn, -1)
+        self.assertEqual(pm.lazySortOrder, Qt.AscendingOrder)
+        self.assertFalse(pm.isLazy())
+        tm = BibTableModel(p, [{"bibkey": "a"}], ["bibkey"])
+        pm.setSourceModel(tm)
+        self.assertFalse(pm.isLazy())
+        with patch(
+            "physbiblio.gui.bibWindows.BibTableModel.sort", autospec=True
+        ) as _s, patch(
+            "physbiblio.gui.bibWindows.BibTableModel.setFilterText", autospec=True
+        ) as _f:
+            pm.sort(0, Qt.DescendingOrder)
+            pm.setFilterRegExp("abc")
+            self.assertEqual(_s.call_count, 0)
+            self.assertEqual(_f.call_count, 0)
+        self.assertEqual(pm.sortColumn(), 0)
+        self.assertEqual(pm.sortOrder(), Qt.DescendingOrder)
+        self.assertEqual(pm.filterRegExp().pattern(), "abc")
+        tm.lazy = True
+        with patch(
+            "physbiblio.gui.bibWindows.BibTableModel.sort", autospec=True
+        ) as _s, patch(
+            "physbiblio.gui.bibWindows.BibTableModel.setFilterText", autospec=True
+        ) as _f:
+            pm.sort(1, Qt.AscendingOrder)
+            _s.assert_called_once_with(tm, 1, Qt.AscendingOrder)
+            pm.setFilterRegExp("def")
+            _f.assert_called_once_with(tm, "def")
+        self.assertEqual(pm.sortColumn(), 1)
+        self.assertEqual(pm.sortOrder(), Qt.AscendingOrder)
+        self.assertEqual(pm.filterRegExp().pattern(), "abc")
+
+
 @unittest.skipIf(skipTestsSettings.gui, "GUI tests")
 class TestCommonBibActions(GUIwMainWTestCase):
     """test CommonBibActions"""
@@ -4055,7 +4309,7 @@ class TestCommonBibActions(GUIwMainWTestCase):
         ) as _er, patch(
             "logging.Logger.exception"
         ) as _ex:
-            c.onMerge()
+            self.assertIsNone(c.onMerge())
             self.assertEqual(_m.call_count, 0)
             self.assertEqual(_rl.call_count, 0)
             _mbi.assert_called_once_with(c.bibs[0], c.bibs[1], self.mainW)
@@ -4187,16 +4441,12 @@ class TestCommonBibActions(GUIwMainWTestCase):
             return_value=[{"idCat": 321}, {"idCat": 432}],
             autospec=True,
         ) as _cebk, patch(
-            "physbiblio.database.CatsEntries.delete", return_value=True, autospec=True
-        ) as _cede, patch(
             "physbiblio.database.CatsEntries.insert", return_value=True, autospec=True
         ) as _cein, patch(
             "physbiblio.database.Experiments.getByEntry",
             return_value=[{"idExp": 4321}, {"idExp": 5432}],
             autospec=True,
         ) as _eebk, patch(
-            "physbiblio.database.EntryExps.delete", return_value=True, autospec=True
-        ) as _eede, patch(
             "physbiblio.database.EntryExps.insert", return_value=True, autospec=True
         ) as _eein, patch(
             "physbiblio.pdf.LocalPDF.mergePDFFolders", autospec=True
@@ -4207,7 +4457,7 @@ class TestCommonBibActions(GUIwMainWTestCase):
         ) as _er, patch(
             "logging.Logger.exception"
         ) as _ex:
-            c.onMerge()
+            self.assertEqual(c.onMerge(), "merged")
             self.assertEqual(_m.call_count, 0)
             _rl.assert_called_once_with(self.mainW, ["last"])
             _mbi.assert_called_once_with(c.bibs[0], c.bibs[1], self.mainW)
@@ -4238,14 +4488,6 @@ class TestCommonBibActions(GUIwMainWTestCase):
             self.assertEqual(_er.call_count, 0)
             self.assertEqual(_ex.call_count, 0)
             _cebk.assert_has_calls([call(pBDB.cats, "abc"), call(pBDB.cats, "def")])
-            _cede.assert_has_calls(
-                [
-                    call(pBDB.catBib, 321, "abc"),
-                    call(pBDB.catBib, 432, "abc"),
-                    call(pBDB.catBib, 321, "def"),
-                    call(pBDB.catBib, 432, "def"),
-                ]
-            )
             _cein.assert_has_calls(
                 [
                     call(pBDB.catBib, 321, "merged"),
@@ -4255,14 +4497,6 @@ class TestCommonBibActions(GUIwMainWTestCase):
                 ]
             )
             _eebk.assert_has_calls([call(pBDB.exps, "abc"), call(pBDB.exps, "def")])
-            _eede.assert_has_calls(
-                [
-                    call(pBDB.bibExp, "abc", 4321),
-                    call(pBDB.bibExp, "abc", 5432),
-                    call(pBDB.bibExp, "def", 4321),
-                    call(pBDB.bibExp, "def", 5432),
-                ]
-            )
             _eein.assert_has_calls(
                 [
                     call(pBDB.bibExp, "merged", 4321),
@@ -4918,6 +5152,8 @@ class TestBibtexListWindow(GUIwMainWTestCase):
                 askBibs=bw.askBibs,
                 mainWin=bw.mainWin,
                 previous=bw.previous,
+                query=None,
+                defaultSort=("firstdate", "DESC"),
             )
             _cea.assert_called_once_with(bw)
             _sps.assert_called_once_with(
@@ -4963,13 +5199,46 @@ class TestBibtexListWindow(GUIwMainWTestCase):
             "physbiblio.database.Entries.getAll",
             return_value=[{"bibkey": "xyz"}],
             autospec=True,
-        ) as _ga:
+        ) as _ga, patch.dict(pbConfig.params, {"bibListPageSize": 0}, clear=False):
             bw.createTable()
             _ga.assert_called_once_with(
                 pBDB.bibs,
                 orderType="DESC",
                 limitTo=pbConfig.params["defaultLimitBibtexs"],
             )
+        bw.bibs = None
+        with patch(
+            "physbiblio.database.Entries.getAll", autospec=True
+        ) as _ga, patch(
+            "physbiblio.database.Entries.prepareFetchAll",
+            return_value=("select * from entries", ()),
+            autospec=True,
+        ) as _pf, patch(
+            "physbiblio.gui.bibWindows.BibTableModel", autospec=USE_AUTOSPEC_CLASS
+        ) as _tm, patch.dict(
+            pbConfig.params, {"bibListPageSize": 20}, clear=False
+        ):
+            bw.createTable()
+            self.assertEqual(_ga.call_count, 0)
+            _pf.assert_called_once_with(
+                pBDB.bibs,
+                orderType="DESC",
+                limitTo=pbConfig.params["defaultLimitBibtexs"],
+                saveQuery=True,
+            )
+            _tm.assert_called_once_with(
+                bw,
+                None,
+                bw.columns + bw.additionalCols,
+                bw.columns,
+                bw.additionalCols,
+                askBibs=bw.askBibs,
+                mainWin=bw.mainWin,
+                previous=bw.previous,
+                query=("select * from entries", ()),
+                defaultSort=("firstdate", "DESC"),
+            )
+            self.assertIsNone(bw.bibs)
         # check if firstdate is missing
         with patch.dict(
             pbConfig.params,
@@ -5540,16 +5809,12 @@ class TestBibtexListWindow(GUIwMainWTestCase):
             "physbiblio.database.Entries.getAll", return_value="getall", autospec=True
         ) as _ga:
             bw.recreateTable()
-            _ga.assert_called_once_with(
-                pBDB.bibs,
-                orderType="DESC",
-                limitTo=pbConfig.params["defaultLimitBibtexs"],
-            )
+            self.assertEqual(_ga.call_count, 0)
             _cl.assert_called_once_with(bw)
             _ct.assert_called_once_with(bw)
             _rc.assert_called_once_with()
             _sc.assert_called_once_with(Qt.WaitCursor)
-            self.assertEqual(bw.bibs, "getall")
+            self.assertIsNone(bw.bibs)
 
 
 @unittest.skipIf(skipTestsSettings.gui, "GUI tests")
@@ -5663,6 +5928,8 @@ class TestEditBibtexDialog(GUITestCase):
         self.assertEqual(eb.createField("bibtex", 10), 10)
         for k in eb.checkboxes:
             self.assertEqual(eb.createField(k, 10), 10)
+        for k in pBDB.bibs.displayCols:
+            self.assertEqual(eb.createField(k, 10), 10)
         self.assertEqual(eb.createField("bibkey", 0), 1)
         self.assertEqual(eb.createField("inspire", 5), 6)
         self.assertEqual(eb.createField("marks", 11), 13)
@@ -6126,6 +6393,7 @@ class TestSearchBibsWindow(GUITestCase):
                     "different from",
                     "does not contain",
                     "exact match",
+                    "matches",
                 ],
                 "catexp": [
                     "all the following",
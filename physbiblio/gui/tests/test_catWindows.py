@@ -533,6 +533,14 @@ class TestCatsTreeWindow(GUITestCase):
             {"idCat": 3, "name": "test3"},
         ]
         self.cathier = {0: {1: {2: {}}, 3: {}}}
+        self.catsGraph = {
+            0: {"idCat": 0, "name": "main", "children": [1, 3]},
+            1: {"idCat": 1, "name": "test1", "children": [2]},
+            2: {"idCat": 2, "name": "test2", "children": []},
+            3: {"idCat": 3, "name": "test3", "children": []},
+        }
+        for c in self.catsGraph.values():
+            c.update({"entries": 33, "exps": 12})
         with patch(
             "physbiblio.gui.commonClasses.catString",
             side_effect=[" 2: test2S", " 1: test1S", " 3: test3S", " 0: mainS"],
@@ -867,8 +875,8 @@ class TestCatsTreeWindow(GUITestCase):
             return_value=self.cathier,
             autospec=True,
         ) as _gh, patch(
-            "physbiblio.database.Categories.getAll",
-            return_value=self.cats,
+            "physbiblio.database.Categories.getGraph",
+            return_value=self.catsGraph,
             autospec=True,
         ) as _gh, patch(
             "physbiblio.gui.catWindows.CatsTreeWindow._populateTree",
@@ -895,8 +903,8 @@ class TestCatsTreeWindow(GUITestCase):
             return_value=self.cathier,
             autospec=True,
         ) as _gh, patch(
-            "physbiblio.database.Categories.getAll",
-            return_value=self.cats,
+            "physbiblio.database.Categories.getGraph",
+            return_value=self.catsGraph,
             autospec=True,
         ) as _gh, patch(
             "physbiblio.gui.catWindows.CatsTreeWindow._populateTree",
@@ -973,8 +981,8 @@ class TestCatsTreeWindow(GUITestCase):
             return_value=self.cathier,
             autospec=True,
         ) as _gh, patch(
-            "physbiblio.database.Categories.getAll",
-            return_value=self.cats,
+            "physbiblio.database.Categories.getGraph",
+            return_value=self.catsGraph,
             autospec=True,
         ) as _ga, patch(
             "physbiblio.gui.catWindows.CatsTreeWindow._populateTree",
@@ -1051,8 +1059,8 @@ class TestCatsTreeWindow(GUITestCase):
             return_value=self.cathier,
             autospec=True,
         ) as _gh, patch(
-            "physbiblio.database.Categories.getAll",
-            return_value=self.cats,
+            "physbiblio.database.Categories.getGraph",
+            return_value=self.catsGraph,
             autospec=True,
         ) as _ga, patch(
             "physbiblio.gui.catWindows.CatsTreeWindow._populateTree",
@@ -1112,8 +1120,8 @@ class TestCatsTreeWindow(GUITestCase):
             return_value=self.cathier,
             autospec=True,
         ) as _gh, patch(
-            "physbiblio.database.Categories.getAll",
-            return_value=self.cats,
+            "physbiblio.database.Categories.getGraph",
+            return_value=self.catsGraph,
             autospec=True,
         ) as _ga, patch(
             "physbiblio.gui.catWindows.CatsTreeWindow._populateTree",
@@ -1154,8 +1162,8 @@ class TestCatsTreeWindow(GUITestCase):
             return_value=self.cathier,
             autospec=True,
         ) as _gh, patch(
-            "physbiblio.database.Categories.getAll",
-            return_value=self.cats,
+            "physbiblio.database.Categories.getGraph",
+            return_value=self.catsGraph,
             autospec=True,
         ) as _ga, patch(
             "physbiblio.gui.catWindows.CatsTreeWindow._populateTree",
@@ -1195,24 +1203,12 @@ class TestCatsTreeWindow(GUITestCase):
         p = QWidget()
         ctw = CatsTreeWindow(p)
         with patch(
-            "physbiblio.database.Categories.getByID",
-            side_effect=[
-                [{"idCat": 0, "name": "main"}],
-                [{"idCat": 1, "name": "test1"}],
-                [{"idCat": 3, "name": "test3"}],
-                [{"idCat": 1, "name": "test1"}],
-                [{"idCat": 2, "name": "test2"}],
-                [{"idCat": 2, "name": "test2"}],
-                [{"idCat": 2, "name": "test2"}],
-                [{"idCat": 1, "name": "test1"}],
-                [{"idCat": 3, "name": "test3"}],
-                [{"idCat": 3, "name": "test3"}],
-                [{"idCat": 0, "name": "test0"}],
-                [{"idCat": 0, "name": "test0"}],
-            ],
+            "physbiblio.database.Categories.getGraph",
+            return_value=self.catsGraph,
             autospec=True,
-        ):
+        ) as _gg:
             pt = ctw._populateTree(self.cathier[0], 0)
+            self.assertEqual(_gg.call_count, 4)
         self.assertIsInstance(pt, NamedElement)
         self.assertEqual(pt.name, "main")
         self.assertEqual(pt.idCat, 0)
@@ -1242,8 +1238,8 @@ class TestCatsTreeWindow(GUITestCase):
             return_value=self.cathier,
             autospec=True,
         ) as _gh, patch(
-            "physbiblio.database.Categories.getAll",
-            return_value=self.cats,
+            "physbiblio.database.Categories.getGraph",
+            return_value=self.catsGraph,
             autospec=True,
         ) as _gh, patch(
             "physbiblio.gui.catWindows.CatsTreeWindow._populateTree",
@@ -1255,36 +1251,38 @@ class TestCatsTreeWindow(GUITestCase):
         with patch("logging.Logger.exception") as _l, patch(
             "PySide2.QtCore.QTimer.start", autospec=True
         ) as _st, patch("PySide2.QtWidgets.QToolTip.showText") as _sh, patch(
-            "physbiblio.database.Categories.getByID", return_value=[], autospec=True
-        ) as _gbi:
+            "physbiblio.database.Categories.getGraph", return_value={}, autospec=True
+        ) as _gg:
             self.assertEqual(ctw.handleItemEntered(ix), None)
             _l.assert_called_once_with("Failed in finding category")
-            _gbi.assert_called_once_with(pBDB.cats, "0")
+            _gg.assert_called_once_with(pBDB.cats)
             self.assertEqual(_st.call_count, 0)
             _sh.assert_not_called()
         with patch("logging.Logger.exception") as _l, patch(
             "PySide2.QtCore.QTimer.start", autospec=True
         ) as _st, patch("PySide2.QtWidgets.QToolTip.showText") as _sh, patch(
-            "physbiblio.database.Categories.getByID",
-            return_value=[{"idCat": 0, "name": "main"}],
+            "physbiblio.database.Categories.getGraph",
+            return_value=self.catsGraph,
+            autospec=True,
+        ) as _gg, patch(
+            "physbiblio.database.CatsEntries.countByCatTree",
+            return_value=40,
             autospec=True,
-        ) as _gbi, patch(
-            "physbiblio.database.CatsEntries.countByCat", return_value=33, autospec=True
-        ) as _cb, patch(
-            "physbiblio.database.CatsExps.countByCat", return_value=12, autospec=True
-        ) as _ce:
+        ) as _ct:
             position = QCursor.pos()
             self.assertEqual(ctw.handleItemEntered(ix), None)
             _l.assert_not_called()
             self.assertIsInstance(ctw.timer, QTimer)
             self.assertTrue(ctw.timer.isSingleShot())
-            _gbi.assert_called_once_with(pBDB.cats, "0")
+            _gg.assert_called_once_with(pBDB.cats)
             _st.assert_called_once_with(500)
             _sh.assert_not_called()
             ctw.timer.timeout.emit()
             _sh.assert_called_once_with(
                 position,
-                "0: main\nCorresponding entries: 33\nAssociated experiments: 12",
+                "0: main\nCorresponding entries: 33\n"
+                + "Entries including subcategories: 40\n"
+                + "Associated experiments: 12",
                 ctw.tree.viewport(),
                 ctw.tree.visualRect(ix),
                 3000,
@@ -1292,14 +1290,14 @@ class TestCatsTreeWindow(GUITestCase):
         with patch("logging.Logger.exception") as _l, patch(
             "PySide2.QtCore.QTimer.start", autospec=True
         ) as _st, patch("PySide2.QtWidgets.QToolTip.showText") as _sh, patch(
-            "physbiblio.database.Categories.getByID",
-            return_value=[{"idCat": 0, "name": "main"}],
+            "physbiblio.database.Categories.getGraph",
+            return_value=self.catsGraph,
+            autospec=True,
+        ) as _gg, patch(
+            "physbiblio.database.CatsEntries.countByCatTree",
+            return_value=40,
             autospec=True,
-        ) as _gbi, patch(
-            "physbiblio.database.CatsEntries.countByCat", return_value=33, autospec=True
-        ) as _cb, patch(
-            "physbiblio.database.CatsExps.countByCat", return_value=12, autospec=True
-        ) as _ce:
+        ) as _ct:
             self.assertEqual(ctw.handleItemEntered(ix), None)
             _sh.assert_called_once_with(QCursor.pos(), "", ctw.tree.viewport())
 
@@ -1319,8 +1317,8 @@ class TestCatsTreeWindow(GUITestCase):
             return_value=self.cathier,
             autospec=True,
         ) as _gh, patch(
-            "physbiblio.database.Categories.getAll",
-            return_value=self.cats,
+            "physbiblio.database.Categories.getGraph",
+            return_value=self.catsGraph,
             autospec=True,
         ) as _gh, patch(
             "physbiblio.gui.catWindows.CatsTreeWindow._populateTree",
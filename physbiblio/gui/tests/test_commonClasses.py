@@ -709,19 +709,37 @@ class TestPBTableModel(GUITestCase):
         """Test addImage"""
         p = ObjListWindow()
         mtm = PBTableModel(p, ["a", "b"])
-        img = mtm.addImage(":/images/edit.png", 51)
-        self.assertIsInstance(img, QPixmap)
-        self.assertEqual(img.height(), 51)
-        img = mtm.addImage(":/images/nonexistent", 51)
-        self.assertTrue(img.isNull())
+        with patch.dict(PBTableModel.pixmapCache, {}, clear=True):
+            img = mtm.addImage(":/images/edit.png", 51)
+            self.assertIsInstance(img, QPixmap)
+            self.assertEqual(img.height(), 51)
+            self.assertEqual(
+                PBTableModel.pixmapCache, {(":/images/edit.png", 51): img}
+            )
+            with patch(
+                "physbiblio.gui.commonClasses.QPixmap", autospec=True
+            ) as _qpm:
+                self.assertEqual(mtm.addImage(":/images/edit.png", 51), img)
+                self.assertEqual(_qpm.call_count, 0)
+            img = mtm.addImage(":/images/nonexistent", 51)
+            self.assertTrue(img.isNull())
 
     def test_addImages(self):
         """Test addImages"""
         p = ObjListWindow()
         mtm = PBTableModel(p, ["a", "b"])
+        PBTableModel.pixmapCache.clear()
         qp = mtm.addImages([":/images/edit.png", ":/images/find.png"], 31)
         self.assertIsInstance(qp, QPixmap)
         self.assertEqual(qp.height(), 31)
+        self.assertEqual(
+            PBTableModel.pixmapCache,
+            {((":/images/edit.png", ":/images/find.png"), 31, 48): qp},
+        )
+        self.assertEqual(
+            mtm.addImages([":/images/edit.png", ":/images/find.png"], 31), qp
+        )
+        PBTableModel.pixmapCache.clear()
         basepixm = QPixmap(96, 48)
         qpixm = QPixmap(":/images/edit.png")
         painter = QPainter(basepixm)
@@ -3,6 +3,7 @@
 
 This file is part of the physbiblio package.
 """
+import datetime
 import os
 import sys
 import traceback
@@ -61,7 +62,9 @@ class TestMainWindow(GUITestCase):
             self.modName + ".Thread_checkUpdated",
             autospec=USE_AUTOSPEC_CLASS,
             return_value=tcu,
-        ) as _cu:
+        ) as _cu, patch(
+            self.clsName + ".refreshPDFSummary", autospec=True
+        ) as _rps:
             mw = MainWindow()
             _ca.assert_called_once_with(mw)
             _mt.assert_called_once_with(mw)
@@ -70,8 +73,10 @@ class TestMainWindow(GUITestCase):
             _sb.assert_called_once_with(mw)
             _cu.assert_called_once_with(mw)
             tcu.start.assert_called_once_with()
+            _rps.assert_called_once_with(mw)
             mw1 = MainWindow(testing=True)
             _ca.assert_called_once_with(mw)
+            _rps.assert_called_once_with(mw)
         with patch(self.clsName + ".printNewVersion", autospec=True) as _pnw:
             mw.checkUpdated.result.emit(True, "0.0.0")
             _pnw.assert_called_once_with(mw, True, "0.0.0")
@@ -82,6 +87,7 @@ class TestMainWindow(GUITestCase):
         self.assertIsInstance(mw.mainStatusBar, QStatusBar)
         self.assertEqual(mw.lastAuthorStats, None)
         self.assertEqual(mw.lastPaperStats, None)
+        self.assertIsNone(mw1.pdfSummaryThread)
         self.assertIsInstance(mw.bibtexListWindows, list)
         self.assertIsInstance(mw.tabWidget, QTabWidget)
         self.assertTrue(mw.tabWidget.tabBarAutoHide())
@@ -474,6 +480,13 @@ class TestMainWindow(GUITestCase):
             s="Ctrl+Shift+B",
         )
 
+        assertAction(
+            self.mainW.findDuplicatesAct,
+            "Find &duplicates",
+            "Find the entries which are possibly duplicated in the database",
+            "findDuplicates",
+        )
+
         assertAction(
             self.mainW.infoFromArxivAct,
             "Info from ar&Xiv",
@@ -571,6 +584,13 @@ class TestMainWindow(GUITestCase):
             "cleanSparePDF",
         )
 
+        assertAction(
+            self.mainW.maintainDBAct,
+            "&Maintain database",
+            "Check the integrity of the database file and reclaim the unused space",
+            "maintainDB",
+        )
+
     def test_createMenusAndToolBar(self):
         """test createMenusAndToolBar"""
 
@@ -618,6 +638,7 @@ class TestMainWindow(GUITestCase):
                 self.mainW.cleanAllBibtexsAct,
                 self.mainW.cleanAllBibtexsAskAct,
                 self.mainW.findBadBibtexsAct,
+                self.mainW.findDuplicatesAct,
                 None,
                 self.mainW.infoFromArxivAct,
                 self.mainW.updateAllBibtexsAct,
@@ -649,6 +670,7 @@ class TestMainWindow(GUITestCase):
                 None,
                 self.mainW.cleanSpareAct,
                 self.mainW.cleanSparePDFAct,
+                self.mainW.maintainDBAct,
                 None,
                 self.mainW.authorStatsAct,
             ],
@@ -1418,10 +1440,51 @@ class TestMainWindow(GUITestCase):
         mb.setIconPixmap.assert_called_once_with("qpm")
         mb.exec_.assert_called_once_with()
 
+    def test_refreshPDFSummary(self):
+        """test refreshPDFSummary"""
+        mainW = MainWindow(testing=True)
+        self.assertIsNone(mainW.pdfSummaryThread)
+        thr = Thread_pdfFolderSummary(mainW)
+        thr.start = MagicMock()
+        thr.isRunning = MagicMock(return_value=True)
+        with patch(
+            self.modName + ".Thread_pdfFolderSummary",
+            autospec=USE_AUTOSPEC_CLASS,
+            return_value=thr,
+        ) as _t:
+            mainW.refreshPDFSummary()
+            _t.assert_called_once_with(mainW)
+            thr.start.assert_called_once_with()
+            self.assertEqual(mainW.pdfSummaryThread, thr)
+            mainW.refreshPDFSummary()
+            _t.assert_called_once_with(mainW)
+            thr.start.assert_called_once_with()
+            thr.isRunning.return_value = False
+            mainW.refreshPDFSummary()
+            self.assertEqual(_t.call_count, 2)
+            self.assertEqual(thr.start.call_count, 2)
+
     def test_showDBStats(self):
         """test showDBStats"""
         dbStats(pBDB)
         mb = MagicMock()
+        summary = {
+            "folder": pBPDF.pdfDir,
+            "files": 2,
+            "size": 4096**2,
+            "time": datetime.datetime(2020, 1, 2, 3, 4, 5),
+        }
+        statsText = (
+            "The PhysBiblio database currently contains "
+            + "the following number of records:\n"
+            + "- %d bibtex entries\n" % (pBDB.stats["bibs"])
+            + "- %d categories\n" % (pBDB.stats["cats"])
+            + "- %d experiments,\n" % (pBDB.stats["exps"])
+            + "- %d bibtex entries to categories connections\n" % (pBDB.stats["catBib"])
+            + "- %d experiment to categories connections\n" % (pBDB.stats["catExp"])
+            + "- %d bibtex entries to experiment connections.\n\n"
+            % (pBDB.stats["bibExp"])
+        )
         with patch(
             self.modName + ".QMessageBox", return_value=mb, autospec=True
         ) as _mb, patch(
@@ -1429,34 +1492,83 @@ class TestMainWindow(GUITestCase):
         ) as _qpm, patch(
             self.modName + ".dbStats", autospec=True
         ) as _dbs, patch(
-            "physbiblio.pdf.LocalPDF.dirSize", autospec=True, return_value=4096 ** 2
+            "physbiblio.pdf.LocalPDF.getFolderSummary",
+            autospec=True,
+            return_value=summary,
+        ) as _gs, patch(
+            "physbiblio.pdf.LocalPDF.dirSize", autospec=True
         ) as _ds, patch(
-            "physbiblio.pdf.LocalPDF.numberOfFiles", autospec=True, return_value=2
-        ) as _ig:
+            "physbiblio.pdf.LocalPDF.numberOfFiles", autospec=True
+        ) as _ig, patch(
+            self.clsName + ".refreshPDFSummary", autospec=True
+        ) as _rps:
             mbox = self.mainW.showDBStats()
             _dbs.assert_called_once_with(pBDB)
-            _ig.assert_called_once_with(pBPDF, pBPDF.pdfDir)
-            _ds.assert_called_once_with(pBPDF, pBPDF.pdfDir)
+            _gs.assert_called_once_with(pBPDF)
+            self.assertEqual(_ig.call_count, 0)
+            self.assertEqual(_ds.call_count, 0)
             _mb.assert_called_once_with(
                 _mb.Information,
                 "PhysBiblio database statistics",
-                "The PhysBiblio database currently contains "
-                + "the following number of records:\n"
-                + "- %d bibtex entries\n" % (pBDB.stats["bibs"])
-                + "- %d categories\n" % (pBDB.stats["cats"])
-                + "- %d experiments,\n" % (pBDB.stats["exps"])
-                + "- %d bibtex entries to categories connections\n"
-                % (pBDB.stats["catBib"])
-                + "- %d experiment to categories connections\n" % (pBDB.stats["catExp"])
-                + "- %d bibtex entries to experiment connections.\n\n"
-                % (pBDB.stats["bibExp"])
+                statsText
                 + "The number of currently stored PDF files is 2.\n"
-                + "The size of the PDF folder is 16.00MB.",
+                + "The size of the PDF folder is 16.00MB."
+                + "\n(PDF folder scanned at 2020-01-02 03:04)",
                 parent=self.mainW,
             )
             _qpm.assert_called_once_with(":/images/icon.png")
+            _rps.assert_called_once_with(self.mainW)
         mb.setIconPixmap.assert_called_once_with("qpm")
-        mb.show.assert_called_once_with()
+        mb.exec_.assert_called_once_with()
+        mb.show.assert_not_called()
+        with patch(
+            self.modName + ".QMessageBox", return_value=mb, autospec=True
+        ) as _mb, patch(self.modName + ".QPixmap", autospec=True) as _qpm, patch(
+            self.modName + ".dbStats", autospec=True
+        ) as _dbs, patch(
+            "physbiblio.pdf.LocalPDF.getFolderSummary",
+            autospec=True,
+            return_value=None,
+        ) as _gs, patch(
+            self.clsName + ".refreshPDFSummary", autospec=True
+        ) as _rps:
+            mbox = self.mainW.showDBStats()
+            _mb.assert_called_once_with(
+                _mb.Information,
+                "PhysBiblio database statistics",
+                statsText
+                + "The number of currently stored PDF files is not available "
+                + "yet (the PDF folder is being scanned).\n"
+                + "The size of the PDF folder is not available "
+                + "yet (the PDF folder is being scanned).",
+                parent=self.mainW,
+            )
+            _rps.assert_called_once_with(self.mainW)
+        with patch(
+            self.modName + ".QMessageBox", return_value=mb, autospec=True
+        ) as _mb, patch(self.modName + ".QPixmap", autospec=True) as _qpm, patch(
+            self.modName + ".dbStats", autospec=True
+        ) as _dbs, patch(
+            "physbiblio.pdf.LocalPDF.getFolderSummary",
+            autospec=True,
+            return_value=summary,
+        ) as _gs, patch(
+            self.clsName + ".refreshPDFSummary", autospec=True
+        ) as _rps, patch.object(
+            pBDB.profiler, "enabled", new=True
+        ), patch(
+            "physbiblio.databaseCore.QueryProfiler.report",
+            return_value="1 statements",
+            autospec=True,
+        ) as _r:
+            mbox = self.mainW.showDBStats()
+            _r.assert_called_once_with(pBDB.profiler)
+            self.assertTrue(
+                _mb.call_args[0][2].endswith(
+                    "\n(PDF folder scanned at 2020-01-02 03:04)"
+                    + "\n\nStatistics on the database queries:\n1 statements"
+                )
+            )
 
     def test_runInThread(self):
         """test _runInThread"""
@@ -1477,8 +1589,18 @@ class TestMainWindow(GUITestCase):
         thr.start = MagicMock()
         thr.finished = MagicMock()
         thr.finished.connect = MagicMock()
+        thr.isFinished = MagicMock(return_value=True)
         func = MagicMock(return_value=thr)
         with patch(
+            "physbiblio.databaseCore.PhysBiblioDBCore.closeThreadCursors",
+            autospec=True,
+        ) as _ctc, patch(
+            "physbiblio.databaseCore.PhysBiblioDBCore.checkUncommitted",
+            return_value=False,
+            autospec=True,
+        ) as _cu, patch(
+            self.clsName + ".mainWindowTitle", autospec=True
+        ) as _mwt, patch(
             self.modName + ".PrintText", return_value=app, autospec=USE_AUTOSPEC_CLASS
         ) as _pt, patch(
             "physbiblio.gui.dialogWindows.PrintText.progressBarMin", autospec=True
@@ -1514,6 +1636,9 @@ class TestMainWindow(GUITestCase):
             app.exec_.assert_called_once_with()
             _info.assert_called_once_with("Closing...")
             _rth.assert_called_once_with(pBErrorManager)
+            _ctc.assert_called_once_with(pBDB)
+            _cu.assert_called_once_with(pBDB)
+            _mwt.assert_not_called()
             self.assertEqual(_sbm.call_count, 0)
             _done.assert_called_once_with(self.mainW)
         app.reject = MagicMock()
@@ -1531,6 +1656,12 @@ class TestMainWindow(GUITestCase):
         thr.start.reset_mock()
         app.exec_.reset_mock()
         with patch(
+            "physbiblio.databaseCore.PhysBiblioDBCore.checkUncommitted",
+            return_value=True,
+            autospec=True,
+        ) as _cu, patch(
+            self.clsName + ".mainWindowTitle", autospec=True
+        ) as _mwt, patch(
             self.modName + ".PrintText", return_value=app, autospec=USE_AUTOSPEC_CLASS
         ) as _pt, patch(
             "physbiblio.gui.dialogWindows.PrintText.progressBarMin", autospec=True
@@ -1574,6 +1705,7 @@ class TestMainWindow(GUITestCase):
             app.exec_.assert_called_once_with()
             _info.assert_has_calls([call("add"), call("Closing...")])
             _rth.assert_called_once_with(pBErrorManager)
+            _mwt.assert_called_once_with(self.mainW, mwstr.winTitleModified)
             _sbm.assert_called_once_with(self.mainW, "out")
             self.assertEqual(_done.call_count, 0)
 
@@ -1640,6 +1772,49 @@ class TestMainWindow(GUITestCase):
                 ws, parent=self.mainW, pbMax=pt.pbMax.emit, pbVal=pt.pbVal.emit
             )
 
+    def test_maintainDB(self):
+        """test maintainDB"""
+        with patch(self.clsName + "._runInThread", autospec=True) as _rit, patch(
+            self.modName + ".askYesNo", return_value=True, autospec=True
+        ) as _a, patch(
+            "physbiblio.database.PhysBiblioDB.checkUncommitted",
+            return_value=False,
+            autospec=True,
+        ) as _cu:
+            self.mainW.maintainDB()
+            _rit.assert_called_once_with(
+                self.mainW, Thread_maintainDB, "Maintain database", True
+            )
+            _a.assert_called_once_with(
+                "Do you want to rebuild the whole database file?\n"
+                + "It may take longer, but the space is reclaimed at once."
+            )
+        with patch(self.clsName + "._runInThread", autospec=True) as _rit, patch(
+            self.modName + ".askYesNo", side_effect=[True, False], autospec=True
+        ) as _a, patch(
+            "physbiblio.database.PhysBiblioDB.checkUncommitted",
+            return_value=True,
+            autospec=True,
+        ) as _cu:
+            self.mainW.maintainDB()
+            _rit.assert_called_once_with(
+                self.mainW, Thread_maintainDB, "Maintain database", False
+            )
+            self.assertEqual(_a.call_count, 2)
+        with patch(self.clsName + "._runInThread", autospec=True) as _rit, patch(
+            self.modName + ".askYesNo", return_value=False, autospec=True
+        ) as _a, patch(
+            "physbiblio.database.PhysBiblioDB.checkUncommitted",
+            return_value=True,
+            autospec=True,
+        ) as _cu:
+            self.mainW.maintainDB()
+            self.assertEqual(_rit.call_count, 0)
+            _a.assert_called_once_with(
+                "The maintenance will save the unsaved changes to the database. "
+                + "Do you want to continue?"
+            )
+
     def test_createStatusBar(self):
         """test createStatusBar"""
         with patch(self.modName + ".QStatusBar.showMessage", autospec=True) as _sm:
@@ -3045,6 +3220,39 @@ class TestMainWindow(GUITestCase):
             )
             _uab.assert_called_once_with(self.mainW, 12, force=False)
 
+        with patch(
+            self.modName + ".askYesNo", side_effect=[False, True], autospec=True
+        ) as _ay, patch(
+            "physbiblio.database.Entries.getOAICheckpoint",
+            return_value='["2018-01-01","abc"]',
+            autospec=True,
+        ) as _gc, patch(
+            self.modName + ".askGenericText", autospec=True
+        ) as _agt, patch(
+            self.clsName + ".updateAllBibtexs", autospec=True
+        ) as _uab:
+            self.assertEqual(self.mainW.updateAllBibtexsAsk(), None)
+            _ay.assert_called_with(
+                "A previous update of all the bibtexs was interrupted "
+                + "after the entry 'abc'.\nDo you want to resume it?",
+                "Resume update?",
+            )
+            self.assertEqual(_agt.call_count, 0)
+            _uab.assert_called_once_with(self.mainW, 0, force=False, resume=True)
+        with patch(
+            self.modName + ".askYesNo", side_effect=[True, False], autospec=True
+        ) as _ay, patch(
+            "physbiblio.database.Entries.getOAICheckpoint",
+            return_value='["2018-01-01","abc"]',
+            autospec=True,
+        ) as _gc, patch(
+            self.modName + ".askGenericText", return_value=["12", True], autospec=True
+        ) as _agt, patch(
+            self.clsName + ".updateAllBibtexs", autospec=True
+        ) as _uab:
+            self.assertEqual(self.mainW.updateAllBibtexsAsk(), None)
+            _uab.assert_called_once_with(self.mainW, 12, force=True)
+
     def test_updateAllBibtexs(self):
         """test updateAllBibtexs"""
         with patch(self.clsName + ".statusBarMessage", autospec=True) as _sbm, patch(
@@ -3064,6 +3272,7 @@ class TestMainWindow(GUITestCase):
                 force=False,
                 minProgress=0.0,
                 reloadAll=False,
+                resume=False,
                 stopFlag=True,
                 useEntries=None,
             )
@@ -3072,7 +3281,11 @@ class TestMainWindow(GUITestCase):
             self.clsName + "._runInThread", autospec=True
         ) as _rit, patch(self.clsName + ".refreshMainContent", autospec=True) as _rmc:
             self.mainW.updateAllBibtexs(
-                startFrom=12, useEntries="abc", force=True, reloadAll=True
+                startFrom=12,
+                useEntries="abc",
+                force=True,
+                reloadAll=True,
+                resume=True,
             )
             _sbm.assert_called_once_with(
                 self.mainW, "Starting update of bibtexs from 12..."
@@ -3085,6 +3298,7 @@ class TestMainWindow(GUITestCase):
                 force=True,
                 minProgress=0.0,
                 reloadAll=True,
+                resume=True,
                 stopFlag=True,
                 useEntries="abc",
             )
@@ -3118,6 +3332,7 @@ class TestMainWindow(GUITestCase):
                 pbMax=pt.pbMax.emit,
                 pbVal=pt.pbVal.emit,
                 reloadAll=True,
+                resume=False,
                 useEntries="abc",
             )
 
@@ -3619,8 +3834,8 @@ class TestMainWindow(GUITestCase):
         self.mainW.selectedCats = [0, 1, 2]
         self.mainW.selectedExps = [0, 1]
         with patch(
-            "physbiblio.database.Categories.getByEntry",
-            return_value=[[0]],
+            "physbiblio.database.Categories.getDictByEntries",
+            return_value={"a": [[0]], "b": [[0]], "c": [[0]], "d": [[0]]},
             autospec=True,
         ) as _gbe, patch(
             self.modName + ".CatsTreeWindow",
@@ -3638,14 +3853,7 @@ class TestMainWindow(GUITestCase):
             "physbiblio.database.EntryExps.insert", autospec=True
         ) as _bei:
             self.mainW.askCatsForEntries(["a", "b", "c", "d"])
-            _gbe.assert_has_calls(
-                [
-                    call(pBDB.cats, "a"),
-                    call(pBDB.cats, "b"),
-                    call(pBDB.cats, "c"),
-                    call(pBDB.cats, "d"),
-                ]
-            )
+            _gbe.assert_called_once_with(pBDB.cats, ["a", "b", "c", "d"])
             _ctw.assert_has_calls(
                 [
                     call(askCats=True, askForBib="a", parent=self.mainW, previous=[0]),
@@ -3965,8 +4173,8 @@ class TestMainWindow(GUITestCase):
             side_effect=["data1", "data2", {"bibkey": ""}],
             autospec=True,
         ) as _pi, patch(
-            "physbiblio.database.Entries.insert",
-            side_effect=[True, False, True, True],
+            "physbiblio.database.Entries.insertMany",
+            return_value=[True, False],
             autospec=True,
         ) as _bi, patch(
             "physbiblio.database.CatsEntries.delete", autospec=True
@@ -4011,7 +4219,7 @@ class TestMainWindow(GUITestCase):
                     ),
                 ]
             )
-            _bi.assert_has_calls([call(pBDB.bibs, "data1"), call(pBDB.bibs, "data2")])
+            _bi.assert_called_once_with(pBDB.bibs, ["data1", "data2"])
             _wa.assert_has_calls([call("Failed in inserting entry 'b'\n")])
             _wa.assert_has_calls(
                 [call("Failed in inserting entry 'e'. Corrupted bibtex?\n")]
@@ -4102,8 +4310,8 @@ class TestMainWindow(GUITestCase):
             side_effect=["data1", "data2"],
             autospec=True,
         ) as _pi, patch(
-            "physbiblio.database.Entries.insert",
-            side_effect=[True, True],
+            "physbiblio.database.Entries.insertMany",
+            return_value=[True, True],
             autospec=True,
         ) as _bi, patch(
             "physbiblio.database.Entries.setBook", autospec=True
@@ -4144,7 +4352,7 @@ class TestMainWindow(GUITestCase):
                     ),
                 ]
             )
-            _bi.assert_has_calls([call(pBDB.bibs, "data1"), call(pBDB.bibs, "data2")])
+            _bi.assert_called_once_with(pBDB.bibs, ["data1", "data2"])
             self.assertEqual(_wa.call_count, 0)
             _sbm.assert_called_once_with(
                 self.mainW, "Entries successfully imported: ['a', 'b']"
@@ -4209,8 +4417,8 @@ class TestMainWindow(GUITestCase):
             side_effect=["data1", "data2"],
             autospec=True,
         ) as _pi, patch(
-            "physbiblio.database.Entries.insert",
-            side_effect=[True, True],
+            "physbiblio.database.Entries.insertMany",
+            return_value=[True, True],
             autospec=True,
         ) as _bi, patch(
             "physbiblio.database.Entries.setBook", autospec=True
@@ -4253,7 +4461,7 @@ class TestMainWindow(GUITestCase):
                     ),
                 ]
             )
-            _bi.assert_has_calls([call(pBDB.bibs, "data1"), call(pBDB.bibs, "data2")])
+            _bi.assert_called_once_with(pBDB.bibs, ["data1", "data2"])
             _wa.assert_called_once_with("Failed in completing info for entry 'b'\n")
             _sbm.assert_called_once_with(
                 self.mainW, "Entries successfully imported: ['a']"
@@ -4314,8 +4522,8 @@ class TestMainWindow(GUITestCase):
             side_effect=[{"data": "1"}, {"data": "2"}],
             autospec=True,
         ) as _pi, patch(
-            "physbiblio.database.Entries.insert",
-            side_effect=[True, True],
+            "physbiblio.database.Entries.insertMany",
+            return_value=[True, True],
             autospec=True,
         ) as _bi, patch(
             "physbiblio.database.Entries.setBook", autospec=True
@@ -4358,11 +4566,9 @@ class TestMainWindow(GUITestCase):
                     ),
                 ]
             )
-            _bi.assert_has_calls(
-                [
-                    call(pBDB.bibs, {"data": "1", "ads": "a"}),
-                    call(pBDB.bibs, {"data": "2", "ads": "b"}),
-                ]
+            _bi.assert_called_once_with(
+                pBDB.bibs,
+                [{"data": "1", "ads": "a"}, {"data": "2", "ads": "b"}],
             )
             _wa.assert_called_once_with("Failed in completing info for entry 'b'\n")
             _sbm.assert_has_calls(
@@ -4624,6 +4830,113 @@ class TestMainWindow(GUITestCase):
                 useEntries=["abc"],
             )
 
+    def test_findDuplicates(self):
+        """test findDuplicates"""
+        mainW = MainWindow(testing=True)
+        with patch(self.clsName + "._runInThread", autospec=True) as _rit, patch(
+            self.modName + ".infoMessage", autospec=True
+        ) as _im, patch(self.clsName + ".reloadMainContent", autospec=True) as _rmc:
+            mainW.findDuplicates()
+            _rit.assert_called_once_with(
+                mainW, Thread_findDuplicates, "Find duplicates", minProgress=0.0
+            )
+            _im.assert_called_once_with("No duplicated entries found!")
+            self.assertEqual(_rmc.call_count, 0)
+
+        def patcher(*args, **kwargs):
+            mainW.duplicates = [
+                {"bibkeys": ["a", "b", "c"], "matches": ["doi", "fingerprint"]},
+                {"bibkeys": ["d", "e", "g"], "matches": ["arxiv"]},
+            ]
+
+        def entry(key, doi="", arxiv="", fingerprint=""):
+            return {
+                "bibkey": key,
+                "doi": doi,
+                "arxiv": arxiv,
+                "inspire": "",
+                "fingerprint": fingerprint,
+            }
+
+        mainW._runInThread = patcher
+        ea = entry("a", doi="1/2", fingerprint="f1")
+        eb = entry("b", doi="1/2", fingerprint="f2")
+        ec = entry("c", fingerprint="f2")
+        ed = entry("d", arxiv="1234.5678")
+        ee = entry("e", doi="3/4")
+        em = entry("m", doi="1/2", fingerprint="f2")
+        with patch(
+            self.modName + ".askYesNo", return_value=False, autospec=True
+        ) as _ay, patch(self.modName + ".infoMessage", autospec=True) as _im, patch(
+            "physbiblio.database.Entries.getByBibkey",
+            return_value=[ea, eb, ec, ed, ee],
+            autospec=True,
+        ) as _gbb, patch(
+            self.clsName + ".reloadMainContent", autospec=True
+        ) as _rmc, patch(
+            "physbiblio.gui.bibWindows.CommonBibActions.onMerge", autospec=True
+        ) as _om:
+            mainW.findDuplicates()
+            self.assertEqual(_im.call_count, 0)
+            _gbb.assert_called_once_with(
+                pBDB.bibs, ["a", "b", "c", "d", "e", "g"], saveQuery=False
+            )
+            _rmc.assert_called_once_with(mainW, [ea, eb, ec, ed, ee])
+            _ay.assert_called_once_with(
+                "2 groups of possibly duplicated entries found. "
+                + "Do you want to merge them one pair at a time?"
+            )
+            self.assertEqual(_om.call_count, 0)
+        with patch(
+            self.modName + ".askYesNo",
+            side_effect=[True, True, True, False],
+            autospec=True,
+        ) as _ay, patch(
+            "physbiblio.database.Entries.getByBibkey",
+            side_effect=[[ea, eb, ec, ed, ee], [ea, eb], [em, ec], [ed, ee], [ed]],
+            autospec=True,
+        ) as _gbb, patch(
+            self.clsName + ".reloadMainContent", autospec=True
+        ) as _rmc, patch(
+            "physbiblio.gui.bibWindows.CommonBibActions.onMerge",
+            side_effect=["m", "n"],
+            autospec=True,
+        ) as _om:
+            mainW.findDuplicates()
+            self.assertEqual(
+                _gbb.call_args_list,
+                [
+                    call(pBDB.bibs, ["a", "b", "c", "d", "e", "g"], saveQuery=False),
+                    call(pBDB.bibs, ["a", "b"], saveQuery=False),
+                    call(pBDB.bibs, ["m", "c"], saveQuery=False),
+                    call(pBDB.bibs, ["d", "e"], saveQuery=False),
+                    call(pBDB.bibs, ["d", "g"], saveQuery=False),
+                ],
+            )
+            self.assertEqual(
+                _ay.call_args_list,
+                [
+                    call(
+                        "2 groups of possibly duplicated entries found. "
+                        + "Do you want to merge them one pair at a time?"
+                    ),
+                    call(
+                        "'a' and 'b' have the same doi. " + "Do you want to merge them?"
+                    ),
+                    call(
+                        "'m' and 'c' have the same fingerprint. "
+                        + "Do you want to merge them?"
+                    ),
+                    call(
+                        "'d' and 'e' are in the same group of possible "
+                        + "duplicates (through arxiv). Do you want to merge them?"
+                    ),
+                ],
+            )
+            self.assertEqual(_om.call_count, 2)
+            self.assertEqual(_om.call_args_list[0][0][0].bibs, [ea, eb])
+            self.assertEqual(_om.call_args_list[1][0][0].bibs, [em, ec])
+
     def test_infoFromArxiv(self):
         """test infoFromArxiv"""
         ffa = FieldsFromArxiv()
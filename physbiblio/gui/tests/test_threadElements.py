@@ -28,6 +28,7 @@ try:
     from physbiblio.gui.setuptests import *
     from physbiblio.gui.threadElements import *
     from physbiblio.inspireStats import pBStats
+    from physbiblio.pdf import pBPDF
     from physbiblio.setuptests import *
 except ImportError:
     print("Could not find physbiblio and its modules!")
@@ -101,6 +102,27 @@ class Test_Thread_checkUpdated(GUITestCase):
             )
 
 
+@unittest.skipIf(skipTestsSettings.gui, "GUI tests")
+class Test_Thread_pdfFolderSummary(GUITestCase):
+    """Test the functions in threadElements.Thread_pdfFolderSummary"""
+
+    def test_init(self):
+        """test __init__"""
+        p = QWidget()
+        thr = Thread_pdfFolderSummary(p)
+        self.assertIsInstance(thr, PBThread)
+        self.assertEqual(thr.parent(), p)
+        self.assertRaises(NotImplementedError, thr.setStopFlag)
+
+    def test_run(self):
+        """test run"""
+        p = QWidget()
+        thr = Thread_pdfFolderSummary(p)
+        with patch("physbiblio.pdf.LocalPDF.updateFolderSummary", autospec=True) as _u:
+            thr.run()
+            _u.assert_called_once_with(pBPDF)
+
+
 @unittest.skipIf(skipTestsSettings.gui, "GUI tests")
 class Test_Thread_updateAllBibtexs(GUITestCase):
     """Test the functions in threadElements.Thread_updateAllBibtexs"""
@@ -120,6 +142,9 @@ class Test_Thread_updateAllBibtexs(GUITestCase):
         self.assertEqual(thr.reloadAll, "r")
         self.assertEqual(thr.pbMax, "m")
         self.assertEqual(thr.pbVal, "v")
+        self.assertEqual(thr.resume, False)
+        thr = Thread_updateAllBibtexs(ws, 123, p, resume=True)
+        self.assertEqual(thr.resume, True)
 
     def test_run(self):
         """test run"""
@@ -127,7 +152,7 @@ class Test_Thread_updateAllBibtexs(GUITestCase):
         q = Queue()
         ws = WriteStream(q)
         thr = Thread_updateAllBibtexs(
-            ws, 123, p, [[]], True, True, pbMax="m", pbVal="v"
+            ws, 123, p, [[]], True, True, pbMax="m", pbVal="v", resume="r"
         )
         self.assertTrue(ws.running)
         with patch(
@@ -144,6 +169,7 @@ class Test_Thread_updateAllBibtexs(GUITestCase):
                 reloadAll=True,
                 pbMax="m",
                 pbVal="v",
+                resume="r",
             )
             self.assertFalse(ws.running)
             _st.assert_called_once_with(ws)
@@ -639,6 +665,49 @@ class Test_Thread_findBadBibtexs(GUITestCase):
         self.assertFalse(pBDB.bibs.runningFindBadBibtexs)
 
 
+@unittest.skipIf(skipTestsSettings.gui, "GUI tests")
+class Test_Thread_findDuplicates(GUITestCase):
+    """Test the functions in threadElements.Thread_findDuplicates"""
+
+    def test_init(self):
+        """test __init__"""
+        p = QWidget()
+        q = Queue()
+        ws = WriteStream(q)
+        thr = Thread_findDuplicates(ws, p, pbMax="m", pbVal="v")
+        self.assertIsInstance(thr, PBThread)
+        self.assertEqual(thr.parent(), p)
+        self.assertEqual(thr.receiver, ws)
+        self.assertEqual(thr.pbMax, "m")
+        self.assertEqual(thr.pbVal, "v")
+        self.assertFalse(p.duplicates)
+        self.assertRaises(Exception, lambda: Thread_findDuplicates(ws, None))
+        self.assertRaises(NotImplementedError, thr.setStopFlag)
+
+    def test_run(self):
+        """test run"""
+        p = QWidget()
+        q = Queue()
+        ws = WriteStream(q)
+        thr = Thread_findDuplicates(ws, p, pbMax="m", pbVal="v")
+        self.assertTrue(ws.running)
+        with patch(
+            "physbiblio.database.Entries.findDuplicates",
+            return_value=[{"bibkeys": ["a", "b"], "matches": ["doi"]}],
+            autospec=True,
+        ) as _fun, patch("time.sleep") as _sl, patch(
+            "physbiblio.gui.commonClasses.WriteStream.start", autospec=True
+        ) as _st:
+            thr.run()
+            _fun.assert_called_once_with(pBDB.bibs, pbMax="m", pbVal="v")
+            self.assertEqual(
+                p.duplicates, [{"bibkeys": ["a", "b"], "matches": ["doi"]}]
+            )
+            self.assertFalse(ws.running)
+            _st.assert_called_once_with(ws)
+            _sl.assert_called_once_with(0.1)
+
+
 @unittest.skipIf(skipTestsSettings.gui, "GUI tests")
 class Test_Thread_importFromBib(GUITestCase):
     """Test the functions in threadElements.Thread_importFromBib"""
@@ -857,6 +926,42 @@ class Test_Thread_cleanSparePDF(GUITestCase):
             _st.assert_called_once_with(ws)
 
 
+@unittest.skipIf(skipTestsSettings.gui, "GUI tests")
+class Test_Thread_maintainDB(GUITestCase):
+    """Test the functions in threadElements.Thread_maintainDB"""
+
+    def test_init(self):
+        """test __init__"""
+        p = QWidget()
+        q = Queue()
+        ws = WriteStream(q)
+        thr = Thread_maintainDB(ws, True, p, pbMax="max", pbVal="val")
+        self.assertIsInstance(thr, PBThread)
+        self.assertEqual(thr.parent(), p)
+        self.assertEqual(thr.receiver, ws)
+        self.assertTrue(thr.full)
+        self.assertEqual(thr.pbMax, "max")
+        self.assertEqual(thr.pbVal, "val")
+        self.assertRaises(NotImplementedError, thr.setStopFlag)
+
+    def test_run(self):
+        """test run"""
+        p = QWidget()
+        q = Queue()
+        ws = WriteStream(q)
+        thr = Thread_maintainDB(ws, False, p, pbMax="max", pbVal="val")
+        self.assertTrue(ws.running)
+        with patch(
+            "physbiblio.database.PhysBiblioDB.maintain", autospec=True
+        ) as _fun, patch(
+            "physbiblio.gui.commonClasses.WriteStream.start", autospec=True
+        ) as _st:
+            thr.run()
+            _fun.assert_called_once_with(pBDB, full=False, pbMax="max", pbVal="val")
+            self.assertFalse(ws.running)
+            _st.assert_called_once_with(ws)
+
+
 @unittest.skipIf(skipTestsSettings.gui, "GUI tests")
 class Test_Thread_fieldsArxiv(GUITestCase):
     """Test the functions in threadElements.Thread_fieldsArxiv"""
@@ -58,6 +58,16 @@ class Thread_checkUpdated(PBThread):
             )
 
 
+class Thread_pdfFolderSummary(PBThread):
+    """Thread that scans the PDF folder in the background,
+    using `pBPDF.updateFolderSummary`
+    """
+
+    def run(self):
+        """Run the thread, using `pBPDF.updateFolderSummary`"""
+        pBPDF.updateFolderSummary()
+
+
 class Thread_updateAllBibtexs(PBThread):
     """Thread that uses `pBDB.bibs.searchOAIUpdates`"""
 
@@ -71,6 +81,7 @@ class Thread_updateAllBibtexs(PBThread):
         reloadAll=False,
         pbMax=None,
         pbVal=None,
+        resume=False,
     ):
         """Initialize the thread and store the required settings
 
@@ -90,6 +101,8 @@ class Thread_updateAllBibtexs(PBThread):
                 of a progress bar in the GUI, if possible
             pbVal (callable, optional): a function to set the value
                 of a progress bar in the GUI, if possible
+            resume: resume the update from the saved checkpoint
+                (see `physbiblio.database.Entries.searchOAIUpdates`)
         """
         super(Thread_updateAllBibtexs, self).__init__(parent)
         self.startFrom = startFrom
@@ -99,6 +112,7 @@ class Thread_updateAllBibtexs(PBThread):
         self.reloadAll = reloadAll
         self.pbMax = pbMax
         self.pbVal = pbVal
+        self.resume = resume
 
     def run(self):
         """Start the receiver,
@@ -112,6 +126,7 @@ class Thread_updateAllBibtexs(PBThread):
             reloadAll=self.reloadAll,
             pbMax=self.pbMax,
             pbVal=self.pbVal,
+            resume=self.resume,
         )
         time.sleep(0.1)
         self.receiver.running = False
@@ -513,6 +528,44 @@ class Thread_findBadBibtexs(PBThread):
         pBDB.bibs.runningFindBadBibtexs = False
 
 
+class Thread_findDuplicates(PBThread):
+    """Thread the execution of
+    `physbiblio.database.Entries.findDuplicates`
+    """
+
+    def __init__(self, receiver, parent, pbMax=None, pbVal=None):
+        """Instantiate the object
+
+        Parameters:
+            receiver: the receiver for the text output
+                (a `WriteStream` object)
+            parent: the parent widget. Cannot be None
+            pbMax (callable, optional): a function to set the maximum
+                of a progress bar in the GUI, if possible
+            pbVal (callable, optional): a function to set the value
+                of a progress bar in the GUI, if possible
+        """
+        super(Thread_findDuplicates, self).__init__(parent)
+        try:
+            self.parent().duplicates = False
+        except AttributeError:
+            raise Exception(thestr.errorInvalidParent % "Thread_findDuplicates")
+        self.receiver = receiver
+        self.pbMax = pbMax
+        self.pbVal = pbVal
+
+    def run(self):
+        """Start the receiver,
+        run `pBDB.bibs.findDuplicates` and finish
+        """
+        self.receiver.start()
+        self.parent().duplicates = pBDB.bibs.findDuplicates(
+            pbMax=self.pbMax, pbVal=self.pbVal
+        )
+        time.sleep(0.1)
+        self.receiver.running = False
+
+
 class Thread_importFromBib(PBThread):
     """Thread the execution of
     `physbiblio.database.Entries.importFromBib`
@@ -647,6 +700,39 @@ class Thread_cleanSpare(PBThread):
         self.receiver.running = False
 
 
+class Thread_maintainDB(PBThread):
+    """Thread the execution of
+    `physbiblio.database.PhysBiblioDB.maintain`
+    """
+
+    def __init__(self, receiver, full, parent=None, pbMax=None, pbVal=None):
+        """Instantiate the object
+
+        Parameters:
+            receiver: the receiver for the text output
+                (a `WriteStream` object)
+            full: rebuild the whole database file
+                (see `physbiblio.databaseCore.PhysBiblioDBCore.maintain`)
+            parent: the parent widget
+            pbMax (callable, optional): a function to set the maximum
+                of a progress bar in the GUI, if possible
+            pbVal (callable, optional): a function to set the value
+                of a progress bar in the GUI, if possible
+        """
+        super(Thread_maintainDB, self).__init__(parent)
+        self.receiver = receiver
+        self.full = full
+        self.pbMax = pbMax
+        self.pbVal = pbVal
+
+    def run(self):
+        """Start the receiver, run `pBDB.maintain` and finish"""
+        self.receiver.start()
+        pBDB.maintain(full=self.full, pbMax=self.pbMax, pbVal=self.pbVal)
+        time.sleep(0.1)
+        self.receiver.running = False
+
+
 class Thread_cleanSparePDF(PBThread):
     """Thread the execution of
     `physbiblio.pdf.LocalPDF.removeSparePDFFolders`
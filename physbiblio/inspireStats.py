@@ -26,7 +26,7 @@ try:
     from physbiblio.config import pbConfig
     from physbiblio.errors import pBLogger
     from physbiblio.strings.main import InspireStatsStrings as isstr
-    from physbiblio.webimport.webInterf import PBSession
+    from physbiblio.webimport.webInterf import pBSessionPool
 except ImportError:
     print("Could not find physbiblio and its modules!")
     print(traceback.format_exc())
@@ -63,8 +63,6 @@ class InspireStatsLoader:
         self.allInfoP = {}
         self.citingPapersList = [[], []]
 
-        self.http = PBSession()
-
     def changeBackend(self, wantBackend):
         """Changes the matplotlib backend currently in use.
 
@@ -89,7 +87,7 @@ class InspireStatsLoader:
         """
 
         def getSeries(url):
-            response = self.http.get(url, timeout=self.timeout)
+            response = pBSessionPool.session().get(url, timeout=self.timeout)
             text = response.content.decode("utf-8")
             try:
                 return json.loads(text)["hits"]["hits"]
@@ -2,6 +2,7 @@
 
 This file is part of the physbiblio package.
 """
+import datetime
 import os
 import os.path as osp
 import shutil
@@ -10,18 +11,14 @@ import sys
 import traceback
 
 import six
-
-if sys.version_info[0] < 3:
-    from urllib2 import HTTPError, URLError, urlopen
-else:
-    from urllib.request import HTTPError, URLError, urlopen
-
+from requests.exceptions import RequestException
 
 try:
     from physbiblio.config import pbConfig
     from physbiblio.database import pBDB
     from physbiblio.errors import pBLogger
     from physbiblio.strings.main import PDFStrings as pstr
+    from physbiblio.webimport.webInterf import pBSessionPool
 except ImportError:
     print("Could not find physbiblio and its modules!")
     print(traceback.format_exc())
@@ -42,6 +39,7 @@ class LocalPDF:
         self.checkFolderExists()
         self.pdfDir = pbConfig.params["pdfFolder"]
         self.pdfApp = pbConfig.params["pdfApplication"]
+        self.folderSummary = None
 
     def checkFolderExists(self):
         """Check if the PDF folder exists. If not, create it"""
@@ -222,14 +220,17 @@ class LocalPDF:
             return False
         pBLogger.info(pstr.downloading % url)
         try:
-            response = urlopen(url)
-        except (URLError, ConnectionError):
+            response = pBSessionPool.session().get(
+                url, timeout=float(pbConfig.params["timeoutWebSearch"])
+            )
+            response.raise_for_status()
+        except (RequestException, ConnectionError):
             pBLogger.exception(pstr.pdfNotFound % key + pstr.e404 % url)
             return False
         else:
             try:
                 with open(filename, "wb") as newF:
-                    newF.write(response.read())
+                    newF.write(response.content)
             except OSError:
                 pBLogger.exception(pstr.errorSave % filename)
             else:
@@ -491,6 +492,40 @@ class LocalPDF:
                         total_size += os.path.getsize(fp)
         return total_size
 
+    def updateFolderSummary(self):
+        """Scan the PDF folder and save the number of files
+        and its size in `self.folderSummary`.
+        Scanning a large folder may be slow, so that this function
+        should run in the background and the interface should use
+        the last stored summary (see `self.getFolderSummary`)
+
+        Output:
+            a dictionary with the scanned folder ("folder"),
+            the number of files ("files"), the size in bytes ("size")
+            and the time of the scan ("time")
+        """
+        folder = self.pdfDir
+        summary = {
+            "folder": folder,
+            "files": self.numberOfFiles(folder),
+            "size": self.dirSize(folder),
+            "time": datetime.datetime.now(),
+        }
+        self.folderSummary = summary
+        return summary
+
+    def getFolderSummary(self):
+        """Get the last summary of the PDF folder
+        saved by `self.updateFolderSummary`, without scanning the folder
+
+        Output:
+            the dictionary (see `self.updateFolderSummary`),
+            or None if the current PDF folder has not been scanned yet
+        """
+        if self.folderSummary is None or self.folderSummary["folder"] != self.pdfDir:
+            return None
+        return self.folderSummary
+
     def getSizeWUnits(self, size, units="MB", fmt="%.2f"):
         """Print a size obtained with `self.dirSize`
 
@@ -99,6 +99,40 @@ class DBTestCase(unittest.TestCase):
         """Clean temporary database"""
         self.pBDB.undo(verbose=False)
 
+    def insertFakeRecords(self, bibkeys=[], idExps=[], idCats=[]):
+        """Insert minimal entries, experiments and categories,
+        so that the connections to them satisfy the foreign keys
+
+        Parameters:
+            bibkeys: the list of bibtex keys of the new entries
+            idExps: the list of ids of the new experiments
+            idCats: the list of ids of the new categories
+        """
+        for k in bibkeys:
+            self.assertTrue(
+                self.pBDB.connExec(
+                    "insert into entries (bibkey, bibtex, firstdate) "
+                    + "values (?, ?, '')",
+                    (k, "@article{%s,}" % k),
+                )
+            )
+        for e in idExps:
+            self.assertTrue(
+                self.pBDB.connExec(
+                    "insert into experiments (idExp, name, comments) "
+                    + "values (?, ?, '')",
+                    (e, "exp%s" % e),
+                )
+            )
+        for c in idCats:
+            self.assertTrue(
+                self.pBDB.connExec(
+                    "insert into categories (idCat, name, description) "
+                    + "values (?, ?, '')",
+                    (c, "cat%s" % c),
+                )
+            )
+
     @patch("sys.stdout", new_callable=StringIO)
     def assert_stdout(self, function, expected_output, mock_stdout):
         """Catch and test stdout of the function"""
@@ -16,6 +16,7 @@ class CommonGUIStrings:
     elementImported = "Entries successfully imported: %s"
     elementInserted = "Element '%s' successfully inserted.\n"
     entriesCorrespondent = "Corresponding entries: {en}\n"
+    entriesInTree = "Entries including subcategories: {en}\n"
     entryNotInDb = "The entry '%s' is not in the database!"
     expNotInDb = "The experiment ID %s is not in the database!"
     expsAssociated = "Associated experiments: {ex}"
@@ -412,6 +413,8 @@ class MainWindowStrings(CommonStrings, ErrorsStrings, CommonGUIStrings):
         dbD = "Show some statistics about the current database"
         dbT = "&Database info"
         delete = "Delete '%s'"
+        dupD = "Find the entries which are possibly duplicated in the database"
+        dupT = "Find &duplicates"
         edit = "Edit '%s'"
         editProfD = "Edit profiles"
         editProfT = "&Edit profiles"
@@ -445,6 +448,10 @@ class MainWindowStrings(CommonStrings, ErrorsStrings, CommonGUIStrings):
         loadInsT = "&Load from INSPIRE-HEP"
         logD = "Show the content of the logfile"
         logT = "Log file"
+        maintD = (
+            "Check the integrity of the database file " + "and reclaim the unused space"
+        )
+        maintT = "&Maintain database"
         manage = "Manage '%s'"
         profD = "Manage profiles"
         profT = "&Profiles"
@@ -563,7 +570,21 @@ class MainWindowStrings(CommonStrings, ErrorsStrings, CommonGUIStrings):
         + "The number of currently stored PDF files is {nf:}.\n"
         + "The size of the PDF folder is {pdfs:}."
     )
+    dbStatsPDFTime = "\n(PDF folder scanned at %s)"
+    dbStatsPDFUnknown = "not available yet (the PDF folder is being scanned)"
+    dbStatsQueries = "\n\nStatistics on the database queries:\n%s"
     dbStatsTitle = "PhysBiblio database statistics"
+    dupFound = (
+        "%d groups of possibly duplicated entries found. "
+        + "Do you want to merge them one pair at a time?"
+    )
+    dupMergeAsk = "'%s' and '%s' have the same %s. Do you want to merge them?"
+    dupMergeAskGroup = (
+        "'%s' and '%s' are in the same group of possible duplicates "
+        + "(through %s). Do you want to merge them?"
+    )
+    dupNone = "No duplicated entries found!"
+    dupT = "Find duplicates"
     emptyFN = "Empty filename given!"
     emptyInFNs = "Empty input filename(s)!"
     emptyOutFN = "Empty output filename!"
@@ -602,6 +623,15 @@ class MainWindowStrings(CommonStrings, ErrorsStrings, CommonGUIStrings):
     )
     listSyntax = "Cannot recognize the list sintax. Missing quotes in the string?"
     mainTab = "Main tab"
+    maintainFullAsk = (
+        "Do you want to rebuild the whole database file?\n"
+        + "It may take longer, but the space is reclaimed at once."
+    )
+    maintainT = "Maintain database"
+    maintainUncommitted = (
+        "The maintenance will save the unsaved changes to the database. "
+        + "Do you want to continue?"
+    )
     newTab = "New tab"
     newTabAsk = "Insert the new tab name"
     newTabName = "New tab name?"
@@ -669,6 +699,11 @@ class MainWindowStrings(CommonStrings, ErrorsStrings, CommonGUIStrings):
         + "from which you want to start the updates:"
     )
     updINumTitle = "Where do you want to start searchOAIUpdates from?"
+    updResumeText = (
+        "A previous update of all the bibtexs was interrupted "
+        + "after the entry '%s'.\nDo you want to resume it?"
+    )
+    updResumeTitle = "Resume update?"
     wantToExit = "Do you really want to exit?"
 
 
@@ -4,6 +4,16 @@ from .common import CommonStrings
 class ArgParserStrings:
     """Strings for the physbiblio.argParser module"""
 
+    afterHelp = (
+        "the position of the last entry processed by a previous interrupted run,"
+        + " printed when the process is stopped (replaces startFrom)"
+    )
+    changesDeleteHelp = (
+        "delete the changes up to the given sequence number from the journal"
+        + " (when the exported files and the copies of the database are updated)"
+    )
+    changesHelp = "print the changes recorded in the journal of the database"
+    changesSinceHelp = "the sequence number after which the changes are printed"
     cleanHelp = "clean the entries in the database"
     cleanStartHelp = "the index from which the cleaning should start"
     cliHelp = "open the internal command line interface"
@@ -14,8 +24,23 @@ class ArgParserStrings:
     datesStartHelp = "the starting date (format as yyyy-mm-dd)"
     exportFilenameHelp = "the filename where to save the entries"
     exportHelp = "export all the entries in the database in a file"
+    exportSinceHelp = (
+        "update an existing file with the changes after the given sequence number"
+    )
     guiHelp = "open the gui"
+    maintainFullHelp = (
+        "rebuild the whole database file (full VACUUM) "
+        + "instead of releasing only the unused pages"
+    )
+    maintainHelp = (
+        "check the integrity of the database, update the statistics "
+        + "used by the query planner and reclaim the unused space"
+    )
     profileHelp = "define the profile that must be used"
+    queryStatsHelp = (
+        "collect statistics on the database queries "
+        + "and print them at the end of the command"
+    )
     subHelp = "sub-command help"
     testFailed = "Some error occurred during tests"
     testHelp = "run the test suite"
@@ -41,6 +66,9 @@ class ArgParserStrings:
         + "in the database and remove duplicated entries"
     )
     updateHelp = "use INSPIRE to update the information in the database"
+    updateResumeHelp = (
+        "resume the update from the checkpoint saved by a previous interrupted run"
+    )
     updateForceHelp = "force the update"
     updateStartHelp = "the index from which the updating should start"
     weeklyHelp = "fetch the weekly updates from INSPIRE-HEP OAI"
@@ -78,6 +106,10 @@ class ConfigStrings:
         )
         fontSize = "Font size in the list of bibtex entries and companion boxes"
         limitBibtexs = "Number of bibtex entries in the initial view of the main table"
+        bibListPageSize = (
+            "Number of entries loaded at once when scrolling the main table "
+            + "(0 to load all the entries immediately)"
+        )
         logFName = "Name of the log file"
         logLevel = (
             "How many messages to save in the log file "
@@ -99,6 +131,66 @@ class ConfigStrings:
             + " for showing the list of changes when a new one is opened"
         )
         timeout = "Timeout for the web queries"
+        httpRetries = (
+            "Number of times a failed HTTP request is repeated, 0 to disable "
+            + "(will have effects only after restarting the application)"
+        )
+        httpPoolSize = (
+            "Number of hosts for which the HTTP connections are kept alive "
+            + "(will have effects only after restarting the application)"
+        )
+        loadAndInsertWorkers = (
+            "Number of parallel workers used to download the information "
+            + "when importing a list of entries (1 to process them in sequence)"
+        )
+        busyTimeout = (
+            "Time (in milliseconds) to wait when the database "
+            + "is locked by another connection"
+        )
+        cacheSize = (
+            "Size (in KiB) of the page cache of each database connection "
+            + "(will have effects only after restarting the application)"
+        )
+        mmapSize = (
+            "Size (in MiB) of the part of the database file accessed "
+            + "with memory-mapped I/O, 0 to disable "
+            + "(will have effects only after restarting the application)"
+        )
+        profileQueries = (
+            "Collect statistics on the time spent in the database queries "
+            + "(will have effects only after restarting the application)"
+        )
+        slowQueryTime = (
+            "Time (in milliseconds) above which a database query is logged "
+            + "together with its query plan, when the query statistics "
+            + "are collected (0 to disable)"
+        )
+        oaiRequestDelay = (
+            "Minimum time interval (in seconds) between two requests "
+            + "to the INSPIRE-HEP OAI server"
+        )
+        oaiUpdateBatchSize = (
+            "Number of updated entries that are saved together, "
+            + "when updating the entries using INSPIRE-HEP OAI"
+        )
+        oaiUpdateWorkers = (
+            "Number of parallel workers used to download the information "
+            + "when updating the entries using INSPIRE-HEP OAI "
+            + "(1 to process them in sequence)"
+        )
+        httpBackoff = (
+            "Backoff factor (in seconds) between the repeated attempts "
+            + "of a failed HTTP request "
+            + "(will have effects only after restarting the application)"
+        )
+        httpConnectTimeout = (
+            "Timeout (in seconds) for establishing the connection "
+            + "to the server in the web queries"
+        )
+        httpMaxPerHost = (
+            "Maximum number of simultaneous HTTP connections to the same host "
+            + "(will have effects only after restarting the application)"
+        )
         updateFrom = (
             "Index of bibtex entries (firstdate ASC) "
             + 'from which I should start when using "Update bibtexs"'
@@ -160,12 +252,21 @@ class DatabaseCoreStrings:
     errorCannotCommit = "Impossible to commit!"
     errorCannotRollback = "Impossible to rollback!"
     errorConnection = "Connection error: %s\nquery: %s"
+    errorCreateIndex = "Create index %s failed"
     errorCreateTable = "Create table %s failed"
     errorCursor = 'Cursor error: %s\nThe query was: "%s"\nand the parameters: %s'
     errorInsMainCats = "Insert main categories failed"
     errorInsUpd = "Cannot insert/update: ID exists!\n%s\nquery: %s"
     errorLiteralEval = "Error in literal_eval with string '%s'"
     invalidIsLocked = "Invalid `self.onIsLocked`!"
+    maintainAnalyze = "updating the statistics used by the query planner (ANALYZE)"
+    maintainFailed = "The maintenance of the database failed!"
+    maintainIncrVacuum = "releasing the unused pages (incremental VACUUM)"
+    maintainIntegrity = "checking the integrity of the database"
+    maintainIntegrityErr = "The integrity check found some problems:\n%s"
+    maintainSize = "Database size: %.2f MB before, %.2f MB after"
+    maintainStep = "Maintenance step %d/%d: %s"
+    maintainVacuum = "rebuilding the database file (VACUUM)"
     newColEntries = "New column in table 'entries': 'bibdict' (text)."
     noDatabaseCreate = "-------New database or missing tables.\nCreating them!\n\n"
     openDb = "Opening database: %s"
@@ -174,19 +275,50 @@ class DatabaseCoreStrings:
         + "in another instance of the application\n"
         + "query failed: %s"
     )
+    profilerDisabled = "The collection of query statistics is not enabled."
+    profilerSite = "%10.1f ms %7d calls %9d rows   %s"
+    profilerSummary = "%d statements in %.1f ms, %d rows, %d slow statements"
+    removeDuplicates = "Removing duplicated rows from table '%s' (%s)"
     rollbackDb = "Rolled back to last commit."
     savedDb = "Database saved."
+    slowQuery = (
+        "Slow statement (%.1f ms, %d rows) from %s:\n%s\n"
+        + "parameters: %s\nquery plan:\n%s"
+    )
+    threadNewCursor = "Creating a new database cursor for thread %s"
 
 
 class DatabaseStrings(CommonStrings, DatabaseCoreStrings):
     """Strings for the physbiblio.database module"""
 
+    addForeignKeys = "Adding the foreign keys to the table '%s'"
     catNotInDb = "Category '%s' not in database"
     cleaning = "Cleaning (%s, %s)"
+    computeDisplayFields = "Computing the plain text fields of %d entries"
+    convertBibdict = "Converting the 'bibdict' field of %d entries to JSON"
+    createAliases = "Creating the table of the previous bibtex keys"
+    createChanges = "Creating the journal of the changes in the entries"
+    createFullText = "Creating the full-text index on the entries"
+    createStats = "Counting the rows of the tables for the statistics"
+    errorConvertBibdict = "Cannot convert the 'bibdict' field to JSON!"
+    errorDisplayFields = "Cannot save the plain text fields of the entries!"
+    errorForeignKeys = (
+        "Cannot add the foreign keys to the tables. "
+        + "Links may remain when entries, categories or experiments are deleted"
+    )
     errorReadInput = "Something failed in reading your input '%s'"
     errorRename = "Cannot rename folder"
+    maintainFullText = "Rebuilding the full-text index after VACUUM"
     newDbCreate = "-------New database. Creating tables!\n\n"
+    newColumn = "New column in table 'entries': '%s' (text)."
+    noAliases = "Cannot create the table of the previous bibtex keys"
+    noChanges = "Cannot create the journal of the changes in the entries"
     noElsFound = "No elements found?"
+    noFullText = (
+        "Cannot create the full-text index (is FTS5 available?). "
+        + "Text matches will use 'like'"
+    )
+    noStats = "Cannot create the table of the statistics"
 
     class Bibs:
         """Strings for the physbiblio.database. class"""
@@ -196,13 +328,15 @@ class DatabaseStrings(CommonStrings, DatabaseCoreStrings):
         callOAIDates = "Calling INSPIRE-HEP OAI harvester between dates %s and %s"
         cannotParse = "Cannot parse properly:\n%s"
         cbError = "Error while cleaning entry '%s'"
-        cbInvalidStart = "Invalid startFrom in cleanBibtexs"
+        cbInvalidStart = "Invalid startFrom or after in cleanBibtexs"
         cbProcessProgr = "%5d / %d (%5.2f%%) - cleaning: '%s'\n"
         cbProcessTot = "CleanBibtexs will process %d total entries"
         cbResChan = "%d bibtex entries changed"
         cbResEntr = "%d entries processed"
         cbResErr = "%d errors occurred"
         delete = "Delete entry, using key = '%s'"
+        dupFound = "%d groups of possibly duplicated entries found"
+        dupProcessTot = "findDuplicates will process %d total entries"
         elementChanged = "-- element changed!"
         elementsFound = "%d elements found"
         emptyBibtex = "Empty bibtex?\n%s\n%s"
@@ -221,7 +355,7 @@ class DatabaseStrings(CommonStrings, DatabaseCoreStrings):
         errorUpdateBib = "Impossible to update bibkey"
         experimental = "Experimental paper"
         fcbBadEntries = "%d bad entries found:\n %s"
-        fcbInvalidStart = "Invalid startFrom in findCorruptedBibtexs"
+        fcbInvalidStart = "Invalid startFrom or after in findCorruptedBibtexs"
         fcbNotReadable = "%s is NOT readable!\n"
         fcbProcessProgr = "%5d / %d (%5.2f%%) - processing: '%s'"
         fcbProcessTot = "findCorruptedBibtexs will process %d total entries"
@@ -242,8 +376,8 @@ class DatabaseStrings(CommonStrings, DatabaseCoreStrings):
         ifbFromFile = "Importing from file bib: %s"
         ifbInserted = "Element successfully inserted.\n"
         ifbNewKey = "Entry will have key: '%s'"
-        ifbProcessProgr = "%5d / %d (%5.2f%%), processing entry %s"
-        ifbProcessTot = "Entries to be processed: %d"
+        ifbProcessProgr = "%5d (%5.2f%% of the file), processing entry %s"
+        ifbProcessTot = "Bytes to be processed: %d"
         iidEmptyID = "InspireID is empty, cannot proceed."
         iidEmptyRecord = "Empty record looking for recid:%s!"
         iidKeyError = "Key error: (%s, %s)"
@@ -251,6 +385,7 @@ class DatabaseStrings(CommonStrings, DatabaseCoreStrings):
         iidStMissing = "Something missing in entry %s"
         iidWrongType = "Wrong type in inspireID: %s"
         iidWrongVal = "Wrong value/format in inspireID: %s"
+        insertMany = "inserting %d new entries"
         invalidComparisonOp = (
             "Invalid comparison operator "
             + "('%s') in database operations!\n"
@@ -266,6 +401,7 @@ class DatabaseStrings(CommonStrings, DatabaseCoreStrings):
             + "('%s') in database operations!\n"
             + "Reverting to default 'ASC'."
         )
+        invalidPageToken = "Invalid page token: '%s'"
         laiEmptyKey = "Impossible to insert an entry with empty bibkey!\n%s\n"
         laiErrors = "ERRORS!\nFailed to load and import entries:\n%s"
         laiFailed = "Failed in inserting entry %s\n"
@@ -280,6 +416,7 @@ class DatabaseStrings(CommonStrings, DatabaseCoreStrings):
         laiNewKey = "Entry will have key: '%s'"
         laiProcessProgr = "%5d / %d (%5.2f%%) - looking for string: '%s'\n"
         laiProcessTot = "LoadAndInsert will process %d total entries"
+        laiWorkers = "LoadAndInsert will use %d parallel workers"
         laiReadError = "Error while reading the bibtex '%s'"
         lecture = "Lecture"
         oaiChanged = "%d changed entries:\n%s"
@@ -304,18 +441,26 @@ class DatabaseStrings(CommonStrings, DatabaseCoreStrings):
         replaceProcessTot = "Replace will process %d entries"
         replaceText = "Replacing text in entries: "
         replaceError = "Something wrong in replace"
+        resumeAfter = "Resuming after entry '%s'"
+        resumeToken = (
+            "Stopped after entry '%s'. "
+            + "To resume the process from the next entry, use --after '%s'"
+        )
         review = "Review"
         souError = (
             "Something wrong here. "
             + "Possibly the bibtex key has been changed "
             + "while processing entry '%s'?"
         )
-        souInvalidStart = "Invalid startFrom in searchOAIUpdates"
+        souCheckpoint = "Resuming searchOAIUpdates from the saved checkpoint"
+        souCommitted = "Changes committed, checkpoint saved at entry '%s'"
+        souInvalidStart = "Invalid startFrom or after in searchOAIUpdates"
         souResChan = "%d entries changed"
         souResErr = "%d errors occurred"
         souResProc = "%d entries processed"
         souProcessProgr = "%5d / %d (%5.2f%%) - looking for update: '%s'"
         souProcessTot = "SearchOAIUpdates will process %d total entries"
+        souWorkers = "SearchOAIUpdates will use %d parallel workers"
         updateBibkey = "Updating bibkey for entry '%s' into '%s'"
         updateField = "Updating '%s' for entry '%s'"
         useQueryVals = "Using query:\n%s\nvalues: %s"
@@ -335,6 +480,7 @@ class DatabaseStrings(CommonStrings, DatabaseCoreStrings):
             opTContains = "contains"
             opTDifferent = "different from"
             opTExact = "exact match"
+            opTMatches = "matches"
             opTNotCont = "does not contain"
 
     class BibsCats:
@@ -344,6 +490,7 @@ class DatabaseStrings(CommonStrings, DatabaseCoreStrings):
         askInputCat = "categories for '%s': "
         alreadyPresent = "EntryCat already present: (%d, %s)"
         insert = "inserting (idCat=%s and key=%s)"
+        insertMany = "inserting %d new connections between categories and entries"
         updateKey = "Updating entryCats for bibkey change, from '%s' to '%s'"
 
     class BibsExps:
@@ -353,8 +500,15 @@ class DatabaseStrings(CommonStrings, DatabaseCoreStrings):
         askInputExp = "experiments for '%s': "
         alreadyPresent = "EntryExp already present: (%s, %d)"
         insert = "inserting (key=%s and idExp=%s)"
+        insertMany = "inserting %d new connections between entries and experiments"
         updateKey = "Updating entryExps for bibkey change, from '%s' to '%s'"
 
+    class Changes:
+        """Strings for the physbiblio.database.ChangeJournal class"""
+
+        last = "Last change: %d"
+        line = "%d [%s] %s '%s' in %s"
+
     class Cats:
         """Strings for the physbiblio.database.Categories class"""
 
@@ -404,6 +558,7 @@ class ExportStrings:
     cannotRestoreBackup = "Cannot restore backup file.\nCheck the file permissions."
     cannotWriteBackup = "Cannot write backup file.\nCheck the folder permissions."
     cannotWrite = "Cannot write on file.\nCheck the file permissions."
+    changesExported = "Output file updated: %d changed and %d deleted entries"
     citeFound = r"%d \cite commands found in .tex file"
     doneAllTexs = "Done for all the texFiles.\n\n"
     errorCitation = "Cannot recognize citation list in '%s'!"
@@ -415,11 +570,16 @@ class ExportStrings:
     entriesRemoved = "Output file updated. Removed entries:\n%s"
     entryInserted = "%s inserted in output file"
     keyMissing = "Key '%s' missing, trying to import it from Web"
+    lastSeqExported = (
+        "Last change included in the output file: %d "
+        + "(use it as 'since' to export only the next changes)"
+    )
     keysFound = "%d keys found in .tex file"
     missingEntries = "%d required entries were missing in database"
     newKeysFound = "%d new keys found in .tex file"
     newKeysTotal = "%d new keys found, %d in total."
     noElement = "No elements to export!"
+    noChanges = "No changes to export"
     noLastSel = "No last selection to export!"
     nonMatchingEntries = "Possible non-matching keys in %d entries:\n"
     outputUpdated = "Output file updated"
@@ -515,6 +675,18 @@ class TablesDefStrings:
         "comments": "Comments",
         "ord": "Ordering when plotting (not yet implemented)",
     }
+    entriesAliasesDescs = {
+        "alias": "Previous bibtex key",
+        "bibkey": "Current bibtex key of the entry",
+    }
+    entriesChangesDescs = {
+        "seq": "Sequence number of the change",
+        "tableName": "Table where the change occurred",
+        "action": "Type of change (insert, update or delete)",
+        "bibkey": "Bibtex key of the changed entry",
+        "idLink": "Category or experiment ID (for the links of the entries)",
+        "time": "Time of the change",
+    }
     entriesCatsDescs = {
         "idEnC": "Unique identifier",
         "bibkey": "Corresponding bibtex key",
@@ -547,6 +719,10 @@ class TablesDefStrings:
         "marks": "Mark the record",
         "abstract": "Abstract of the record",
         "bibdict": "Dictionary with fields of the bibtex entry from bibtexparser",
+        "titleText": "Title of the record, as plain text",
+        "authorText": "Authors of the record, as plain text",
+        "firstAuthor": "First author of the record, used for sorting",
+        "publishedText": "Publication info (journal, volume, year, pages)",
     }
     entriesExpsDescs = {
         "idEnEx": "Unique identifier",
@@ -581,6 +757,10 @@ class TablesDefStrings:
         "name": "name of the setting",
         "value": "value of the setting",
     }
+    tableStatsDescs = {
+        "tableName": "Name of the table",
+        "numRows": "Number of rows in the table",
+    }
 
 
 class ViewStrings(CommonStrings):
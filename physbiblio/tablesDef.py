@@ -60,6 +60,11 @@ tableFields["entries"] = [
     ["marks", "text", ""],
     ["abstract", "text", ""],
     ["bibdict", "text", ""],
+    ["titleText", "text", ""],
+    ["authorText", "text", ""],
+    ["firstAuthor", "text", ""],
+    ["publishedText", "text", ""],
+    ["fingerprint", "text", ""],
 ]
 tableFields["categories"] = [
     ["idCat", "integer", "primary key"],
@@ -83,18 +88,89 @@ tableFields["expCats"] = [
 ]
 tableFields["entryCats"] = [
     ["idEnC", "integer", "primary key"],
-    ["bibkey", "text", "not null"],
+    ["bibkey", "text", "not null collate nocase"],
     ["idCat", "integer", "not null"],
 ]
 tableFields["entryExps"] = [
     ["idEnEx", "integer", "primary key"],
-    ["bibkey", "text", "not null"],
+    ["bibkey", "text", "not null collate nocase"],
     ["idExp", "integer", "not null"],
 ]
+tableFields["entryAliases"] = [
+    ["alias", "text", "primary key not null collate nocase"],
+    ["bibkey", "text", "not null collate nocase"],
+]
+# journal of the changes in the entries and in their links,
+# filled by triggers (see physbiblio.database.PhysBiblioDB.createChangeJournal)
+tableFields["entryChanges"] = [
+    ["seq", "integer", "primary key autoincrement"],
+    ["tableName", "text", "not null"],
+    ["action", "text", "not null"],
+    ["bibkey", "text", "not null collate nocase"],
+    ["idLink", "integer", ""],
+    ["time", "text", "default current_timestamp"],
+]
+# number of rows of the main tables, kept up to date by triggers
+# (see physbiblio.database.PhysBiblioDB.createTableStats)
+tableFields["tableStats"] = [
+    ["tableName", "text", "primary key not null"],
+    ["numRows", "integer", "not null default 0"],
+]
 tableFields["settings"] = [
     ["name", "text", "primary key not null"],
     ["value", "text", "default ''"],
 ]
+# foreign keys of the tables which link entries, categories and experiments,
+# as [column, referenced table, referenced column]:
+# the links are renamed or deleted together with the referenced row
+tableForeignKeys = {}
+tableForeignKeys["expCats"] = [
+    ["idExp", "experiments", "idExp"],
+    ["idCat", "categories", "idCat"],
+]
+tableForeignKeys["entryCats"] = [
+    ["bibkey", "entries", "bibkey"],
+    ["idCat", "categories", "idCat"],
+]
+tableForeignKeys["entryExps"] = [
+    ["bibkey", "entries", "bibkey"],
+    ["idExp", "experiments", "idExp"],
+]
+tableIndexes = {}
+tableIndexes["entryCats_bibkey_idCat"] = ["entryCats", ["bibkey", "idCat"], True]
+tableIndexes["entryCats_idCat_bibkey"] = ["entryCats", ["idCat", "bibkey"], False]
+tableIndexes["entryExps_bibkey_idExp"] = ["entryExps", ["bibkey", "idExp"], True]
+tableIndexes["entryExps_idExp_bibkey"] = ["entryExps", ["idExp", "bibkey"], False]
+tableIndexes["expCats_idExp_idCat"] = ["expCats", ["idExp", "idCat"], True]
+tableIndexes["expCats_idCat_idExp"] = ["expCats", ["idCat", "idExp"], False]
+tableIndexes["entries_arxiv"] = ["entries", ["arxiv"], False]
+tableIndexes["entries_doi"] = ["entries", ["doi"], False]
+tableIndexes["entries_inspire"] = ["entries", ["inspire"], False]
+tableIndexes["entries_firstdate"] = ["entries", ["firstdate"], False]
+tableIndexes["entries_fingerprint"] = ["entries", ["fingerprint"], False]
+tableIndexes["categories_parentCat"] = ["categories", ["parentCat", "idCat"], False]
+tableIndexes["entryAliases_bibkey"] = ["entryAliases", ["bibkey"], False]
+# full-text (FTS5) index on the entries: the content of each column
+# is computed from a row of "entries" (named "{0}" in the expression)
+fullTextTable = "entries_fts"
+fullTextFields = [
+    ["bibkey", "{0}.bibkey", "unindexed"],
+    [
+        "title",
+        "case when json_valid({0}.bibdict) "
+        + "then json_extract({0}.bibdict, '$.title') end",
+        "",
+    ],
+    [
+        "author",
+        "case when json_valid({0}.bibdict) "
+        + "then json_extract({0}.bibdict, '$.author') end",
+        "",
+    ],
+    ["bibtex", "{0}.bibtex", ""],
+    ["abstract", "{0}.abstract", ""],
+]
+fullTextUpdateCols = ["bibkey", "bibtex", "bibdict", "abstract"]
 fieldsDescriptions = {}
 fieldsDescriptions["entries"] = tdstr.entriesDescs
 fieldsDescriptions["categories"] = tdstr.catsDescs
@@ -102,4 +178,7 @@ fieldsDescriptions["experiments"] = tdstr.expsDescs
 fieldsDescriptions["expCats"] = tdstr.expsCatsDescs
 fieldsDescriptions["entryCats"] = tdstr.entriesCatsDescs
 fieldsDescriptions["entryExps"] = tdstr.entriesExpsDescs
+fieldsDescriptions["entryAliases"] = tdstr.entriesAliasesDescs
+fieldsDescriptions["entryChanges"] = tdstr.entriesChangesDescs
 fieldsDescriptions["settings"] = tdstr.settingsDescs
+fieldsDescriptions["tableStats"] = tdstr.tableStatsDescs
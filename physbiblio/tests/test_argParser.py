@@ -78,7 +78,7 @@ class TestParser(unittest.TestCase):
                 lambda: parser.parse_args([opt]),
                 [
                     "usage: PhysBiblio.exe [-h] [-p ",
-                    "{clean,cli,daily,dates,export,test,tex,update,weekly,gui}",
+                    "{changes,clean,cli,daily,dates,export,maintain,test,tex,update,weekly,gui}",
                 ],
             )
         for opt in ["-p", "--profile"]:
@@ -102,23 +102,53 @@ class TestParser(unittest.TestCase):
             args = parser.parse_args([sub])
             self.assertIs(args.func, func)
         tests = [
+            [
+                "changes",
+                "physbiblio.database.ChangeJournal.printSince",
+                [],
+                ([pBDB.changes], {"since": 0}),
+            ],
+            [
+                "changes",
+                "physbiblio.database.ChangeJournal.printSince",
+                ["--since", "12"],
+                ([pBDB.changes], {"since": 12}),
+            ],
+            [
+                "changes",
+                "physbiblio.database.ChangeJournal.deleteUpTo",
+                ["-d", "12"],
+                ([pBDB.changes, 12], {}),
+            ],
+            [
+                "changes",
+                "physbiblio.database.ChangeJournal.deleteUpTo",
+                ["--deleteUpTo", "5", "-s", "8"],
+                ([pBDB.changes, 5], {}),
+            ],
             [
                 "clean",
                 "physbiblio.database.Entries.cleanBibtexs",
                 [],
-                ([pBDB.bibs], {"startFrom": 0}),
+                ([pBDB.bibs], {"startFrom": 0, "after": None}),
             ],
             [
                 "clean",
                 "physbiblio.database.Entries.cleanBibtexs",
                 ["-s", "100"],
-                ([pBDB.bibs], {"startFrom": 100}),
+                ([pBDB.bibs], {"startFrom": 100, "after": None}),
             ],
             [
                 "clean",
                 "physbiblio.database.Entries.cleanBibtexs",
                 ["--startFrom", "1000"],
-                ([pBDB.bibs], {"startFrom": 1000}),
+                ([pBDB.bibs], {"startFrom": 1000, "after": None}),
+            ],
+            [
+                "clean",
+                "physbiblio.database.Entries.cleanBibtexs",
+                ["-a", '["2018-01-01","abc"]'],
+                ([pBDB.bibs], {"startFrom": 0, "after": '["2018-01-01","abc"]'}),
             ],
             ["cli", "physbiblio.cli.cli", [], ([], {})],
             [
@@ -146,7 +176,25 @@ class TestParser(unittest.TestCase):
                 "export",
                 "physbiblio.export.PBExport.exportAll",
                 ["testname"],
-                ([pBExport, "testname"], {}),
+                ([pBExport, "testname"], {"since": None}),
+            ],
+            [
+                "export",
+                "physbiblio.export.PBExport.exportAll",
+                ["testname", "-s", "5"],
+                ([pBExport, "testname"], {"since": 5}),
+            ],
+            [
+                "maintain",
+                "physbiblio.database.PhysBiblioDB.maintain",
+                [],
+                ([pBDB], {"full": False}),
+            ],
+            [
+                "maintain",
+                "physbiblio.database.PhysBiblioDB.maintain",
+                ["--full"],
+                ([pBDB], {"full": True}),
             ],
             [
                 "tex",
@@ -347,31 +395,73 @@ class TestParser(unittest.TestCase):
                 "update",
                 "physbiblio.database.Entries.searchOAIUpdates",
                 [],
-                ([pBDB.bibs], {"startFrom": 0, "force": False}),
+                (
+                    [pBDB.bibs],
+                    {"startFrom": 0, "force": False, "resume": False, "after": None},
+                ),
             ],
             [
                 "update",
                 "physbiblio.database.Entries.searchOAIUpdates",
                 ["-f"],
-                ([pBDB.bibs], {"startFrom": 0, "force": True}),
+                (
+                    [pBDB.bibs],
+                    {"startFrom": 0, "force": True, "resume": False, "after": None},
+                ),
             ],
             [
                 "update",
                 "physbiblio.database.Entries.searchOAIUpdates",
                 ["--force"],
-                ([pBDB.bibs], {"startFrom": 0, "force": True}),
+                (
+                    [pBDB.bibs],
+                    {"startFrom": 0, "force": True, "resume": False, "after": None},
+                ),
             ],
             [
                 "update",
                 "physbiblio.database.Entries.searchOAIUpdates",
                 ["-s", "100"],
-                ([pBDB.bibs], {"startFrom": 100, "force": False}),
+                (
+                    [pBDB.bibs],
+                    {"startFrom": 100, "force": False, "resume": False, "after": None},
+                ),
             ],
             [
                 "update",
                 "physbiblio.database.Entries.searchOAIUpdates",
                 ["--startFrom", "100"],
-                ([pBDB.bibs], {"startFrom": 100, "force": False}),
+                (
+                    [pBDB.bibs],
+                    {"startFrom": 100, "force": False, "resume": False, "after": None},
+                ),
+            ],
+            [
+                "update",
+                "physbiblio.database.Entries.searchOAIUpdates",
+                ["-r"],
+                (
+                    [pBDB.bibs],
+                    {"startFrom": 0, "force": False, "resume": True, "after": None},
+                ),
+            ],
+            [
+                "update",
+                "physbiblio.database.Entries.searchOAIUpdates",
+                ["--resume", "-f"],
+                (
+                    [pBDB.bibs],
+                    {"startFrom": 0, "force": True, "resume": True, "after": None},
+                ),
+            ],
+            [
+                "update",
+                "physbiblio.database.Entries.searchOAIUpdates",
+                ["--after", "tok"],
+                (
+                    [pBDB.bibs],
+                    {"startFrom": 0, "force": False, "resume": False, "after": "tok"},
+                ),
             ],
             [
                 "weekly",
@@ -397,19 +487,33 @@ class TestParser(unittest.TestCase):
                     args = parser.parse_args([sub] + options)
                     args.func(args)
                     mock.assert_called_once_with(*expected[0], **expected[1])
+        with patch(
+            "physbiblio.export.PBExport.exportAll", return_value=12, autospec=True
+        ) as _e:
+            args = parser.parse_args(["export", "testname"])
+            self.assertEqual(args.func(args), 12)
 
     def test_subcommands_fail(self):
         """Test that the options are recognised correctly."""
         parser = setParser()
         tests = [
+            ["changes", ["-s"]],
+            ["changes", ["-s", "abc"]],
+            ["changes", ["5"]],
+            ["changes", ["-d"]],
+            ["changes", ["-d", "abc"]],
             ["clean", ["-f"]],
             ["clean", ["-s"]],
             ["clean", ["-s", "abc"]],
             ["clean", ["--startfrom", "1000"]],
+            ["clean", ["--after"]],
             ["cli", ["-t"]],
             ["daily", ["date"]],
             ["dates", ["date1"]],
             ["export", ["testname1", "testname2"]],
+            ["export", ["testname", "-s", "abc"]],
+            ["maintain", ["-s"]],
+            ["maintain", ["full"]],
             ["gui", ["-p"]],
             ["test", ["-f"]],
             ["tex", ["f1"]],
@@ -418,6 +522,7 @@ class TestParser(unittest.TestCase):
             ["update", ["-o"]],
             ["update", ["-s", "abc"]],
             ["update", ["--startFrom"]],
+            ["update", ["-a"]],
             ["weekly", ["any"]],
         ]
         with patch(
@@ -465,6 +570,36 @@ class TestParser(unittest.TestCase):
             args = parser.parse_args(["test", "-a"])
         skipTestsSettings = oldSettings
 
+    def test_runCommand(self):
+        """test the runCommand function"""
+        parser = setParser()
+        args = parser.parse_args(["cli"])
+        self.assertFalse(args.queryStats)
+        with patch("physbiblio.cli.cli", autospec=True) as _c, patch(
+            "physbiblio.databaseCore.PhysBiblioDBCore.setQueryProfiling",
+            autospec=True,
+        ) as _s:
+            runCommand(args)
+            _c.assert_called_once_with()
+            self.assertEqual(_s.call_count, 0)
+        args = parser.parse_args(["--queryStats", "cli"])
+        self.assertTrue(args.queryStats)
+        with patch("physbiblio.cli.cli", autospec=True) as _c, patch(
+            "physbiblio.databaseCore.PhysBiblioDBCore.setQueryProfiling",
+            autospec=True,
+        ) as _s, patch(
+            "physbiblio.databaseCore.QueryProfiler.report",
+            return_value="report",
+            autospec=True,
+        ) as _r, patch(
+            "logging.Logger.info"
+        ) as _i:
+            runCommand(args)
+            _c.assert_called_once_with()
+            _s.assert_called_once_with(pBDB, True)
+            _r.assert_called_once_with(pBDB.profiler)
+            _i.assert_called_once_with("report")
+
     def test_call_gui(self):
         """test the call_gui function"""
         mw = MainWindow()
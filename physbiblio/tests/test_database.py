@@ -6,7 +6,9 @@ This file is part of the physbiblio package.
 import ast
 import datetime
 import sys
+import threading
 import traceback
+import types
 
 import six
 
@@ -21,13 +23,20 @@ else:
 
 try:
     from physbiblio.config import pbConfig
-    from physbiblio.database import cats_alphabetical, catString, dbStats
+    from physbiblio.database import (
+        cats_alphabetical,
+        catString,
+        dbStats,
+        displayFields,
+        fingerprint,
+        shortAuthors,
+    )
     from physbiblio.databaseCore import *
     from physbiblio.errors import pBLogger
     from physbiblio.export import pBExport
     from physbiblio.pdf import pBPDF
     from physbiblio.setuptests import *
-    from physbiblio.tablesDef import tableFields
+    from physbiblio.tablesDef import tableFields, tableForeignKeys, tableIndexes
     from physbiblio.webimport.webInterf import physBiblioWeb
 except ImportError:
     print("Could not find physbiblio and its modules!")
@@ -208,12 +217,20 @@ class TestCreateTables(unittest.TestCase):
             )
             _i.assert_any_call(
                 "CREATE TABLE entryExps (\nidEnEx integer primary "
-                + "key,\nbibkey text not null,\n"
-                + "idExp integer not null);\n"
+                + "key,\nbibkey text not null collate nocase,\n"
+                + "idExp integer not null,\n"
+                + "FOREIGN KEY (bibkey) REFERENCES entries (bibkey) "
+                + "ON UPDATE CASCADE ON DELETE CASCADE,\n"
+                + "FOREIGN KEY (idExp) REFERENCES experiments (idExp) "
+                + "ON UPDATE CASCADE ON DELETE CASCADE);\n"
             )
             _i.assert_any_call(
                 "CREATE TABLE entryCats (\nidEnC integer primary key,"
-                + "\nbibkey text not null,\nidCat integer not null);\n"
+                + "\nbibkey text not null collate nocase,\nidCat integer not null,\n"
+                + "FOREIGN KEY (bibkey) REFERENCES entries (bibkey) "
+                + "ON UPDATE CASCADE ON DELETE CASCADE,\n"
+                + "FOREIGN KEY (idCat) REFERENCES categories (idCat) "
+                + "ON UPDATE CASCADE ON DELETE CASCADE);\n"
             )
             _i.assert_any_call(
                 "CREATE TABLE experiments (\nidExp integer primary key,"
@@ -222,7 +239,25 @@ class TestCreateTables(unittest.TestCase):
             )
             _i.assert_any_call(
                 "CREATE TABLE expCats (\nidExC integer primary key,\n"
-                + "idExp integer not null,\nidCat integer not null);\n"
+                + "idExp integer not null,\nidCat integer not null,\n"
+                + "FOREIGN KEY (idExp) REFERENCES experiments (idExp) "
+                + "ON UPDATE CASCADE ON DELETE CASCADE,\n"
+                + "FOREIGN KEY (idCat) REFERENCES categories (idCat) "
+                + "ON UPDATE CASCADE ON DELETE CASCADE);\n"
+            )
+            _i.assert_any_call(
+                "CREATE TABLE entryAliases (\nalias text primary key not null "
+                + "collate nocase,\nbibkey text not null collate nocase);\n"
+            )
+            _i.assert_any_call(
+                "CREATE TABLE entryChanges (\nseq integer primary key "
+                + "autoincrement,\ntableName text not null,\n"
+                + "action text not null,\nbibkey text not null collate nocase,"
+                + "\nidLink integer ,\ntime text default current_timestamp);\n"
+            )
+            _i.assert_any_call(
+                "CREATE TABLE tableStats (\ntableName text primary key not null,"
+                + "\nnumRows integer not null default 0);\n"
             )
             _i.assert_any_call(
                 "CREATE TABLE entries (\nbibkey text primary key not null "
@@ -235,7 +270,10 @@ class TestCreateTables(unittest.TestCase):
                 + "default 0,\nphd_thesis integer default 0,\nreview "
                 + "integer default 0,\nproceeding integer default 0,"
                 + "\nbook integer default 0,\nnoUpdate integer default 0,"
-                + "\nmarks text ,\nabstract text ,\nbibdict text );\n"
+                + "\nmarks text ,\nabstract text ,\nbibdict text ,"
+                + "\ntitleText text ,\nauthorText text ,"
+                + "\nfirstAuthor text ,\npublishedText text ,"
+                + "\nfingerprint text );\n"
             )
             _i.assert_any_call(
                 "CREATE TABLE categories (\nidCat integer primary key,"
@@ -260,11 +298,15 @@ class TestCreateTables(unittest.TestCase):
             [
                 "categories",
                 "entries",
+                "entryAliases",
                 "entryCats",
+                "entryChanges",
                 "entryExps",
                 "expCats",
                 "experiments",
                 "settings",
+                "sqlite_sequence",
+                "tableStats",
             ],
         )
         self.assertEqual([e["name"] for e in self.pBDB.cats.getAll()], ["Main", "Tags"])
@@ -280,14 +322,31 @@ class TestCreateTables(unittest.TestCase):
             [
                 "categories",
                 "entries",
+                "entries_fts",
+                "entries_fts_config",
+                "entries_fts_content",
+                "entries_fts_data",
+                "entries_fts_docsize",
+                "entries_fts_idx",
+                "entryAliases",
                 "entryCats",
+                "entryChanges",
                 "entryExps",
                 "expCats",
                 "experiments",
                 "settings",
+                "sqlite_sequence",
+                "tableStats",
             ],
         )
         self.assertEqual([e["name"] for e in self.pBDB.cats.getAll()], ["Main", "Tags"])
+        self.assertTrue(
+            self.pBDB.cursExec("SELECT name FROM sqlite_master WHERE type='index';")
+        )
+        self.assertEqual(
+            sorted([name[0] for name in self.pBDB.cursor() if "autoindex" not in name[0]]),
+            sorted(tableIndexes.keys()),
+        )
 
     @classmethod
     def tearDownClass(self):
@@ -745,6 +804,7 @@ class TestDatabaseMain(DBTestCase):  # using cats just for simplicity
             self.assertEqual(_o.call_count, 0)
             _lsc.assert_called_once_with(dbc)
         self.assertEqual(dbc.tableFields, physbiblio.tablesDef.tableFields)
+        self.assertEqual(dbc.tableIndexes, physbiblio.tablesDef.tableIndexes)
         self.assertEqual(dbc.descriptions, physbiblio.tablesDef.fieldsDescriptions)
         self.assertIsInstance(dbc.tableCols, dict)
         self.assertEqual(
@@ -759,6 +819,10 @@ class TestDatabaseMain(DBTestCase):  # using cats just for simplicity
         self.assertEqual(dbc.logger, pBLogger)
         self.assertEqual(dbc.lastFetched, None)
         self.assertEqual(dbc.catsHier, None)
+        self.assertIsInstance(dbc.profiler, QueryProfiler)
+        self.assertFalse(dbc.profiler.enabled)
+        self.assertEqual(dbc.profiler.logger, pBLogger)
+        self.assertEqual(dbc.profiler.slowQueryTime, 500)
 
         with patch("os.path.exists", return_value=True) as _e, patch(
             "logging.Logger.info"
@@ -830,6 +894,17 @@ class TestDatabaseMain(DBTestCase):  # using cats just for simplicity
             dbc.openDB()
             _i.assert_called_once_with("Opening database: %s" % tempDBName)
             _c.assert_called_once_with(tempDBName, check_same_thread=False)
+            _c().execute.assert_has_calls(
+                [
+                    call("PRAGMA recursive_triggers = ON"),
+                    call("PRAGMA busy_timeout = 5000"),
+                    call("PRAGMA cache_size = -2000"),
+                    call("PRAGMA mmap_size = 0"),
+                    call("PRAGMA foreign_keys = ON"),
+                ]
+            )
+            self.assertEqual(_c().execute.call_count, 5)
+            self.assertEqual(dbc.ownerThread, threading.get_ident())
             _c().cursor.assert_called_once_with()
             _lsc.assert_called_once_with(dbc)
             self.assertEqual(dbc.conn, _c())
@@ -847,6 +922,75 @@ class TestDatabaseMain(DBTestCase):  # using cats just for simplicity
             self.assertEqual(dbc.conn.row_factory, sqlite3.Row)
             self.assertEqual(dbc.curs, _c().cursor())
 
+    def test_threadCursors(self):
+        """test the connection and the cursors used by the different threads"""
+        self.pBDB.commit(verbose=False)
+        self.assertEqual(
+            self.pBDB.conn.execute("PRAGMA journal_mode").fetchone()[0], "wal"
+        )
+        self.assertEqual(
+            self.pBDB.conn.execute("PRAGMA busy_timeout").fetchone()[0],
+            pbConfig.params["busyTimeout"],
+        )
+        self.assertEqual(
+            self.pBDB.conn.execute("PRAGMA cache_size").fetchone()[0],
+            -pbConfig.params["cacheSize"],
+        )
+        self.assertEqual(self.pBDB.conn.execute("PRAGMA foreign_keys").fetchone()[0], 1)
+        self.assertTrue(self.pBDB.isOwnerThread())
+        self.assertIs(self.pBDB.curs, self.pBDB.mainCurs)
+        self.assertIs(self.pBDB.bibs.conn, self.pBDB.conn)
+        self.assertIs(self.pBDB.bibs.curs, self.pBDB.mainCurs)
+        self.assertEqual(self.pBDB.threadCurs, {})
+        mainFetch = self.pBDB.bibs.fetchCurs
+        self.assertIs(self.pBDB.bibs.fetchCurs, mainFetch)
+        res = {}
+
+        def inThread():
+            res["owner"] = self.pBDB.isOwnerThread()
+            res["conn"] = self.pBDB.bibs.conn
+            res["curs"] = self.pBDB.bibs.curs
+            res["fetch"] = self.pBDB.bibs.fetchCurs
+            res["insert"] = self.pBDB.bibs.insertFromBibtex(
+                '@article{thr,\nauthor = "me",\ntitle = "thr",}'
+            )
+            res["count"] = self.pBDB.bibs.count()
+
+        thr = threading.Thread(target=inThread)
+        with patch("logging.Logger.debug") as _d:
+            thr.start()
+            thr.join()
+            _d.assert_any_call(
+                "Creating a new database cursor for thread %s" % thr.ident
+            )
+        self.assertFalse(res["owner"])
+        self.assertIs(res["conn"], self.pBDB.conn)
+        self.assertIsNot(res["curs"], self.pBDB.mainCurs)
+        self.assertIsNot(res["fetch"], mainFetch)
+        self.assertTrue(res["insert"])
+        self.assertEqual(res["count"], 1)
+        self.assertEqual(list(self.pBDB.threadCurs.values()), [res["curs"]])
+        self.assertEqual(self.pBDB.bibs.count(), 1)
+        self.assertTrue(self.pBDB.checkUncommitted())
+        self.assertEqual(self.pBDB.closeThreadCursors(), 1)
+        self.assertEqual(self.pBDB.threadCurs, {})
+        self.assertTrue(self.pBDB.checkUncommitted())
+        self.pBDB.undo(verbose=False)
+        self.assertEqual(self.pBDB.bibs.count(), 0)
+
+        thr = threading.Thread(target=inThread)
+        thr.start()
+        thr.join()
+        self.assertTrue(res["insert"])
+        self.pBDB.commit(verbose=False)
+        self.assertEqual(self.pBDB.bibs.getField("thr", "bibkey"), "thr")
+        self.pBDB.setQueryProfiling(False)
+        self.assertIsNot(list(self.pBDB.threadCurs.values())[0], res["curs"])
+        self.assertEqual(self.pBDB.closeThreadCursors(), 1)
+        self.assertEqual(self.pBDB.closeThreadCursors(), 0)
+        self.pBDB.bibs.delete("thr")
+        self.pBDB.commit(verbose=False)
+
     def test_closeDB(self):
         """test closeDB"""
         with patch("os.path.exists", return_value=True) as _e, patch(
@@ -859,6 +1003,15 @@ class TestDatabaseMain(DBTestCase):  # using cats just for simplicity
             _i.assert_called_once_with("Closing database...")
             dbc.conn.close.assert_called_once_with()
         dbc.conn.reset_mock()
+        dbc.curs = MagicMock()
+        dbc.curs.close.side_effect = [None, ProgrammingError("closed"), None]
+        with patch("logging.Logger.info") as _i:
+            self.assertTrue(dbc.closeDB())
+            dbc.curs.close.assert_called_once_with()
+            dbc.conn.close.assert_called_once_with()
+            self.assertTrue(dbc.closeDB())
+            self.assertEqual(dbc.conn.close.call_count, 2)
+        dbc.conn.reset_mock()
         with patch("logging.Logger.debug") as _d:
             self.assertTrue(dbc.closeDB(info=False))
             _d.assert_called_once_with("Closing database...")
@@ -1029,6 +1182,235 @@ class TestDatabaseMain(DBTestCase):  # using cats just for simplicity
 
         self.pBDB.conn = trueconn
 
+    def test_connExecMany(self):
+        """test connExecMany"""
+        self.pBDB.dbChanged = False
+        trueconn = self.pBDB.conn
+        self.pBDB.conn = MagicMock()
+        self.pBDB.conn.executemany.side_effect = [
+            ProgrammingError("a"),
+            IntegrityError("d"),
+            None,
+        ]
+        with patch("logging.Logger.exception") as _ex:
+            self.assertFalse(self.pBDB.connExecMany("a", [[1], [2]]))
+            _ex.assert_called_once_with("Connection error: a\nquery: a")
+        with patch("logging.Logger.exception") as _ex:
+            self.assertFalse(self.pBDB.connExecMany("a", [[1], [2]]))
+            _ex.assert_called_once_with("Cannot insert/update: ID exists!\nd\nquery: a")
+        self.assertFalse(self.pBDB.dbChanged)
+        self.assertTrue(self.pBDB.connExecMany("a", [[1], [2]]))
+        self.pBDB.conn.executemany.assert_called_with("a", [[1], [2]])
+        self.assertTrue(self.pBDB.dbChanged)
+        self.pBDB.conn = trueconn
+
+    def test_connExecManyAtomic(self):
+        """test connExecMany with atomic=True"""
+
+        def countCats():
+            return self.pBDB.conn.execute("select count(*) from categories").fetchone()[
+                0
+            ]
+
+        self.pBDB.commit(verbose=0)
+        self.pBDB.cats.insert(
+            {
+                "name": "atomic",
+                "comments": "",
+                "description": "",
+                "parentCat": 0,
+                "ord": 0,
+            }
+        )
+        count = countCats()
+        with patch("logging.Logger.exception") as _ex:
+            self.assertFalse(
+                self.pBDB.connExecMany(
+                    "insert into categories (idCat, name, description, "
+                    + "parentCat, comments, ord) values (?, ?, '', 0, '', 0)",
+                    [[1000, "a"], [1001, "b"], [1000, "c"]],
+                    atomic=True,
+                )
+            )
+            _ex.assert_called_once()
+        self.assertEqual(countCats(), count)
+        self.assertTrue(self.pBDB.conn.in_transaction)
+        self.assertTrue(
+            self.pBDB.connExecMany(
+                "insert into categories (idCat, name, description, "
+                + "parentCat, comments, ord) values (?, ?, '', 0, '', 0)",
+                [[1000, "a"], [1001, "b"]],
+                atomic=True,
+            )
+        )
+        self.assertEqual(countCats(), count + 2)
+        self.pBDB.undo(verbose=0)
+        self.assertEqual(countCats(), count - 1)
+
+    def test_selectIn(self):
+        """test selectIn"""
+        self.pBDB.commit(verbose=0)
+        with patch(
+            "physbiblio.databaseCore.PhysBiblioDBSub.cursExec",
+            side_effect=[True, True],
+            autospec=True,
+        ) as _ce, patch.object(self.pBDB.cats, "curs", new=MagicMock()) as _cu:
+            _cu.fetchall.side_effect = [[1, 2], [3]]
+            self.assertEqual(
+                self.pBDB.cats.selectIn(
+                    "select * from categories where idCat in (%s)",
+                    [0, 1, 2],
+                    chunkSize=2,
+                ),
+                [1, 2, 3],
+            )
+            _ce.assert_has_calls(
+                [
+                    call(
+                        self.pBDB.cats,
+                        "select * from categories where idCat in (?, ?)",
+                        [0, 1],
+                    ),
+                    call(
+                        self.pBDB.cats,
+                        "select * from categories where idCat in (?)",
+                        [2],
+                    ),
+                ]
+            )
+        self.assertEqual(
+            [
+                r["idCat"]
+                for r in self.pBDB.cats.selectIn(
+                    "select idCat from categories where idCat in (%s) "
+                    + "order by idCat",
+                    [0, 1, 2, 1000],
+                    chunkSize=1,
+                )
+            ],
+            [0, 1],
+        )
+        self.assertEqual(
+            self.pBDB.cats.selectIn(
+                "select idCat from categories where idCat in (%s)", []
+            ),
+            [],
+        )
+        with patch.object(self.pBDB.cats, "selectInChunkSize", new=1):
+            self.assertEqual(
+                {
+                    k: [r["idCat"] for r in v]
+                    for k, v in self.pBDB.cats.selectInGrouped(
+                        "select idCat from categories where idCat in (%s)",
+                        [0, 1, 1000],
+                        "idCat",
+                    ).items()
+                },
+                {0: [0], 1: [1], 1000: []},
+            )
+
+    def test_queryProfiler(self):
+        """test QueryProfiler, ProfiledCursor and setQueryProfiling"""
+        self.pBDB.commit(verbose=0)
+        self.assertFalse(self.pBDB.profiler.enabled)
+        self.assertEqual(self.pBDB.profiler.slowQueryTime, 500)
+        self.assertNotIsInstance(self.pBDB.curs, ProfiledCursor)
+        self.assertEqual(
+            self.pBDB.profiler.report(),
+            "The collection of query statistics is not enabled.",
+        )
+        self.pBDB.setQueryProfiling(True, slowQueryTime=0)
+        try:
+            self.assertIsInstance(self.pBDB.curs, ProfiledCursor)
+            self.assertIsInstance(self.pBDB.bibs.fetchCurs, ProfiledCursor)
+            self.assertEqual(self.pBDB.profiler.slowQueryTime, 0)
+            self.assertTrue(self.pBDB.cursExec("select * from categories"))
+            self.assertEqual(self.pBDB.profiler.summary()["statements"], 0)
+            self.assertEqual(len(self.pBDB.curs.fetchall()), 2)
+            self.assertTrue(
+                self.pBDB.connExecMany(
+                    "insert into categories (name, description) values (?, '')",
+                    [["a"], ["b"]],
+                )
+            )
+            self.assertTrue(
+                self.pBDB.connExec("delete from categories where name = 'a'")
+            )
+            self.assertTrue(self.pBDB.cursExec("select * from categories"))
+            self.assertIsNotNone(self.pBDB.curs.fetchone())
+            self.assertEqual(len(self.pBDB.curs.fetchmany(2)), 2)
+            self.assertEqual(
+                len([r for r in self.pBDB.bibs.fetchAll(doFetch=False).fetchCurs]), 0
+            )
+            summary = self.pBDB.profiler.summary()
+            self.assertTrue(summary["enabled"])
+            self.assertEqual(summary["statements"], 4)
+            self.assertEqual(summary["rows"], 2 + 2 + 1 + 0)
+            self.assertEqual(summary["slow"], 0)
+            self.assertEqual(summary["slowQueries"], [])
+            sites = [s["site"].split(":")[0] for s in summary["sites"]]
+            self.assertEqual(sites, ["test_queryProfiler (test_database.py"] * 4)
+            self.assertEqual(
+                sorted([s["site"].split(" -> ")[1] for s in summary["sites"]]),
+                ["connExec", "connExecMany", "cursExec", "fetchAll"],
+            )
+            self.pBDB.curs.close()
+            self.assertEqual(self.pBDB.profiler.summary()["statements"], 5)
+            self.pBDB.curs = self.pBDB.newCursor(self.pBDB.conn)
+
+            self.pBDB.profiler.reset()
+            self.pBDB.profiler.slowQueryTime = 1e-9
+            with patch("logging.Logger.warning") as _w:
+                self.assertTrue(
+                    self.pBDB.cursExec("select * from categories where idCat = ?", (1,))
+                )
+                self.assertEqual(len(self.pBDB.curs.fetchall()), 1)
+                _w.assert_called_once()
+                self.assertIn("Slow statement (", _w.call_args[0][0])
+                self.assertIn(
+                    "select * from categories where idCat = ?", _w.call_args[0][0]
+                )
+            summary = self.pBDB.profiler.summary()
+            self.assertEqual(summary["slow"], 1)
+            slow = summary["slowQueries"][0]
+            self.assertEqual(slow["query"], "select * from categories where idCat = ?")
+            self.assertEqual(slow["data"], (1,))
+            self.assertEqual(slow["rows"], 1)
+            self.assertEqual(len(slow["plan"]), 1)
+            self.assertIn("categories", slow["plan"][0])
+            self.assertEqual(
+                self.pBDB.profiler.explain(self.pBDB.conn, "not valid"), []
+            )
+            with patch("logging.Logger.warning") as _w:
+                self.assertTrue(
+                    self.pBDB.connExecMany(
+                        "update categories set description = ? where idCat = ?",
+                        ((a, b) for a, b in [["c", 0], ["d", 1]]),
+                    )
+                )
+            slow = self.pBDB.profiler.summary()["slowQueries"][-1]
+            self.assertEqual(slow["data"], ("c", 0))
+            self.assertEqual(slow["rows"], 2)
+            self.assertEqual(len(slow["plan"]), 1)
+            self.assertIn("categories", slow["plan"][0])
+            self.pBDB.profiler.reset()
+            self.assertTrue(
+                self.pBDB.cursExec("select * from categories where idCat = ?", (1,))
+            )
+            self.assertEqual(len(self.pBDB.curs.fetchall()), 1)
+            report = self.pBDB.profiler.report().split("\n")
+            self.assertEqual(len(report), 2)
+            self.assertTrue(
+                report[0].startswith("1 statements in "),
+            )
+            self.assertTrue(report[0].endswith(" ms, 1 rows, 1 slow statements"))
+            self.assertIn("1 calls         1 rows   test_queryProfiler", report[1])
+        finally:
+            self.pBDB.setQueryProfiling(False, slowQueryTime=500)
+            self.pBDB.profiler.reset()
+        self.assertNotIsInstance(self.pBDB.curs, ProfiledCursor)
+        self.pBDB.undo(verbose=0)
+
     def test_cursExec(self):
         """test cursExec"""
         trueconn = self.pBDB.curs
@@ -1149,6 +1531,24 @@ class TestDatabaseMain(DBTestCase):  # using cats just for simplicity
             _c.assert_called_once_with("Create table tablename failed")
             _e.assert_called_once_with(1)
             self.assertEqual(_co.call_count, 1)
+        with patch(
+            "physbiblio.databaseCore.PhysBiblioDBCore.connExec",
+            return_value=True,
+            autospec=True,
+        ) as _ce, patch("logging.Logger.info") as _i:
+            dbc.createTable(
+                "tablename",
+                [["abc", "def"], ["ghi", "jkl"]],
+                foreignKeys=[["abc", "t1", "a"], ["ghi", "t2", "g"]],
+            )
+            _ce.assert_called_once_with(
+                dbc,
+                "CREATE TABLE tablename (\nabc def,\nghi jkl,\n"
+                + "FOREIGN KEY (abc) REFERENCES t1 (a) "
+                + "ON UPDATE CASCADE ON DELETE CASCADE,\n"
+                + "FOREIGN KEY (ghi) REFERENCES t2 (g) "
+                + "ON UPDATE CASCADE ON DELETE CASCADE);",
+            )
 
     def test_createTables(self):
         """Test createTables"""
@@ -1176,7 +1576,10 @@ class TestDatabaseMain(DBTestCase):  # using cats just for simplicity
             with self.assertRaises(AttributeError):
                 dbc.createTables()
             _ct.assert_has_calls(
-                [call(dbc, q, tableFields[q]) for q in tableFields.keys()]
+                [
+                    call(dbc, q, tableFields[q], foreignKeys=tableForeignKeys.get(q))
+                    for q in tableFields.keys()
+                ]
             )
             _cur.assert_any_call(
                 dbc, "SELECT name FROM sqlite_master WHERE type='table';"
@@ -1204,8 +1607,11 @@ class TestDatabaseMain(DBTestCase):  # using cats just for simplicity
             "logging.Logger.error"
         ) as _e, patch(
             "physbiblio.databaseCore.PhysBiblioDBCore.commit", autospec=True
-        ) as _com:
+        ) as _com, patch(
+            "physbiblio.databaseCore.PhysBiblioDBCore.createIndexes", autospec=True
+        ) as _ci:
             dbc.createTables()
+            _ci.assert_called_once_with(dbc, tableIndexes)
             _con.assert_called_once_with(
                 dbc,
                 "INSERT into categories "
@@ -1219,6 +1625,96 @@ class TestDatabaseMain(DBTestCase):  # using cats just for simplicity
             dbc.undo()
             dbc.createTables()  # repeat, now connExec gives False
             _e.assert_any_call("Insert main categories failed")
+            _ci.reset_mock()
+            _con.side_effect = None
+            dbc.createTables({"entryCats": tableFields["entryCats"]})
+            _ci.assert_called_once_with(
+                dbc,
+                {
+                    "entryCats_bibkey_idCat": tableIndexes["entryCats_bibkey_idCat"],
+                    "entryCats_idCat_bibkey": tableIndexes["entryCats_idCat_bibkey"],
+                },
+            )
+
+    def test_createIndexes(self):
+        """test createIndexes"""
+        if os.path.exists(tempFDBName):
+            os.remove(tempFDBName)
+        open(tempFDBName, "a").close()
+        with patch("os.path.exists", return_value=True) as _e, patch(
+            "physbiblio.databaseCore.PhysBiblioDBCore.loadSubClasses", autospec=True
+        ) as _lsc:
+            dbc = PhysBiblioDBCore(tempFDBName, pBLogger, noOpen=True)
+        dbc.openDB()
+        dbc.createTable("entryCats", tableFields["entryCats"])
+        self.assertTrue(
+            dbc.connExec(
+                "INSERT into entryCats (bibkey, idCat) values "
+                + "('a', 0), ('a', 1), ('a', 0), ('b', 0)"
+            )
+        )
+        indexes = {
+            "entryCats_bibkey_idCat": tableIndexes["entryCats_bibkey_idCat"],
+            "entryCats_idCat_bibkey": tableIndexes["entryCats_idCat_bibkey"],
+        }
+        with patch("logging.Logger.info") as _i, patch(
+            "physbiblio.databaseCore.PhysBiblioDBCore.commit", autospec=True
+        ) as _com:
+            self.assertTrue(dbc.createIndexes(indexes))
+            _i.assert_has_calls(
+                [
+                    call("Removing duplicated rows from table 'entryCats' "
+                        + "(bibkey, idCat)"),
+                    call(
+                        "CREATE UNIQUE INDEX IF NOT EXISTS entryCats_bibkey_idCat "
+                        + "ON entryCats (bibkey, idCat);\n"
+                    ),
+                    call(
+                        "CREATE INDEX IF NOT EXISTS entryCats_idCat_bibkey "
+                        + "ON entryCats (idCat, bibkey);\n"
+                    ),
+                ]
+            )
+            _com.assert_called_once_with(dbc)
+        dbc.cursExec("SELECT bibkey, idCat FROM entryCats")
+        self.assertEqual(
+            [tuple(r) for r in dbc.curs.fetchall()], [("a", 0), ("a", 1), ("b", 0)]
+        )
+        self.assertFalse(
+            dbc.connExec("INSERT into entryCats (bibkey, idCat) values ('b', 0)")
+        )
+        dbc.cursExec("SELECT name FROM sqlite_master WHERE type='index'")
+        self.assertEqual(
+            sorted([r[0] for r in dbc.curs.fetchall()]), sorted(indexes.keys())
+        )
+        with patch("logging.Logger.info") as _i, patch(
+            "physbiblio.databaseCore.PhysBiblioDBCore.commit", autospec=True
+        ) as _com:
+            self.assertTrue(dbc.createIndexes(indexes))
+            _i.assert_not_called()
+            _com.assert_not_called()
+        with patch(
+            "physbiblio.databaseCore.PhysBiblioDBCore.connExec",
+            return_value=False,
+            autospec=True,
+        ) as _ce, patch("logging.Logger.error") as _e, patch(
+            "physbiblio.databaseCore.PhysBiblioDBCore.undo", autospec=True
+        ) as _u:
+            self.assertFalse(
+                dbc.createIndexes({"abc": ["entryCats", ["idCat"], True]})
+            )
+            _e.assert_called_once_with("Create index abc failed")
+            _u.assert_called_once_with(dbc)
+            _ce.reset_mock()
+            _e.reset_mock()
+            self.assertFalse(
+                dbc.createIndexes({"abc": ["entryCats", ["idCat"], False]})
+            )
+            _ce.assert_called_once_with(
+                dbc, "CREATE INDEX IF NOT EXISTS abc ON entryCats (idCat);"
+            )
+            _e.assert_called_once_with("Create index abc failed")
+        dbc.closeDB()
 
     def test_checkDatabaseUpdates_DBC(self):
         """test checkDatabaseUpdates in PhysBiblioDBCore"""
@@ -1341,11 +1837,519 @@ class TestDatabaseMain(DBTestCase):  # using cats just for simplicity
             "physbiblio.database.PhysBiblioDB.convertSearchFormat", autospec=True
         ) as _cf, patch(
             "physbiblio.database.PhysBiblioDB.checkCaseInsensitiveBibkey", autospec=True
-        ) as _ci:
+        ) as _ci, patch(
+            "physbiblio.database.PhysBiblioDB.convertBibdictFormat", autospec=True
+        ) as _cb, patch(
+            "physbiblio.database.PhysBiblioDB.checkDisplayFields", autospec=True
+        ) as _cd, patch(
+            "physbiblio.databaseCore.PhysBiblioDBCore.createIndexes", autospec=True
+        ) as _cx, patch(
+            "physbiblio.database.PhysBiblioDB.createEntryAliases", autospec=True
+        ) as _ea, patch(
+            "physbiblio.database.PhysBiblioDB.createFullTextIndex", autospec=True
+        ) as _ft, patch(
+            "physbiblio.database.PhysBiblioDB.checkForeignKeys", autospec=True
+        ) as _fk, patch(
+            "physbiblio.database.PhysBiblioDB.createChangeJournal", autospec=True
+        ) as _cj, patch(
+            "physbiblio.database.PhysBiblioDB.createTableStats", autospec=True
+        ) as _ts:
             self.pBDB.checkDatabaseUpdates()
             _su.assert_called_once_with(self.pBDB)
             _cf.assert_called_once_with(self.pBDB)
             _ci.assert_called_once_with(self.pBDB)
+            _cx.assert_called_once_with(self.pBDB)
+            _cb.assert_called_once_with(self.pBDB)
+            _cd.assert_called_once_with(self.pBDB)
+            _ea.assert_called_once_with(self.pBDB)
+            _ft.assert_called_once_with(self.pBDB)
+            _fk.assert_called_once_with(self.pBDB)
+            _cj.assert_called_once_with(self.pBDB)
+            _ts.assert_called_once_with(self.pBDB)
+
+    def test_createFullTextIndex(self):
+        """test createFullTextIndex"""
+
+        def ftsContent():
+            self.pBDB.cursExec("select rowid, * from entries_fts order by rowid")
+            return [tuple(r) for r in self.pBDB.curs.fetchall()]
+
+        self.pBDB.commit(verbose=False)
+        self.assertTrue(self.pBDB.hasFullText)
+        self.pBDB.cursExec(
+            "SELECT name FROM sqlite_master WHERE type='trigger' "
+            + "AND tbl_name='entries' order by name"
+        )
+        self.assertEqual(
+            [r[0] for r in self.pBDB.curs.fetchall()],
+            [
+                "entries_fts_ad",
+                "entries_fts_ai",
+                "entries_fts_au",
+                "entryAliases_ad",
+                "entryAliases_ai",
+                "entryAliases_au",
+                "entryChanges_entries_ad",
+                "entryChanges_entries_ai",
+                "entryChanges_entries_au",
+                "tableStats_entries_ad",
+                "tableStats_entries_ai",
+            ],
+        )
+        with patch("logging.Logger.info") as _i, patch(
+            "physbiblio.databaseCore.PhysBiblioDBCore.connExec", autospec=True
+        ) as _ce:
+            self.assertTrue(self.pBDB.createFullTextIndex())
+            _i.assert_not_called()
+            _ce.assert_not_called()
+        self.assertTrue(
+            self.pBDB.bibs.insertFromBibtex(
+                '@article{abc,\nauthor = "Gariazzo, S.",\ntitle = "Neutrinos",}'
+            )
+        )
+        self.assertTrue(
+            self.pBDB.connExec(
+                "INSERT into entries (bibkey, bibtex, bibdict, firstdate) values "
+                + "('def', '@article{def,}', \"{'title': 'old'}\", '2020')"
+            )
+        )
+        rowAbc = (
+            1,
+            "abc",
+            "{Neutrinos}",
+            "Gariazzo, S.",
+            '@Article{abc,\n        author = "Gariazzo, S.",\n'
+            + '         title = "{Neutrinos}",\n}',
+            None,
+        )
+        self.assertEqual(
+            ftsContent(), [rowAbc, (2, "def", None, None, "@article{def,}", None)]
+        )
+        self.assertTrue(
+            self.pBDB.connExec(
+                "update entries set abstract = 'abs', marks = 'imp' "
+                + "where bibkey = 'def'"
+            )
+        )
+        self.assertEqual(
+            ftsContent(), [rowAbc, (2, "def", None, None, "@article{def,}", "abs")]
+        )
+        self.assertTrue(
+            self.pBDB.connExec(
+                "replace into entries (bibkey, bibtex, firstdate) "
+                + "values ('def', 'new', '2020')"
+            )
+        )
+        self.assertEqual(ftsContent(), [rowAbc, (3, "def", None, None, "new", None)])
+        self.pBDB.bibs.delete("def")
+        self.assertEqual(ftsContent(), [rowAbc])
+
+        self.assertTrue(self.pBDB.connExec("DROP TRIGGER entries_fts_ad"))
+        self.assertTrue(self.pBDB.connExec("DELETE FROM entries_fts"))
+        with patch("logging.Logger.info") as _i, patch(
+            "physbiblio.databaseCore.PhysBiblioDBCore.commit", autospec=True
+        ) as _c:
+            self.assertTrue(self.pBDB.createFullTextIndex())
+            _i.assert_called_once_with("Creating the full-text index on the entries")
+            _c.assert_called_once_with(self.pBDB, verbose=False)
+        self.assertEqual(ftsContent(), [rowAbc])
+        self.pBDB.bibs.delete("abc")
+        self.assertEqual(ftsContent(), [])
+
+        self.pBDB.hasFullText = False
+        with patch("logging.Logger.warning") as _w, patch(
+            "physbiblio.databaseCore.PhysBiblioDBCore.connExec",
+            return_value=False,
+            autospec=True,
+        ) as _ce, patch(
+            "physbiblio.databaseCore.PhysBiblioDBCore.undo", autospec=True
+        ) as _u:
+            self.assertFalse(self.pBDB.createFullTextIndex(rebuild=True))
+            _ce.assert_called_once_with(
+                self.pBDB, "DROP TRIGGER IF EXISTS entries_fts_ai;"
+            )
+            _w.assert_called_once_with(
+                "Cannot create the full-text index (is FTS5 available?). "
+                + "Text matches will use 'like'"
+            )
+            _u.assert_called_once_with(self.pBDB, verbose=False)
+        self.assertFalse(self.pBDB.hasFullText)
+        self.pBDB.hasFullText = True
+
+    def test_createEntryAliases(self):
+        """test createEntryAliases"""
+
+        def aliases():
+            self.pBDB.cursExec("select * from entryAliases order by alias")
+            return [tuple(r) for r in self.pBDB.curs.fetchall()]
+
+        self.pBDB.commit(verbose=False)
+        with patch("logging.Logger.info") as _i, patch(
+            "physbiblio.databaseCore.PhysBiblioDBCore.connExec", autospec=True
+        ) as _ce:
+            self.assertTrue(self.pBDB.createEntryAliases())
+            _i.assert_not_called()
+            _ce.assert_not_called()
+        self.assertTrue(
+            self.pBDB.connExec(
+                "INSERT into entries (bibkey, bibtex, firstdate, old_keys) values "
+                + "('abc', '', '2020', 'old1 Old2,,ABC'), "
+                + "('def', '', '2020', NULL), ('ghi', '', '2020', 'x\"y')"
+            )
+        )
+        self.assertEqual(aliases(), [("old1", "abc"), ("Old2", "abc"), ("xy", "ghi")])
+        self.assertTrue(
+            self.pBDB.connExec(
+                "update entries set old_keys = 'old1' where bibkey = 'def'"
+            )
+        )
+        self.assertEqual(aliases(), [("old1", "def"), ("Old2", "abc"), ("xy", "ghi")])
+        self.assertTrue(
+            self.pBDB.connExec("update entries set bibkey = 'jkl' where bibkey = 'ghi'")
+        )
+        self.assertEqual(aliases(), [("old1", "def"), ("Old2", "abc"), ("xy", "jkl")])
+        self.pBDB.bibs.delete("jkl")
+        self.assertEqual(aliases(), [("old1", "def"), ("Old2", "abc")])
+
+        self.assertTrue(self.pBDB.connExec("DROP TRIGGER entryAliases_ad"))
+        self.assertTrue(self.pBDB.connExec("DELETE FROM entryAliases"))
+        with patch("logging.Logger.info") as _i, patch(
+            "physbiblio.databaseCore.PhysBiblioDBCore.commit", autospec=True
+        ) as _c:
+            self.assertTrue(self.pBDB.createEntryAliases())
+            _i.assert_called_once_with("Creating the table of the previous bibtex keys")
+            _c.assert_called_once_with(self.pBDB, verbose=False)
+        self.assertEqual(aliases(), [("old1", "def"), ("Old2", "abc")])
+
+        with patch("logging.Logger.warning") as _w, patch(
+            "physbiblio.databaseCore.PhysBiblioDBCore.connExec",
+            return_value=False,
+            autospec=True,
+        ) as _ce, patch(
+            "physbiblio.databaseCore.PhysBiblioDBCore.undo", autospec=True
+        ) as _u:
+            self.assertFalse(self.pBDB.createEntryAliases(rebuild=True))
+            _ce.assert_called_once_with(
+                self.pBDB, "DROP TRIGGER IF EXISTS entryAliases_ai;"
+            )
+            _w.assert_called_once_with(
+                "Cannot create the table of the previous bibtex keys"
+            )
+            _u.assert_called_once_with(self.pBDB, verbose=False)
+
+    def test_createChangeJournal(self):
+        """test createChangeJournal"""
+        self.pBDB.commit(verbose=False)
+        with patch("logging.Logger.info") as _i, patch(
+            "physbiblio.databaseCore.PhysBiblioDBCore.connExec", autospec=True
+        ) as _ce:
+            self.assertTrue(self.pBDB.createChangeJournal())
+            _i.assert_not_called()
+            _ce.assert_not_called()
+        self.pBDB.cursExec(
+            "SELECT name FROM sqlite_master WHERE type='trigger' "
+            + "AND name like 'entryChanges%' order by name"
+        )
+        self.assertEqual(
+            [r[0] for r in self.pBDB.curs.fetchall()],
+            [
+                "entryChanges_entries_ad",
+                "entryChanges_entries_ai",
+                "entryChanges_entries_au",
+                "entryChanges_entryCats_ad",
+                "entryChanges_entryCats_ai",
+                "entryChanges_entryCats_au",
+                "entryChanges_entryExps_ad",
+                "entryChanges_entryExps_ai",
+                "entryChanges_entryExps_au",
+            ],
+        )
+
+        self.assertTrue(self.pBDB.connExec("DROP TRIGGER entryChanges_entryExps_ai"))
+        with patch("logging.Logger.info") as _i, patch(
+            "physbiblio.databaseCore.PhysBiblioDBCore.commit", autospec=True
+        ) as _c:
+            self.assertTrue(self.pBDB.createChangeJournal())
+            _i.assert_called_once_with(
+                "Creating the journal of the changes in the entries"
+            )
+            _c.assert_called_once_with(self.pBDB, verbose=False)
+        self.pBDB.cursExec(
+            "SELECT name FROM sqlite_master WHERE type='trigger' "
+            + "AND name = 'entryChanges_entryExps_ai'"
+        )
+        self.assertEqual(len(self.pBDB.curs.fetchall()), 1)
+
+        with patch("logging.Logger.warning") as _w, patch(
+            "physbiblio.databaseCore.PhysBiblioDBCore.connExec",
+            return_value=False,
+            autospec=True,
+        ) as _ce, patch(
+            "physbiblio.databaseCore.PhysBiblioDBCore.undo", autospec=True
+        ) as _u:
+            self.assertFalse(self.pBDB.createChangeJournal(rebuild=True))
+            _ce.assert_called_once_with(
+                self.pBDB, "DROP TRIGGER IF EXISTS entryChanges_entries_ai;"
+            )
+            _w.assert_called_once_with(
+                "Cannot create the journal of the changes in the entries"
+            )
+            _u.assert_called_once_with(self.pBDB, verbose=False)
+
+    def test_createTableStats(self):
+        """test createTableStats and dbStats"""
+        self.pBDB.commit(verbose=False)
+        with patch("logging.Logger.info") as _i, patch(
+            "physbiblio.databaseCore.PhysBiblioDBCore.connExec", autospec=True
+        ) as _ce:
+            self.assertTrue(self.pBDB.createTableStats())
+            _i.assert_not_called()
+            _ce.assert_not_called()
+        self.pBDB.cursExec(
+            "SELECT name FROM sqlite_master WHERE type='trigger' "
+            + "AND name like 'tableStats%' order by name"
+        )
+        self.assertEqual(
+            [r[0] for r in self.pBDB.curs.fetchall()],
+            sorted(
+                "tableStats_%s_%s" % (t, a)
+                for t in self.pBDB.statsTables
+                for a in ["ad", "ai"]
+            ),
+        )
+
+        def numRows():
+            self.pBDB.cursExec("SELECT tableName, numRows FROM tableStats")
+            return {r[0]: r[1] for r in self.pBDB.curs.fetchall()}
+
+        self.assertEqual(
+            numRows(),
+            {
+                "categories": 2,
+                "entries": 0,
+                "entryCats": 0,
+                "entryExps": 0,
+                "expCats": 0,
+                "experiments": 0,
+            },
+        )
+        self.insertFakeRecords(bibkeys=["abc", "def"], idExps=[1])
+        self.pBDB.catBib.insert(1, ["abc", "def"])
+        self.pBDB.bibExp.insert("abc", 1)
+        self.pBDB.catExp.insert(0, 1)
+        with patch("physbiblio.database.Entries.count", autospec=True) as _c, patch(
+            "physbiblio.database.CatsEntries.count", autospec=True
+        ) as _cc:
+            dbStats(self.pBDB)
+            _c.assert_not_called()
+            _cc.assert_not_called()
+        self.assertEqual(
+            self.pBDB.stats,
+            {"bibs": 2, "cats": 2, "exps": 1, "catBib": 2, "catExp": 1, "bibExp": 1},
+        )
+        self.pBDB.bibs.delete("abc")
+        dbStats(self.pBDB)
+        self.assertEqual(
+            self.pBDB.stats,
+            {"bibs": 1, "cats": 2, "exps": 1, "catBib": 1, "catExp": 1, "bibExp": 0},
+        )
+        self.pBDB.undo(verbose=False)
+        dbStats(self.pBDB)
+        self.assertEqual(
+            self.pBDB.stats,
+            {"bibs": 0, "cats": 2, "exps": 0, "catBib": 0, "catExp": 0, "bibExp": 0},
+        )
+
+        self.assertTrue(self.pBDB.connExec("DROP TRIGGER tableStats_entries_ai"))
+        self.assertTrue(
+            self.pBDB.connExec(
+                "insert into entries (bibkey, bibtex, firstdate) "
+                + "values ('abc', '@article{abc,}', '')"
+            )
+        )
+        self.assertEqual(numRows()["entries"], 0)
+        with patch("logging.Logger.info") as _i, patch(
+            "physbiblio.databaseCore.PhysBiblioDBCore.commit", autospec=True
+        ) as _c:
+            self.assertTrue(self.pBDB.createTableStats())
+            _i.assert_called_once_with(
+                "Counting the rows of the tables for the statistics"
+            )
+            _c.assert_called_once_with(self.pBDB, verbose=False)
+        self.assertEqual(numRows()["entries"], 1)
+        self.pBDB.undo(verbose=False)
+
+        self.assertTrue(self.pBDB.connExec("DELETE FROM tableStats"))
+        with patch(
+            "physbiblio.database.Entries.count", return_value=12, autospec=True
+        ) as _c:
+            dbStats(self.pBDB)
+            _c.assert_called_once_with(self.pBDB.bibs)
+        self.assertEqual(self.pBDB.stats["bibs"], 12)
+        self.pBDB.undo(verbose=False)
+        del self.pBDB.stats
+
+        with patch("logging.Logger.warning") as _w, patch(
+            "physbiblio.databaseCore.PhysBiblioDBCore.connExec",
+            return_value=False,
+            autospec=True,
+        ) as _ce, patch(
+            "physbiblio.databaseCore.PhysBiblioDBCore.undo", autospec=True
+        ) as _u:
+            self.assertFalse(self.pBDB.createTableStats(rebuild=True))
+            _ce.assert_called_once_with(
+                self.pBDB, "DROP TRIGGER IF EXISTS tableStats_entries_ai;"
+            )
+            _w.assert_called_once_with("Cannot create the table of the statistics")
+            _u.assert_called_once_with(self.pBDB, verbose=False)
+
+    def test_convertBibdictFormat(self):
+        """test convertBibdictFormat"""
+        with patch("logging.Logger.debug") as _d:
+            self.pBDB.convertBibdictFormat()
+            _d.assert_called_once_with(
+                "'bibdict' already in JSON format. Nothing to do here."
+            )
+        self.assertTrue(
+            self.pBDB.connExec(
+                "INSERT into entries (bibkey, bibtex, bibdict, firstdate) values "
+                + "(?, ?, ?, '2020'), (?, ?, NULL, '2020'), (?, ?, ?, '2020')",
+                (
+                    "abc",
+                    '@article{abc,\ntitle="abc",\n}',
+                    "{'ID': 'abc', 'ENTRYTYPE': 'article', 'title': 'abc'}",
+                    "def",
+                    '@article{def,\ntitle="def",\n}',
+                    "ghi",
+                    "",
+                    '{"ID":"ghi"}',
+                ),
+            )
+        )
+        with patch("logging.Logger.info") as _i, patch(
+            "physbiblio.databaseCore.PhysBiblioDBCore.commit", autospec=True
+        ) as _c:
+            self.pBDB.convertBibdictFormat()
+            _i.assert_called_once_with(
+                "Converting the 'bibdict' field of 2 entries to JSON"
+            )
+            _c.assert_called_once_with(self.pBDB)
+        self.pBDB.cursExec("select bibkey, bibdict from entries order by bibkey")
+        self.assertEqual(
+            [dict(r) for r in self.pBDB.curs.fetchall()],
+            [
+                {
+                    "bibkey": "abc",
+                    "bibdict": '{"ID":"abc","ENTRYTYPE":"article","title":"abc"}',
+                },
+                {
+                    "bibkey": "def",
+                    "bibdict": '{"title":"def","ENTRYTYPE":"article","ID":"def"}',
+                },
+                {"bibkey": "ghi", "bibdict": '{"ID":"ghi"}'},
+            ],
+        )
+        with patch(
+            "physbiblio.databaseCore.PhysBiblioDBCore.connExecMany",
+            return_value=False,
+            autospec=True,
+        ) as _cm, patch("logging.Logger.error") as _e, patch(
+            "physbiblio.databaseCore.PhysBiblioDBCore.undo", autospec=True
+        ) as _u:
+            self.pBDB.connExec(
+                "update entries set bibdict = NULL where bibkey = 'ghi'"
+            )
+            self.pBDB.convertBibdictFormat()
+            _e.assert_called_once_with("Cannot convert the 'bibdict' field to JSON!")
+            _u.assert_called_once_with(self.pBDB)
+
+    def test_checkDisplayFields(self):
+        """test checkDisplayFields"""
+        self.pBDB.cursExec("PRAGMA table_info(entries);")
+        entriesCols = [r[1] for r in self.pBDB.curs]
+        self.assertTrue(all(c in entriesCols for c in self.pBDB.bibs.displayCols))
+        self.pBDB.commit(verbose=False)
+        with patch("logging.Logger.debug") as _d, patch(
+            "physbiblio.databaseCore.PhysBiblioDBCore.commit", autospec=True
+        ) as _c:
+            self.pBDB.checkDisplayFields()
+            _d.assert_called_once_with(
+                "Plain text fields already present. Nothing to do here."
+            )
+            _c.assert_called_once_with(self.pBDB, verbose=False)
+        self.assertTrue(
+            self.pBDB.connExec(
+                "insert into entries (bibkey, bibtex, bibdict, firstdate, year) "
+                + "values (?, ?, ?, '2020', ?), (?, ?, NULL, '2020', NULL)",
+                (
+                    "abc",
+                    '@article{abc,\ntitle="{A}b$\\gamma$",\n}',
+                    '{"ID":"abc","ENTRYTYPE":"article","title":"{A}b$\\\\gamma$"}',
+                    2018,
+                    "def",
+                    '@article{def,\nauthor="John Smith and Me",\n'
+                    + 'journal="J",\nyear="2019",\n}',
+                ),
+            )
+        )
+        with patch("logging.Logger.info") as _i, patch(
+            "physbiblio.databaseCore.PhysBiblioDBCore.commit", autospec=True
+        ) as _c:
+            self.pBDB.checkDisplayFields()
+            _i.assert_called_once_with("Computing the plain text fields of 2 entries")
+            _c.assert_called_once_with(self.pBDB)
+        self.pBDB.cursExec(
+            "select bibkey, titleText, authorText, firstAuthor, publishedText "
+            + "from entries order by bibkey"
+        )
+        self.assertEqual(
+            [dict(r) for r in self.pBDB.curs.fetchall()],
+            [
+                {
+                    "bibkey": "abc",
+                    "titleText": "Abγ",
+                    "authorText": "",
+                    "firstAuthor": "",
+                    "publishedText": "  (2018) ",
+                },
+                {
+                    "bibkey": "def",
+                    "titleText": "",
+                    "authorText": "John Smith and Me",
+                    "firstAuthor": "Smith, John",
+                    "publishedText": "J  (2019) ",
+                },
+            ],
+        )
+        self.assertTrue(
+            self.pBDB.connExec(
+                "update entries set fingerprint = NULL where bibkey = 'abc'"
+            )
+        )
+        with patch("logging.Logger.info") as _i, patch(
+            "physbiblio.databaseCore.PhysBiblioDBCore.commit", autospec=True
+        ) as _c:
+            self.pBDB.checkDisplayFields()
+            _i.assert_called_once_with("Computing the plain text fields of 1 entries")
+        self.assertEqual(
+            self.pBDB.bibs.getField("abc", "fingerprint"),
+            fingerprint("Ab\u03b3", "", 2018),
+        )
+        with patch(
+            "physbiblio.databaseCore.PhysBiblioDBCore.connExecMany",
+            return_value=False,
+            autospec=True,
+        ) as _cm, patch("logging.Logger.error") as _e, patch(
+            "physbiblio.databaseCore.PhysBiblioDBCore.undo", autospec=True
+        ) as _u:
+            self.pBDB.connExec(
+                "update entries set titleText = NULL where bibkey = 'def'"
+            )
+            self.pBDB.checkDisplayFields()
+            _e.assert_called_once_with(
+                "Cannot save the plain text fields of the entries!"
+            )
+            _u.assert_called_once_with(self.pBDB)
 
     def test_checkCaseInsensitiveBibkey(self):
         """test checkCaseInsensitiveBibkey"""
@@ -1446,6 +2450,248 @@ class TestDatabaseMain(DBTestCase):  # using cats just for simplicity
             self.assertEqual(_un.call_count, 0)
         self.pBDB.curs = self.pBDB.conn.cursor()
 
+    def test_checkForeignKeys(self):
+        """test the creation of the foreign keys in old databases"""
+
+        def rows(db, table):
+            db.cursExec("select * from %s" % table)
+            return [tuple(r)[1:] for r in db.curs.fetchall()]
+
+        if os.path.exists(tempFDBName):
+            os.remove(tempFDBName)
+        db = PhysBiblioDB(tempFDBName, pBLogger, info=False)
+        with patch("logging.Logger.info") as _i:
+            self.assertTrue(db.checkForeignKeys())
+            _i.assert_not_called()
+        # recreate the link tables as in the previous versions
+        db.cursExec("PRAGMA foreign_keys = OFF")
+        for table in ["entryCats", "entryExps", "expCats"]:
+            self.assertTrue(db.connExec("DROP TABLE %s" % table))
+            self.assertTrue(
+                db.connExec(
+                    "CREATE TABLE %s (%s)"
+                    % (table, ", ".join([" ".join(f) for f in tableFields[table]]))
+                )
+            )
+        self.assertTrue(
+            db.connExec(
+                "INSERT into entries (bibkey, bibtex, firstdate) "
+                + "values ('abc', '', '2020')"
+            )
+        )
+        self.assertTrue(
+            db.connExec(
+                "INSERT into experiments (idExp, name, comments) "
+                + "values (1, 'exp', '')"
+            )
+        )
+        for query in [
+            "INSERT into entryCats (bibkey, idCat) values "
+            + "('abc', 1), ('xyz', 1), ('abc', 5)",
+            "INSERT into entryExps (bibkey, idExp) values ('ABC', 1), ('abc', 5)",
+            "INSERT into expCats (idExp, idCat) values (1, 0), (3, 0)",
+        ]:
+            self.assertTrue(db.connExec(query))
+        db.commit(verbose=False)
+        db.cursExec("PRAGMA foreign_keys = ON")
+        db.cursExec("PRAGMA foreign_key_list(entryCats)")
+        self.assertEqual(db.curs.fetchall(), [])
+
+        with patch("logging.Logger.info") as _i:
+            self.assertTrue(db.checkForeignKeys())
+            _i.assert_has_calls(
+                [
+                    call("Cleaning (abc, 5)"),
+                    call("Cleaning (1, xyz)"),
+                    call("Cleaning (5, abc)"),
+                    call("Cleaning (0, 3)"),
+                    call("Adding the foreign keys to the table 'expCats'"),
+                    call("Adding the foreign keys to the table 'entryCats'"),
+                    call("Adding the foreign keys to the table 'entryExps'"),
+                ],
+                any_order=True,
+            )
+        self.assertFalse(db.checkUncommitted())
+        for table in ["entryCats", "entryExps", "expCats"]:
+            db.cursExec("PRAGMA foreign_key_list(%s)" % table)
+            self.assertEqual(
+                sorted([(r[2], r[3], r[4], r[5], r[6]) for r in db.curs.fetchall()]),
+                sorted(
+                    [
+                        (fk[1], fk[0], fk[2], "CASCADE", "CASCADE")
+                        for fk in tableForeignKeys[table]
+                    ]
+                ),
+            )
+        db.cursExec("PRAGMA index_list(entryCats)")
+        self.assertEqual(
+            sorted([r[1] for r in db.curs.fetchall()]),
+            ["entryCats_bibkey_idCat", "entryCats_idCat_bibkey"],
+        )
+        self.assertEqual(rows(db, "entryCats"), [("abc", 1)])
+        self.assertEqual(rows(db, "entryExps"), [("ABC", 1)])
+        self.assertEqual(rows(db, "expCats"), [(1, 0)])
+        self.assertFalse(db.catBib.insert(1, "xyz"))
+
+        self.assertTrue(db.bibs.updateBibkey("abc", "def"))
+        self.assertEqual(rows(db, "entryCats"), [("def", 1)])
+        self.assertEqual(rows(db, "entryExps"), [("def", 1)])
+        db.bibs.delete("def")
+        self.assertEqual(rows(db, "entryCats"), [])
+        self.assertEqual(rows(db, "entryExps"), [])
+        db.exps.delete(1)
+        self.assertEqual(rows(db, "expCats"), [])
+        db.undo(verbose=False)
+
+        with patch("logging.Logger.debug") as _d:
+            self.assertTrue(db.checkForeignKeys())
+            _d.assert_any_call("Foreign keys already present. Nothing to do here.")
+        db.cursExec("PRAGMA foreign_keys = OFF")
+        self.assertTrue(db.connExec("DROP TABLE expCats"))
+        self.assertTrue(db.connExec("CREATE TABLE expCats (idExC integer primary key)"))
+        db.commit(verbose=False)
+        db.cursExec("PRAGMA foreign_keys = ON")
+        with patch("logging.Logger.error") as _e, patch("logging.Logger.info") as _i:
+            self.assertFalse(db.checkForeignKeys())
+            _e.assert_any_call(
+                "Cannot add the foreign keys to the tables. "
+                + "Links may remain when entries, categories "
+                + "or experiments are deleted"
+            )
+        self.assertFalse(db.checkUncommitted())
+        self.assertEqual(db.conn.execute("PRAGMA foreign_keys").fetchone()[0], 1)
+        db.closeDB()
+        os.remove(tempFDBName)
+
+    def test_maintain(self):
+        """test maintain and fileSize"""
+        if os.path.exists(tempFDBName):
+            os.remove(tempFDBName)
+        db = PhysBiblioDB(tempFDBName, pBLogger, info=False)
+        db.cursExec("PRAGMA page_size")
+        pageSize = db.curs.fetchall()[0][0]
+        db.cursExec("PRAGMA page_count")
+        pageCount = db.curs.fetchall()[0][0]
+        self.assertEqual(db.fileSize(), pageCount * pageSize)
+        for i in range(200):
+            self.assertTrue(
+                db.connExec(
+                    "INSERT into entries (bibkey, bibtex, firstdate) "
+                    + "values (?, ?, '2020')",
+                    ("key%d" % i, "x" * 1000),
+                )
+            )
+        db.commit(verbose=False)
+        self.assertTrue(db.connExec("delete from entries"))
+        pbm = MagicMock()
+        pbv = MagicMock()
+        with patch("logging.Logger.info") as _i, patch(
+            "physbiblio.database.PhysBiblioDB.createFullTextIndex", autospec=True
+        ) as _ft, patch(
+            "physbiblio.database.PhysBiblioDB.createTableStats", autospec=True
+        ) as _ts:
+            res = db.maintain(pbMax=pbm, pbVal=pbv)
+            _ts.assert_called_once_with(db, rebuild=True)
+            _i.assert_has_calls(
+                [
+                    call(
+                        "Maintenance step 1/3: checking the integrity of the database"
+                    ),
+                    call(
+                        "Maintenance step 2/3: updating the statistics "
+                        + "used by the query planner (ANALYZE)"
+                    ),
+                    call("Maintenance step 3/3: rebuilding the database file (VACUUM)"),
+                ]
+            )
+            if db.hasFullText:
+                _ft.assert_called_once_with(db, rebuild=True)
+                _i.assert_any_call("Rebuilding the full-text index after VACUUM")
+            else:
+                _ft.assert_not_called()
+        pbm.assert_called_once_with(3)
+        pbv.assert_has_calls([call(0), call(1), call(2), call(3)])
+        self.assertFalse(db.checkUncommitted())
+        self.assertEqual(res["integrity"], ["ok"])
+        self.assertTrue(res["fullVacuum"])
+        self.assertLess(res["sizeAfter"], res["sizeBefore"])
+        self.assertEqual(res["sizeAfter"], db.fileSize())
+        db.cursExec("PRAGMA auto_vacuum")
+        self.assertEqual(db.curs.fetchall()[0][0], 2)
+        self.assertEqual(db.bibs.count(), 0)
+        db.cursExec("select count(*) from sqlite_stat1")
+        self.assertGreater(db.curs.fetchall()[0][0], 0)
+
+        for i in range(200):
+            self.assertTrue(
+                db.connExec(
+                    "INSERT into entries (bibkey, bibtex, firstdate) "
+                    + "values (?, ?, '2020')",
+                    ("key%d" % i, "x" * 1000),
+                )
+            )
+        db.commit(verbose=False)
+        self.assertTrue(db.connExec("delete from entries"))
+        with patch("logging.Logger.info") as _i, patch(
+            "physbiblio.database.PhysBiblioDB.createFullTextIndex", autospec=True
+        ) as _ft:
+            res = db.maintain()
+            _i.assert_any_call(
+                "Maintenance step 3/3: releasing the unused pages "
+                + "(incremental VACUUM)"
+            )
+            _ft.assert_not_called()
+        self.assertFalse(res["fullVacuum"])
+        self.assertEqual(res["integrity"], ["ok"])
+        self.assertLess(res["sizeAfter"], res["sizeBefore"])
+        with patch("physbiblio.database.PhysBiblioDB.createFullTextIndex") as _ft:
+            self.assertTrue(db.maintain(full=True)["fullVacuum"])
+
+        with patch(
+            "physbiblio.databaseCore.PhysBiblioDBCore.cursExec",
+            side_effect=[True, True, False],
+            autospec=True,
+        ) as _ce, patch(
+            "physbiblio.databaseCore.PhysBiblioDBCore.fileSize",
+            return_value=10,
+            autospec=True,
+        ) as _fs, patch(
+            "logging.Logger.error"
+        ) as _e, patch(
+            "physbiblio.databaseCore.PhysBiblioDBCore.undo", autospec=True
+        ) as _u, patch(
+            "physbiblio.database.PhysBiblioDB.createTableStats", autospec=True
+        ) as _ts:
+            db.curs = MagicMock()
+            db.curs.fetchall.side_effect = [[[2]], [["ok"]]]
+            self.assertIsNone(db.maintain())
+            self.assertEqual(_ce.call_count, 3)
+            _ts.assert_not_called()
+            _e.assert_called_once_with("The maintenance of the database failed!")
+            _u.assert_called_once_with(db, verbose=False)
+        db.curs = db.conn.cursor()
+        with patch(
+            "physbiblio.databaseCore.PhysBiblioDBCore.cursExec",
+            side_effect=[True, True, True, True, True],
+            autospec=True,
+        ) as _ce, patch(
+            "physbiblio.databaseCore.PhysBiblioDBCore.fileSize",
+            return_value=10,
+            autospec=True,
+        ) as _fs, patch(
+            "logging.Logger.warning"
+        ) as _w, patch(
+            "physbiblio.database.PhysBiblioDB.createTableStats", autospec=True
+        ):
+            db.curs = MagicMock()
+            db.curs.fetchall.side_effect = [[[2]], [["a"], ["b"]], [], []]
+            res = db.maintain()
+            _w.assert_called_once_with("The integrity check found some problems:\na\nb")
+            self.assertEqual(res["integrity"], ["a", "b"])
+        db.curs = db.conn.cursor()
+        db.closeDB()
+        os.remove(tempFDBName)
+
 
 @unittest.skipIf(skipTestsSettings.db, "Database tests")
 class TestDatabaseLinks(DBTestCase):
@@ -1454,6 +2700,7 @@ class TestDatabaseLinks(DBTestCase):
     def test_CatsEntries(self):
         """Test CatsEntries functions"""
         self.pBDB.utils.cleanSpareEntries()
+        self.insertFakeRecords(bibkeys=["test", "test1", "test2", "testA"], idCats=[2])
         self.assertTrue(self.pBDB.catBib.insert(1, "test"))
         self.assertFalse(self.pBDB.catBib.insert(1, "test"))  # already present
         self.assertEqual(tuple(self.pBDB.catBib.getOne(1, "test")[0]), (1, "test", 1))
@@ -1472,7 +2719,7 @@ class TestDatabaseLinks(DBTestCase):
             [tuple(a) for a in self.pBDB.catBib.getAll()],
             [(1, "test1", 1), (2, "test2", 1), (3, "test1", 2), (4, "test2", 2)],
         )
-        self.pBDB.utils.cleanSpareEntries()
+        self.assertTrue(self.pBDB.connExec("delete from entryCats"))
         with patch("six.moves.input", return_value="[1,2]") as _input:
             self.pBDB.catBib.askCats("test1")
             _input.assert_called_once_with("categories for 'test1': ")
@@ -1489,11 +2736,95 @@ class TestDatabaseLinks(DBTestCase):
             [(1, "test1", 1), (2, "test1", 2), (3, "test2", 1), (4, "test2", 2)],
         )
         self.assertEqual(self.pBDB.catBib.countByCat(1), 2)
-        self.assertTrue(self.pBDB.catBib.insert("test", "test"))
+        self.assertFalse(self.pBDB.catBib.insert("test", "test"))  # missing category
+
+    def test_insertMany(self):
+        """Test insertMany in CatsEntries and EntryExps"""
+        self.pBDB.utils.cleanSpareEntries()
+        self.insertFakeRecords(bibkeys=["test", "test1"], idCats=[2])
+        self.assertEqual(self.pBDB.catBib.insertMany([]), [])
+        self.assertTrue(self.pBDB.catBib.insert(1, "test"))
+        self.assertEqual(
+            self.pBDB.catBib.insertMany(
+                [(1, "test"), ("1", "test1"), (1, "test1"), (2, "test")]
+            ),
+            [False, True, False, True],
+        )
+        self.assertEqual(
+            sorted([(a["idCat"], a["bibkey"]) for a in self.pBDB.catBib.getAll()]),
+            [(1, "test"), (1, "test1"), (2, "test")],
+        )
+        with patch(
+            "physbiblio.databaseCore.PhysBiblioDBSub.connExecMany",
+            return_value=False,
+            autospec=True,
+        ) as _cem:
+            self.assertEqual(
+                self.pBDB.catBib.insertMany([(1, "test"), (2, "test1")]),
+                [False, None],
+            )
+            _cem.assert_called_once_with(
+                self.pBDB.catBib,
+                "INSERT OR IGNORE into entryCats (bibkey, idCat) "
+                + "values (:bibkey, :idCat)",
+                [{"bibkey": "test1", "idCat": 2}],
+                atomic=True,
+            )
+        # pairs referring to missing entries or categories do not
+        # prevent the insertion of the valid ones
+        self.assertEqual(
+            self.pBDB.catBib.insertMany(
+                [(2, "test1"), (999, "test1"), (2, "missing"), ("2", "TEST1")]
+            ),
+            [True, None, None, False],
+        )
+        self.assertEqual(
+            sorted([(a["idCat"], a["bibkey"]) for a in self.pBDB.catBib.getAll()]),
+            [(1, "test"), (1, "test1"), (2, "test"), (2, "test1")],
+        )
+
+        self.assertTrue(self.pBDB.connExec("delete from entryCats"))
+        self.assertTrue(
+            self.pBDB.exps.insert(
+                {"name": "exp", "comments": "", "homepage": "", "inspire": ""}
+            )
+        )
+        idExp = self.pBDB.exps.getByName("exp")[0]["idExp"]
+        self.insertFakeRecords(idExps=[1000])
+        self.assertTrue(self.pBDB.catExp.insert(1, idExp))
+        self.assertEqual(self.pBDB.bibExp.insertMany([]), [])
+        self.assertTrue(self.pBDB.bibExp.insert("test", idExp))
+        self.assertEqual(
+            self.pBDB.bibExp.insertMany(
+                [("test", idExp), ("test1", idExp), ("test1", idExp), ("test1", 1000)]
+            ),
+            [False, True, False, True],
+        )
+        self.assertEqual(
+            sorted([(a["bibkey"], a["idExp"]) for a in self.pBDB.bibExp.getAll()]),
+            [("test", idExp), ("test1", idExp), ("test1", 1000)],
+        )
+        self.assertEqual(
+            [(a["idCat"], a["bibkey"]) for a in self.pBDB.catBib.getAll()],
+            [(1, "test"), (1, "test1")],
+        )
+        self.assertEqual(
+            self.pBDB.bibExp.insertMany(
+                [("test", 1000), ("test", 999), ("missing", 1000)]
+            ),
+            [True, None, None],
+        )
+        self.assertEqual(
+            sorted([(a["bibkey"], a["idExp"]) for a in self.pBDB.bibExp.getAll()]),
+            sorted(
+                [("test", 1000), ("test", idExp), ("test1", idExp), ("test1", 1000)]
+            ),
+        )
 
     def test_catExps(self):
         """Test CatsExps functions"""
         self.pBDB.utils.cleanSpareEntries()
+        self.insertFakeRecords(idExps=[10, 11], idCats=[2])
         self.assertTrue(self.pBDB.catExp.insert(1, 10))
         self.assertFalse(self.pBDB.catExp.insert(1, 10))  # already present
         self.assertEqual(tuple(self.pBDB.catExp.getOne(1, 10)[0]), (1, 10, 1))
@@ -1510,7 +2841,7 @@ class TestDatabaseLinks(DBTestCase):
             [tuple(a) for a in self.pBDB.catExp.getAll()],
             [(1, 10, 1), (2, 11, 1), (3, 10, 2), (4, 11, 2)],
         )
-        self.pBDB.utils.cleanSpareEntries()
+        self.assertTrue(self.pBDB.connExec("delete from expCats"))
         with patch("six.moves.input", return_value="[1,2]") as _input:
             self.pBDB.catExp.askCats(10)
             _input.assert_called_once_with("categories for '10': ")
@@ -1526,11 +2857,14 @@ class TestDatabaseLinks(DBTestCase):
         self.assertEqual(self.pBDB.catExp.countByCat(1), 2)
         self.assertEqual(self.pBDB.catExp.countByExp(10), 2)
         self.assertEqual(self.pBDB.catExp.countByExp(1), 0)
-        self.assertTrue(self.pBDB.catExp.insert("test", "test"))
+        self.assertFalse(self.pBDB.catExp.insert("test", "test"))  # missing elements
 
     def test_EntryExps(self):
         """Test EntryExps functions"""
         self.pBDB.utils.cleanSpareEntries()
+        self.insertFakeRecords(
+            bibkeys=["test", "test1", "test2", "testA"], idExps=[1, 2]
+        )
         self.assertTrue(self.pBDB.bibExp.insert("test", 1))
         self.assertFalse(self.pBDB.bibExp.insert("test", 1))  # already present
         self.assertEqual(tuple(self.pBDB.bibExp.getOne("test", 1)[0]), (1, "test", 1))
@@ -1549,7 +2883,7 @@ class TestDatabaseLinks(DBTestCase):
             [tuple(a) for a in self.pBDB.bibExp.getAll()],
             [(1, "test1", 1), (2, "test1", 2), (3, "test2", 1), (4, "test2", 2)],
         )
-        self.pBDB.utils.cleanSpareEntries()
+        self.assertTrue(self.pBDB.connExec("delete from entryExps"))
         with patch("six.moves.input", return_value="[1,2]") as _input:
             self.pBDB.bibExp.askExps("test1")
             _input.assert_called_once_with("experiments for 'test1': ")
@@ -1566,7 +2900,138 @@ class TestDatabaseLinks(DBTestCase):
             [(1, "test1", 1), (2, "test1", 2), (3, "test2", 1), (4, "test2", 2)],
         )
         self.assertEqual(self.pBDB.bibExp.countByExp(1), 2)
-        self.assertTrue(self.pBDB.bibExp.insert("test", "test"))
+        self.assertFalse(self.pBDB.bibExp.insert("test", "test"))  # missing exp
+
+
+@unittest.skipIf(skipTestsSettings.db, "Database tests")
+class TestDatabaseChangeJournal(DBTestCase):
+    """Tests for the methods in the changes subclass"""
+
+    def changes(self, since):
+        """Return the changes after the given sequence number as tuples"""
+        return [
+            (r["tableName"], r["action"], r["bibkey"], r["idLink"])
+            for r in self.pBDB.changes.getSince(since)
+        ]
+
+    def test_triggers(self):
+        """test the changes recorded by the triggers"""
+        start = self.pBDB.changes.lastSeq()
+        self.insertFakeRecords(bibkeys=["abc", "def"], idExps=[1])
+        self.assertTrue(self.pBDB.catBib.insert(1, "abc"))
+        self.assertTrue(self.pBDB.bibExp.insert("def", 1))
+        self.assertTrue(self.pBDB.bibs.updateField("abc", "comments", "x", verbose=0))
+        self.assertEqual(
+            self.changes(start),
+            [
+                ("entries", "insert", "abc", None),
+                ("entries", "insert", "def", None),
+                ("entryCats", "insert", "abc", 1),
+                ("entryExps", "insert", "def", 1),
+                ("entries", "update", "abc", None),
+            ],
+        )
+        self.assertEqual(self.pBDB.changes.lastSeq(), start + 5)
+        self.assertTrue(
+            self.pBDB.connExec("update entries set bibkey = 'ghi' where bibkey = 'abc'")
+        )
+        self.assertEqual(
+            self.changes(start + 5),
+            [
+                ("entryCats", "delete", "abc", 1),
+                ("entryCats", "insert", "ghi", 1),
+                ("entries", "delete", "abc", None),
+                ("entries", "update", "ghi", None),
+            ],
+        )
+        self.assertTrue(
+            self.pBDB.connExec("update entries set bibkey = 'DEF' where bibkey = 'def'")
+        )
+        # the links are not updated when only the case of the key changes
+        self.assertEqual(
+            self.changes(start + 9),
+            [
+                ("entries", "delete", "def", None),
+                ("entries", "update", "DEF", None),
+            ],
+        )
+        self.pBDB.bibs.delete("DEF")
+        self.assertEqual(
+            sorted(self.changes(start + 11)),
+            [("entries", "delete", "DEF", None), ("entryExps", "delete", "def", 1)],
+        )
+        self.assertTrue(self.pBDB.catBib.delete(1, "ghi"))
+        self.assertEqual(self.changes(start + 13), [("entryCats", "delete", "ghi", 1)])
+
+    def test_getChangedBibkeys(self):
+        """test getChangedBibkeys"""
+        start = self.pBDB.changes.lastSeq()
+        self.assertEqual(self.pBDB.changes.getChangedBibkeys(start), ([], []))
+        self.insertFakeRecords(bibkeys=["abc", "def", "jkl"])
+        self.assertEqual(
+            self.pBDB.changes.getChangedBibkeys(start), (["abc", "def", "jkl"], [])
+        )
+        middle = self.pBDB.changes.lastSeq()
+        self.assertTrue(self.pBDB.catBib.insert(1, "jkl"))
+        self.assertTrue(
+            self.pBDB.connExec("update entries set bibkey = 'ghi' where bibkey = 'abc'")
+        )
+        self.assertTrue(
+            self.pBDB.connExec("update entries set bibkey = 'Def' where bibkey = 'def'")
+        )
+        self.pBDB.bibs.delete("Def")
+        self.assertEqual(
+            self.pBDB.changes.getChangedBibkeys(middle),
+            (["ghi", "jkl"], ["abc", "def"]),
+        )
+        self.assertEqual(
+            self.pBDB.changes.getChangedBibkeys(start),
+            (["ghi", "jkl"], ["abc", "def"]),
+        )
+        self.assertEqual(
+            self.pBDB.changes.getChangedBibkeys(self.pBDB.changes.lastSeq()),
+            ([], []),
+        )
+
+    def test_lastSeq_deleteUpTo(self):
+        """test lastSeq, count and deleteUpTo"""
+        start = self.pBDB.changes.lastSeq()
+        self.insertFakeRecords(bibkeys=["abc", "def"])
+        self.assertEqual(self.pBDB.changes.lastSeq(), start + 2)
+        total = self.pBDB.changes.count()
+        self.assertTrue(self.pBDB.changes.deleteUpTo(start + 1))
+        self.assertEqual(self.pBDB.changes.count(), 1)
+        self.assertEqual(self.changes(0), [("entries", "insert", "def", None)])
+        self.assertTrue(self.pBDB.changes.deleteUpTo(start + 2))
+        self.assertEqual(self.pBDB.changes.count(), 0)
+        self.assertEqual(self.pBDB.changes.lastSeq(), start + 2)
+        self.insertFakeRecords(bibkeys=["ghi"])
+        self.assertEqual(self.pBDB.changes.lastSeq(), start + 3)
+        with patch(
+            "physbiblio.databaseCore.PhysBiblioDBCore.cursExec",
+            return_value=False,
+            autospec=True,
+        ) as _ce:
+            self.assertEqual(self.pBDB.changes.lastSeq(), 0)
+
+    def test_printSince(self):
+        """test printSince"""
+        start = self.pBDB.changes.lastSeq()
+        self.insertFakeRecords(bibkeys=["abc"])
+        self.assertTrue(self.pBDB.catBib.insert(1, "abc"))
+        times = [r["time"] for r in self.pBDB.changes.getSince(start)]
+        with patch("logging.Logger.info") as _i:
+            self.pBDB.changes.printSince(start)
+            self.assertEqual(
+                _i.call_args_list,
+                [
+                    call("%d [%s] insert 'abc' in entries" % (start + 1, times[0])),
+                    call(
+                        "%d [%s] insert 'abc, 1' in entryCats" % (start + 2, times[1])
+                    ),
+                    call("Last change: %d" % (start + 2)),
+                ],
+            )
 
 
 @unittest.skipIf(skipTestsSettings.db, "Database tests")
@@ -1619,6 +3084,7 @@ class TestDatabaseExperiments(DBTestCase):
         self.assertFalse(self.pBDB.exps.updateField(1, "idExp", "2"))
         self.assertFalse(self.pBDB.exps.updateField(1, "inspire", None))
         self.checkNumberExperiments(2)
+        self.insertFakeRecords(bibkeys=["test"])
         self.assertTrue(self.pBDB.catExp.insert(1, 1))
         self.assertTrue(self.pBDB.bibExp.insert("test", 1))
         dbStats(self.pBDB)
@@ -1795,6 +3261,7 @@ class TestDatabaseExperiments(DBTestCase):
             u'\n\n%comment\n@article{abc,\nauthor = "me",' + '\ntitle = "title",}',
             bibkey="abc",
         )
+        self.assertTrue(self.pBDB.bibs.insert(data))
         data = self.pBDB.bibs.prepareInsert(
             u'\n\n%comment\n@article{defghi,\nauthor = "me",\n' + 'title = "title",}',
             bibkey="defghi",
@@ -1880,6 +3347,23 @@ class TestDatabaseExperiments(DBTestCase):
                 },
             ],
         )
+        self.assertTrue(self.pBDB.bibExp.insert("defghi", 1))
+        keys = ["k%d" % i for i in range(1200)] + ["defghi", "abc"]
+        grouped = self.pBDB.exps.getDictByEntries(keys)
+        self.assertEqual(sorted(grouped.keys()), sorted(keys))
+        self.assertEqual([e["idExp"] for e in grouped["abc"]], [1])
+        self.assertEqual([e["idExp"] for e in grouped["defghi"]], [2, 1])
+        self.assertEqual(grouped["k0"], [])
+        self.assertEqual(
+            [(e["bibkey"], e["idExp"]) for e in self.pBDB.exps.getByEntries(keys)],
+            [("abc", 1), ("defghi", 2), ("defghi", 1)],
+        )
+        self.assertEqual(self.pBDB.exps.getDictByEntries([]), {})
+        grouped = self.pBDB.exps.getDictByEntries(["DEFGHI", "abc", "Abc"])
+        self.assertEqual(sorted(grouped.keys()), ["Abc", "DEFGHI", "abc"])
+        self.assertEqual([e["idExp"] for e in grouped["DEFGHI"]], [2, 1])
+        self.assertEqual([e["idExp"] for e in grouped["abc"]], [1])
+        self.assertEqual([e["idExp"] for e in grouped["Abc"]], [1])
 
 
 @unittest.skipIf(skipTestsSettings.db, "Database tests")
@@ -1983,6 +3467,7 @@ class TestDatabaseCategories(DBTestCase):
         self.assertFalse(self.pBDB.cats.updateField(1, "idCat", "2"))
         self.assertFalse(self.pBDB.cats.updateField(1, "parentCat", None))
         self.checkNumberCategories(4)
+        self.insertFakeRecords(bibkeys=["test"], idExps=[1])
         self.assertTrue(self.pBDB.catExp.insert(2, 1))
         self.assertTrue(self.pBDB.catBib.insert(2, "test"))
         self.assertTrue(
@@ -2227,6 +3712,7 @@ class TestDatabaseCategories(DBTestCase):
             u'\n\n%comment\n@article{defghi,\nauthor = "me",\n' + 'title = "title",}',
             bibkey="defghi",
         )
+        self.assertTrue(self.pBDB.bibs.insert(data))
         self.assertTrue(self.pBDB.catBib.insert(0, "defghi"))
         self.assertEqual(
             [dict(e) for e in self.pBDB.cats.getByEntries(["abc", "defghi"])],
@@ -2255,6 +3741,20 @@ class TestDatabaseCategories(DBTestCase):
                 },
             ],
         )
+        keys = ["k%d" % i for i in range(1200)] + ["defghi", "abc"]
+        grouped = self.pBDB.cats.getDictByEntries(keys)
+        self.assertEqual(sorted(grouped.keys()), sorted(keys))
+        self.assertEqual([e["idCat"] for e in grouped["abc"]], [1])
+        self.assertEqual([e["idCat"] for e in grouped["defghi"]], [0])
+        self.assertEqual(grouped["k1199"], [])
+        grouped = self.pBDB.cats.getDictByEntries(["ABC", "defghi"])
+        self.assertEqual(sorted(grouped.keys()), ["ABC", "defghi"])
+        self.assertEqual([e["idCat"] for e in grouped["ABC"]], [1])
+        self.assertEqual([e["idCat"] for e in grouped["defghi"]], [0])
+        self.assertEqual(
+            [(e["bibkey"], e["idCat"]) for e in self.pBDB.cats.getByEntries(keys)],
+            [("abc", 1), ("defghi", 0)],
+        )
 
     def test_catString(self):
         """Test catString with existing and non existing records"""
@@ -2269,6 +3769,56 @@ class TestDatabaseCategories(DBTestCase):
             catString(2, self.pBDB)
             _i.assert_any_call("Category '2' not in database")
 
+    def test_getGraph(self):
+        """Test getGraph, its cache and its invalidation"""
+        self.pBDB.catsGraph = None
+        for n, p in [["g", 1], ["c", 1], ["d", 2]]:
+            self.assertTrue(
+                self.pBDB.cats.insert(
+                    {
+                        "name": n,
+                        "comments": "",
+                        "description": "",
+                        "parentCat": p,
+                        "ord": 0,
+                    }
+                )
+            )
+        graph = self.pBDB.cats.getGraph()
+        self.assertEqual(sorted(graph.keys()), [0, 1, 2, 3, 4])
+        self.assertEqual(
+            {i: c["children"] for i, c in graph.items()},
+            {0: [1], 1: [3, 2], 2: [4], 3: [], 4: []},
+        )
+        self.assertEqual(graph[3]["name"], "c")
+        self.assertEqual(graph[3]["parentCat"], 1)
+        self.assertEqual(graph[3]["ord"], 0)
+        self.assertEqual(graph[3]["entries"], 0)
+        self.assertEqual(graph[3]["exps"], 0)
+        self.assertIs(self.pBDB.catsGraph, graph)
+        with patch(
+            "physbiblio.databaseCore.PhysBiblioDBSub.cursExec", autospec=True
+        ) as _ce:
+            self.assertIs(self.pBDB.cats.getGraph(), graph)
+            _ce.assert_not_called()
+        self.insertFakeRecords(bibkeys=["a", "b"], idExps=[1])
+        self.pBDB.catBib.insert(3, ["a", "b"])
+        self.assertIsNone(self.pBDB.catsGraph)
+        self.pBDB.catExp.insert(3, 1)
+        graph = self.pBDB.cats.getGraph()
+        self.assertEqual(graph[3]["entries"], 2)
+        self.assertEqual(graph[3]["exps"], 1)
+        self.pBDB.catBib.delete(3, "a")
+        self.assertEqual(self.pBDB.cats.getGraph()[3]["entries"], 1)
+        self.pBDB.cats.updateField(3, "name", "h")
+        self.assertEqual(self.pBDB.cats.getGraph()[1]["children"], [2, 3])
+        self.pBDB.cats.delete(2)
+        self.assertEqual(sorted(self.pBDB.cats.getGraph().keys()), [0, 1, 3])
+        self.pBDB.undo(verbose=0)
+        self.assertIsNone(self.pBDB.catsGraph)
+        self.assertEqual(sorted(self.pBDB.cats.getGraph().keys()), [0, 1])
+        self.assertIsNot(self.pBDB.cats.getGraph(replace=True), graph)
+
     def test_cats_alphabetical(self):
         """Test alphabetical ordering of idCats with cats_alphabetical"""
         self.assertTrue(
@@ -2313,6 +3863,73 @@ class TestDatabaseCategories(DBTestCase):
             cats_alphabetical([5], self.pBDB)
             _i.assert_any_call("Category '5' not in database")
 
+    def test_tree(self):
+        """Test treeQuery, getAllCatsInTree, getAncestors, countByCatTree
+        and the deletion of subcategories
+        """
+        for n, p in [["c", 1], ["d", 2], ["e", 1], ["f", 3]]:
+            self.assertTrue(
+                self.pBDB.cats.insert(
+                    {
+                        "name": n,
+                        "comments": "",
+                        "description": "",
+                        "parentCat": p,
+                        "ord": 0,
+                    }
+                )
+            )
+        self.assertEqual(
+            self.pBDB.cats.treeQuery([1, 2]),
+            "with recursive tree(idCat) as (select idCat from categories "
+            + "where idCat in (?, ?) union select categories.idCat "
+            + "from categories join tree on categories.parentCat=tree.idCat) "
+            + "select idCat from tree",
+        )
+        self.assertEqual(self.pBDB.cats.getAllCatsInTree(2), [2, 3, 5])
+        self.assertEqual(self.pBDB.cats.getAllCatsInTree(["3", "4"]), [3, 4, 5])
+        self.assertEqual(self.pBDB.cats.getAllCatsInTree([]), [])
+        self.assertEqual(self.pBDB.cats.getAncestors(5), [3, 2, 1, 0])
+        self.assertEqual(self.pBDB.cats.getAncestors(1), [0])
+        self.assertEqual(self.pBDB.cats.getAncestors(0), [])
+        self.assertEqual(self.pBDB.cats.getAncestors(10), [])
+        self.insertFakeRecords(bibkeys=["a", "b", "c", "d"], idExps=[1])
+        self.pBDB.catBib.insert(5, ["a", "b"])
+        self.pBDB.catBib.insert(3, ["a", "c"])
+        self.pBDB.catBib.insert(4, "d")
+        self.pBDB.catExp.insert(3, 1)
+        self.assertEqual(self.pBDB.catBib.countByCatTree(2), 3)
+        self.assertEqual(self.pBDB.catBib.countByCatTree(1), 4)
+        self.assertEqual(self.pBDB.catBib.countByCatTree(5), 2)
+        self.assertEqual(self.pBDB.catBib.countByCatTree(10), 0)
+        self.pBDB.bibs.fetchFromDict(
+            [
+                {
+                    "type": "Categories",
+                    "field": None,
+                    "logical": "",
+                    "operator": "this or subcategories",
+                    "content": [3],
+                }
+            ],
+            orderBy="bibkey",
+        )
+        self.assertEqual(
+            self.pBDB.bibs.lastQuery,
+            "select * from entries  where  entries.bibkey in "
+            + "(select bibkey from entryCats where idCat in (%s))  "
+            % self.pBDB.cats.treeQuery([3])
+            + "order by entries.bibkey ASC",
+        )
+        self.assertEqual(self.pBDB.bibs.lastVals, ("3",))
+        self.assertTrue(self.pBDB.cats.delete(3))
+        self.assertEqual([c["idCat"] for c in self.pBDB.cats.getAll()], [0, 1, 2, 4])
+        self.assertEqual(
+            sorted([(e["idCat"], e["bibkey"]) for e in self.pBDB.catBib.getAll()]),
+            [(4, "d")],
+        )
+        self.assertEqual(self.pBDB.catExp.getAll(), [])
+
     def test_hierarchy(self):
         """Testing the construction and print of the category hierarchies"""
         self.assertTrue(
@@ -2402,32 +4019,42 @@ class TestDatabaseEntries(DBTestCase):
     def test_delete(self):
         """Test delete a bibtex entry from the DB"""
         self.insert_three()
+        self.insertFakeRecords(idExps=[1])
         self.assertTrue(self.pBDB.catBib.insert(1, "abc"))
         self.assertTrue(self.pBDB.bibExp.insert("abc", 1))
         dbStats(self.pBDB)
         self.assertEqual(
             self.pBDB.stats,
-            {"bibs": 3, "cats": 2, "exps": 0, "catBib": 1, "catExp": 0, "bibExp": 1},
+            {"bibs": 3, "cats": 2, "exps": 1, "catBib": 1, "catExp": 0, "bibExp": 1},
         )
         self.pBDB.bibs.delete("aaa")
         dbStats(self.pBDB)
         self.assertEqual(
             self.pBDB.stats,
-            {"bibs": 3, "cats": 2, "exps": 0, "catBib": 1, "catExp": 0, "bibExp": 1},
+            {"bibs": 3, "cats": 2, "exps": 1, "catBib": 1, "catExp": 0, "bibExp": 1},
         )
         self.pBDB.bibs.delete("abc")
         dbStats(self.pBDB)
         self.assertEqual(
             self.pBDB.stats,
-            {"bibs": 2, "cats": 2, "exps": 0, "catBib": 0, "catExp": 0, "bibExp": 0},
+            {"bibs": 2, "cats": 2, "exps": 1, "catBib": 0, "catExp": 0, "bibExp": 0},
         )
         self.pBDB.bibs.delete(["def", "ghi"])
         dbStats(self.pBDB)
         self.assertEqual(
             self.pBDB.stats,
-            {"bibs": 0, "cats": 2, "exps": 0, "catBib": 0, "catExp": 0, "bibExp": 0},
+            {"bibs": 0, "cats": 2, "exps": 1, "catBib": 0, "catExp": 0, "bibExp": 0},
         )
 
+    def test_dumpLoadBibdict(self):
+        """test dumpBibdict and loadBibdict"""
+        bibdict = {"ID": "abc", "ENTRYTYPE": "article", "title": "Abç"}
+        string = self.pBDB.bibs.dumpBibdict(bibdict)
+        self.assertEqual(string, '{"ID":"abc","ENTRYTYPE":"article","title":"Abç"}')
+        self.assertEqual(self.pBDB.bibs.loadBibdict(string), bibdict)
+        self.assertEqual(self.pBDB.bibs.loadBibdict(" %s " % bibdict), bibdict)
+        self.assertRaises(SyntaxError, lambda: self.pBDB.bibs.loadBibdict("{'a"))
+
     def test_prepareInsert(self):
         """test prepareInsert"""
         # multiple entries in bibtex:
@@ -2610,6 +4237,56 @@ class TestDatabaseEntries(DBTestCase):
             )
         )
 
+    def test_insertMany(self):
+        """Test insertion of many bibtex items at once"""
+        self.assertEqual(self.pBDB.bibs.insertMany([]), [])
+        self.assertTrue(
+            self.pBDB.bibs.insertFromBibtex(
+                '@article{abc,\nauthor = "me",\ntitle = "abc",}'
+            )
+        )
+        data = [
+            self.pBDB.bibs.prepareInsert(
+                '@article{%s,\nauthor = "me",\ntitle = "%s",}' % (k, k)
+            )
+            for k in ["abc", "def", "ghi", "def"]
+        ]
+        self.assertEqual(self.pBDB.bibs.insertMany(data), [False, True, True, False])
+        self.assertEqual(
+            sorted([e["bibkey"] for e in self.pBDB.bibs.getAll()]),
+            ["abc", "def", "ghi"],
+        )
+        self.pBDB.undo(verbose=0)
+        self.assertEqual(self.pBDB.bibs.getAll(), [])
+        del data[2]["arxiv"]
+        with patch("logging.Logger.exception") as _e:
+            self.assertEqual(self.pBDB.bibs.insertMany(data), [None, None, None, False])
+            _e.assert_called_once()
+        self.assertEqual(self.pBDB.bibs.getAll(), [])
+        with patch(
+            "physbiblio.databaseCore.PhysBiblioDBSub.connExecMany",
+            return_value=True,
+            autospec=True,
+        ) as _cem:
+            self.assertEqual(self.pBDB.bibs.insertMany(data[0:1]), [None])
+            _cem.assert_called_once()
+        self.assertTrue(
+            self.pBDB.bibs.insertFromBibtex(
+                '@article{Abc,\nauthor = "me",\ntitle = "abc",}'
+            )
+        )
+        data = [
+            self.pBDB.bibs.prepareInsert(
+                '@article{%s,\nauthor = "me",\ntitle = "%s",}' % (k, k)
+            )
+            for k in ["abc", "Xy", "xY"]
+        ]
+        self.assertEqual(self.pBDB.bibs.insertMany(data), [False, True, False])
+        self.assertEqual(
+            sorted([e["bibkey"] for e in self.pBDB.bibs.getAll()]), ["Abc", "Xy"]
+        )
+        self.pBDB.undo(verbose=0)
+
     def test_update(self):
         """Test general update, field update, bibkey update"""
         self.assertFalse(self.pBDB.bibs.getField("abc", "bibkey"))
@@ -2646,12 +4323,13 @@ class TestDatabaseEntries(DBTestCase):
         )
         self.assertEqual(self.pBDB.bibs.getByBibkey("abc"), e1)
 
+        self.insertFakeRecords(idExps=[1])
         self.assertTrue(self.pBDB.bibExp.insert("abc", 1))
         self.assertTrue(self.pBDB.catBib.insert(1, "abc"))
         dbStats(self.pBDB)
         self.assertEqual(
             self.pBDB.stats,
-            {"bibs": 1, "cats": 2, "exps": 0, "catBib": 1, "catExp": 0, "bibExp": 1},
+            {"bibs": 1, "cats": 2, "exps": 1, "catBib": 1, "catExp": 0, "bibExp": 1},
         )
         with patch("physbiblio.pdf.LocalPDF.renameFolder", autospec=True) as _mock_ren:
             self.assertTrue(self.pBDB.bibs.updateBibkey("abc", "def"))
@@ -2661,10 +4339,25 @@ class TestDatabaseEntries(DBTestCase):
             '@Article{abc,\n        author = "me",\n         ' + 'title = "{abc}",\n}',
         )
         self.assertEqual(self.pBDB.bibs.getByBibkey("def")[0]["old_keys"], "abc")
+        self.assertEqual(
+            [(e["bibkey"], e["idCat"]) for e in self.pBDB.catBib.getAll()],
+            [("def", 1)],
+        )
+        self.assertEqual(
+            [(e["bibkey"], e["idExp"]) for e in self.pBDB.bibExp.getAll()],
+            [("def", 1)],
+        )
+        # the connections are kept when all the fields are replaced
+        entry = self.pBDB.bibs.getByBibkey("def", saveQuery=False)[0]
+        self.assertTrue(
+            self.pBDB.bibs.update(
+                {k: entry[k] for k in ["bibtex", "firstdate", "old_keys"]}, "def"
+            )
+        )
         dbStats(self.pBDB)
         self.assertEqual(
             self.pBDB.stats,
-            {"bibs": 1, "cats": 2, "exps": 0, "catBib": 1, "catExp": 0, "bibExp": 1},
+            {"bibs": 1, "cats": 2, "exps": 1, "catBib": 1, "catExp": 0, "bibExp": 1},
         )
 
         self.assertEqual(self.pBDB.bibs.getByBibkey("def")[0]["inspire"], None)
@@ -2711,6 +4404,12 @@ class TestDatabaseEntries(DBTestCase):
             self.pBDB.bibs.getField("def", "bibdict"),
             {"ENTRYTYPE": "article", "ID": "abc", "author": "me", "title": "{abc}"},
         )
+        self.assertEqual(
+            [self.pBDB.bibs.getField("def", f) for f in self.pBDB.bibs.displayCols],
+            ["abc", "me", "me", "", fingerprint("abc", "me", None)],
+        )
+        self.assertTrue(self.pBDB.bibs.updateField("def", "year", 2019, verbose=0))
+        self.assertEqual(self.pBDB.bibs.getField("def", "publishedText"), "  (2019) ")
         self.assertTrue(
             self.pBDB.bibs.updateField(
                 "def", "bibtex", '@Article{abc,\nauthor = "me",\ntitle = ', verbose=0
@@ -2723,6 +4422,105 @@ class TestDatabaseEntries(DBTestCase):
         with patch("physbiblio.pdf.LocalPDF.renameFolder", autospec=True) as _mock_ren:
             self.assertFalse(self.pBDB.bibs.updateBibkey("def", "abc"))
 
+    def test_updateFields(self):
+        """test updateFields"""
+        self.insert_three()
+        self.assertFalse(
+            self.pBDB.bibs.updateFields(
+                "abc", {"bibkey": "xyz", "inspires": "1", "arxiv": None}, verbose=0
+            )
+        )
+        with patch("logging.Logger.warning") as _w:
+            self.assertFalse(
+                self.pBDB.bibs.updateFields("abc", {"inspires": "1"}, verbose=2)
+            )
+            _w.assert_called_once_with(
+                "Non-existing field or unappropriated value: (abc, inspires, 1)"
+            )
+        bibtex = '@Article{abc,\nauthor = "you",\ntitle = "{new}",\nyear="2020",\n}'
+        with patch.object(
+            self.pBDB.bibs, "connExec", wraps=self.pBDB.bibs.connExec
+        ) as _ce, patch.object(
+            self.pBDB.bibs, "parseBibdict", wraps=self.pBDB.bibs.parseBibdict
+        ) as _pb, patch(
+            "logging.Logger.info"
+        ) as _i:
+            self.assertTrue(
+                self.pBDB.bibs.updateFields(
+                    "abc",
+                    {"bibtex": bibtex, "inspire": "1234", "titleText": "x"},
+                )
+            )
+            _i.assert_called_once_with("Updating 'bibtex', 'inspire' for entry 'abc'")
+            _pb.assert_called_once_with(bibtex)
+            _ce.assert_called_once()
+            self.assertEqual(
+                _ce.call_args[0][0],
+                "update entries set bibtex=:bibtex, inspire=:inspire, "
+                + "bibdict=:bibdict, titleText=:titleText, authorText=:authorText, "
+                + "firstAuthor=:firstAuthor, publishedText=:publishedText, "
+                + "fingerprint=:fingerprint where bibkey=:bibkey\n",
+            )
+        entry = self.pBDB.bibs.getByBibkey("abc")[0]
+        self.assertEqual(entry["bibtex"], bibtex)
+        self.assertEqual(entry["inspire"], "1234")
+        self.assertEqual(entry["bibtexDict"]["title"], "{new}")
+        self.assertEqual(
+            [entry[f] for f in self.pBDB.bibs.displayCols],
+            ["new", "you", "you", "  (2020) ", fingerprint("new", "you", "2020")],
+        )
+        with patch.object(
+            self.pBDB.bibs, "connExec", wraps=self.pBDB.bibs.connExec
+        ) as _ce:
+            self.assertTrue(
+                self.pBDB.bibs.updateFields(
+                    "def", {"year": 2019, "marks": "new"}, verbose=0
+                )
+            )
+            _ce.assert_called_once()
+        entry = self.pBDB.bibs.getByBibkey("def")[0]
+        self.assertEqual(entry["marks"], "new")
+        self.assertEqual(entry["publishedText"], "  (2019) ")
+        self.assertEqual(entry["titleText"], "def")
+        self.assertTrue(
+            self.pBDB.bibs.updateFields(
+                "ghi", {"bibdict": {"title": "other", "author": "A B"}}, verbose=0
+            )
+        )
+        self.assertEqual(
+            self.pBDB.bibs.getField("ghi", "bibdict"),
+            {"title": "other", "author": "A B"},
+        )
+        self.assertEqual(self.pBDB.bibs.getField("ghi", "firstAuthor"), "B, A")
+        self.assertTrue(
+            self.pBDB.bibs.updateFields(
+                "ghi", {"bibtex": '@Article{ghi,\nauthor = "me",\ntitle = '}, verbose=0
+            )
+        )
+        self.assertEqual(self.pBDB.bibs.getField("ghi", "bibdict"), {})
+
+        with patch.object(
+            self.pBDB.bibs, "updateFields", wraps=self.pBDB.bibs.updateFields
+        ) as _uf:
+            self.assertEqual(
+                self.pBDB.bibs.replace(
+                    "author",
+                    ["author", "arxiv"],
+                    "me",
+                    ["him", "1111"],
+                    entries=self.pBDB.bibs.getByBibkey("def"),
+                ),
+                (["def"], ["def"], []),
+            )
+            _uf.assert_called_once()
+            self.assertEqual(
+                sorted(_uf.call_args[0][1].keys()), ["arxiv", "author", "bibtex"]
+            )
+        entry = self.pBDB.bibs.getByBibkey("def")[0]
+        self.assertEqual(entry["arxiv"], "1111")
+        self.assertEqual(entry["bibtexDict"]["author"], "him")
+        self.assertEqual(entry["authorText"], "him")
+
     def test_prepareUpdate(self):
         """test prepareUpdate and related functions"""
         bibtexA = u'@article{abc,\nauthor="me",\ntitle="abc",\n}'
@@ -3067,6 +4865,7 @@ class TestDatabaseEntries(DBTestCase):
     def test_fetchFromDict(self):
         """test the pretty complicated function fetchFromDict"""
         self.insert_three()
+        self.insertFakeRecords(idExps=[0])
         self.pBDB.bibExp.insert(["abc", "def"], 0)
         self.pBDB.catBib.insert(0, ["abc"])
         self.pBDB.catBib.insert(1, ["def", "ghi"])
@@ -3171,26 +4970,84 @@ class TestDatabaseEntries(DBTestCase):
                 e["bibkey"]
                 for e in self.pBDB.bibs.fetchFromDict(
                     [
-                        {
-                            "type": "Experiments",
-                            "logical": "",
-                            "operator": "one",
-                            "content": 0,
-                            "field": None,
-                        },
+                        {
+                            "type": "Experiments",
+                            "logical": "",
+                            "operator": "one",
+                            "content": 0,
+                            "field": None,
+                        },
+                        {
+                            "type": "Categories",
+                            "operator": "at least one among",
+                            "logical": "or",
+                            "content": [0, 1],
+                            "field": None,
+                        },
+                    ]
+                ).lastFetched
+            ],
+            ["abc", "def", "ghi"],
+        )
+        self.pBDB.catBib.insert(0, ["def"])
+        self.assertEqual(
+            [
+                e["bibkey"]
+                for e in self.pBDB.bibs.fetchFromDict(
+                    [
+                        {
+                            "type": "Categories",
+                            "field": None,
+                            "logical": "",
+                            "operator": "all the following",
+                            "content": [0, 1],
+                        }
+                    ]
+                ).lastFetched
+            ],
+            ["def"],
+        )
+        self.assertEqual(
+            self.pBDB.bibs.lastQuery,
+            "select * from entries  where  ("
+            + "exists (select 1 from entryCats where entryCats.bibkey = "
+            + "entries.bibkey and entryCats.idCat = ?) and "
+            + "exists (select 1 from entryCats where entryCats.bibkey = "
+            + "entries.bibkey and entryCats.idCat = ?))  order by entries.firstdate ASC",
+        )
+        self.assertEqual(self.pBDB.bibs.lastVals, ("0", "1"))
+        # entries in more than one of the categories are returned only once
+        self.assertEqual(
+            [
+                e["bibkey"]
+                for e in self.pBDB.bibs.fetchFromDict(
+                    [
                         {
                             "type": "Categories",
+                            "field": None,
+                            "logical": "",
                             "operator": "at least one among",
-                            "logical": "or",
                             "content": [0, 1],
-                            "field": None,
-                        },
-                    ]
+                        }
+                    ],
+                    limitTo=2,
                 ).lastFetched
             ],
-            ["abc", "def", "ghi"],
+            ["abc", "def"],
         )
-        self.pBDB.catBib.insert(0, ["def"])
+        self.assertEqual(
+            self.pBDB.bibs.lastQuery,
+            "select * from entries  where  entries.bibkey in "
+            + "(select bibkey from entryCats where idCat in (?, ?))  "
+            + "order by entries.firstdate ASC LIMIT 2",
+        )
+        self.pBDB.cursExec(
+            "select count(*) from (%s)"
+            % self.pBDB.bibs.lastQuery.replace(" LIMIT 2", ""),
+            self.pBDB.bibs.lastVals,
+        )
+        self.assertEqual(self.pBDB.curs.fetchall()[0][0], 3)
+        # two conditions on the same table
         self.assertEqual(
             [
                 e["bibkey"]
@@ -3200,14 +5057,28 @@ class TestDatabaseEntries(DBTestCase):
                             "type": "Categories",
                             "field": None,
                             "logical": "",
-                            "operator": "all the following",
-                            "content": [0, 1],
-                        }
-                    ]
+                            "operator": "at least one among",
+                            "content": 0,
+                        },
+                        {
+                            "type": "Categories",
+                            "field": None,
+                            "logical": "and",
+                            "operator": "at least one among",
+                            "content": 1,
+                        },
+                    ],
                 ).lastFetched
             ],
             ["def"],
         )
+        self.assertEqual(
+            self.pBDB.bibs.lastQuery,
+            "select * from entries  where  entries.bibkey in "
+            + "(select bibkey from entryCats where idCat = ?)  and "
+            + "entries.bibkey in (select bibkey from entryCats where idCat = ?)   "
+            + "order by entries.firstdate ASC",
+        )
         self.pBDB.catBib.delete(0, "def")
 
         # check limitTo, limitOffset
@@ -4982,17 +6853,17 @@ class TestDatabaseEntries(DBTestCase):
         self.assertEqual(
             self.pBDB.bibs.lastQuery, "select * from entries  order by firstdate ASC"
         )
-        # orderType
+        # orderType (same firstdate: the index on firstdate is scanned backwards)
         self.assertEqual(
             [e["bibkey"] for e in self.pBDB.bibs.getAll(orderType="DESC")],
-            ["abc", "def", "ghi"],
+            ["ghi", "def", "abc"],
         )
         self.assertEqual(
             [
                 e["bibkey"]
                 for e in self.pBDB.bibs.fetchAll(orderType="DESC").lastFetched
             ],
-            ["abc", "def", "ghi"],
+            ["ghi", "def", "abc"],
         )
         self.assertEqual(
             self.pBDB.bibs.lastQuery, "select * from entries  order by firstdate DESC"
@@ -5209,6 +7080,449 @@ class TestDatabaseEntries(DBTestCase):
             self.assertEqual(f.read(), sampleTxt)
         os.remove(testBibName)
 
+    def test_prepareFetchAll(self):
+        """Test the prepareFetchAll function"""
+        self.pBDB.bibs.lastQuery = ""
+        self.pBDB.bibs.lastVals = ()
+        self.assertEqual(
+            self.pBDB.bibs.prepareFetchAll(),
+            ("select * from entries  order by firstdate ASC", ()),
+        )
+        self.assertEqual(self.pBDB.bibs.lastQuery, "")
+        self.assertEqual(
+            self.pBDB.bibs.prepareFetchAll(
+                params={"bibkey": "abc"},
+                operator="like",
+                orderType="DESC",
+                limitTo=5,
+                saveQuery=True,
+            ),
+            (
+                "select * from entries  where bibkey like ? "
+                + " order by firstdate DESC LIMIT 5",
+                ("%abc%",),
+            ),
+        )
+        self.assertEqual(
+            self.pBDB.bibs.lastQuery,
+            "select * from entries  where bibkey like ? "
+            + " order by firstdate DESC LIMIT 5",
+        )
+        self.assertEqual(self.pBDB.bibs.lastVals, ("%abc%",))
+        self.assertEqual(
+            self.pBDB.bibs.prepareFetchAll(
+                params={"title": ["abc", "de*"], "arxiv": "1234"},
+                connection="or",
+                operator="match",
+            ),
+            (
+                "select * from entries  where  entries.rowid in (select rowid "
+                + "from entries_fts where entries_fts match ?)  or  "
+                + "entries.rowid in (select rowid from entries_fts "
+                + "where entries_fts match ?)  or  arxiv like ?  "
+                + "order by firstdate ASC",
+                ('title : ("abc")', 'title : ("de"*)', "%1234%"),
+            ),
+        )
+
+    def test_fullTextQuery(self):
+        """Test fullTextQuery and fullTextColumns"""
+        self.assertEqual(
+            self.pBDB.bibs.fullTextColumns(), ["title", "author", "bibtex", "abstract"]
+        )
+        self.assertEqual(self.pBDB.bibs.fullTextQuery("abc"), '"abc"')
+        self.assertEqual(
+            self.pBDB.bibs.fullTextQuery('neutrino "dark matter" oscill*'),
+            '"neutrino" "dark matter" "oscill"*',
+        )
+        self.assertEqual(
+            self.pBDB.bibs.fullTextQuery('OR a OR b- NOT c:d AND OR "e f'),
+            '"a" OR "b-" NOT "c:d" AND "e f"',
+        )
+        self.assertEqual(self.pBDB.bibs.fullTextQuery('a "" * OR'), '"a"')
+        self.assertEqual(self.pBDB.bibs.fullTextQuery(' " '), '""')
+        self.assertEqual(
+            self.pBDB.bibs.fullTextQuery("a b", "title"), 'title : ("a" "b")'
+        )
+        self.assertEqual(self.pBDB.bibs.fullTextQuery("a b", "bibkey"), '"a" "b"')
+
+    def test_prepareMatch(self):
+        """Test prepareMatch"""
+        ftsQ = (
+            "entries.rowid in (select rowid from entries_fts where entries_fts match ?)"
+        )
+        self.assertTrue(self.pBDB.hasFullText)
+        self.assertEqual(self.pBDB.bibs.prepareMatch(None, "a"), (ftsQ, ('"a"',)))
+        self.assertEqual(
+            self.pBDB.bibs.prepareMatch("abstract", "a b*"),
+            (ftsQ, ('abstract : ("a" "b"*)',)),
+        )
+        self.assertEqual(
+            self.pBDB.bibs.prepareMatch("arxiv", "a", prependTab="entries."),
+            ("entries.arxiv like ?", ("%a%",)),
+        )
+        self.pBDB.hasFullText = False
+        self.assertEqual(
+            self.pBDB.bibs.prepareMatch(None, "a"), ("bibtex like ?", ("%a%",))
+        )
+        self.assertEqual(
+            self.pBDB.bibs.prepareMatch("title", "a"), ("bibtex like ?", ("%a%",))
+        )
+        self.assertEqual(
+            self.pBDB.bibs.prepareMatch("abstract", "a"), ("abstract like ?", ("%a%",))
+        )
+        self.pBDB.hasFullText = True
+
+    def test_fetchMatch(self):
+        """Test "match" searches with fetchFromDict and fetchAll"""
+        for k, a, t in [
+            ["a1", "Gariazzo, S.", "Neutrino oscillations in the early universe"],
+            ["b2", "Mirizzi, A.", "Sterile neutrinos and neutrino masses"],
+            ["c3", "Other, B.", "Dark matter and dark energy"],
+        ]:
+            self.assertTrue(
+                self.pBDB.bibs.insertFromBibtex(
+                    '@article{%s,\nauthor = "%s",\ntitle = "%s",}' % (k, a, t)
+                )
+            )
+
+        def search(content, field="bibtex", operator="matches", **kwargs):
+            return [
+                e["bibkey"]
+                for e in self.pBDB.bibs.fetchFromDict(
+                    [
+                        {
+                            "type": "Text",
+                            "logical": "",
+                            "operator": operator,
+                            "content": content,
+                            "field": field,
+                        }
+                    ],
+                    **kwargs
+                ).lastFetched
+            ]
+
+        self.assertEqual(search("neutrin*"), ["a1", "b2"])
+        self.assertEqual(search("neutrin*", orderBy="rank"), ["b2", "a1"])
+        self.assertEqual(search('"sterile neutrinos"'), ["b2"])
+        self.assertEqual(search('"neutrinos sterile"'), [])
+        self.assertEqual(search("dark", field="abstract"), [])
+        self.assertEqual(search("gariazzo", field="author"), ["a1"])
+        self.assertEqual(search("Neutrino", field="bibkey"), [])
+        self.assertEqual(search("B", field="bibkey"), ["b2"])
+        with patch("logging.Logger.warning") as _w:
+            self.assertEqual(search("a", field="nonexistent"), ["a1", "b2", "c3"])
+            _w.assert_called_once_with("Invalid field: 'nonexistent'")
+        self.assertEqual(search("neutrin", operator="contains"), ["a1", "b2"])
+        self.pBDB.hasFullText = False
+        self.assertEqual(search("neutrin*", orderBy="rank"), [])
+        self.assertEqual(search("neutrin", orderBy="rank"), ["a1", "b2"])
+        self.pBDB.hasFullText = True
+        self.assertEqual(
+            [
+                e["bibkey"]
+                for e in self.pBDB.bibs.getAll(
+                    params={"author": "mirizzi", "title": "energ*"},
+                    connection="or",
+                    operator="match",
+                    orderBy="bibkey",
+                )
+            ],
+            ["b2", "c3"],
+        )
+
+    def test_queryPages(self):
+        """Test preparePageQuery, countQueryPage, getQueryPage, getQueryKeys"""
+        q = "select * from entries"
+        self.assertEqual(
+            self.pBDB.bibs.preparePageQuery(q), ("select * from (%s) " % q, ())
+        )
+        self.assertEqual(
+            self.pBDB.bibs.preparePageQuery(q + ";", (1,), orderBy="bibkey"),
+            ("select * from (%s) order by bibkey collate nocase ASC" % q, (1,)),
+        )
+        with patch("logging.Logger.warning") as _w:
+            self.assertEqual(
+                self.pBDB.bibs.preparePageQuery(q, orderBy="title", orderType="a"),
+                (
+                    "select * from (%s) order by titleText collate nocase ASC" % q,
+                    (),
+                ),
+            )
+            _w.assert_called_once_with(
+                "Invalid ordering ('a') in database operations!\n"
+                + "Reverting to default 'ASC'."
+            )
+        self.assertEqual(
+            self.pBDB.bibs.preparePageQuery(q, orderBy="author", orderType="DESC"),
+            ("select * from (%s) order by firstAuthor collate nocase DESC" % q, ()),
+        )
+        self.assertEqual(
+            self.pBDB.bibs.preparePageQuery(q, orderBy="volume"),
+            (
+                "select * from (%s) order by case when json_valid(bibdict) " % q
+                + "then json_extract(bibdict, '$.volume') end collate nocase ASC",
+                (),
+            ),
+        )
+        self.assertEqual(
+            self.pBDB.bibs.preparePageQuery(q, orderBy="Type", orderType="DESC"),
+            ("select * from (%s) " % q, ()),
+        )
+        nq, nv = self.pBDB.bibs.preparePageQuery(q, (1,), filterText="ab")
+        self.assertEqual(
+            nq,
+            "select * from (%s) where " % q
+            + " or ".join(["%s like ?" % f for f in self.pBDB.bibs.pageFilterFields])
+            + " ",
+        )
+        self.assertEqual(nv, (1,) + ("%ab%",) * len(self.pBDB.bibs.pageFilterFields))
+
+        self.insert_three()
+        self.assertTrue(self.pBDB.bibs.updateField("def", "comments", "some Text"))
+        self.assertEqual(self.pBDB.bibs.countQueryPage(q), 3)
+        self.assertEqual(self.pBDB.bibs.countQueryPage(q, filterText="text"), 1)
+        self.assertEqual(
+            self.pBDB.bibs.countQueryPage(q + " where arxiv=?", ("abc",)), 1
+        )
+        self.assertEqual(self.pBDB.bibs.getQueryKeys(q), ["abc", "def", "ghi"])
+        self.assertEqual(self.pBDB.bibs.getQueryKeys(q, filterText="text"), ["def"])
+        self.assertEqual(
+            [
+                e["bibkey"]
+                for e in self.pBDB.bibs.getQueryPage(
+                    q, orderBy="bibkey", orderType="DESC"
+                )
+            ],
+            ["ghi", "def", "abc"],
+        )
+        page = self.pBDB.bibs.getQueryPage(
+            q, orderBy="title", orderType="DESC", limitTo=1, limitOffset=1
+        )
+        self.assertEqual([e["bibkey"] for e in page], ["def"])
+        self.assertEqual(page[0]["title"], "{def}")
+        self.assertEqual(
+            [
+                e["bibkey"]
+                for e in self.pBDB.bibs.getQueryPage(
+                    q + " where bibkey!=?", ("ghi",), orderBy="arxiv", limitTo=5
+                )
+            ],
+            ["abc", "def"],
+        )
+        self.pBDB.bibs.lastQuery = "last"
+        self.pBDB.bibs.lastFetched = "fetched"
+        with patch("logging.Logger.exception") as _e:
+            self.assertEqual(self.pBDB.bibs.getQueryPage("wrong query"), [])
+            self.assertEqual(self.pBDB.bibs.countQueryPage("wrong query"), 0)
+            self.assertEqual(self.pBDB.bibs.getQueryKeys("wrong query"), [])
+            self.assertEqual(_e.call_count, 3)
+        self.assertEqual(self.pBDB.bibs.lastQuery, "last")
+        self.assertEqual(self.pBDB.bibs.lastFetched, "fetched")
+
+    def test_queryPagesAfter(self):
+        """Test pageSortExpression, getQueryPageAfter, iterQueryPages"""
+        self.assertEqual(self.pBDB.bibs.pageSortExpression("title"), "titleText")
+        self.assertEqual(self.pBDB.bibs.pageSortExpression("year"), "year")
+        self.assertEqual(
+            self.pBDB.bibs.pageSortExpression("volume"),
+            "case when json_valid(bibdict) "
+            + "then json_extract(bibdict, '$.volume') end",
+        )
+        self.assertEqual(self.pBDB.bibs.pageSortExpression("Type"), None)
+        self.assertEqual(self.pBDB.bibs.pageSortExpression(None), None)
+        token = self.pBDB.bibs.makePageToken(2018, "abc")
+        self.assertEqual(self.pBDB.bibs.readPageToken(token), (2018, "abc"))
+        self.assertEqual(self.pBDB.bibs.readPageToken("abc"), None)
+        self.assertEqual(self.pBDB.bibs.readPageToken(None), None)
+        self.assertEqual(self.pBDB.bibs.readPageToken("[1, 2]"), None)
+
+        q = "select * from entries"
+        self.assertEqual(self.pBDB.bibs.getQueryPageAfter(q), ([], None))
+        for i, k in enumerate(["b", "a", "C", "d", "e"]):
+            self.assertTrue(
+                self.pBDB.bibs.insert(
+                    self.pBDB.bibs.prepareInsert(
+                        '@article{%s,\nauthor="me",%s\nyear=%s}'
+                        % (k, "" if k == "e" else '\ntitle="t%d",' % (i % 2), 2000 + i)
+                    )
+                )
+            )
+        self.pBDB.connExec("update entries set titleText=NULL where bibkey='e'")
+        for orderBy, orderType, keys in [
+            (None, "ASC", ["a", "b", "C", "d", "e"]),
+            ("title", "ASC", ["e", "b", "C", "a", "d"]),
+            ("title", "DESC", ["d", "a", "C", "b", "e"]),
+            ("year", "DESC", ["e", "d", "C", "a", "b"]),
+            ("volume", "ASC", ["a", "b", "C", "d", "e"]),
+        ]:
+            page, token = self.pBDB.bibs.getQueryPageAfter(
+                q, orderBy=orderBy, orderType=orderType
+            )
+            self.assertEqual([e["bibkey"] for e in page], keys)
+            self.assertNotIn("pageSortValue", page[0].keys())
+            self.assertEqual(self.pBDB.bibs.readPageToken(token)[1], keys[-1])
+            fetched = []
+            token = None
+            while True:
+                page, token = self.pBDB.bibs.getQueryPageAfter(
+                    q, orderBy=orderBy, orderType=orderType, limitTo=2, after=token
+                )
+                if len(page) == 0:
+                    self.assertEqual(token, None)
+                    break
+                fetched += [e["bibkey"] for e in page]
+            self.assertEqual(fetched, keys)
+        page, token = self.pBDB.bibs.getQueryPageAfter(
+            q + " where bibkey != ?", ("a",), filterText="200", orderBy="title"
+        )
+        self.assertEqual([e["bibkey"] for e in page], ["e", "b", "C", "d"])
+        self.assertEqual(self.pBDB.bibs.readPageToken(token), ("t1", "d"))
+        page, token = self.pBDB.bibs.getQueryPageAfter(
+            q, orderBy="title", limitTo=2, after=self.pBDB.bibs.makePageToken(None, "e")
+        )
+        self.assertEqual([e["bibkey"] for e in page], ["b", "C"])
+        self.assertEqual(
+            self.pBDB.bibs.countQueryPage(
+                q, orderBy="title", after=self.pBDB.bibs.makePageToken(None, "e")
+            ),
+            4,
+        )
+        self.assertEqual(
+            self.pBDB.bibs.countQueryPage(
+                q,
+                orderBy="title",
+                orderType="DESC",
+                after=self.pBDB.bibs.makePageToken("t1", "a"),
+            ),
+            3,
+        )
+        self.assertEqual(
+            self.pBDB.bibs.countQueryPage(
+                q, filterText="t0", orderBy="title", after=token
+            ),
+            0,
+        )
+        with patch("logging.Logger.warning") as _w:
+            self.assertEqual(self.pBDB.bibs.countQueryPage(q, after="wrong"), 0)
+            _w.assert_called_once_with("Invalid page token: 'wrong'")
+        page, token = self.pBDB.bibs.getQueryPageAfter(
+            q, orderBy="title", limitTo=1, limitOffset=3
+        )
+        self.assertEqual([e["bibkey"] for e in page], ["a"])
+        with patch("logging.Logger.warning") as _w:
+            self.assertEqual(
+                [
+                    e["bibkey"]
+                    for e in self.pBDB.bibs.getQueryPageAfter(q, orderType="a")[0]
+                ],
+                ["a", "b", "C", "d", "e"],
+            )
+            self.assertEqual(
+                self.pBDB.bibs.getQueryPageAfter(q, after="wrong"), ([], None)
+            )
+            _w.assert_has_calls(
+                [
+                    call(
+                        "Invalid ordering ('a') in database operations!\n"
+                        + "Reverting to default 'ASC'."
+                    ),
+                    call("Invalid page token: 'wrong'"),
+                ]
+            )
+
+        self.assertEqual(
+            [
+                e["bibkey"]
+                for e in self.pBDB.bibs.iterQueryPages(q, orderBy="title", pageSize=2)
+            ],
+            ["e", "b", "C", "a", "d"],
+        )
+        self.assertEqual(
+            self.pBDB.bibs.readPageToken(self.pBDB.bibs.lastPageToken), ("t1", "d")
+        )
+        self.assertEqual(
+            [
+                e["bibkey"]
+                for e in self.pBDB.bibs.iterQueryPages(
+                    q, orderBy="title", startFrom=2, pageSize=2
+                )
+            ],
+            ["C", "a", "d"],
+        )
+        # interrupted in the middle of a page
+        for ix, e in enumerate(
+            self.pBDB.bibs.iterQueryPages(q, orderBy="title", pageSize=2)
+        ):
+            self.assertNotIn("pageToken", e.keys())
+            if ix == 2:
+                break
+        self.assertEqual(e["bibkey"], "C")
+        token = self.pBDB.bibs.lastPageToken
+        self.assertEqual(self.pBDB.bibs.readPageToken(token), ("t0", "C"))
+        self.assertEqual(
+            [
+                e["bibkey"]
+                for e in self.pBDB.bibs.iterQueryPages(
+                    q, orderBy="title", startFrom=4, after=token
+                )
+            ],
+            ["a", "d"],
+        )
+        page, token = self.pBDB.bibs.getQueryPageAfter(
+            q, orderBy="title", limitTo=2, entryTokens=True
+        )
+        self.assertEqual(
+            [self.pBDB.bibs.readPageToken(e["pageToken"]) for e in page],
+            [(None, "e"), ("t0", "b")],
+        )
+        with patch(
+            "physbiblio.database.Entries.getQueryPageAfter",
+            side_effect=[
+                (
+                    [
+                        {"bibkey": "a", "pageToken": "ta"},
+                        {"bibkey": "b", "pageToken": "tok"},
+                    ],
+                    "tok",
+                ),
+                ([], None),
+            ],
+            autospec=True,
+        ) as _g:
+            self.assertEqual(
+                [e["bibkey"] for e in self.pBDB.bibs.iterQueryPages(q, pageSize=2)],
+                ["a", "b"],
+            )
+            _g.assert_has_calls(
+                [
+                    call(
+                        self.pBDB.bibs,
+                        q,
+                        (),
+                        orderBy=None,
+                        orderType="ASC",
+                        limitTo=2,
+                        after=None,
+                        limitOffset=None,
+                        entryTokens=True,
+                    ),
+                    call(
+                        self.pBDB.bibs,
+                        q,
+                        (),
+                        orderBy=None,
+                        orderType="ASC",
+                        limitTo=2,
+                        after="tok",
+                        limitOffset=None,
+                        entryTokens=True,
+                    ),
+                ]
+            )
+            self.assertEqual(self.pBDB.bibs.lastPageToken, "tok")
+
     def test_fetchByBibkey(self):
         """Test the fetchByBibkey and getByBibkey functions"""
         self.insert_three()
@@ -5239,12 +7553,26 @@ class TestDatabaseEntries(DBTestCase):
         )
         self.assertEqual(
             self.pBDB.bibs.lastQuery,
-            "select * from entries  where bibkey =  ?  or bibkey =  ?  "
-            + "order by firstdate ASC",
+            "select * from entries where bibkey in (?, ?) order by firstdate ASC",
         )
         self.assertEqual(self.pBDB.bibs.lastVals, ("abc", "def"))
         self.pBDB.bibs.lastQuery = ""
         self.pBDB.bibs.lastVals = ()
+        keys = ["k%d" % i for i in range(1200)] + ["ghi", "abc"]
+        with patch.object(
+            self.pBDB.bibs, "selectIn", wraps=self.pBDB.bibs.selectIn
+        ) as _si:
+            self.assertEqual(
+                [e["bibkey"] for e in self.pBDB.bibs.getByBibkey(keys)],
+                ["abc", "ghi"],
+            )
+            _si.assert_called_once_with(
+                "select * from entries where bibkey in (%s)\n", keys
+            )
+        self.assertEqual(self.pBDB.bibs.lastQuery, "")
+        self.assertEqual(self.pBDB.bibs.lastVals, ())
+        self.pBDB.bibs.lastQuery = ""
+        self.pBDB.bibs.lastVals = ()
         self.assertEqual(
             [
                 e["bibkey"]
@@ -5284,15 +7612,34 @@ class TestDatabaseEntries(DBTestCase):
             [e["bibkey"] for e in self.pBDB.bibs.getByKey(["abc", "def"])],
             ["abc", "def", "ghi"],
         )
-        self.assertRegex(self.pBDB.bibs.lastQuery, "select \* from entries  where .*")
-        self.assertRegex(
-            self.pBDB.bibs.lastQuery, ".*bibkey  like   \?  or  bibkey  like   \?.*"
+        self.assertEqual(
+            self.pBDB.bibs.lastQuery,
+            "select * from entries where bibkey in (?, ?) or bibkey in "
+            + "(select bibkey from entryAliases where alias in (?, ?)) "
+            + "order by firstdate ASC",
+        )
+        self.assertEqual(self.pBDB.bibs.lastVals, ("abc", "def", "abc", "def"))
+        self.assertEqual([e["bibkey"] for e in self.pBDB.bibs.getByKey("ab")], [])
+        self.assertEqual(
+            [e["bibkey"] for e in self.pBDB.bibs.getByKey("ABC")], ["abc", "ghi"]
+        )
+        self.assertEqual(
+            [e["bibkey"] for e in self.pBDB.bibs.getByKey("ab", prefix=True)],
+            ["abc", "ghi"],
+        )
+        self.assertEqual(
+            self.pBDB.bibs.lastQuery,
+            "select * from entries where (bibkey >= ? and bibkey < ?) or bibkey in "
+            + "(select bibkey from entryAliases where (alias >= ? and alias < ?)) "
+            + "order by firstdate ASC",
+        )
+        self.assertEqual(
+            self.pBDB.bibs.lastVals, ("ab", "ab\U0010ffff", "ab", "ab\U0010ffff")
         )
-        self.assertRegex(
-            self.pBDB.bibs.lastQuery, ".*old_keys  like   \?  or  old_keys  like   \?.*"
+        self.assertEqual(
+            [e["bibkey"] for e in self.pBDB.bibs.getByKey(["b", "g"], prefix=True)],
+            ["ghi"],
         )
-        self.assertRegex(self.pBDB.bibs.lastQuery, ".* order by firstdate ASC")
-        self.assertEqual(self.pBDB.bibs.lastVals, ("%abc%", "%def%", "%abc%", "%def%"))
         self.pBDB.bibs.lastQuery = ""
         self.pBDB.bibs.lastVals = ()
         self.assertEqual(
@@ -5303,11 +7650,42 @@ class TestDatabaseEntries(DBTestCase):
             ["abc", "ghi"],
         )
         self.assertEqual(
-            [e["bibkey"] for e in self.pBDB.bibs.getByKey("abc", saveQuery=False)],
-            ["abc", "ghi"],
+            [e["bibkey"] for e in self.pBDB.bibs.getByKey("abc", saveQuery=False)],
+            ["abc", "ghi"],
+        )
+        self.assertEqual(self.pBDB.bibs.lastQuery, "")
+        self.assertEqual(self.pBDB.bibs.lastVals, ())
+
+    def test_aliases(self):
+        """Test getAliases, resolveAlias and the aliases
+        created by updateBibkey
+        """
+        self.insert_three()
+        self.assertEqual(self.pBDB.bibs.getAliases("abc"), [])
+        self.assertEqual(self.pBDB.bibs.resolveAlias("abc"), {})
+        with patch("physbiblio.pdf.LocalPDF.renameFolder", autospec=True) as _rf:
+            self.assertTrue(self.pBDB.bibs.updateBibkey("abc", "abc1"))
+            self.assertTrue(self.pBDB.bibs.updateBibkey("abc1", "abc2"))
+        self.assertEqual(self.pBDB.bibs.getAliases("abc2"), ["abc", "abc1"])
+        self.assertEqual(self.pBDB.bibs.resolveAlias("abc1"), {"abc1": "abc2"})
+        self.assertEqual(self.pBDB.bibs.resolveAlias("ABC"), {"abc": "abc2"})
+        self.assertEqual(self.pBDB.bibs.resolveAlias("ab"), {})
+        self.assertEqual(
+            self.pBDB.bibs.resolveAlias("ab", prefix=True),
+            {"abc": "abc2", "abc1": "abc2"},
+        )
+        self.assertEqual(
+            [e["bibkey"] for e in self.pBDB.bibs.getByKey("abc1")], ["abc2"]
+        )
+        self.pBDB.bibs.updateField("def", "old_keys", "abc1, xyz")
+        self.assertEqual(self.pBDB.bibs.getAliases("def"), ["abc1", "xyz"])
+        self.assertEqual(self.pBDB.bibs.getAliases("abc2"), ["abc"])
+        self.assertEqual(
+            self.pBDB.bibs.resolveAlias("", prefix=True),
+            {"abc": "abc2", "abc1": "def", "xyz": "def"},
         )
-        self.assertEqual(self.pBDB.bibs.lastQuery, "")
-        self.assertEqual(self.pBDB.bibs.lastVals, ())
+        self.pBDB.bibs.delete("def")
+        self.assertEqual(self.pBDB.bibs.resolveAlias("xyz"), {})
 
     def test_fetchByBibtex(self):
         """Test the fetchByBibtex and getByBibtex functions"""
@@ -5449,6 +7827,7 @@ class TestDatabaseEntries(DBTestCase):
     def test_fetchByExp(self):
         """test bibs.fetchByExp e bibs.getByExp"""
         self.insert_three()
+        self.insertFakeRecords(idExps=[0])
         self.pBDB.bibExp.insert(["abc", "def"], 0)
         self.assertTrue(
             self.pBDB.exps.insert(
@@ -5458,7 +7837,7 @@ class TestDatabaseEntries(DBTestCase):
         dbStats(self.pBDB)
         self.assertEqual(
             self.pBDB.stats,
-            {"bibs": 3, "cats": 2, "exps": 1, "catBib": 0, "catExp": 0, "bibExp": 2},
+            {"bibs": 3, "cats": 2, "exps": 2, "catBib": 0, "catExp": 0, "bibExp": 2},
         )
         entries = self.pBDB.bibs.fetchByExp(0).lastFetched
         self.assertEqual([e["bibkey"] for e in entries], ["abc", "def"])
@@ -5506,9 +7885,38 @@ class TestDatabaseEntries(DBTestCase):
         self.assertEqual(self.pBDB.bibs.getField("abc", "bibtex"), bibtexIn)
         with patch("logging.Logger.exception") as _e:
             self.pBDB.bibs.cleanBibtexs(startFrom="a"),
-            _e.assert_any_call("Invalid startFrom in cleanBibtexs")
+            _e.assert_any_call("Invalid startFrom or after in cleanBibtexs")
+        with patch("logging.Logger.exception") as _e, patch(
+            "logging.Logger.warning"
+        ) as _w:
+            self.assertEqual(self.pBDB.bibs.cleanBibtexs(after="abc"), (0, 0, []))
+            _w.assert_called_once_with("Invalid page token: 'abc'")
+            _e.assert_any_call("Invalid startFrom or after in cleanBibtexs")
         self.assertEqual(self.pBDB.bibs.cleanBibtexs(startFrom=5), (0, 0, []))
 
+        # stop and resume
+        def stopAt(i):
+            """stop the process when the second entry is reached"""
+            if i == 2:
+                self.pBDB.bibs.runningCleanBibtexs = False
+
+        token = self.pBDB.bibs.makePageToken(
+            self.pBDB.bibs.getField("abc", "firstdate"), "abc"
+        )
+        with patch("logging.Logger.info") as _i:
+            self.assertEqual(
+                self.pBDB.bibs.cleanBibtexs(pbVal=MagicMock(side_effect=stopAt)),
+                (1, 0, ["abc"]),
+            )
+            _i.assert_any_call(
+                "Stopped after entry 'abc'. "
+                + "To resume the process from the next entry, use --after '%s'" % token
+            )
+        with patch("logging.Logger.info") as _i:
+            self.assertEqual(self.pBDB.bibs.cleanBibtexs(after=token), (2, 0, []))
+            _i.assert_any_call("Resuming after entry 'abc'")
+            _i.assert_any_call("CleanBibtexs will process 2 total entries")
+
         with patch("logging.Logger.info") as _i:
             self.pBDB.bibs.cleanBibtexs()
             _i.assert_any_call("CleanBibtexs will process 3 total entries")
@@ -5790,6 +8198,79 @@ class TestDatabaseEntries(DBTestCase):
             res = self.pBDB.bibs.parseAllBibtexs(text, errors=errors, verbose=False)
             self.assertEqual([a["ID"] for a in res], ["def"])
 
+    def test_readBibtexFile(self):
+        """test readBibtexFile"""
+        text = u'@article{abc,\nauthor = "m\u00e8",\n}\n\n@book{def,\ntitle="t"}'
+        with open("tmpbib.bib", "w") as f:
+            f.write(text)
+        size = os.path.getsize("tmpbib.bib")
+        gen = self.pBDB.bibs.readBibtexFile("tmpbib.bib")
+        self.assertIsInstance(gen, types.GeneratorType)
+        self.assertEqual(
+            list(gen),
+            [
+                u"@article{abc,\n",
+                u'author = "m\u00e8",\n',
+                u"}\n",
+                u"\n",
+                u"@book{def,\n",
+                u'title="t"}',
+            ],
+        )
+        pr = MagicMock()
+        self.assertEqual(
+            "".join(self.pBDB.bibs.readBibtexFile("tmpbib.bib", chunkSize=5, progress=pr)),
+            text,
+        )
+        self.assertEqual(pr.call_args_list[-1], call(size))
+        with open("tmpbib.bib", "w") as f:
+            f.write(u"a\r\nb\n")
+        self.assertEqual(
+            list(self.pBDB.bibs.readBibtexFile("tmpbib.bib", chunkSize=2)),
+            [u"a\n", u"b\n"],
+        )
+        os.remove("tmpbib.bib")
+
+    def test_iterBibtexs(self):
+        """test iterBibtexs"""
+        text = [
+            u"@article{abc,\n",
+            'author = "me",\n',
+            'title = "",}\n',
+            "@article{def,\n",
+            'author = "me",\n',
+            'title = "def@ghi",}',
+        ]
+        errors = []
+        with patch(
+            "physbiblio.database.Entries.parseSingleBibtex",
+            side_effect=[[{"ID": "abc"}], [{"ID": "def"}]],
+            autospec=True,
+        ) as _p:
+            gen = self.pBDB.bibs.iterBibtexs(iter(text), errors=errors)
+            self.assertIsInstance(gen, types.GeneratorType)
+            self.assertEqual(_p.call_count, 0)
+            self.assertEqual(next(gen), {"ID": "abc"})
+            _p.assert_called_once_with(
+                self.pBDB.bibs, "".join(text[0:3]), errors=errors, verbose=False
+            )
+            self.assertEqual(next(gen), {"ID": "def"})
+            _p.assert_called_with(
+                self.pBDB.bibs, "".join(text[3:]), errors=errors, verbose=False
+            )
+            self.assertRaises(StopIteration, lambda: next(gen))
+        with patch("logging.Logger.info") as _i:
+            self.assertEqual(
+                [
+                    e["ID"]
+                    for e in self.pBDB.bibs.iterBibtexs(
+                        text + text[3:], messageEvery=2
+                    )
+                ],
+                ["abc", "def", "def"],
+            )
+            _i.assert_any_call("Reading bibtex entry #2")
+
     def test_importFromBib(self):
         with open("tmpbib.bib", "w") as f:
             f.write(
@@ -5801,8 +8282,8 @@ class TestDatabaseEntries(DBTestCase):
         self.pBDB.bibs.importFromBib(
             "tmpbib.bib", completeInfo=False, pbMax=pbm, pbVal=pbv
         )
-        pbm.assert_called_once_with(2)
-        pbv.assert_has_calls([call(1), call(2)])
+        pbm.assert_called_once_with(os.path.getsize("tmpbib.bib"))
+        pbv.assert_called_once_with(os.path.getsize("tmpbib.bib"))
         self.assertEqual([e["bibkey"] for e in self.pBDB.bibs.getAll()], ["abc", "def"])
 
         self.pBDB.undo(verbose=0)
@@ -6020,7 +8501,11 @@ class TestDatabaseEntries(DBTestCase):
             autospec=True,
         ) as _mock_uio, patch.dict(
             pbConfig.params,
-            {"fetchAbstract": False, "defaultCategories": [1]},
+            {
+                "fetchAbstract": False,
+                "defaultCategories": [1],
+                "loadAndInsertWorkers": 1,
+            },
             clear=False,
         ):
             # test add categories
@@ -6231,6 +8716,165 @@ class TestDatabaseEntries(DBTestCase):
                 returnBibtex=True,
             )
 
+    def test_loadAndInsertBatch(self):
+        """tests for loadAndInsertBatch (mocked)"""
+        bibtexs = {
+            "key0": u'@article{key0,\nauthor = "Gariazzo",\ntitle = "{title}",'
+            + '\narxiv="1234.5678",}',
+            "key1": u'@article{key1,\nauthor = "Gariazzo",\ntitle = "{title}",}',
+            "dup": u'@article{key0,\nauthor = "Gariazzo",\ntitle = "{title}",}',
+            "two": u'@article{key2,\nauthor = "Gariazzo",\ntitle = "{title}",}\n'
+            + u'@article{key3,\nauthor = "Gariazzo",\ntitle = "{title}",}',
+            "1.5": u'@book{key4,\nauthor = "Gariazzo",\ntitle = "{title}",}',
+        }
+        with patch(
+            "physbiblio.database.Entries.loadAndInsertBatch",
+            return_value="batch",
+            autospec=True,
+        ) as _lb:
+            with patch.dict(
+                pbConfig.params, {"loadAndInsertWorkers": 1}, clear=False
+            ), patch(
+                "physbiblio.webimport.inspire.WebSearch.retrieveUrlAll",
+                return_value="",
+                autospec=True,
+            ):
+                self.assertTrue(self.pBDB.bibs.loadAndInsert(["abc"]))
+                self.assertEqual(_lb.call_count, 0)
+            with patch.dict(pbConfig.params, {"loadAndInsertWorkers": 3}, clear=False):
+                self.assertTrue(
+                    self.pBDB.bibs.loadAndInsert(
+                        ['@article{abc,\nauthor="me",\ntitle="abc",\n}'],
+                        method="bibtex",
+                    )
+                )
+                self.assertEqual(_lb.call_count, 0)
+                self.assertEqual(
+                    self.pBDB.bibs.loadAndInsert(
+                        ["a", ["b", "c"]], method="doi", pbMax="m", pbVal="v"
+                    ),
+                    "batch",
+                )
+                _lb.assert_called_once_with(
+                    self.pBDB.bibs,
+                    ["a", "b", "c"],
+                    method="doi",
+                    pbMax="m",
+                    pbVal="v",
+                )
+        self.pBDB.undo(verbose=0)
+        with patch("logging.Logger.error") as _e:
+            self.assertFalse(self.pBDB.bibs.loadAndInsertBatch(["a"], method="no"))
+            _e.assert_called_once_with("Method not valid: no")
+
+        pbm = MagicMock()
+        pbv = MagicMock()
+        with patch(
+            "physbiblio.webimport.inspire.WebSearch.retrieveUrlAll",
+            side_effect=lambda s, x: bibtexs[x],
+            autospec=True,
+        ) as _rua, patch(
+            "physbiblio.webimport.inspire.WebSearch.retrieveInspireID",
+            side_effect=lambda s, x, number=None, isDoi=False, isArxiv=False: "1"
+            if x == "key0"
+            else "",
+            autospec=True,
+        ) as _rid, patch(
+            "physbiblio.webimport.inspireoai.WebSearch.retrieveOAIData",
+            return_value={"a": 1},
+            autospec=True,
+        ) as _rod, patch(
+            "physbiblio.database.Entries.updateInfoFromOAI",
+            return_value=True,
+            autospec=True,
+        ) as _uio, patch(
+            "physbiblio.database.Entries.updateInspireID", autospec=True
+        ) as _uid, patch.dict(
+            pbConfig.params,
+            {
+                "fetchAbstract": False,
+                "defaultCategories": [1],
+                "loadAndInsertWorkers": 3,
+            },
+            clear=False,
+        ), patch(
+            "logging.Logger.warning"
+        ) as _w:
+            self.pBDB.bibs.lastInserted = []
+            self.assertTrue(
+                self.pBDB.bibs.loadAndInsertBatch(
+                    ["key0", "key1", "dup", "two", 1.5], pbMax=pbm, pbVal=pbv
+                )
+            )
+            self.assertEqual(_rua.call_count, 5)
+            _rid.assert_has_calls(
+                [
+                    call(physBiblioWeb.webSearch["inspire"], "key0"),
+                    call(physBiblioWeb.webSearch["inspire"], "key1"),
+                    call(physBiblioWeb.webSearch["inspire"], "1.5"),
+                ],
+                any_order=True,
+            )
+            self.assertEqual(_rid.call_count, 3)
+            _rod.assert_called_once_with(physBiblioWeb.webSearch["inspireoai"], "1")
+            _uio.assert_has_calls(
+                [
+                    call(self.pBDB.bibs, "1", oaiData={"a": 1}),
+                    call(self.pBDB.bibs, False, oaiData=None),
+                    call(self.pBDB.bibs, False, oaiData=None),
+                ]
+            )
+            self.assertEqual(_uid.call_count, 0)
+            _w.assert_any_call(
+                "ERRORS!\nFailed to load and import entries:\ntwo"
+            )
+        self.assertEqual(self.pBDB.bibs.lastInserted, ["key0", "key1", "key4"])
+        self.assertEqual(
+            [e["bibkey"] for e in self.pBDB.bibs.getAll(orderBy="bibkey")],
+            ["key0", "key1", "key4"],
+        )
+        self.assertEqual(self.pBDB.bibs.getField("key0", "inspire"), "1")
+        self.assertEqual(self.pBDB.bibs.getField("key1", "inspire"), None)
+        self.assertEqual(
+            [e["idCat"] for e in self.pBDB.cats.getByEntry("key1")], [1]
+        )
+        pbm.assert_called_once_with(5)
+        self.assertEqual(pbv.call_count, 5)
+        pbv.assert_called_with(5)
+        self.pBDB.undo(verbose=0)
+
+        # stop flag and existing entries
+        self.pBDB.bibs.insert(self.pBDB.bibs.prepareInsert(bibtexs["key1"]))
+
+        def stopAfterFirst(s, x):
+            """stop the process after the first download"""
+            self.pBDB.bibs.runningLoadAndInsert = False
+            return bibtexs[x]
+
+        with patch(
+            "physbiblio.webimport.inspire.WebSearch.retrieveUrlAll",
+            side_effect=stopAfterFirst,
+            autospec=True,
+        ) as _rua, patch(
+            "physbiblio.webimport.inspire.WebSearch.retrieveInspireID",
+            return_value="",
+            autospec=True,
+        ) as _rid, patch.dict(
+            pbConfig.params, {"loadAndInsertWorkers": 1}, clear=False
+        ), patch(
+            "logging.Logger.info"
+        ) as _i:
+            self.pBDB.bibs.lastInserted = []
+            self.assertTrue(
+                self.pBDB.bibs.loadAndInsertBatch(["key1", "key0", "dup"])
+            )
+            _i.assert_any_call("Already existing: key1\n")
+            _rua.assert_called_once_with(physBiblioWeb.webSearch["inspire"], "key0")
+            self.assertEqual(_rid.call_count, 0)
+        self.assertEqual(self.pBDB.bibs.lastInserted, [])
+        self.assertEqual(self.pBDB.bibs.count(), 1)
+        self.pBDB.undo(verbose=0)
+
     @unittest.skipIf(skipTestsSettings.online, "Online tests")
     @patch.dict(pbConfig.params, {"maxAuthorSave": 5}, clear=False)
     def test_getFieldsFromArxiv(self):
@@ -6321,6 +8965,7 @@ class TestDatabaseEntries(DBTestCase):
         self.assertFalse(self.pBDB.bibs.updateInspireID("abcdefghi"))
 
     @unittest.skipIf(skipTestsSettings.online, "Online tests")
+    @patch.dict(pbConfig.params, {"oaiUpdateWorkers": 1}, clear=False)
     def test_searchOAIUpdates_online(self):
         """tests for searchOAIUpdates, with real connection"""
         self.assertEqual(self.pBDB.bibs.searchOAIUpdates(startFrom=1), (0, [], []))
@@ -6340,6 +8985,7 @@ class TestDatabaseEntries(DBTestCase):
         )
         self.assertEqual(self.pBDB.bibs.getAll(), [fullRecordAde, fullRecordGariazzo])
 
+    @patch.dict(pbConfig.params, {"oaiUpdateWorkers": 1}, clear=False)
     def test_searchOAIUpdates(self):
         """tests for searchOAIUpdates, with mock functions"""
         self.assertEqual(self.pBDB.bibs.searchOAIUpdates(startFrom=1), (0, [], []))
@@ -6366,7 +9012,7 @@ class TestDatabaseEntries(DBTestCase):
             side_effect=[True, True, True, True, True, True, False, True],
             autospec=True,
         ) as _mock_uioai, patch(
-            "physbiblio.database.Entries.fetchCursor",
+            "physbiblio.database.Entries.iterQueryPages",
             side_effect=[
                 [entry1, entry2],  # 1
                 [entry1a, entry2a],  # 2
@@ -6399,6 +9045,13 @@ class TestDatabaseEntries(DBTestCase):
             self.assertEqual(
                 self.pBDB.bibs.searchOAIUpdates(startFrom=1), (1, [], ["Ade:2013zuv"])
             )  # 4
+            _mock_ga.assert_called_with(
+                self.pBDB.bibs,
+                "select * from entries",
+                orderBy="firstdate",
+                startFrom=1,
+                after=None,
+            )
             self.assertEqual(
                 self.pBDB.bibs.searchOAIUpdates(entries=[entry1]),
                 (1, [], ["Gariazzo:2015rra"]),
@@ -6412,6 +9065,240 @@ class TestDatabaseEntries(DBTestCase):
             pbm.assert_called_once_with(2)
             pbv.assert_has_calls([call(1), call(2)])
 
+    def test_searchOAIUpdatesBatch(self):
+        """tests for searchOAIUpdatesBatch, with mock functions"""
+        for k in ["a3", "a1", "a0", "a4", "a2"]:
+            self.pBDB.bibs.insert(
+                self.pBDB.bibs.prepareInsert(
+                    u'@article{%s,\ntitle="t"\n}' % k,
+                    inspire=None if k == "a2" else "1" + k[1],
+                )
+            )
+        with patch(
+            "physbiblio.database.Entries.searchOAIUpdatesBatch",
+            return_value="b",
+            autospec=True,
+        ) as _b, patch.dict(pbConfig.params, {"oaiUpdateWorkers": 1}, clear=False):
+            self.assertEqual(self.pBDB.bibs.searchOAIUpdates(resume=True), "b")
+            _b.assert_called_once_with(
+                self.pBDB.bibs,
+                startFrom=0,
+                entries=None,
+                force=False,
+                reloadAll=False,
+                pbMax=None,
+                pbVal=None,
+                resume=True,
+                after=None,
+            )
+        self.assertEqual(self.pBDB.bibs.getOAICheckpoint(), None)
+
+        outcomes = {"a0": True, "a3": None}
+        pbm = MagicMock()
+        pbv = MagicMock()
+        with patch(
+            "physbiblio.webimport.inspireoai.WebSearch.retrieveOAIData",
+            side_effect=lambda s, i, **kw: {"id": i},
+            autospec=True,
+        ) as _r, patch(
+            "physbiblio.database.Entries.applyOAIUpdate",
+            side_effect=lambda s, e, **kw: outcomes.get(e["bibkey"], False),
+            autospec=True,
+        ) as _a, patch(
+            "physbiblio.databaseCore.PhysBiblioDBCore.commit", autospec=True
+        ) as _c, patch.dict(
+            pbConfig.params,
+            {"oaiUpdateWorkers": 2, "oaiUpdateBatchSize": 2},
+            clear=False,
+        ):
+            self.assertEqual(
+                self.pBDB.bibs.searchOAIUpdates(pbMax=pbm, pbVal=pbv),
+                (4, ["a3"], ["a0"]),
+            )
+            self.assertEqual(
+                [c[0][1]["bibkey"] for c in _a.call_args_list],
+                ["a0", "a1", "a3", "a4"],
+            )
+            self.assertEqual(
+                [c[1] for c in _a.call_args_list],
+                [
+                    {"force": False, "reloadAll": False, "oaiData": {"id": i}}
+                    for i in ["10", "11", "13", "14"]
+                ],
+            )
+            self.assertEqual(_r.call_count, 4)
+            _r.assert_any_call(
+                physBiblioWeb.webSearch["inspireoai"],
+                "10",
+                bibtex=self.pBDB.bibs.getField("a0", "bibtex"),
+                verbose=0,
+                readConferenceTitle=False,
+            )
+            self.assertEqual(_c.call_count, 3)
+            pbm.assert_called_once_with(5)
+            pbv.assert_called_with(5)
+            self.assertEqual(self.pBDB.bibs.getOAICheckpoint(), None)
+
+            # startFrom, reloadAll
+            _r.reset_mock()
+            _a.reset_mock()
+            self.assertEqual(
+                self.pBDB.bibs.searchOAIUpdates(startFrom=3, reloadAll=True),
+                (2, ["a3"], []),
+            )
+            _r.assert_has_calls(
+                [
+                    call(
+                        physBiblioWeb.webSearch["inspireoai"],
+                        "13",
+                        verbose=0,
+                        readConferenceTitle=False,
+                    ),
+                    call(
+                        physBiblioWeb.webSearch["inspireoai"],
+                        "14",
+                        verbose=0,
+                        readConferenceTitle=False,
+                    ),
+                ],
+                any_order=True,
+            )
+            self.assertEqual(_a.call_count, 2)
+
+            # interrupted run, then resume from the checkpoint
+            def stopAt(s, e, **kw):
+                """set the stop flag while processing a1"""
+                if e["bibkey"] == "a1":
+                    self.pBDB.bibs.runningOAIUpdates = False
+                return False
+
+            _a.side_effect = stopAt
+            _c.reset_mock()
+            with patch("logging.Logger.info") as _i:
+                self.assertEqual(self.pBDB.bibs.searchOAIUpdates(), (2, [], []))
+                _i.assert_any_call("Changes committed, checkpoint saved at entry 'a1'")
+            self.assertEqual(_c.call_count, 2)
+            checkpoint = self.pBDB.bibs.getOAICheckpoint()
+            self.assertEqual(
+                self.pBDB.bibs.readPageToken(checkpoint),
+                (self.pBDB.bibs.getField("a1", "firstdate"), "a1"),
+            )
+            _a.reset_mock()
+            _a.side_effect = None
+            _a.return_value = False
+            with patch("logging.Logger.info") as _i:
+                self.assertEqual(
+                    self.pBDB.bibs.searchOAIUpdates(resume=True), (2, [], [])
+                )
+                _i.assert_any_call(
+                    "Resuming searchOAIUpdates from the saved checkpoint"
+                )
+                _i.assert_any_call("Resuming after entry 'a1'")
+            self.assertEqual(
+                [c[0][1]["bibkey"] for c in _a.call_args_list], ["a3", "a4"]
+            )
+            self.assertEqual(self.pBDB.bibs.getOAICheckpoint(), None)
+            _a.reset_mock()
+            self.assertEqual(
+                self.pBDB.bibs.searchOAIUpdates(after=checkpoint), (2, [], [])
+            )
+            self.assertEqual(
+                [c[0][1]["bibkey"] for c in _a.call_args_list], ["a3", "a4"]
+            )
+
+            # a given list of entries does not use the checkpoint
+            # and does not commit
+            _a.reset_mock()
+            _c.reset_mock()
+            with patch(
+                "physbiblio.config.ConfigurationDB.insert", autospec=True
+            ) as _ci:
+                self.assertEqual(
+                    self.pBDB.bibs.searchOAIUpdates(
+                        entries=self.pBDB.bibs.getByBibkey("a4")
+                        + self.pBDB.bibs.getByBibkey("a2")
+                        + self.pBDB.bibs.getByBibkey("a0")
+                    ),
+                    (2, [], []),
+                )
+                self.assertEqual(_ci.call_count, 0)
+            self.assertEqual(
+                [c[0][1]["bibkey"] for c in _a.call_args_list], ["a4", "a0"]
+            )
+            self.assertEqual(_c.call_count, 0)
+
+            # the old checkpoints, which only contain the bibtex key,
+            # are not valid
+            self.pBDB.config.insert(self.pBDB.bibs.oaiCheckpointName, "a1")
+            self.assertEqual(self.pBDB.bibs.getOAICheckpoint(), None)
+            self.pBDB.config.delete(self.pBDB.bibs.oaiCheckpointName)
+
+    def test_applyOAIUpdate(self):
+        """tests for applyOAIUpdate and isOAIUpdatable"""
+        self.pBDB.bibs.insert(
+            self.pBDB.bibs.prepareInsert(
+                u'@article{Gariazzo:2015rra,\narxiv="1507.08204"\n}', inspire="1385583"
+            )
+        )
+        entry = self.pBDB.bibs.getByBibkey("Gariazzo:2015rra")[0]
+        self.assertTrue(self.pBDB.bibs.isOAIUpdatable(entry))
+        for f in ["book", "lecture", "phd_thesis", "noUpdate"]:
+            e = dict(entry)
+            e[f] = 1
+            self.assertFalse(self.pBDB.bibs.isOAIUpdatable(e))
+            self.assertFalse(self.pBDB.bibs.isOAIUpdatable(e, force=True))
+        e = dict(entry)
+        e["proceeding"] = 1
+        self.assertFalse(self.pBDB.bibs.isOAIUpdatable(e))
+        self.assertTrue(self.pBDB.bibs.isOAIUpdatable(e, force=True))
+        e = dict(entry)
+        e["inspire"] = ""
+        self.assertFalse(self.pBDB.bibs.isOAIUpdatable(e, force=True))
+        e = dict(entry)
+        e["doi"] = "1/2"
+        e["bibtexDict"] = {"journal": "J"}
+        self.assertFalse(self.pBDB.bibs.isOAIUpdatable(e))
+        self.assertTrue(self.pBDB.bibs.isOAIUpdatable(e, force=True))
+
+        entrya = dict(entry)
+        entrya["doi"] = "1/2/3/4"
+        with patch(
+            "physbiblio.database.Entries.updateInfoFromOAI",
+            side_effect=[False, True, True, True],
+            autospec=True,
+        ) as _u, patch(
+            "physbiblio.database.Entries.getByKey",
+            side_effect=[[entrya], [entry], [], [entrya]],
+            autospec=True,
+        ) as _g:
+            e = dict(entry)
+            self.assertEqual(self.pBDB.bibs.applyOAIUpdate(e), None)
+            _u.assert_called_once_with(
+                self.pBDB.bibs,
+                "1385583",
+                bibtex=entry["bibtex"],
+                verbose=0,
+                readConferenceTitle=False,
+                reloadAll=False,
+                originalKey="Gariazzo:2015rra",
+            )
+            self.assertEqual(self.pBDB.bibs.applyOAIUpdate(e, oaiData={"a": 1}), True)
+            _u.assert_called_with(
+                self.pBDB.bibs,
+                "1385583",
+                bibtex=entry["bibtex"],
+                verbose=0,
+                readConferenceTitle=False,
+                reloadAll=False,
+                originalKey="Gariazzo:2015rra",
+                oaiData={"a": 1},
+            )
+            self.assertEqual(self.pBDB.bibs.applyOAIUpdate(e), False)
+            self.pBDB.bibs.newKey = "new"
+            self.assertEqual(self.pBDB.bibs.applyOAIUpdate(e), True)
+            self.assertEqual(e["bibkey"], "new")
+            self.assertFalse(hasattr(self.pBDB.bibs, "newKey"))
+
     @unittest.skipIf(skipTestsSettings.online, "Online tests")
     def test_updateInfoFromOAI_online(self):
         """test updateInfoFromOAI, with online connection"""
@@ -6564,6 +9451,11 @@ class TestDatabaseEntries(DBTestCase):
                             "number": "",
                             "pages": "",
                             "published": "  (2015) ",
+                            "titleText": "",
+                            "authorText": "",
+                            "firstAuthor": "",
+                            "publishedText": "  (2015) ",
+                            "fingerprint": "",
                             "author": "",
                             "bibdict": {
                                 u"arxiv": u"1507.08204",
@@ -6629,6 +9521,11 @@ class TestDatabaseEntries(DBTestCase):
                             "number": "",
                             "pages": "",
                             "published": "  (2016) ",
+                            "titleText": "",
+                            "authorText": "",
+                            "firstAuthor": "",
+                            "publishedText": "  (2016) ",
+                            "fingerprint": "",
                             "author": "",
                             "bibdict": {
                                 u"arxiv": u"1507.08204",
@@ -6681,6 +9578,13 @@ class TestDatabaseEntries(DBTestCase):
                             "number": "",
                             "pages": "",
                             "published": "  (2016) ",
+                            "titleText": "Light Sterile Neutrinos",
+                            "authorText": "Gariazzo",
+                            "firstAuthor": "Gariazzo",
+                            "publishedText": "  (2016) ",
+                            "fingerprint": fingerprint(
+                                "Light Sterile Neutrinos", "Gariazzo", 2016
+                            ),
                             "author": "Gariazzo",
                             "bibdict": {
                                 "ID": u"Gariazzo:2015rra",
@@ -6815,6 +9719,11 @@ class TestDatabaseEntries(DBTestCase):
                     "number": "",
                     "pages": "",
                     "published": "  (2013) ",
+                    "titleText": "",
+                    "authorText": "",
+                    "firstAuthor": "",
+                    "publishedText": "  (2013) ",
+                    "fingerprint": "",
                     "author": "",
                     "bibdict": {
                         u"arxiv": u"1303.5076",
@@ -6864,6 +9773,11 @@ class TestDatabaseEntries(DBTestCase):
                     "number": "",
                     "pages": "",
                     "published": "  (2015) ",
+                    "titleText": "",
+                    "authorText": "",
+                    "firstAuthor": "",
+                    "publishedText": "  (2015) ",
+                    "fingerprint": "",
                     "author": "",
                     "bibdict": {
                         u"arxiv": u"1507.08204",
@@ -6958,6 +9872,11 @@ class TestDatabaseEntries(DBTestCase):
                         "number": "",
                         "pages": "",
                         "published": "  (2013) ",
+                        "titleText": "",
+                        "authorText": "",
+                        "firstAuthor": "",
+                        "publishedText": "  (2013) ",
+                        "fingerprint": "",
                         "author": "",
                         "bibdict": {
                             u"arxiv": u"1303.5076",
@@ -7016,6 +9935,11 @@ class TestDatabaseEntries(DBTestCase):
                         "number": "",
                         "pages": "033001",
                         "published": "J.Phys. G43 (2016) 033001",
+                        "titleText": "",
+                        "authorText": "",
+                        "firstAuthor": "",
+                        "publishedText": "J.Phys. G43 (2016) 033001",
+                        "fingerprint": "",
                         "author": "",
                         "bibdict": {
                             u"doi": u"10.1088/0954-3899/43/3/033001",
@@ -7078,6 +10002,11 @@ class TestDatabaseEntries(DBTestCase):
                     "number": "",
                     "pages": "",
                     "published": "  (2013) ",
+                    "titleText": "",
+                    "authorText": "",
+                    "firstAuthor": "",
+                    "publishedText": "  (2013) ",
+                    "fingerprint": "",
                     "author": "",
                     "bibdict": {
                         u"arxiv": u"1303.5076",
@@ -7127,6 +10056,11 @@ class TestDatabaseEntries(DBTestCase):
                     "number": "",
                     "pages": "",
                     "published": "  (2015) ",
+                    "titleText": "",
+                    "authorText": "",
+                    "firstAuthor": "",
+                    "publishedText": "  (2015) ",
+                    "fingerprint": "",
                     "author": "",
                     "bibdict": {
                         u"arxiv": u"1507.08204",
@@ -7204,6 +10138,11 @@ class TestDatabaseEntries(DBTestCase):
                         "number": "",
                         "pages": "",
                         "published": "  (2013) ",
+                        "titleText": "",
+                        "authorText": "",
+                        "firstAuthor": "",
+                        "publishedText": "  (2013) ",
+                        "fingerprint": "",
                         "author": "",
                         "bibdict": {
                             u"arxiv": u"1303.5076",
@@ -7262,6 +10201,11 @@ class TestDatabaseEntries(DBTestCase):
                         "number": "",
                         "pages": "033001",
                         "published": "J.Phys. G43 (2016) 033001",
+                        "titleText": "",
+                        "authorText": "",
+                        "firstAuthor": "",
+                        "publishedText": "J.Phys. G43 (2016) 033001",
+                        "fingerprint": "",
                         "author": "",
                         "bibdict": {
                             u"doi": u"10.1088/0954-3899/43/3/033001",
@@ -7277,6 +10221,120 @@ class TestDatabaseEntries(DBTestCase):
                 ],
             )
 
+    def test_duplicateKeys(self):
+        """test duplicateKeys"""
+        self.assertEqual(
+            self.pBDB.bibs.duplicateKeys(
+                {"doi": None, "arxiv": None, "inspire": None, "fingerprint": None}
+            ),
+            [],
+        )
+        self.assertEqual(
+            self.pBDB.bibs.duplicateKeys(
+                {"doi": " ", "arxiv": "", "inspire": "", "fingerprint": ""}
+            ),
+            [],
+        )
+        for doi in [
+            "10.1088/0954-3899/43/3/033001",
+            "10.1088/0954-3899/43/3/033001 ",
+            "10.1088/0954-3899/43/3/033001".upper(),
+            "https://doi.org/10.1088/0954-3899/43/3/033001",
+            "http://dx.doi.org/10.1088/0954-3899/43/3/033001",
+            "doi:10.1088/0954-3899/43/3/033001",
+        ]:
+            self.assertEqual(
+                self.pBDB.bibs.duplicateKeys(
+                    {"doi": doi, "arxiv": None, "inspire": None, "fingerprint": ""}
+                ),
+                [("doi", "10.1088/0954-3899/43/3/033001")],
+            )
+        for arxiv in [
+            "1507.08204",
+            "1507.08204v2",
+            "arXiv:1507.08204v12",
+            "arxiv:1507.08204",
+        ]:
+            self.assertEqual(
+                self.pBDB.bibs.duplicateKeys(
+                    {"doi": "", "arxiv": arxiv, "inspire": None, "fingerprint": ""}
+                ),
+                [("arxiv", "1507.08204")],
+            )
+        self.assertEqual(
+            self.pBDB.bibs.duplicateKeys(
+                {"doi": "", "arxiv": "hep-ph/0101001v1", "inspire": None, "fingerprint": ""}
+            ),
+            [("arxiv", "hep-ph/0101001")],
+        )
+        self.assertEqual(
+            self.pBDB.bibs.duplicateKeys(
+                {"doi": "a", "arxiv": "b", "inspire": 1234, "fingerprint": "abcd"}
+            ),
+            [("doi", "a"), ("arxiv", "b"), ("inspire", "1234"), ("fingerprint", "abcd")],
+        )
+
+    def test_findDuplicates(self):
+        """test findDuplicates"""
+        self.assertEqual(self.pBDB.bibs.findDuplicates(), [])
+        for bibtex, fields in [
+            [
+                '@article{a,\nauthor="Gariazzo, S.",\ntitle="{Light} neutrinos",'
+                + '\nyear="2016",\n}',
+                {"doi": "10.1/ABC"},
+            ],
+            [
+                '@article{b,\nauthor="S. Gari\\`azzo",\ntitle="Light Neutrinos",'
+                + '\nyear="2016",\n}',
+                {},
+            ],
+            ['@article{c,\nauthor="X",\ntitle="Other",\n}', {"doi": "10.1/abc"}],
+            [
+                '@article{d,\nauthor="Y",\ntitle="Another",\n}',
+                {"arxiv": "1234.5678v2", "inspire": "12"},
+            ],
+            [
+                '@article{e,\nauthor="Z",\ntitle="Yet another",\n}',
+                {"arxiv": "arXiv:1234.5678"},
+            ],
+            ['@article{f,\nauthor="W",\ntitle="Alone",\n}', {"inspire": "13"}],
+            [
+                '@article{g,\nauthor="V",\ntitle="Something",\n}',
+                {"inspire": "12"},
+            ],
+            ['@article{h,\nauthor="Z",\n}', {}],
+            ['@article{i,\nauthor="Z",\n}', {}],
+        ]:
+            data = self.pBDB.bibs.prepareInsert(bibtex, **fields)
+            self.assertTrue(self.pBDB.bibs.insert(data))
+        pbm = MagicMock()
+        pbv = MagicMock()
+        with patch("logging.Logger.info") as _i:
+            self.assertEqual(
+                self.pBDB.bibs.findDuplicates(pbMax=pbm, pbVal=pbv),
+                [
+                    {"bibkeys": ["a", "b", "c"], "matches": ["doi", "fingerprint"]},
+                    {"bibkeys": ["d", "e", "g"], "matches": ["arxiv", "inspire"]},
+                ],
+            )
+            _i.assert_has_calls(
+                [
+                    call("findDuplicates will process 9 total entries"),
+                    call("2 groups of possibly duplicated entries found"),
+                ]
+            )
+        pbm.assert_called_once_with(9)
+        self.assertEqual(pbv.call_count, 9)
+        pbv.assert_called_with(9)
+        self.assertTrue(self.pBDB.bibs.updateField("c", "doi", "", verbose=0))
+        self.assertEqual(
+            self.pBDB.bibs.findDuplicates(),
+            [
+                {"bibkeys": ["a", "b"], "matches": ["fingerprint"]},
+                {"bibkeys": ["d", "e", "g"], "matches": ["arxiv", "inspire"]},
+            ],
+        )
+
     def test_findCorrupted(self):
         """test the function that finds corrupted bibtexs"""
         data = self.pBDB.bibs.prepareInsert(
@@ -7322,6 +10380,10 @@ class TestDatabaseUtilities(DBTestCase):
         """create spare connections just to delete them
         with cleanSpareEntries
         """
+        # the connections to missing elements can only be created
+        # when the foreign keys are disabled
+        self.pBDB.cursExec("PRAGMA foreign_keys = OFF")
+        self.addCleanup(self.pBDB.cursExec, "PRAGMA foreign_keys = ON")
         self.pBDB.utils.cleanSpareEntries()
         self.assertTrue(self.pBDB.catBib.insert(1, "test"))
         self.assertEqual(self.pBDB.catExp.insert(1, [0, 1]), None)
@@ -7334,8 +10396,10 @@ class TestDatabaseUtilities(DBTestCase):
             self.pBDB.stats,
             {"bibs": 0, "cats": 2, "exps": 1, "catBib": 1, "catExp": 2, "bibExp": 1},
         )
+        self.pBDB.catsGraph = "graph"
         with patch("logging.Logger.info") as _i:
             self.pBDB.utils.cleanSpareEntries()
+            self.assertIsNone(self.pBDB.catsGraph)
             _i.assert_has_calls(
                 [
                     call("Cleaning (test, 1)"),
@@ -7349,6 +10413,78 @@ class TestDatabaseUtilities(DBTestCase):
             {"bibs": 0, "cats": 2, "exps": 1, "catBib": 0, "catExp": 1, "bibExp": 0},
         )
 
+    def test_displayFields(self):
+        """Test displayFields and shortAuthors"""
+        self.assertEqual(
+            displayFields(
+                {
+                    "title": "{Light $\\nu$ {S}terile} Neutrinos",
+                    "author": "Gariazzo, S. and Giunti, C.",
+                    "journal": "J.Phys.",
+                    "volume": "G43",
+                    "pages": "033001",
+                    "year": "2016",
+                },
+                2015,
+            ),
+            {
+                "titleText": "Light \u03bd Sterile Neutrinos",
+                "authorText": "Gariazzo, S. and Giunti, C.",
+                "firstAuthor": "Gariazzo, S.",
+                "publishedText": "J.Phys. G43 (2016) 033001",
+                "fingerprint": fingerprint(
+                    "Light \u03bd Sterile Neutrinos", "Gariazzo, S.", "2016"
+                ),
+            },
+        )
+        self.assertEqual(
+            displayFields({"author": "Stefano Gariazzo and others"}, 2015),
+            {
+                "titleText": "",
+                "authorText": "Stefano Gariazzo and others",
+                "firstAuthor": "Gariazzo, Stefano",
+                "publishedText": "  (2015) ",
+                "fingerprint": "",
+            },
+        )
+        self.assertEqual(
+            displayFields({}),
+            {
+                "titleText": "",
+                "authorText": "",
+                "firstAuthor": "",
+                "publishedText": "",
+                "fingerprint": "",
+            },
+        )
+
+    def test_fingerprint(self):
+        """test fingerprint"""
+        fp = fingerprint("Light \u03bd Sterile Neutrinos", "Gariazzo, S.", "2016")
+        self.assertRegex(fp, "^[0-9a-f]{16}$")
+        for title, author, year in [
+            ["light \u03bd sterile-neutrinos", "Gariazzo, Stefano", 2016],
+            ["Light  \u03bd Sterile Neutrinos.", "Gariazzo", "2016"],
+            ["LIGHT \u039d STERILE NEUTRINOS", "GARIAZZO", "2016"],
+        ]:
+            self.assertEqual(fingerprint(title, author, year), fp)
+        self.assertEqual(
+            fingerprint("Caf\u00e9", "M\u00fcller, A.", 2020),
+            fingerprint("Cafe", "Muller", "2020"),
+        )
+        for title, author, year in [
+            ["Light Sterile Neutrinos", "Gariazzo, S.", "2016"],
+            ["Light \u03bd Sterile Neutrinos", "Giunti, C.", "2016"],
+            ["Light \u03bd Sterile Neutrinos", "Gariazzo, S.", "2015"],
+            ["Light \u03bd Sterile Neutrinos", "Gariazzo, S.", None],
+        ]:
+            self.assertNotEqual(fingerprint(title, author, year), fp)
+        self.assertEqual(fingerprint("", "Gariazzo, S.", "2016"), "")
+        self.assertEqual(fingerprint(" .- ", "Gariazzo, S.", "2016"), "")
+        with patch.dict(pbConfig.params, {"maxAuthorNames": 2}, clear=False):
+            self.assertEqual(shortAuthors("a and b"), "a and b")
+            self.assertEqual(shortAuthors("a and b and c"), "a et al.")
+
     def test_bibtexs(self):
         """Create and clean a bibtex entry"""
         data = self.pBDB.bibs.prepareInsert(
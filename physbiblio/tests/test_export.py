@@ -119,6 +119,42 @@ class TestExportMethods(unittest.TestCase):
             )
         pBExport.rmBackupCopy(testBibName)
 
+        with patch(
+            "physbiblio.database.ChangeJournal.getChangedBibkeys",
+            return_value=(["abc"], []),
+            autospec=True,
+        ) as _gc, patch(
+            "physbiblio.database.Entries.getByBibkey", autospec=True
+        ) as _mock:
+            pBExport.updateExportedBib(testBibName, overwrite=True, since=3)
+            _gc.assert_called_once_with(pBDB.changes, 3)
+            _mock.assert_not_called()
+        with patch(
+            "physbiblio.database.ChangeJournal.getChangedBibkeys",
+            return_value=(["Empty2"], []),
+            autospec=True,
+        ) as _gc, patch(
+            "physbiblio.database.Entries.getByBibkey",
+            return_value=[
+                {
+                    "bibtexDict": {
+                        "ID": "empty2",
+                        "ENTRYTYPE": "Article",
+                        "author": "me",
+                        "title": "yes",
+                    }
+                }
+            ],
+            autospec=True,
+        ) as _mock:
+            pBExport.updateExportedBib(testBibName, overwrite=True, since=3)
+            _mock.assert_called_once_with(pBDB.bibs, "empty2", saveQuery=False)
+        with open(testBibName) as f:
+            self.assertEqual(
+                f.read().replace(" ", "").replace("\n", ""),
+                sampleTxt.replace("me2", "me").replace(" ", "").replace("\n", ""),
+            )
+
     def test_exportAll(self):
         """Test of exportAll"""
         testBibName = self.testBibName
@@ -134,10 +170,139 @@ class TestExportMethods(unittest.TestCase):
             "physbiblio.database.Entries.fetchCursor",
             return_value=sampleList,
             autospec=True,
-        ) as _curs:
-            pBExport.exportAll(testBibName)
+        ) as _curs, patch(
+            "physbiblio.database.ChangeJournal.lastSeq", return_value=7, autospec=True
+        ) as _ls, patch(
+            "logging.Logger.info"
+        ) as _i:
+            self.assertEqual(pBExport.exportAll(testBibName), 7)
+            _ls.assert_called_once_with(pBDB.changes)
+            _i.assert_called_once_with(
+                "Last change included in the output file: 7 "
+                + "(use it as 'since' to export only the next changes)"
+            )
         with open(testBibName) as f:
             self.assertEqual(f.read(), sampleTxt)
+        with patch(
+            "physbiblio.database.Entries.fetchCursor",
+            return_value=sampleList,
+            autospec=True,
+        ) as _curs, patch(
+            "physbiblio.export.PBExport.exportRows", return_value=False, autospec=True
+        ) as _er, patch(
+            "logging.Logger.info"
+        ) as _i:
+            self.assertIsNone(pBExport.exportAll(testBibName))
+            _er.assert_called_once_with(pBExport, testBibName, sampleList)
+            _i.assert_not_called()
+        with patch(
+            "physbiblio.export.PBExport.exportChanges", return_value=9, autospec=True
+        ) as _ec, patch(
+            "physbiblio.database.Entries.fetchCursor",
+            return_value=sampleList,
+            autospec=True,
+        ) as _curs:
+            self.assertEqual(pBExport.exportAll(testBibName, since=4), 9)
+            _ec.assert_called_once_with(pBExport, testBibName, 4)
+            _curs.assert_not_called()
+            os.remove(testBibName)
+            self.assertEqual(
+                pBExport.exportAll(testBibName, since=4), pBDB.changes.lastSeq()
+            )
+            _ec.assert_called_once_with(pBExport, testBibName, 4)
+            _curs.assert_called_once_with(pBDB.bibs)
+
+    def test_exportChanges(self):
+        """Test of exportChanges"""
+        testBibName = self.testBibName
+        with open(testBibName, "w") as f:
+            f.write(
+                '@Article{empty,\nauthor="me",\ntitle="no"\n}\n'
+                + '@Article{empty2,\nauthor="me2",\ntitle="yes"\n}\n'
+                + '@Article{empty3,\nauthor="me3",\ntitle="maybe"\n}\n'
+            )
+        with patch(
+            "physbiblio.database.ChangeJournal.getChangedBibkeys",
+            return_value=([], []),
+            autospec=True,
+        ) as _gc, patch(
+            "physbiblio.database.Entries.getByBibkey", autospec=True
+        ) as _gb, patch(
+            "physbiblio.database.ChangeJournal.lastSeq", return_value=5, autospec=True
+        ) as _ls, patch(
+            "logging.Logger.info"
+        ) as _i:
+            self.assertEqual(pBExport.exportChanges(testBibName, 2), 5)
+            _ls.assert_called_once_with(pBDB.changes)
+            _gc.assert_called_once_with(pBDB.changes, 2)
+            _gb.assert_not_called()
+            _i.assert_any_call("No changes to export")
+            _i.assert_called_with(
+                "Last change included in the output file: 5 "
+                + "(use it as 'since' to export only the next changes)"
+            )
+        with patch(
+            "physbiblio.database.ChangeJournal.getChangedBibkeys",
+            return_value=(["Empty2", "new"], ["empty3"]),
+            autospec=True,
+        ) as _gc, patch(
+            "physbiblio.database.Entries.getByBibkey",
+            return_value=[
+                {
+                    "bibkey": "new",
+                    "bibtexDict": {
+                        "ID": "new",
+                        "ENTRYTYPE": "Article",
+                        "author": "you",
+                        "title": "new",
+                    },
+                },
+                {
+                    "bibkey": "Empty2",
+                    "bibtexDict": {
+                        "ID": "Empty2",
+                        "ENTRYTYPE": "Article",
+                        "author": "me et al",
+                        "title": "yes",
+                    },
+                },
+            ],
+            autospec=True,
+        ) as _gb, patch(
+            "physbiblio.database.ChangeJournal.lastSeq", return_value=6, autospec=True
+        ) as _ls, patch(
+            "logging.Logger.info"
+        ) as _i:
+            self.assertEqual(pBExport.exportChanges(testBibName, 2), 6)
+            _gb.assert_called_once_with(pBDB.bibs, ["Empty2", "new"], saveQuery=False)
+            _i.assert_any_call("Output file updated: 2 changed and 1 deleted entries")
+            _i.assert_called_with(
+                "Last change included in the output file: 6 "
+                + "(use it as 'since' to export only the next changes)"
+            )
+        with open(testBibName) as f:
+            entries = (
+                bibtexparser.bparser.BibTexParser(common_strings=True)
+                .parse(f.read())
+                .entries
+            )
+        self.assertEqual([e["ID"] for e in entries], ["empty", "Empty2", "new"])
+        self.assertEqual(entries[1]["author"], "me et al")
+        self.assertEqual(entries[2]["author"], "you")
+        self.assertFalse(os.path.exists(testBibName + pBExport.backupExtension))
+        with patch(
+            "physbiblio.database.ChangeJournal.getChangedBibkeys",
+            return_value=(["new"], []),
+            autospec=True,
+        ) as _gc, patch(
+            "physbiblio.database.Entries.getByBibkey", return_value=[], autospec=True
+        ) as _gb, patch(
+            "codecs.open", side_effect=IOError("x")
+        ) as _o, patch(
+            "logging.Logger.exception"
+        ) as _e:
+            self.assertIsNone(pBExport.exportChanges(testBibName, 2))
+            _e.assert_called_once_with("Problems in exporting .bib file!")
 
     def test_exportForTexFile(self):
         """test exportForTexFile function with a fake tex and database"""
@@ -3,24 +3,27 @@
 
 This file is part of the physbiblio package.
 """
+import datetime
 import os
 import shutil
 import sys
 import traceback
 
+import requests
 import six
 
 if sys.version_info[0] < 3:
     import unittest2 as unittest
-    from mock import call, patch
+    from mock import MagicMock, call, patch
 else:
     import unittest
-    from unittest.mock import call, patch
+    from unittest.mock import MagicMock, call, patch
 
 try:
     from physbiblio.config import pbConfig
     from physbiblio.database import PhysBiblioDB, pBDB
     from physbiblio.pdf import LocalPDF, pBPDF
+    from physbiblio.webimport.webInterf import pBSessionPool
     from physbiblio.setuptests import *
 except ImportError:
     print("Could not find physbiblio and its modules!")
@@ -169,6 +172,43 @@ class TestPdfMethods(unittest.TestCase):
             self.assertFalse(pBPDF.downloadArxiv("abc.def"))
         shutil.rmtree(pBPDF.getFileDir("abc.def"))
 
+    def test_downloadArxivSession(self):
+        """Test that downloadArxiv uses the pooled HTTP session"""
+        session = MagicMock()
+        session.get.return_value.content = b"pdf content"
+        with patch(
+            "physbiblio.database.Entries.getField",
+            return_value="1806.11344",
+            autospec=True,
+        ) as _gf, patch(
+            "physbiblio.database.Entries.getArxivUrl",
+            return_value="https://arxiv.org/pdf/1806.11344",
+            autospec=True,
+        ) as _u, patch(
+            "physbiblio.webimport.webInterf.PBSessionPool.session",
+            return_value=session,
+            autospec=True,
+        ) as _s:
+            self.assertTrue(pBPDF.downloadArxiv("abc.def", force=True))
+            _s.assert_called_once_with(pBSessionPool)
+            session.get.assert_called_once_with(
+                "https://arxiv.org/pdf/1806.11344",
+                timeout=float(pbConfig.params["timeoutWebSearch"]),
+            )
+            session.get.return_value.raise_for_status.assert_called_once_with()
+            with open(pBPDF.getFilePath("abc.def", "arxiv"), "rb") as _f:
+                self.assertEqual(_f.read(), b"pdf content")
+            session.get.return_value.raise_for_status.side_effect = (
+                requests.exceptions.HTTPError("404")
+            )
+            with patch("logging.Logger.exception") as _e:
+                self.assertFalse(pBPDF.downloadArxiv("abc.def", force=True))
+                _e.assert_called_once_with(
+                    "ArXiv PDF for 'abc.def' not found "
+                    + "(404 error on url: https://arxiv.org/pdf/1806.11344)"
+                )
+        shutil.rmtree(pBPDF.getFileDir("abc.def"))
+
     def test_removeSpare(self):
         """Test finding spare folders"""
         with patch(
@@ -324,6 +364,33 @@ class TestPdfMethods(unittest.TestCase):
                     [call("f/a"), call("f/b/c"), call("f/b/d"), call("f/b/e")]
                 )
 
+    def test_folderSummary(self):
+        """test updateFolderSummary and getFolderSummary"""
+        pdf = LocalPDF()
+        self.assertIsNone(pdf.folderSummary)
+        self.assertIsNone(pdf.getFolderSummary())
+        with patch(
+            "physbiblio.pdf.LocalPDF.numberOfFiles", return_value=3, autospec=True
+        ) as _nf, patch(
+            "physbiblio.pdf.LocalPDF.dirSize", return_value=1234, autospec=True
+        ) as _ds:
+            summary = pdf.updateFolderSummary()
+            _nf.assert_called_once_with(pdf, pdf.pdfDir)
+            _ds.assert_called_once_with(pdf, pdf.pdfDir)
+        self.assertEqual(summary["folder"], pdf.pdfDir)
+        self.assertEqual(summary["files"], 3)
+        self.assertEqual(summary["size"], 1234)
+        self.assertIsInstance(summary["time"], datetime.datetime)
+        self.assertEqual(pdf.folderSummary, summary)
+        with patch("physbiblio.pdf.LocalPDF.numberOfFiles", autospec=True) as _nf:
+            self.assertEqual(pdf.getFolderSummary(), summary)
+            self.assertEqual(_nf.call_count, 0)
+        oldDir = pdf.pdfDir
+        pdf.pdfDir = "/surely/non/existent/folder"
+        self.assertIsNone(pdf.getFolderSummary())
+        pdf.pdfDir = oldDir
+        self.assertEqual(pdf.getFolderSummary(), summary)
+
     def test_getSizeWUnits(self):
         """test getSizeWUnits"""
         with patch("logging.Logger.warning") as _w:
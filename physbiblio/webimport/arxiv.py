@@ -49,6 +49,7 @@ class WebSearch(WebInterf, ArxivStrings):
     name = "arXiv"
     description = "arXiv fetcher"
     url = "https://export.arxiv.org/api/query"
+    minInterval = 1.0
     urlRss = "https://export.arxiv.org/rss/"
     categories = {
         "astro-ph": ["CO", "EP", "GA", "HE", "IM", "SR"],
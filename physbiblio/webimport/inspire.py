@@ -26,6 +26,7 @@ class WebSearch(WebInterf, InspireStrings):
     name = "inspire"
     description = "INSPIRE fetcher"
     url = pbConfig.inspireLiteratureAPI
+    minInterval = 0.35
     urlRecord = pbConfig.inspireLiteratureLink
 
     def __init__(self):
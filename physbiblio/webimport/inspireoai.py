@@ -178,6 +178,13 @@ class WebSearch(WebInterf, InspireOAIStrings):
         WebInterf.__init__(self)
         self.oai = Client(self.url, registry)
 
+    @property
+    def minInterval(self):
+        """The minimum time interval between two requests
+        to the OAI server, from the `oaiRequestDelay` setting
+        """
+        return pbConfig.params["oaiRequestDelay"]
+
     def retrieveUrlFirst(self, string):
         """The OAI interface is not for string searches:
         use the retrieveOAIData function if you have the INSPIRE ID
@@ -442,6 +449,7 @@ class WebSearch(WebInterf, InspireOAIStrings):
         Output:
             the dictionary containing the bibtex information
         """
+        self.waitRateLimit()
         try:
             record = self.oai.getRecord(
                 metadataPrefix="marcxml", identifier="oai:inspirehep.net:" + inspireID
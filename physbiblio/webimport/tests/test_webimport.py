@@ -6,6 +6,7 @@ This file is part of the physbiblio package.
 import datetime
 import os
 import sys
+import threading
 import traceback
 
 import requests
@@ -14,15 +15,26 @@ from requests.packages.urllib3.util.retry import Retry
 
 if sys.version_info[0] < 3:
     import unittest2 as unittest
+    from mock import MagicMock
 else:
     import unittest
+    from unittest.mock import MagicMock
 
 try:
     from physbiblio.config import pbConfig
     from physbiblio.parseAccents import parse_accents_str
     from physbiblio.setuptests import *
     from physbiblio.webimport.inspireoai import get_journal_ref_xml
-    from physbiblio.webimport.webInterf import PBSession, WebInterf, physBiblioWeb
+    from physbiblio.webimport.webInterf import (
+        PBRateLimiter,
+        PBSession,
+        PBSessionPool,
+        WebInterf,
+        createPBAdapter,
+        pBRateLimiter,
+        pBSessionPool,
+        physBiblioWeb,
+    )
 except ImportError:
     print("Could not find physbiblio and its modules!")
     raise
@@ -435,12 +447,147 @@ class TestWebImportOffline(unittest.TestCase):
                 total=5,
                 backoff_factor=1.0,
                 status_forcelist=[429, 500, 502, 503, 504],
-                method_whitelist=["HEAD", "GET", "OPTIONS"],
+                allowed_methods=["HEAD", "GET", "OPTIONS"],
             )
-            _ha.assert_called_once_with(max_retries=fr)
+            _ha.assert_called_once_with(
+                pool_connections=10, pool_maxsize=10, pool_block=False, max_retries=fr
+            )
+            _m.assert_any_call("https://", ha)
+            _m.assert_any_call("http://", ha)
+        with patch(
+            "physbiblio.webimport.webInterf.createPBAdapter", autospec=True
+        ) as _ca, patch("requests.Session.mount") as _m:
+            pbs = PBSession(adapter=ha)
+            self.assertEqual(_ca.call_count, 0)
             _m.assert_any_call("https://", ha)
             _m.assert_any_call("http://", ha)
 
+    def test_createPBAdapter(self):
+        """test the createPBAdapter function"""
+        ha = createPBAdapter(pool_connections=3, pool_maxsize=2, pool_block=True)
+        self.assertIsInstance(ha, HTTPAdapter)
+        self.assertEqual(ha._pool_connections, 3)
+        self.assertEqual(ha._pool_maxsize, 2)
+        self.assertEqual(ha._pool_block, True)
+        self.assertEqual(ha.max_retries.total, 5)
+        self.assertEqual(ha.max_retries.backoff_factor, 1.0)
+
+    def test_PBSessionPool(self):
+        """test the PBSessionPool class"""
+        self.assertIsInstance(pBSessionPool, PBSessionPool)
+        pool = PBSessionPool()
+        self.assertIsNone(pool.adapter)
+        self.assertEqual(pbConfig.params["httpRetries"], 2)
+        self.assertEqual(pbConfig.params["httpBackoff"], 0.3)
+        with patch.dict(
+            pbConfig.params,
+            {
+                "httpPoolSize": 3,
+                "httpMaxPerHost": 2,
+                "httpRetries": 1,
+                "httpBackoff": 0.1,
+            },
+            clear=False,
+        ):
+            ha = pool.getAdapter()
+        self.assertIsInstance(ha, HTTPAdapter)
+        self.assertEqual(ha._pool_connections, 3)
+        self.assertEqual(ha._pool_maxsize, 2)
+        self.assertEqual(ha._pool_block, True)
+        self.assertEqual(ha.max_retries.total, 1)
+        self.assertEqual(ha.max_retries.backoff_factor, 0.1)
+        self.assertIs(pool.getAdapter(), ha)
+        s1 = pool.session()
+        self.assertIsInstance(s1, PBSession)
+        self.assertIs(pool.session(), s1)
+        self.assertIs(s1.get_adapter("https://inspirehep.net"), ha)
+        self.assertIs(s1.get_adapter("http://export.arxiv.org"), ha)
+        sessions = []
+        t = threading.Thread(target=lambda: sessions.append(pool.session()))
+        t.start()
+        t.join()
+        self.assertIsNot(sessions[0], s1)
+        self.assertIs(sessions[0].get_adapter("https://inspirehep.net"), ha)
+        with patch("requests.adapters.HTTPAdapter.close", autospec=True) as _c:
+            pool.close()
+            _c.assert_called_once_with(ha)
+        self.assertIsNone(pool.adapter)
+        self.assertIsNot(pool.session(), s1)
+        self.assertIsNot(pool.adapter, ha)
+
+    def test_textFromUrl(self):
+        """test the textFromUrl method of WebInterf"""
+        with patch.dict(
+            pbConfig.params,
+            {"timeoutWebSearch": 20.0, "httpConnectTimeout": 5.0},
+            clear=False,
+        ):
+            wi = WebInterf()
+        self.assertEqual(wi.urlTimeout, 20.0)
+        self.assertEqual(wi.connectTimeout, 5.0)
+        with patch.dict(
+            pbConfig.params,
+            {"timeoutWebSearch": 2.0, "httpConnectTimeout": 5.0},
+            clear=False,
+        ):
+            self.assertEqual(WebInterf().connectTimeout, 2.0)
+        wi.name = "test"
+        response = MagicMock()
+        response.content = b"abc"
+        with patch("requests.Session.get", return_value=response) as _g, patch(
+            "physbiblio.webimport.webInterf.WebInterf.waitRateLimit", autospec=True
+        ) as _w:
+            self.assertEqual(wi.textFromUrl("https://a.org", {"b": "c"}), "abc")
+            _g.assert_called_once_with(
+                "https://a.org", headers={"b": "c"}, timeout=(5.0, 20.0)
+            )
+            _w.assert_called_once_with(wi, "https://a.org")
+        for exc, msg in [
+            (requests.exceptions.ConnectTimeout("x"), wi.errorTimedOut),
+            (requests.exceptions.ReadTimeout("x"), wi.errorTimedOut),
+            (requests.exceptions.ConnectionError("x"), wi.errorRetrieve),
+        ]:
+            with patch("requests.Session.get", side_effect=exc) as _g, patch(
+                "physbiblio.webimport.webInterf.WebInterf.waitRateLimit",
+                autospec=True,
+            ) as _w, patch("logging.Logger.warning") as _l:
+                self.assertEqual(wi.textFromUrl("https://a.org"), "")
+                _l.assert_called_once_with(msg % "test")
+
+    def test_PBRateLimiter(self):
+        """test the PBRateLimiter class and WebInterf.waitRateLimit"""
+        self.assertIsInstance(pBRateLimiter, PBRateLimiter)
+        rl = PBRateLimiter()
+        self.assertEqual(rl.nextTime, {})
+        with patch("time.time", return_value=10.0) as _t, patch(
+            "time.sleep"
+        ) as _s:
+            rl.wait("a.org", 0)
+            self.assertEqual(rl.nextTime, {})
+            rl.wait("a.org", 1.5)
+            self.assertEqual(_s.call_count, 0)
+            self.assertEqual(rl.nextTime, {"a.org": 11.5})
+            rl.wait("a.org", 1.5)
+            _s.assert_called_once_with(1.5)
+            self.assertEqual(rl.nextTime, {"a.org": 13.0})
+            rl.wait("b.org", 1.0)
+            self.assertEqual(_s.call_count, 1)
+            self.assertEqual(rl.nextTime, {"a.org": 13.0, "b.org": 11.0})
+        wi = WebInterf()
+        self.assertEqual(wi.minInterval, 0.0)
+        self.assertEqual(physBiblioWeb.webSearch["arxiv"].minInterval, 1.0)
+        with patch(
+            "physbiblio.webimport.webInterf.PBRateLimiter.wait", autospec=True
+        ) as _w:
+            wi.waitRateLimit("https://a.org/b")
+            self.assertEqual(_w.call_count, 0)
+            wi.minInterval = 0.5
+            wi.waitRateLimit("https://a.org/b?c=d")
+            _w.assert_called_once_with(pBRateLimiter, "a.org", 0.5)
+            wi.url = "http://x.org/search"
+            wi.waitRateLimit()
+            _w.assert_called_with(pBRateLimiter, "x.org", 0.5)
+
     def test_createUrl(self):
         """Test createUrl"""
         pbw = WebInterf()
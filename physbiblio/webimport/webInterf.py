@@ -10,6 +10,8 @@ import pkgutil
 import socket
 import ssl
 import sys
+import threading
+import time
 import traceback
 
 import requests
@@ -18,7 +20,9 @@ from requests.packages.urllib3.util.retry import Retry
 
 if sys.version_info[0] < 3:
     from urllib2 import HTTPError, Request, URLError, urlopen
+    from urlparse import urlparse
 else:
+    from urllib.parse import urlparse
     from urllib.request import HTTPError, Request, URLError, urlopen
 
 try:
@@ -36,6 +40,45 @@ pkgpath = os.path.dirname(wi.__file__)
 webInterfaces = [name for _, name, _ in pkgutil.iter_modules([pkgpath])]
 
 
+def createPBAdapter(
+    total_retries=5,
+    backoff=1.0,
+    status_forcelist=[429, 500, 502, 503, 504],
+    method_whitelist=["HEAD", "GET", "OPTIONS"],
+    pool_connections=10,
+    pool_maxsize=10,
+    pool_block=False,
+):
+    """Create a `HTTPAdapter` with auto-retries.
+    Input parameters are as from
+    requests.packages.urllib3.util.retry.Retry or requests.adapters.HTTPAdapter.
+
+    Output:
+        a `HTTPAdapter` instance
+    """
+    try:
+        retry_strategy = Retry(
+            total=total_retries,
+            backoff_factor=backoff,
+            status_forcelist=status_forcelist,
+            allowed_methods=method_whitelist,
+        )
+    except TypeError:
+        # urllib3 < 1.26
+        retry_strategy = Retry(
+            total=total_retries,
+            backoff_factor=backoff,
+            status_forcelist=status_forcelist,
+            method_whitelist=method_whitelist,
+        )
+    return HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=pool_block,
+        max_retries=retry_strategy,
+    )
+
+
 class PBSession(requests.Session):
     """Extends the Session class to include auto-retries"""
 
@@ -45,24 +88,121 @@ class PBSession(requests.Session):
         backoff=1.0,
         status_forcelist=[429, 500, 502, 503, 504],
         method_whitelist=["HEAD", "GET", "OPTIONS"],
+        adapter=None,
         **kwargs
     ):
         """Extend the Session class.
         Input parameters are as from
         requests.packages.urllib3.util.retry.Retry or requests.Session.
+        If `adapter` is given, it is mounted instead of a new one
+        (the retry parameters are then ignored).
         """
-        retry_strategy = Retry(
-            total=total_retries,
-            backoff_factor=backoff,
-            status_forcelist=status_forcelist,
-            method_whitelist=method_whitelist,
-        )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
+        if adapter is None:
+            adapter = createPBAdapter(
+                total_retries=total_retries,
+                backoff=backoff,
+                status_forcelist=status_forcelist,
+                method_whitelist=method_whitelist,
+            )
         requests.Session.__init__(self, **kwargs)
         self.mount("https://", adapter)
         self.mount("http://", adapter)
 
 
+class PBSessionPool:
+    """Process-wide pool of keep-alive HTTP connections.
+
+    All the threads share the same `HTTPAdapter`, and therefore
+    the same connection pools (one per host), while each thread
+    uses its own `PBSession`, since sessions are not thread-safe.
+    The number of hosts kept in the pool and the maximum number
+    of simultaneous connections to each host are given
+    by the configuration parameters `httpPoolSize` and `httpMaxPerHost`,
+    the number of retries of the failed requests and their backoff factor
+    by `httpRetries` and `httpBackoff`.
+    """
+
+    def __init__(self):
+        """Prepare the lock and the thread-local storage"""
+        self.lock = threading.Lock()
+        self.adapter = None
+        self.local = threading.local()
+
+    def getAdapter(self):
+        """Return the shared `HTTPAdapter`, create it if needed
+
+        Output:
+            a `HTTPAdapter` instance
+        """
+        with self.lock:
+            if self.adapter is None:
+                self.adapter = createPBAdapter(
+                    total_retries=int(pbConfig.params["httpRetries"]),
+                    backoff=float(pbConfig.params["httpBackoff"]),
+                    pool_connections=int(pbConfig.params["httpPoolSize"]),
+                    pool_maxsize=int(pbConfig.params["httpMaxPerHost"]),
+                    pool_block=True,
+                )
+            return self.adapter
+
+    def session(self):
+        """Return the `PBSession` of the current thread,
+        which uses the shared adapter
+
+        Output:
+            a `PBSession` instance
+        """
+        try:
+            return self.local.session
+        except AttributeError:
+            self.local.session = PBSession(adapter=self.getAdapter())
+            return self.local.session
+
+    def close(self):
+        """Close all the pooled connections.
+        New sessions and connections will be created when needed
+        """
+        with self.lock:
+            if self.adapter is not None:
+                self.adapter.close()
+            self.adapter = None
+            self.local = threading.local()
+
+
+pBSessionPool = PBSessionPool()
+
+
+class PBRateLimiter:
+    """Enforce a minimum time interval between the requests
+    sent to the same host, also when they come from different threads
+    """
+
+    def __init__(self):
+        """Prepare the lock and the dictionary of scheduled times"""
+        self.lock = threading.Lock()
+        self.nextTime = {}
+
+    def wait(self, host, interval):
+        """Wait until a new request to the given host is allowed
+
+        Parameters:
+            host: the name of the host
+            interval: the minimum time interval (in seconds)
+                between two requests to the host
+        """
+        if interval <= 0:
+            return
+        with self.lock:
+            now = time.time()
+            when = max(now, self.nextTime.get(host, now))
+            self.nextTime[host] = when + interval
+        if when > now:
+            time.sleep(when - now)
+
+
+pBRateLimiter = PBRateLimiter()
+
+
 class WebInterf(WebInterfStrings):
     """This is the main class for the web search methods.
 
@@ -74,11 +214,16 @@ class WebInterf(WebInterfStrings):
     url = None
     urlArgs = None
     urlTimeout = 1000.0
+    connectTimeout = 1000.0
+    minInterval = 0.0
     interfaces = []
 
     def __init__(self):
         """Initializes the class variables."""
         self.urlTimeout = float(pbConfig.params["timeoutWebSearch"])
+        self.connectTimeout = min(
+            float(pbConfig.params["httpConnectTimeout"]), self.urlTimeout
+        )
         # save the names of the available web search interfaces
         self.interfaces = [
             a for a in webInterfaces if a not in ["strings", "tests", "webInterf"]
@@ -109,8 +254,21 @@ class WebInterf(WebInterfStrings):
             else url
         )
 
+    def waitRateLimit(self, url=None):
+        """Wait, if needed, so that the requests to the same host
+        are separated by at least `self.minInterval` seconds
+
+        Parameter:
+            url (default None): the url that will be opened.
+                If None, use `self.url`
+        """
+        if self.minInterval <= 0:
+            return
+        pBRateLimiter.wait(urlparse(url or self.url).netloc, self.minInterval)
+
     def textFromUrl(self, url, headers=None):
-        """Use urllib to get the html content of the given url.
+        """Use the pooled session (see `PBSessionPool`)
+        to get the html content of the given url.
 
         Parameters:
             url: the url to be opened
@@ -120,20 +278,26 @@ class WebInterf(WebInterfStrings):
         Output:
             text: the content of the url
         """
-        http = PBSession()
+        http = pBSessionPool.session()
         if not isinstance(headers, dict):
             headers = {}
+        self.waitRateLimit(url)
         try:
-            data = http.get(url, headers=headers, timeout=self.urlTimeout).content
+            data = http.get(
+                url, headers=headers, timeout=(self.connectTimeout, self.urlTimeout)
+            ).content
         except URLError:
             pBLogger.warning(self.errorRetrieve % self.name)
             return ""
         except HTTPError:
             pBLogger.warning(self.errorNotFound % url)
             return ""
-        except (ssl.SSLError, socket.timeout):
+        except (ssl.SSLError, socket.timeout, requests.exceptions.Timeout):
             pBLogger.warning(self.errorTimedOut % self.name)
             return ""
+        except requests.exceptions.ConnectionError:
+            pBLogger.warning(self.errorRetrieve % self.name)
+            return ""
         try:
             text = data.decode("utf-8")
         except Exception: